@@ -16,6 +16,8 @@ import logging
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from caching import get_cache
+
 # Import our manual stock price data
 try:
     import sys
@@ -40,6 +42,9 @@ class EnhancedStockAnalyzer:
     - News and social media integration
     """
     
+    # Seconds a live quote (price and daily change) is reused
+    LIVE_QUOTE_TTL = 60
+    
     def __init__(self):
         self.integrated_analyzer = IntegratedAnalysis()
         self.fundamental_analyzer = FundamentalAnalyzer()
@@ -64,6 +69,9 @@ class EnhancedStockAnalyzer:
         
         # Set a longer cache expiry for price data (30 minutes)
         self.price_cache_expiry = 30 * 60
+        
+        # Live price and daily change, shared by every analyzer in the process
+        self.quote_cache = get_cache('live_quotes', default_ttl=self.LIVE_QUOTE_TTL, max_entries=5000)
 
     def analyze_stock(self, symbol: str, portfolio: pd.DataFrame = None, force_refresh: bool = False) -> Dict:
         """
@@ -81,41 +89,12 @@ class EnhancedStockAnalyzer:
             # Next, check local cache (unless forcing refresh)
             cached_data = None if force_refresh else self._get_from_cache(symbol)
             if cached_data:
-                # Always try to get the latest price data
+                # Merge the live price from the short-TTL quote cache; the
+                # cached analysis itself is not rewritten
                 try:
-                    # Just update the price
-                    updated_price = self._get_current_price(symbol)
-                    if updated_price > 0:
-                        cached_data['current_price'] = updated_price
-                        cached_data['price_time'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        
-                        # Update price in price_metrics if it exists
-                        if 'price_metrics' in cached_data:
-                            # Try to get daily change
-                            try:
-                                import yfinance as yf
-                                ticker = yf.Ticker(symbol)
-                                recent_data = ticker.history(period="2d")
-                                if len(recent_data) >= 2:
-                                    prev_close = recent_data['Close'].iloc[-2]
-                                    if prev_close > 0:
-                                        daily_change = ((updated_price / prev_close) - 1) * 100
-                                        cached_data['price_metrics']['daily_change'] = daily_change
-                                        self.logger.info(f"Updated daily change for {symbol}: {daily_change:.2f}%")
-                                else:
-                                    cached_data['price_metrics']['daily_change'] = 0  # Reset since we don't know the change
-                            except Exception as dc_e:
-                                self.logger.warning(f"Failed to calculate daily change: {str(dc_e)}")
-                                cached_data['price_metrics']['daily_change'] = 0
-                                
-                        # Update price in technical analysis as well
-                        if 'integrated_analysis' in cached_data and 'technical_analysis' in cached_data['integrated_analysis'] and 'price_metrics' in cached_data['integrated_analysis']['technical_analysis']:
-                            cached_data['integrated_analysis']['technical_analysis']['price_metrics']['current_price'] = updated_price
-                            
-                        # Save the updated cache
-                        self._save_to_cache(symbol, cached_data)
-                        
-                        self.logger.info(f"Updated price for {symbol} from cache: {updated_price}")
+                    quote = self.get_live_quotes([symbol]).get(symbol.upper())
+                    if quote:
+                        self._merge_live_quote(cached_data, quote)
                 except Exception as price_e:
                     self.logger.warning(f"Failed to update price for {symbol}: {str(price_e)}")
                 
@@ -324,6 +303,105 @@ class EnhancedStockAnalyzer:
             # Return fallback data on any error
             return self._get_fallback_data(symbol)
 
+    def get_live_quotes(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Live price and daily change for several symbols
+        
+        Fresh quotes come from the shared quote cache; the rest are downloaded
+        in one batch request (which yields both the latest and the previous
+        close), with a per-symbol lookup for any the batch missed.
+        
+        Args:
+            symbols: Stock ticker symbols
+            
+        Returns:
+            Dict mapping each upper-cased symbol to a quote with 'price',
+            'daily_change' (percent) and 'price_time'; symbols without a price
+            are omitted
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols if s))
+        quotes = {}
+        for symbol in symbols:
+            quote = self.quote_cache.get(symbol)
+            if quote is not None:
+                quotes[symbol] = quote
+        
+        missing = [s for s in symbols if s not in quotes]
+        if missing:
+            for symbol, quote in self._download_live_quotes(missing).items():
+                self.quote_cache.set(symbol, quote, memory_only=True)
+                quotes[symbol] = quote
+        
+        for symbol in [s for s in missing if s not in quotes]:
+            quote = self.quote_cache.get_or_fetch(symbol, lambda: self._fetch_live_quote(symbol))
+            if quote is not None:
+                quotes[symbol] = quote
+        return quotes
+    
+    def _download_live_quotes(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Latest close and daily change for many symbols in one download"""
+        quotes = {}
+        try:
+            data = yf.download(symbols, period="5d", interval="1d", progress=False,
+                               group_by='column', auto_adjust=False, threads=True)
+            if data is None or data.empty or 'Close' not in data:
+                return quotes
+            closes = data['Close']
+            if isinstance(closes, pd.Series):
+                closes = closes.to_frame(symbols[0])
+            
+            price_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            for symbol in symbols:
+                if symbol not in closes.columns:
+                    continue
+                series = closes[symbol].dropna()
+                if series.empty or series.iloc[-1] <= 0:
+                    continue
+                price = float(series.iloc[-1])
+                prev_close = float(series.iloc[-2]) if len(series) >= 2 else 0.0
+                quotes[symbol] = {
+                    'price': price,
+                    'daily_change': ((price / prev_close) - 1) * 100 if prev_close > 0 else 0,
+                    'price_time': price_time
+                }
+        except Exception as e:
+            self.logger.warning(f"Batch quote download failed for {len(symbols)} symbols: {str(e)}")
+        return quotes
+    
+    def _fetch_live_quote(self, symbol: str) -> Optional[Dict]:
+        """Live price and daily change for one symbol"""
+        price = self._get_current_price(symbol)
+        if price <= 0:
+            return None
+        
+        daily_change = 0
+        try:
+            recent_data = yf.Ticker(symbol).history(period="2d")
+            if len(recent_data) >= 2:
+                prev_close = recent_data['Close'].iloc[-2]
+                if prev_close > 0:
+                    daily_change = ((price / prev_close) - 1) * 100
+        except Exception as dc_e:
+            self.logger.warning(f"Failed to calculate daily change: {str(dc_e)}")
+        
+        return {
+            'price': price,
+            'daily_change': daily_change,
+            'price_time': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+    
+    @staticmethod
+    def _merge_live_quote(data: Dict, quote: Dict) -> Dict:
+        """Overlay a live quote on an analysis dict loaded from the cache"""
+        data['current_price'] = quote['price']
+        data['price_time'] = quote['price_time']
+        if 'price_metrics' in data:
+            data['price_metrics']['daily_change'] = quote['daily_change']
+        technical = data.get('integrated_analysis', {}).get('technical_analysis', {})
+        if 'price_metrics' in technical:
+            technical['price_metrics']['current_price'] = quote['price']
+        return data
+    
     def _get_current_price(self, symbol: str) -> float:
         """Get just the current price for a stock - optimized for speed and reliability"""
         try:
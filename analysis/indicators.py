@@ -0,0 +1,357 @@
+"""
+Technical Indicators Module
+Vectorized NumPy implementations of the technical indicators used across the
+analyzers, agents and screening models.
+
+Every function accepts a single price series (1-D) or a matrix of series with
+one row per symbol (2-D, shape ``(n_symbols, n_bars)``) and returns an array of
+the same shape. Series of different lengths can be stacked with
+``stack_series``, which right-aligns them on their last bar and pads the start
+with NaN; all indicators treat leading NaN as "no data yet", so each row gives
+the same result as computing that series on its own.
+
+``latest_indicators_many`` computes the latest value of every standard
+indicator for many symbols in one pass and memoizes the result per
+(symbol, last bar), so a screen computes each indicator once per new bar.
+"""
+
+import logging
+import math
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from caching.memory import LRUMemoryCache
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def _as_matrix(values: Any) -> Tuple[np.ndarray, bool]:
+    x = np.asarray(values, dtype=np.float64)
+    if x.ndim == 1:
+        return x[np.newaxis, :], True
+    if x.ndim != 2:
+        raise ValueError("Expected a 1-D series or a 2-D (symbols x bars) matrix")
+    return x, False
+
+
+def _restore(x: np.ndarray, squeeze: bool) -> np.ndarray:
+    return x[0] if squeeze else x
+
+
+def stack_series(series: Sequence[Any]) -> np.ndarray:
+    """
+    Stack series of different lengths into a (n_symbols, max_len) matrix.
+
+    Series are right-aligned on their last bar; missing leading bars are NaN.
+    """
+    arrays = [np.asarray(s, dtype=np.float64).ravel() for s in series]
+    length = max((len(a) for a in arrays), default=0)
+    matrix = np.full((len(arrays), length), np.nan)
+    for row, array in enumerate(arrays):
+        if len(array):
+            matrix[row, length - len(array):] = array
+    return matrix
+
+
+def rolling_mean(values: Any, window: int) -> np.ndarray:
+    """
+    Simple moving average over the trailing window (NaN until the window is full).
+
+    Uses cumulative sums, so the cost is O(n_bars) regardless of the window.
+    """
+    if window <= 0:
+        raise ValueError("window must be positive")
+    x, squeeze = _as_matrix(values)
+    out = np.full_like(x, np.nan)
+    if x.shape[1] >= window:
+        valid = ~np.isnan(x)
+        sums = np.cumsum(np.where(valid, x, 0.0), axis=1)
+        counts = np.cumsum(valid, axis=1)
+        sums = np.concatenate([np.zeros((x.shape[0], 1)), sums], axis=1)
+        counts = np.concatenate([np.zeros((x.shape[0], 1), dtype=counts.dtype), counts], axis=1)
+        window_sums = sums[:, window:] - sums[:, :-window]
+        window_counts = counts[:, window:] - counts[:, :-window]
+        out[:, window - 1:] = np.where(window_counts == window, window_sums / window, np.nan)
+    return _restore(out, squeeze)
+
+
+def rolling_std(values: Any, window: int, ddof: int = 1) -> np.ndarray:
+    """Rolling standard deviation over the trailing window (sample std by default)"""
+    if window <= ddof:
+        raise ValueError("window must be larger than ddof")
+    x, squeeze = _as_matrix(values)
+    out = np.full_like(x, np.nan)
+    if x.shape[1] >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=1)
+        out[:, window - 1:] = windows.std(axis=2, ddof=ddof)
+    return _restore(out, squeeze)
+
+
+def ema(values: Any, span: int) -> np.ndarray:
+    """
+    Exponential moving average, matching ``Series.ewm(span=span, adjust=False).mean()``.
+
+    The recursion runs over bars but is vectorized across symbols.
+    """
+    x, squeeze = _as_matrix(values)
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty_like(x)
+    prev = np.full(x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        current = x[:, t]
+        blended = alpha * current + (1.0 - alpha) * prev
+        prev = np.where(np.isnan(prev), current, np.where(np.isnan(current), prev, blended))
+        out[:, t] = prev
+    return _restore(out, squeeze)
+
+
+def returns(values: Any, periods: int = 1) -> np.ndarray:
+    """
+    Simple returns over ``periods`` bars (NaN for the first bars and zero prices).
+    """
+    x, squeeze = _as_matrix(values)
+    out = np.full_like(x, np.nan)
+    if x.shape[1] > periods:
+        previous = x[:, :-periods]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[:, periods:] = np.where(previous != 0, x[:, periods:] / previous - 1.0, np.nan)
+    return _restore(out, squeeze)
+
+
+def rsi(values: Any, period: int = 14) -> np.ndarray:
+    """
+    Relative Strength Index using simple moving averages of gains and losses.
+
+    Matches the pandas formulation used throughout the codebase:
+    ``delta.where(delta > 0, 0).rolling(period).mean()`` for gains (and the
+    mirror for losses), so the first bar counts as a zero change.
+    """
+    x, squeeze = _as_matrix(values)
+    delta = np.full_like(x, np.nan)
+    delta[:, 1:] = x[:, 1:] - x[:, :-1]
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    missing = np.isnan(x)
+    gains[missing] = np.nan
+    losses[missing] = np.nan
+
+    avg_gain = rolling_mean(gains, period)
+    avg_loss = rolling_mean(losses, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return _restore(out, squeeze)
+
+
+def macd(values: Any, fast: int = 12, slow: int = 26,
+         signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    MACD line, signal line and histogram.
+
+    Returns:
+        (macd, signal, histogram)
+    """
+    macd_line = ema(values, fast) - ema(values, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def bollinger_bands(values: Any, window: int = 20,
+                    num_std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bollinger Bands around a simple moving average.
+
+    Returns:
+        (middle, upper, lower)
+    """
+    middle = rolling_mean(values, window)
+    spread = num_std * rolling_std(values, window)
+    return middle, middle + spread, middle - spread
+
+
+def average_true_range(high: Any, low: Any, close: Any, period: int = 14) -> np.ndarray:
+    """Average True Range (simple moving average of the true range)"""
+    h, squeeze = _as_matrix(high)
+    l, _ = _as_matrix(low)
+    c, _ = _as_matrix(close)
+    previous_close = np.full_like(c, np.nan)
+    previous_close[:, 1:] = c[:, :-1]
+    ranges = np.stack([h - l, np.abs(h - previous_close), np.abs(l - previous_close)])
+    true_range = np.nanmax(np.where(np.isnan(ranges).all(axis=0), 0.0, ranges), axis=0)
+    true_range[np.isnan(h - l)] = np.nan
+    return _restore(rolling_mean(true_range, period), squeeze)
+
+
+def max_drawdown(values: Any) -> np.ndarray:
+    """
+    Largest peak-to-trough decline of each series, as a positive fraction.
+
+    Returns:
+        Array with one value per series (a scalar array for a 1-D input)
+    """
+    x, squeeze = _as_matrix(values)
+    peaks = np.fmax.accumulate(x, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdowns = np.where(peaks > 0, (peaks - x) / peaks, np.nan)
+    valid = ~np.isnan(drawdowns)
+    result = np.where(valid.any(axis=1), np.max(np.where(valid, drawdowns, -np.inf), axis=1), 0.0)
+    return result[0] if squeeze else result
+
+
+def volatility(values: Any, periods_per_year: int = TRADING_DAYS_PER_YEAR, ddof: int = 0) -> np.ndarray:
+    """
+    Annualized volatility of simple returns, as a fraction.
+
+    Returns:
+        Array with one value per series (a scalar array for a 1-D input)
+    """
+    r, squeeze = _as_matrix(returns(values))
+    valid = ~np.isnan(r)
+    counts = valid.sum(axis=1)
+    means = np.where(counts > 0, np.where(valid, r, 0.0).sum(axis=1) / np.maximum(counts, 1), 0.0)
+    squares = np.where(valid, (r - means[:, np.newaxis]) ** 2, 0.0).sum(axis=1)
+    dof = counts - ddof
+    result = np.where(dof > 0, np.sqrt(squares / np.maximum(dof, 1)), 0.0) * math.sqrt(periods_per_year)
+    return result[0] if squeeze else result
+
+
+def latest_values(close: Any, volume: Optional[Any] = None) -> Dict[str, np.ndarray]:
+    """
+    Latest value of every standard indicator for each series.
+
+    ``return_N`` compares the last close with the close N bars from the end
+    (``close[-1] / close[-N] - 1``), and ``volume_ratio_20`` is the average
+    volume of the last 20 bars over the 20 bars before them.
+
+    Args:
+        close: Close prices, 1-D or (n_symbols, n_bars)
+        volume: Optional volumes with the same shape
+
+    Returns:
+        Dict of indicator name -> array with one value per series
+    """
+    c, _ = _as_matrix(close)
+    n_bars = c.shape[1]
+    last = c[:, -1] if n_bars else np.full(c.shape[0], np.nan)
+
+    def at_end(matrix: np.ndarray, offset: int = 1) -> np.ndarray:
+        if n_bars >= offset:
+            return matrix[:, -offset]
+        return np.full(c.shape[0], np.nan)
+
+    values = {'close': last}
+    for window in (20, 50, 200):
+        values[f'sma_{window}'] = at_end(rolling_mean(c, window))
+    values['rsi_14'] = at_end(rsi(c, 14))
+
+    macd_line, signal_line, histogram = macd(c)
+    values['macd'] = at_end(macd_line)
+    values['macd_signal'] = at_end(signal_line)
+    values['macd_histogram'] = at_end(histogram)
+
+    middle, upper, lower = bollinger_bands(c)
+    values['bb_middle'] = at_end(middle)
+    values['bb_upper'] = at_end(upper)
+    values['bb_lower'] = at_end(lower)
+    values['roc_10'] = at_end(returns(c, 10)) * 100
+
+    for lookback in (5, 10, 20, 21, 63):
+        base = at_end(c, lookback)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values[f'return_{lookback}'] = np.where(base != 0, last / base - 1.0, np.nan)
+
+    values['volatility'] = volatility(c)
+    values['max_drawdown'] = max_drawdown(c)
+
+    if volume is not None:
+        v, _ = _as_matrix(volume)
+        volume_sma = rolling_mean(v, 20)
+        recent, older = at_end(volume_sma), at_end(volume_sma, 21)
+        values['volume'] = at_end(v)
+        values['volume_sma_20'] = recent
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values['volume_ratio_20'] = np.where(older > 0, recent / older, np.nan)
+
+    return values
+
+
+class IndicatorCache:
+    """
+    Memoizes latest indicator values per (symbol, last bar).
+
+    Misses are stacked into one matrix and computed in a single vectorized pass.
+    """
+
+    def __init__(self, max_entries: int = 5000):
+        self._cache = LRUMemoryCache(max_entries=max_entries, max_bytes=None)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(symbol: str, close: np.ndarray, last_bar: Any) -> str:
+        # The last close is part of the key so an intraday update of the
+        # current bar is not served from a stale entry
+        last_close = close[-1] if len(close) else None
+        return f"{symbol}|{last_bar}|{len(close)}|{last_close!r}"
+
+    def latest_many(self, series: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+        """
+        Latest indicator values for many symbols.
+
+        Args:
+            series: symbol -> {'close': prices, 'volume': optional volumes,
+                    'last_bar': optional timestamp of the last bar}
+
+        Returns:
+            symbol -> {indicator name: float}
+        """
+        results = {}
+        pending = {}
+        for symbol, data in series.items():
+            close = np.asarray(data['close'], dtype=np.float64).ravel()
+            key = self._key(symbol, close, data.get('last_bar'))
+            entry = self._cache.get_entry(key)
+            if entry is not None:
+                self.hits += 1
+                results[symbol] = entry['data']
+            else:
+                self.misses += 1
+                pending[symbol] = (key, close, data.get('volume'))
+
+        if pending:
+            symbols = list(pending)
+            closes = stack_series([pending[s][1] for s in symbols])
+            volumes = None
+            if any(pending[s][2] is not None for s in symbols):
+                volumes = stack_series([
+                    pending[s][2] if pending[s][2] is not None else np.full(len(pending[s][1]), np.nan)
+                    for s in symbols
+                ])
+            computed = latest_values(closes, volumes)
+            for row, symbol in enumerate(symbols):
+                snapshot = {name: float(column[row]) for name, column in computed.items()}
+                self._cache.set_value(pending[symbol][0], snapshot, ttl=float('inf'))
+                results[symbol] = snapshot
+
+        return results
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+_default_cache = IndicatorCache()
+
+
+def latest_indicators_many(series: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Latest indicator values for many symbols, memoized process-wide"""
+    return _default_cache.latest_many(series)
+
+
+def latest_indicators(symbol: str, close: Iterable[float], volume: Optional[Iterable[float]] = None,
+                      last_bar: Any = None) -> Dict[str, float]:
+    """Latest indicator values for one symbol, memoized process-wide"""
+    return _default_cache.latest_many({
+        symbol: {'close': close, 'volume': volume, 'last_bar': last_bar}
+    })[symbol]
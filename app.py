@@ -1,5 +1,5 @@
 # app.py
-from flask import Flask, render_template, request, jsonify, url_for, redirect, flash, session
+from flask import Flask, render_template, request, jsonify, url_for, redirect, flash, session, Response, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from models import db, User, StockAnalysis, Portfolio, StockPreference, FeatureWeight, SectorPreference, PredictionRecord
@@ -9,8 +9,10 @@ from portfolio.portfolio_management import PortfolioManager
 from interface.interface import analyze_single_stock
 from user_profiling.profile_analyzer import ProfileAnalyzer
 from ml_components.adaptive_learning_db import AdaptiveLearningDB
+from ml_components.feedback_buffer import get_feedback_buffer
 import os
 import time
+import threading
 import logging
 from datetime import datetime, timedelta
 
@@ -22,10 +24,12 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 from ml_components.naif_alrasheed_model import NaifAlRasheedModel
 from claude_integration.chat_interface import ChatInterface
-from claude_integration.claude_handler import ClaudeHandler
+from claude_integration.claude_handler import ClaudeHandler, format_sse_event
 from sentiment_config_routes import sentiment_bp
 from routes.phase_3_4_routes import phase_3_4_bp
 from health import health_bp
+from routes.job_routes import jobs_bp, submit_job, wants_background
+from jobs.handlers import compute_sector_analysis, refresh_prediction_outcomes
 import json
 import pandas as pd
 import numpy as np
@@ -86,6 +90,7 @@ app.json_encoder = CustomJSONEncoder  # Use our custom JSON encoder
 
 # Initialize extensions
 db.init_app(app)
+get_feedback_buffer().init_app(app)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
@@ -94,6 +99,7 @@ login_manager.login_view = 'login'
 app.register_blueprint(sentiment_bp)
 app.register_blueprint(phase_3_4_bp)
 app.register_blueprint(health_bp)
+app.register_blueprint(jobs_bp)
 
 # Initialize components
 portfolio_manager = PortfolioManager()
@@ -164,6 +170,7 @@ def index():
             liked_stocks = adaptive_learning.get_liked_stocks(limit=5)
             if liked_stocks:
                 # For demo, we'll just analyze these stocks
+                stock_analyzer.get_live_quotes(liked_stocks[:3])
                 for symbol in liked_stocks[:3]:  # Limit to 3 for performance
                     try:
                         data = stock_analyzer.analyze_stock(symbol)
@@ -1574,6 +1581,57 @@ def user_preferences():
         predictions=predictions
     )
 
+# Candidate analysis runs on a long-lived pool; each pool thread keeps one
+# EnhancedStockAnalyzer, so the ML and fundamental engines are built once per
+# thread instead of once per candidate per request
+CANDIDATE_ANALYSIS_WORKERS = 8
+_candidate_pool = None
+_candidate_pool_lock = threading.Lock()
+_candidate_analyzers = threading.local()
+
+def _candidate_analyzer():
+    analyzer = getattr(_candidate_analyzers, 'analyzer', None)
+    if analyzer is None:
+        analyzer = EnhancedStockAnalyzer()
+        _candidate_analyzers.analyzer = analyzer
+    return analyzer
+
+def analyze_candidate_stocks(symbols):
+    """
+    Analyze candidate stocks concurrently for recommendation scoring.
+    
+    Args:
+        symbols: Stock symbols to analyze
+        
+    Returns:
+        List of stock data dicts (with 'symbol') in the order of symbols,
+        skipping stocks that could not be analyzed
+    """
+    global _candidate_pool
+    from concurrent.futures import ThreadPoolExecutor
+    
+    if not symbols:
+        return []
+    
+    # Live prices for every candidate in one batch
+    stock_analyzer.get_live_quotes(symbols)
+    
+    def analyze(symbol):
+        try:
+            # The analyzer keeps per-call state (current symbol, freshly trained ML engine),
+            # so each thread uses its own; caches and live quotes are still shared
+            return _candidate_analyzer().analyze_stock(symbol)
+        except Exception as e:
+            print(f"Error analyzing stock {symbol}: {str(e)}")
+            return None
+    
+    with _candidate_pool_lock:
+        if _candidate_pool is None:
+            _candidate_pool = ThreadPoolExecutor(max_workers=CANDIDATE_ANALYSIS_WORKERS,
+                                                 thread_name_prefix='candidate-analysis')
+    results = list(_candidate_pool.map(analyze, symbols))
+    return [{'symbol': symbol, **data} for symbol, data in zip(symbols, results) if data]
+
 @app.route('/recommendations')
 @login_required
 def recommendations():
@@ -1596,14 +1654,7 @@ def recommendations():
     sample_stocks = [s for s in sample_stocks if s not in user_stocks]
     
     # Get data for these stocks
-    stock_data = []
-    for symbol in sample_stocks:
-        try:
-            data = stock_analyzer.analyze_stock(symbol)
-            if data:
-                stock_data.append({'symbol': symbol, **data})
-        except Exception as e:
-            print(f"Error analyzing stock {symbol}: {str(e)}")
+    stock_data = analyze_candidate_stocks(sample_stocks)
     
     # Get recommendations using the adaptive learning model
     if stock_data:
@@ -1623,6 +1674,7 @@ def portfolio():
     purchased_stocks = []
     if adaptive_learning:
         purchased_symbols = adaptive_learning.get_purchased_stocks()
+        stock_analyzer.get_live_quotes(purchased_symbols)
         for symbol in purchased_symbols:
             try:
                 data = stock_analyzer.analyze_stock(symbol)
@@ -1760,6 +1812,13 @@ def portfolio_optimize(portfolio_id):
             'target_allocation': {}
         }
         
+        # Optionally run the optimization as a background job and return its id
+        if wants_background():
+            return submit_job('portfolio_optimize', {
+                'portfolio_id': portfolio.id,
+                'constraints': constraints
+            })
+        
         # Run optimization
         result = portfolio_manager.optimize_portfolio(constraints)
         
@@ -2029,24 +2088,40 @@ def naif_model_screen():
         if not run_simulation:
             custom_params['simulation_runs'] = 0
         
+        # Stock symbols screened for the market (the same list in the background job,
+        # so ?async=1 returns the portfolio the synchronous request would)
+        if market == 'us':
+            symbols = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'META', 'TSLA', 'JPM', 'JNJ', 'V',
+                      'WMT', 'PG', 'UNH', 'HD', 'BAC', 'MA', 'DIS', 'ADBE', 'CRM', 'NFLX',
+                      'XOM', 'CVX', 'PFE', 'ABT', 'TMO', 'COST', 'AVGO', 'LLY', 'ORCL', 'ACN']
+        else:  # Saudi market
+            symbols = ['1180', '2222', '1010', '2030', '7200', '4700', '1060', '4009', '2380', '1120']
+        
+        # Optionally run the screening as a background job and return its id
+        if wants_background():
+            return submit_job('naif_screening', {
+                'market': market,
+                'symbols': symbols,
+                'custom_params': custom_params,
+                'risk_profile': risk_profile,
+                'user_id': current_user.id,
+                'portfolio_name': request.form.get('portfolio_name')
+            })
+        
         # Run the OPTIMIZED screening model with async processing
         try:
             from ml_components.naif_model_optimizer import OptimizedNaifModel
-            optimized_model = OptimizedNaifModel()
-
-            # Get stock symbols for the market
-            if market == 'us':
-                symbols = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'META', 'TSLA', 'JPM', 'JNJ', 'V',
-                          'WMT', 'PG', 'UNH', 'HD', 'BAC', 'MA', 'DIS', 'ADBE', 'CRM', 'NFLX',
-                          'XOM', 'CVX', 'PFE', 'ABT', 'TMO', 'COST', 'AVGO', 'LLY', 'ORCL', 'ACN']
-            else:  # Saudi market
-                symbols = ['1180', '2222', '1010', '2030', '7200', '4700', '1060', '4009', '2380', '1120']
+            optimized_model = OptimizedNaifModel(naif_model)
 
             app.logger.info(f"🚀 Using OPTIMIZED Naif model for {len(symbols)} {market.upper()} stocks")
 
             # Run async analysis
             import asyncio
-            results = asyncio.run(optimized_model.analyze_portfolio_fast(symbols, market.upper()))
+            results = asyncio.run(optimized_model.analyze_portfolio_fast(
+                symbols, market.upper(),
+                custom_params=custom_params if custom_params else None,
+                risk_profile=risk_profile
+            ))
 
             # Convert to expected format
             if results and not results.get('fallback_mode'):
@@ -2133,36 +2208,18 @@ def naif_sector_analysis():
     if market not in ['us', 'saudi']:
         market = 'us'  # Default to US if invalid
     
+    # Optionally run the sector analysis as a background job and return its id
+    if wants_background():
+        return submit_job('naif_sector_analysis', {'market': market})
+    
     # Run sector ranking
     try:
-        # Run macro analysis first
-        macro_analysis = naif_model._analyze_macro_conditions(market)
-        
-        # Then run sector ranking
-        sector_scores = naif_model._rank_sectors(market, macro_analysis)
-        top_sectors = naif_model._select_top_sectors(sector_scores, market)
-        
-        # Sort sectors by score
-        sorted_sectors = sorted(sector_scores.items(), key=lambda x: x[1], reverse=True)
-        
-        # Get more detailed sector metrics for display
-        sector_metrics = {}
-        for sector_name, _ in sorted_sectors:
-            # Create a mock list of companies in this sector for metrics calculation
-            mock_companies = [{'sector': sector_name, 'symbol': f'MOCK_{i}_{sector_name}'} for i in range(5)]
-            
-            # Calculate detailed metrics
-            growth = naif_model._calculate_sector_growth(mock_companies, market)
-            momentum = naif_model._calculate_sector_momentum(mock_companies, market)
-            profitability = naif_model._calculate_sector_profitability(mock_companies, market)
-            valuation = naif_model._calculate_sector_valuation(mock_companies, market)
-            
-            sector_metrics[sector_name] = {
-                'growth': growth,
-                'momentum': momentum,
-                'profitability': profitability,
-                'valuation': valuation
-            }
+        # Macro analysis, sector ranking and detailed sector metrics for display
+        analysis = compute_sector_analysis(naif_model, market)
+        macro_analysis = analysis['macro_analysis']
+        sorted_sectors = analysis['sorted_sectors']
+        top_sectors = analysis['top_sectors']
+        sector_metrics = analysis['sector_metrics']
         
         # Prepare market insights (example data)
         market_insights = {
@@ -2735,29 +2792,12 @@ def update_all_predictions():
     if not current_user.is_authenticated:
         return jsonify({'success': False, 'error': 'Authentication required'})
     
-    # Get predictions that are at least 7 days old and have no actual value
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    predictions = PredictionRecord.query.filter(
-        PredictionRecord.prediction_date < week_ago,
-        PredictionRecord.actual_value.is_(None)
-    ).all()
-    
-    updated_count = 0
-    for prediction in predictions:
-        try:
-            # Get current data for the stock
-            data = stock_analyzer.analyze_stock(prediction.symbol)
-            if data and 'current_price' in data:
-                # Update the prediction with actual price
-                prediction.actual_value = data['current_price']
-                prediction.error = abs(prediction.predicted_value - data['current_price'])
-                db.session.add(prediction)
-                updated_count += 1
-        except Exception as e:
-            print(f"Error updating prediction for {prediction.symbol}: {str(e)}")
+    # Optionally run the update as a background job and return its id
+    if wants_background():
+        return submit_job('update_predictions', {})
     
-    if updated_count > 0:
-        db.session.commit()
+    # Record actual prices for predictions that are at least 7 days old
+    updated_count = refresh_prediction_outcomes(stock_analyzer)
     
     return jsonify({
         'success': True, 
@@ -2792,10 +2832,35 @@ def ensure_json_serializable(obj):
         # Fall back to string representation for other types
         return str(obj)
 
+def record_chat_stock_views(user_chat):
+    """Record the stocks discussed in a chat in the adaptive learning system"""
+    try:
+        adaptive_learning = get_adaptive_learning()
+        if adaptive_learning:
+            # Extract potential stock symbols for tracking
+            stock_symbols = user_chat.context.get('current_stocks', [])
+            for symbol in stock_symbols:
+                adaptive_learning.record_stock_view(symbol)
+    except Exception as learning_error:
+        app.logger.error(f"Error in adaptive learning: {str(learning_error)}")
+        # Continue without recording if adaptive learning fails
+
+def stream_chat_events(user_chat, message):
+    """Server-sent events carrying a chat response as it is generated"""
+    try:
+        for text in user_chat.stream_message(message):
+            yield format_sse_event({'text': text})
+        record_chat_stock_views(user_chat)
+        yield format_sse_event({}, event='done')
+    except Exception as e:
+        app.logger.error(f"Error in streaming chat API: {str(e)}")
+        yield format_sse_event({'error': "I'm sorry, I encountered an error processing your request. Please try again."},
+                               event='error')
+
 @app.route('/api/chat', methods=['POST'])
 @login_required
 def chat_api():
-    """API endpoint for chat interactions"""
+    """API endpoint for chat interactions (server-sent events when "stream" is set)"""
     try:
         # Get message from request
         data = request.json
@@ -2808,6 +2873,12 @@ def chat_api():
         # Create a new chat interface for this user
         user_chat = ChatInterface(user_id=current_user.id)
         
+        # Stream the response so the first tokens arrive without waiting for the full completion
+        if data.get('stream') or request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+            return Response(stream_with_context(stream_chat_events(user_chat, message)),
+                            mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        
         # Process the message
         response = user_chat.process_message(message, include_visualizations=include_visualizations)
         
@@ -2831,16 +2902,7 @@ def chat_api():
                 # Continue without visualizations if they cause errors
         
         # Record this interaction in the adaptive learning system
-        try:
-            adaptive_learning = get_adaptive_learning()
-            if adaptive_learning:
-                # Extract potential stock symbols for tracking
-                stock_symbols = user_chat.context.get('current_stocks', [])
-                for symbol in stock_symbols:
-                    adaptive_learning.record_stock_view(symbol)
-        except Exception as learning_error:
-            app.logger.error(f"Error in adaptive learning: {str(learning_error)}")
-            # Continue without recording if adaptive learning fails
+        record_chat_stock_views(user_chat)
         
         # Return the simplified response
         return jsonify(simplified_response)
@@ -6,6 +6,7 @@ Creates Flask app with modular blueprint architecture
 from flask import Flask
 from flask_login import LoginManager
 from models import db, User
+from ml_components.feedback_buffer import get_feedback_buffer
 from blueprints import register_blueprints
 from config import get_config
 from security import SecurityMiddleware, APIKeyRotation
@@ -50,6 +51,7 @@ def create_app(config_name=None):
     
     # Initialize database
     db.init_app(app)
+    get_feedback_buffer().init_app(app)
     
     # Initialize Flask-Login
     login_manager = LoginManager()
@@ -0,0 +1,19 @@
+"""
+Shared caching subsystem used by the market data clients.
+"""
+
+from .memory import LRUMemoryCache
+from .disk import DiskCache
+from .sqlite_store import SQLiteCacheStore, migrate_pickle_directory
+from .tiered import TieredCache, CacheStats, get_cache, all_cache_stats
+
+__all__ = [
+    'LRUMemoryCache',
+    'DiskCache',
+    'SQLiteCacheStore',
+    'migrate_pickle_directory',
+    'TieredCache',
+    'CacheStats',
+    'get_cache',
+    'all_cache_stats',
+]
@@ -0,0 +1,170 @@
+"""
+File-per-key disk cache tier
+"""
+
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+
+class DiskCache:
+    """
+    Stores one file per key under a directory.
+
+    Two formats are supported so existing cache directories keep working:
+
+    - ``pickle``: the raw value pickled to ``<key>.pkl``; the file mtime is the fetch time
+    - ``json``: ``{'cache_time': ..., 'data': ...}`` written to ``<key>.json``; files
+      holding a bare JSON value (older layout) are read with their mtime as fetch time
+
+    Writes go through a temporary file and ``os.replace`` so readers never see a
+    partially written entry.
+    """
+
+    FORMATS = {'pickle': '.pkl', 'json': '.json'}
+
+    def __init__(self, directory: str, format: str = 'pickle', suffix: Optional[str] = None,
+                 max_bytes: Optional[int] = None):
+        if format not in self.FORMATS:
+            raise ValueError(f"Unsupported disk cache format: {format}")
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.format = format
+        self.suffix = suffix if suffix is not None else self.FORMATS[format]
+        self.max_bytes = max_bytes
+        self._writes_since_prune = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _safe_name(key: str) -> str:
+        return key.replace('/', '_').replace('\\', '_')
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{self._safe_name(key)}{self.suffix}"
+
+    def read(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        """
+        Read an entry regardless of age.
+
+        Returns:
+            (value, stored_at, size_in_bytes) or None if missing or unreadable
+        """
+        path = self.path_for(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        try:
+            if self.format == 'pickle':
+                with open(path, 'rb') as f:
+                    return pickle.load(f), stat.st_mtime, stat.st_size
+
+            with open(path, 'r') as f:
+                payload = json.load(f)
+            if isinstance(payload, dict) and set(payload) == {'cache_time', 'data'}:
+                return payload['data'], float(payload['cache_time']), stat.st_size
+            return payload, stat.st_mtime, stat.st_size
+        except Exception as e:
+            self.logger.error(f"Error reading from disk cache: {str(e)}")
+            return None
+
+    def write(self, key: str, value: Any) -> Optional[int]:
+        """
+        Write an entry atomically.
+
+        Returns:
+            Number of bytes written, or None on failure
+        """
+        path = self.path_for(key)
+        try:
+            if self.format == 'pickle':
+                payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            else:
+                payload = json.dumps({'cache_time': time.time(), 'data': value}).encode('utf-8')
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp_')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            self.logger.error(f"Error saving to disk cache: {str(e)}")
+            return None
+
+        if self.max_bytes is not None:
+            with self._lock:
+                self._writes_since_prune += 1
+                should_prune = self._writes_since_prune >= 100
+                if should_prune:
+                    self._writes_since_prune = 0
+            if should_prune:
+                self.prune(self.max_bytes)
+        return len(payload)
+
+    def delete(self, key: str) -> bool:
+        try:
+            self.path_for(key).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def files(self, pattern: str = "*") -> Iterator[Path]:
+        return self.directory.glob(f"{pattern}{self.suffix}")
+
+    def delete_matching(self, predicate: Callable[[str], bool]) -> int:
+        """Delete every entry whose file stem satisfies predicate"""
+        count = 0
+        for path in list(self.files()):
+            if predicate(path.name[:-len(self.suffix)] if self.suffix else path.name):
+                try:
+                    path.unlink()
+                    count += 1
+                except FileNotFoundError:
+                    pass
+        return count
+
+    def total_bytes(self) -> int:
+        total = 0
+        for path in self.files():
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def prune(self, max_bytes: int) -> int:
+        """Delete the oldest entries until the directory fits in max_bytes"""
+        entries = []
+        for path in self.files():
+            try:
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except FileNotFoundError:
+                pass
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+                removed += 1
+            except FileNotFoundError:
+                pass
+        if removed:
+            self.logger.debug(f"Pruned {removed} files from {self.directory}")
+        return removed
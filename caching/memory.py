@@ -0,0 +1,103 @@
+"""
+Bounded in-memory LRU cache tier
+"""
+
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate size of a cached value in bytes"""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class LRUMemoryCache(MutableMapping):
+    """
+    Thread-safe LRU cache bounded by entry count and approximate byte size.
+
+    Entries are dicts of the form ``{'data', 'expires_at', 'stored_at', 'size'}``,
+    which is also the shape the clients' former ``memory_cache`` dicts used, so
+    the tier can be inspected or seeded like a plain mapping of entries.
+    Expired entries are kept until evicted so callers can still fall back to
+    stale data when an upstream fetch fails.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: Optional[int] = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    # Mapping interface (entry level)
+
+    def __getitem__(self, key: str) -> Dict:
+        with self._lock:
+            return self._entries[key]
+
+    def __setitem__(self, key: str, entry: Dict) -> None:
+        entry = dict(entry)
+        entry.setdefault('stored_at', time.time())
+        entry.setdefault('size', estimate_size(entry.get('data')))
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key).get('size', 0)
+            self._entries[key] = entry
+            self.current_bytes += entry['size']
+            self._evict()
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key)
+            self.current_bytes -= entry.get('size', 0)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or
+            (self.max_bytes is not None and self.current_bytes > self.max_bytes and len(self._entries) > 1)
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self.current_bytes -= entry.get('size', 0)
+            self.evictions += 1
+
+    # Value level API
+
+    def get_entry(self, key: str) -> Optional[Dict]:
+        """Return the entry for key (fresh or stale) and mark it recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set_value(self, key: str, value: Any, ttl: float, stored_at: Optional[float] = None,
+                  size: Optional[int] = None) -> None:
+        """Store a value that expires ttl seconds after stored_at"""
+        stored_at = time.time() if stored_at is None else stored_at
+        self[key] = {
+            'data': value,
+            'expires_at': stored_at + ttl,
+            'stored_at': stored_at,
+            'size': estimate_size(value) if size is None else size
+        }
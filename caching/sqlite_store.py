@@ -0,0 +1,370 @@
+"""
+Consolidated SQLite store for API response caches
+
+Replaces a directory holding one pickle per ``ENDPOINT_param=...&symbol=X`` key
+with a single indexed SQLite database:
+
+- ``entries`` holds every response, indexed by (endpoint, symbol) with its
+  fetch time, so freshness checks are index lookups instead of ``stat()`` +
+  ``pickle.load`` per file and many symbols can be read in one query
+- ``series`` holds time series responses as packed float64 column blobs,
+  so a series is read back with one row fetch and wrapped as NumPy arrays
+  without parsing the JSON payload
+
+The store implements the same read/write/delete interface as ``DiskCache`` so
+it can be used as the disk tier of a ``TieredCache``. Legacy pickle files in
+the same directory are still read (and then imported) on a miss, and can be
+bulk-imported with ``migrate_pickle_directory`` or::
+
+    python -m caching.sqlite_store cache/alpha_vantage
+"""
+
+import logging
+import pickle
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_KEY_PATTERN = re.compile(r'^([A-Z][A-Z0-9_]*?)_([a-z_]+=.*)$')
+
+# Alpha Vantage time series payload keys and their OHLCV field names
+SERIES_FIELDS = {
+    'open': '1. open',
+    'high': '2. high',
+    'low': '3. low',
+    'close': '4. close',
+    'volume': '5. volume'
+}
+
+
+def parse_cache_key(key: str) -> Tuple[str, Optional[str]]:
+    """
+    Split an ``ENDPOINT_param=value&...`` cache key into (endpoint, symbol).
+    """
+    match = _KEY_PATTERN.match(key)
+    if not match:
+        return key, None
+    endpoint, param_str = match.groups()
+    params = dict(part.split('=', 1) for part in param_str.split('&') if '=' in part)
+    return endpoint, params.get('symbol') or params.get('tickers')
+
+
+def extract_series(payload: Any) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Convert an Alpha Vantage time series response to column arrays sorted by date.
+
+    Returns:
+        Dict with 'dates' (datetime64[s]) and float64 OHLCV columns, or None
+    """
+    if not isinstance(payload, dict):
+        return None
+    series_key = next((k for k in payload if 'Time Series' in k), None)
+    if series_key is None or not isinstance(payload[series_key], dict):
+        return None
+
+    bars = payload[series_key]
+    stamps = sorted(bars)
+    if not stamps:
+        return None
+
+    columns = {'dates': np.array(stamps, dtype='datetime64[s]')}
+    for column, field in SERIES_FIELDS.items():
+        columns[column] = np.array(
+            [float(bars[stamp].get(field, 'nan')) for stamp in stamps], dtype=np.float64
+        )
+    return columns
+
+
+class SQLiteCacheStore:
+    """
+    Single-file, indexed cache store with bulk and columnar time series reads.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            cache_key TEXT PRIMARY KEY,
+            endpoint TEXT NOT NULL,
+            symbol TEXT,
+            fetched_at REAL NOT NULL,
+            size INTEGER NOT NULL,
+            payload BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_entries_endpoint_symbol ON entries (endpoint, symbol);
+        CREATE TABLE IF NOT EXISTS series (
+            cache_key TEXT PRIMARY KEY,
+            endpoint TEXT NOT NULL,
+            symbol TEXT,
+            fetched_at REAL NOT NULL,
+            bars INTEGER NOT NULL,
+            dates BLOB NOT NULL,
+            open BLOB NOT NULL,
+            high BLOB NOT NULL,
+            low BLOB NOT NULL,
+            close BLOB NOT NULL,
+            volume BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_series_endpoint_symbol ON series (endpoint, symbol);
+    """
+
+    def __init__(self, directory: str, filename: str = 'cache.sqlite3',
+                 legacy_suffix: Optional[str] = '.pkl', mmap_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            directory: Directory holding the database (and any legacy pickle files)
+            filename: Database file name
+            legacy_suffix: Suffix of legacy per-key pickle files; None disables fallback
+            mmap_bytes: SQLite memory-map size, which speeds up page reads
+                (result values are still copied out by sqlite3)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / filename
+        self.legacy_suffix = legacy_suffix
+        self.mmap_bytes = mmap_bytes
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA mmap_size={int(self.mmap_bytes)}')
+            self._local.conn = conn
+        return conn
+
+    # DiskCache-compatible interface
+
+    def _legacy_path(self, key: str) -> Optional[Path]:
+        if self.legacy_suffix is None:
+            return None
+        return self.directory / f"{key.replace('/', '_').replace(chr(92), '_')}{self.legacy_suffix}"
+
+    def _read_legacy(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        path = self._legacy_path(key)
+        if path is None:
+            return None
+        try:
+            stat = path.stat()
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error reading legacy cache file {path.name}: {str(e)}")
+            return None
+
+        # Import so the next lookup is served from the database
+        self.write(key, value, fetched_at=stat.st_mtime)
+        return value, stat.st_mtime, stat.st_size
+
+    def read(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        """
+        Read an entry regardless of age.
+
+        Returns:
+            (value, fetched_at, size_in_bytes) or None if missing
+        """
+        row = self._connection().execute(
+            'SELECT payload, fetched_at, size FROM entries WHERE cache_key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return self._read_legacy(key)
+        try:
+            return pickle.loads(row[0]), row[1], row[2]
+        except Exception as e:
+            logger.error(f"Error decoding cache entry {key}: {str(e)}")
+            return None
+
+    def write(self, key: str, value: Any, fetched_at: Optional[float] = None) -> Optional[int]:
+        """
+        Insert or replace an entry; time series payloads are also stored as columns.
+
+        Returns:
+            Size of the stored payload in bytes, or None on failure
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        endpoint, symbol = parse_cache_key(key)
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            series = extract_series(value)
+            with self._write_lock:
+                conn = self._connection()
+                with conn:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)',
+                        (key, endpoint, symbol, fetched_at, len(payload), sqlite3.Binary(payload))
+                    )
+                    if series is not None:
+                        conn.execute(
+                            'INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                            (key, endpoint, symbol, fetched_at, len(series['dates']),
+                             series['dates'].astype('int64').tobytes(),
+                             *(series[c].tobytes() for c in SERIES_FIELDS))
+                        )
+            return len(payload)
+        except Exception as e:
+            logger.error(f"Error saving to cache store: {str(e)}")
+            return None
+
+    def delete(self, key: str) -> bool:
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                deleted = conn.execute('DELETE FROM entries WHERE cache_key = ?', (key,)).rowcount
+                conn.execute('DELETE FROM series WHERE cache_key = ?', (key,))
+        legacy = self._legacy_path(key)
+        if legacy is not None and legacy.exists():
+            legacy.unlink()
+            deleted += 1
+        return deleted > 0
+
+    def delete_matching(self, predicate: Callable[[str], bool]) -> int:
+        """
+        Delete every entry (and legacy file) whose key satisfies predicate.
+
+        Returns:
+            Number of entries removed
+        """
+        keys = [row[0] for row in self._connection().execute('SELECT cache_key FROM entries')]
+        doomed = [key for key in keys if predicate(key)]
+        if doomed:
+            with self._write_lock:
+                conn = self._connection()
+                with conn:
+                    conn.executemany('DELETE FROM entries WHERE cache_key = ?', [(k,) for k in doomed])
+                    conn.executemany('DELETE FROM series WHERE cache_key = ?', [(k,) for k in doomed])
+
+        removed = set(doomed)
+        if self.legacy_suffix is not None:
+            for path in self.directory.glob(f"*{self.legacy_suffix}"):
+                key = path.name[:-len(self.legacy_suffix)]
+                if predicate(key):
+                    path.unlink()
+                    removed.add(key)
+        return len(removed)
+
+    # Bulk and columnar access
+
+    def read_many(self, keys: Iterable[str], chunk_size: int = 500) -> Dict[str, Tuple[Any, float]]:
+        """
+        Read many entries with one query per chunk of keys.
+
+        Returns:
+            Dict of key -> (value, fetched_at) for keys present in the store
+        """
+        keys = list(keys)
+        results = {}
+        conn = self._connection()
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f'SELECT cache_key, payload, fetched_at FROM entries WHERE cache_key IN ({placeholders})',
+                chunk
+            )
+            for key, payload, fetched_at in rows:
+                results[key] = (pickle.loads(payload), fetched_at)
+        return results
+
+    def fetched_at_many(self, endpoint: str, symbols: Iterable[str]) -> Dict[str, float]:
+        """
+        Latest fetch time per symbol for an endpoint, without decoding payloads.
+        """
+        symbols = list(symbols)
+        results = {}
+        conn = self._connection()
+        for start in range(0, len(symbols), 500):
+            chunk = symbols[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f'SELECT symbol, MAX(fetched_at) FROM entries '
+                f'WHERE endpoint = ? AND symbol IN ({placeholders}) GROUP BY symbol',
+                [endpoint, *chunk]
+            )
+            results.update(dict(rows))
+        return results
+
+    def get_series(self, symbol: str, endpoint: str = 'TIME_SERIES_DAILY') -> Optional[Dict[str, np.ndarray]]:
+        """
+        Most recently fetched time series for a symbol as read-only column arrays.
+
+        sqlite3 copies each column blob into a ``bytes`` object; the arrays are
+        views over those copies, not over the database file.
+
+        Returns:
+            Dict with 'dates' (datetime64[s]), 'open', 'high', 'low', 'close',
+            'volume' (float64) and 'fetched_at', or None if not stored
+        """
+        row = self._connection().execute(
+            'SELECT fetched_at, dates, open, high, low, close, volume FROM series '
+            'WHERE endpoint = ? AND symbol = ? ORDER BY fetched_at DESC LIMIT 1',
+            (endpoint, symbol)
+        ).fetchone()
+        if row is None:
+            return None
+
+        fetched_at, dates, *columns = row
+        result = {'dates': np.frombuffer(dates, dtype=np.int64).view('datetime64[s]')}
+        for name, blob in zip(SERIES_FIELDS, columns):
+            result[name] = np.frombuffer(blob, dtype=np.float64)
+        result['fetched_at'] = fetched_at
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connection()
+        entries, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        series = conn.execute('SELECT COUNT(*) FROM series').fetchone()[0]
+        return {'entries': entries, 'payload_bytes': total, 'series': series, 'path': str(self.path)}
+
+
+def migrate_pickle_directory(directory: str, store: Optional[SQLiteCacheStore] = None,
+                             delete_files: bool = False) -> Dict[str, int]:
+    """
+    Import every ``<key>.pkl`` file in directory into the SQLite store.
+
+    File modification times are kept as fetch times so TTLs carry over.
+
+    Args:
+        directory: Directory containing the pickle files
+        store: Target store; defaults to a store in the same directory
+        delete_files: Remove each pickle after it has been imported
+
+    Returns:
+        Counts of imported and failed files
+    """
+    store = store or SQLiteCacheStore(directory)
+    counts = {'imported': 0, 'failed': 0}
+    for path in sorted(Path(directory).glob('*.pkl')):
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            if store.write(path.stem, value, fetched_at=path.stat().st_mtime) is None:
+                raise ValueError("write failed")
+            counts['imported'] += 1
+            if delete_files:
+                path.unlink()
+        except Exception as e:
+            logger.warning(f"Could not migrate {path.name}: {str(e)}")
+            counts['failed'] += 1
+    logger.info(f"Migrated {counts['imported']} cache files from {directory} ({counts['failed']} failed)")
+    return counts
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    target = sys.argv[1] if len(sys.argv) > 1 else './cache/alpha_vantage'
+    result = migrate_pickle_directory(target, delete_files='--delete' in sys.argv)
+    print(f"Imported {result['imported']} files, {result['failed']} failed")
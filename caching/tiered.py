@@ -0,0 +1,262 @@
+"""
+Two-tier (memory + disk) cache with per-endpoint TTLs, metrics and
+single-flight fetch de-duplication
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from caching.disk import DiskCache
+from caching.memory import LRUMemoryCache
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters"""
+
+    FIELDS = ('memory_hits', 'disk_hits', 'misses', 'stale_hits', 'fetches', 'coalesced', 'errors')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = {field: 0 for field in self.FIELDS}
+
+    def incr(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[field] += amount
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts['memory_hits'] + counts['disk_hits'] + counts['misses']
+        counts['hit_rate'] = (counts['memory_hits'] + counts['disk_hits']) / lookups if lookups else 0.0
+        return counts
+
+
+class _InFlight:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class TieredCache:
+    """
+    Cache with a bounded LRU memory tier in front of an optional disk tier.
+
+    TTLs are looked up per endpoint (e.g. ``GLOBAL_QUOTE`` or ``historical``) from
+    the ``ttls`` mapping, falling back to ``default_ttl``. ``get_or_fetch``
+    coalesces concurrent misses for the same key into a single upstream call.
+    """
+
+    def __init__(self, name: str, directory: Optional[str] = None,
+                 ttls: Optional[Dict[str, float]] = None, default_ttl: float = 3600,
+                 max_entries: int = 1000, max_bytes: Optional[int] = 64 * 1024 * 1024,
+                 disk_format: str = 'pickle', disk_suffix: Optional[str] = None,
+                 disk_max_bytes: Optional[int] = None, disk: Optional[Any] = None):
+        """
+        Args:
+            name: Name used in logs and metrics
+            directory: Disk tier directory; None keeps the cache memory-only
+            ttls: Mapping of endpoint name to TTL in seconds
+            default_ttl: TTL for endpoints missing from ttls
+            max_entries: Maximum number of entries in the memory tier
+            max_bytes: Approximate byte budget of the memory tier
+            disk_format: 'pickle' or 'json'
+            disk_suffix: Override for the disk file suffix
+            disk_max_bytes: Optional byte budget of the disk tier
+            disk: Pre-built persistent tier with the DiskCache read/write/delete
+                interface (e.g. SQLiteCacheStore); overrides directory
+        """
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.memory = LRUMemoryCache(max_entries=max_entries, max_bytes=max_bytes)
+        if disk is not None:
+            self.disk = disk
+        else:
+            self.disk = DiskCache(directory, format=disk_format, suffix=disk_suffix,
+                                  max_bytes=disk_max_bytes) if directory else None
+        self.stats = CacheStats()
+        self._inflight: Dict[str, _InFlight] = {}
+        self._inflight_lock = threading.Lock()
+
+    def ttl_for(self, endpoint: Optional[str] = None) -> float:
+        if endpoint is None:
+            return self.default_ttl
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    @staticmethod
+    def _entry_is_fresh(entry: Dict, max_age: Optional[float]) -> bool:
+        if max_age is None:
+            return time.time() < entry['expires_at']
+        return time.time() - entry['stored_at'] <= max_age
+
+    def get(self, key: str, endpoint: Optional[str] = None, max_age: Optional[float] = None,
+            allow_stale: bool = False) -> Optional[Any]:
+        """
+        Look up a value in memory, then on disk.
+
+        Args:
+            key: Cache key
+            endpoint: Endpoint whose TTL applies
+            max_age: Override the TTL for this lookup (seconds)
+            allow_stale: Return expired entries instead of treating them as misses
+
+        Returns:
+            Cached value or None
+        """
+        ttl = self.ttl_for(endpoint)
+
+        entry = self.memory.get_entry(key)
+        if entry is not None:
+            if self._entry_is_fresh(entry, max_age):
+                self.stats.incr('memory_hits')
+                return entry['data']
+            if allow_stale:
+                self.stats.incr('stale_hits')
+                return entry['data']
+
+        if self.disk is not None:
+            found = self.disk.read(key)
+            if found is not None:
+                value, stored_at, size = found
+                if time.time() - stored_at <= (ttl if max_age is None else max_age):
+                    self.memory.set_value(key, value, ttl, stored_at=stored_at, size=size)
+                    self.stats.incr('disk_hits')
+                    return value
+                if allow_stale:
+                    self.stats.incr('stale_hits')
+                    return value
+
+        self.stats.incr('misses')
+        return None
+
+    def set(self, key: str, value: Any, endpoint: Optional[str] = None,
+            memory_only: bool = False) -> None:
+        """Store a value in both tiers"""
+        size = None
+        if self.disk is not None and not memory_only:
+            size = self.disk.write(key, value)
+        self.memory.set_value(key, value, self.ttl_for(endpoint), size=size)
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any], endpoint: Optional[str] = None,
+                     force_refresh: bool = False,
+                     should_cache: Callable[[Any], bool] = lambda value: value is not None) -> Any:
+        """
+        Return the cached value or call fetch exactly once across concurrent callers.
+
+        Threads that miss while another thread is already fetching the same key
+        wait for that fetch and share its result (or its exception).
+        """
+        if not force_refresh:
+            cached = self.get(key, endpoint)
+            if cached is not None:
+                return cached
+
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlight()
+                self._inflight[key] = call
+
+        if not leader:
+            self.stats.incr('coalesced')
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            # Another leader may have filled the cache between our miss and now
+            value = None if force_refresh else self._peek(key)
+            if value is None:
+                self.stats.incr('fetches')
+                value = fetch()
+                if should_cache(value):
+                    self.set(key, value, endpoint)
+            call.result = value
+            return value
+        except Exception as e:
+            self.stats.incr('errors')
+            call.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+
+    def _peek(self, key: str) -> Optional[Any]:
+        entry = self.memory.get_entry(key)
+        if entry is not None and self._entry_is_fresh(entry, None):
+            return entry['data']
+        return None
+
+    def delete(self, key: str) -> None:
+        self.memory.pop(key, None)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def invalidate(self, pattern: Optional[str] = None) -> int:
+        """
+        Remove entries whose key contains pattern (all entries if None).
+
+        Returns:
+            Number of disk files removed
+        """
+        if pattern is None:
+            self.memory.clear()
+            return self.disk.delete_matching(lambda _: True) if self.disk is not None else 0
+
+        for key in [k for k in self.memory if pattern in k]:
+            self.memory.pop(key, None)
+        if self.disk is None:
+            return 0
+        return self.disk.delete_matching(lambda stem: pattern in stem)
+
+    def clear(self) -> int:
+        return self.invalidate(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.as_dict()
+        stats.update({
+            'name': self.name,
+            'memory_entries': len(self.memory),
+            'memory_bytes': self.memory.current_bytes,
+            'memory_evictions': self.memory.evictions,
+            'inflight': len(self._inflight)
+        })
+        return stats
+
+
+_caches: Dict[str, TieredCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, **kwargs) -> TieredCache:
+    """
+    Get the process-wide cache registered under name, creating it on first use.
+
+    Keyword arguments are only used when the cache is created.
+    """
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = TieredCache(name, **kwargs)
+            _caches[name] = cache
+        return cache
+
+
+def all_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Metrics for every cache registered through get_cache"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.get_stats() for cache in caches}
@@ -1,3 +1,4 @@
 from .claude_handler import ClaudeHandler
+from .history_store import ChatHistoryStore
 
-__all__ = ['ClaudeHandler']
\ No newline at end of file
+__all__ = ['ClaudeHandler', 'ChatHistoryStore']
\ No newline at end of file
@@ -4,7 +4,7 @@ import os
 import logging
 import json
 import re
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from datetime import datetime
 from anthropic import Anthropic
 
@@ -231,6 +231,92 @@ class ChatInterface:
         Returns:
             Dict with response text and any visualizations
         """
+        response = self._local_response(message, include_visualizations, attachment)
+        if response is not None:
+            return response
+
+        # If no command matched, process with Claude
+        try:
+            stock_context, portfolio_context = self._assistant_context(message)
+
+            # Send to Claude for processing using the chat_with_assistant method
+            claude_response = self.claude_handler.chat_with_assistant(
+                user_id=str(self.user_id),
+                user_message=message,
+                stock_context=stock_context,
+                portfolio_context=portfolio_context
+            )
+            
+            response_text = claude_response.get('response', "I'm sorry, I couldn't process your request.")
+            
+            # Add bot response to chat history
+            self.chat_history.append({'role': 'assistant', 'content': response_text, 'timestamp': datetime.now().isoformat()})
+            
+            # Extract any potential stock symbols mentioned by Claude
+            self._extract_stock_symbols(response_text)
+            
+            # No need to suggest menu here as we handle these patterns earlier
+            
+            return {'text': response_text}
+            
+        except Exception as e:
+            self.logger.error(f"Error processing message with Claude: {str(e)}")
+            error_response = "I'm sorry, I encountered an error processing your request. Please try again."
+            self.chat_history.append({'role': 'assistant', 'content': error_response, 'timestamp': datetime.now().isoformat()})
+            return {'text': error_response}
+
+    def stream_message(self, message: str, attachment: Optional[Dict] = None) -> Iterator[str]:
+        """
+        Process a user message, yielding the response text as it is produced
+
+        Commands and menu requests are answered in one piece; anything else is
+        streamed from Claude as it is generated.
+
+        Args:
+            message: The user's message
+            attachment: Optional attachment data (file path, type, etc.)
+
+        Yields:
+            Chunks of response text
+
+        Raises:
+            Exception: Errors from Claude propagate so the caller can report a
+                failed reply; nothing is added to the chat history for it
+        """
+        response = self._local_response(message, False, attachment)
+        if response is not None:
+            yield response['text']
+            return
+
+        chunks = []
+        try:
+            stock_context, portfolio_context = self._assistant_context(message)
+            for text in self.claude_handler.stream_chat(
+                user_id=str(self.user_id),
+                user_message=message,
+                stock_context=stock_context,
+                portfolio_context=portfolio_context
+            ):
+                chunks.append(text)
+                yield text
+        except Exception as e:
+            self.logger.error(f"Error streaming message with Claude: {str(e)}")
+            raise
+
+        response_text = ''.join(chunks)
+        self.chat_history.append({'role': 'assistant', 'content': response_text, 'timestamp': datetime.now().isoformat()})
+        self._extract_stock_symbols(response_text)
+
+    def _local_response(self, message: str, include_visualizations: bool = False,
+                        attachment: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Answer a message without Claude when it is a command, menu request or attachment
+
+        Records the user message in the chat history.
+
+        Returns:
+            Response dict, or None when the message should go to Claude
+        """
         # Special case for ML reset confirmation
         if message.lower().strip() == 'confirm reset ml' and self.context.get('pending_ml_reset'):
             confirmation_result = self._confirm_reset_ml()
@@ -336,71 +422,54 @@ class ChatInterface:
                 response = {'text': menu_result[0]}
                 self.chat_history.append({'role': 'assistant', 'content': menu_result[0], 'timestamp': datetime.now().isoformat()})
                 return response
+
+        return None
+
+    def _assistant_context(self, message: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """
+        Build the stock and portfolio context sent to Claude with a message
+
+        Returns:
+            Tuple of (stock_context, portfolio_context)
+        """
+        # Prepare stock and portfolio context from the chat context
+        stock_context = None
+        if self.context.get('last_analysis'):
+            stock_context = self.context['last_analysis']
         
-        # If no command matched, process with Claude
-        try:
-            # Prepare stock and portfolio context from the chat context
-            stock_context = None
-            if self.context.get('last_analysis'):
-                stock_context = self.context['last_analysis']
-            
-            # Extract potential stock symbols from current message and add to context
-            self._extract_stock_symbols(message)
-                
-            # Add additional context about discussed stocks
-            if self.context['current_stocks'] and not stock_context:
-                stock_context = {
-                    'symbols_in_discussion': self.context['current_stocks'],
-                    'last_mentioned': self.context['current_stocks'][-1] if self.context['current_stocks'] else None
-                }
-                
-            portfolio_context = None
-            if self.context.get('current_portfolio_id'):
-                portfolio_context = {'portfolio_id': self.context['current_portfolio_id']}
-                
-            # If user has set preferences, include them
-            if 'preferences' in self.context and self.context['preferences']:
-                if not stock_context:
-                    stock_context = {}
-                stock_context['user_preferences'] = self.context['preferences']
-                
-            # Include risk profile if set
-            if 'risk_profile' in self.context:
-                if not stock_context:
-                    stock_context = {}
-                stock_context['risk_profile'] = self.context['risk_profile']
-            
-            # Include menu information if in a menu state
-            if self.context.get('current_menu_state'):
-                if not stock_context:
-                    stock_context = {}
-                stock_context['menu_state'] = self.context['current_menu_state']
+        # Extract potential stock symbols from current message and add to context
+        self._extract_stock_symbols(message)
             
-            # Send to Claude for processing using the chat_with_assistant method
-            claude_response = self.claude_handler.chat_with_assistant(
-                user_id=str(self.user_id),
-                user_message=message,
-                stock_context=stock_context,
-                portfolio_context=portfolio_context
-            )
-            
-            response_text = claude_response.get('response', "I'm sorry, I couldn't process your request.")
-            
-            # Add bot response to chat history
-            self.chat_history.append({'role': 'assistant', 'content': response_text, 'timestamp': datetime.now().isoformat()})
-            
-            # Extract any potential stock symbols mentioned by Claude
-            self._extract_stock_symbols(response_text)
+        # Add additional context about discussed stocks
+        if self.context['current_stocks'] and not stock_context:
+            stock_context = {
+                'symbols_in_discussion': self.context['current_stocks'],
+                'last_mentioned': self.context['current_stocks'][-1] if self.context['current_stocks'] else None
+            }
             
-            # No need to suggest menu here as we handle these patterns earlier
+        portfolio_context = None
+        if self.context.get('current_portfolio_id'):
+            portfolio_context = {'portfolio_id': self.context['current_portfolio_id']}
             
-            return {'text': response_text}
+        # If user has set preferences, include them
+        if 'preferences' in self.context and self.context['preferences']:
+            if not stock_context:
+                stock_context = {}
+            stock_context['user_preferences'] = self.context['preferences']
             
-        except Exception as e:
-            self.logger.error(f"Error processing message with Claude: {str(e)}")
-            error_response = "I'm sorry, I encountered an error processing your request. Please try again."
-            self.chat_history.append({'role': 'assistant', 'content': error_response, 'timestamp': datetime.now().isoformat()})
-            return {'text': error_response}
+        # Include risk profile if set
+        if 'risk_profile' in self.context:
+            if not stock_context:
+                stock_context = {}
+            stock_context['risk_profile'] = self.context['risk_profile']
+        
+        # Include menu information if in a menu state
+        if self.context.get('current_menu_state'):
+            if not stock_context:
+                stock_context = {}
+            stock_context['menu_state'] = self.context['current_menu_state']
+
+        return stock_context, portfolio_context
     
     def _check_for_commands(self, message: str) -> Optional[Tuple[str, Optional[Dict]]]:
         """
@@ -1,18 +1,68 @@
 from anthropic import Anthropic
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 import logging
 import json
 import datetime
 import os
 
+from .history_store import ChatHistoryStore
+
+CHAT_SYSTEM_PROMPT = """You are an AI investment assistant for the Investment Bot platform.
+You help users understand investment concepts, analyze stocks, and make informed decisions.
+Your responses should be:
+1. Clear and educational
+2. Balanced and objective
+3. Factual and data-driven
+4. Risk-aware and responsible
+
+CAPABILITIES:
+- Stock analysis (technical, fundamental, sentiment, valuation)
+- Portfolio management and optimization
+- Risk assessment and Monte Carlo simulations
+- Market sector analysis
+- Investment strategy recommendations
+- Balance sheet analysis
+- Naif Al-Rasheed model implementation for US and Saudi markets
+- Personalized stock recommendations based on user preferences and risk profile
+
+INSTRUCTIONS:
+- If a user asks for analysis, suggest specific commands they can use (e.g., "analyze AAPL", "run technical analysis for TSLA")
+- When users ask about concepts like P/E ratio, ROTC, or investment strategies, provide educational explanations
+- For complex questions, break down your answers into clear steps or points
+- When appropriate, suggest commands for deeper insights (e.g., "You can run 'analyze portfolio risk' for detailed metrics")
+- Always include appropriate risk disclaimers when providing investment advice
+- Focus on explaining concepts clearly rather than making specific buy or sell recommendations
+- Remember user preferences to provide personalized advice
+"""
+
+
+def format_sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Format one server-sent event with a JSON payload"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+
+
 class ClaudeHandler:
-    def __init__(self):
+    # Messages of prior conversation sent with each chat request
+    HISTORY_WINDOW = 10
+    # Characters allowed for each serialized context block
+    MAX_CONTEXT_CHARS = 2000
+    # Items kept from any list and characters kept from any string inside a context
+    MAX_CONTEXT_ITEMS = 20
+    MAX_CONTEXT_STRING = 300
+
+    def __init__(self, client=None, history_store: Optional[ChatHistoryStore] = None):
+        """
+        Args:
+            client: Optional Anthropic-compatible client (defaults to one built from CLAUDE_API_KEY)
+            history_store: Optional shared chat history store (created on first use)
+        """
         # Use environment variable for API key
         self.api_key = os.environ.get('CLAUDE_API_KEY')
-        self.anthropic = None  # Initialize lazily
+        self.anthropic = client  # Initialize lazily
         self.model = "claude-3-opus-20240229"  # Using the highest capability model for best investment advice
         self.logger = logging.getLogger(__name__)
-        self.conversation_history = {}  # Store chat history by user_id
+        self.history_store = history_store
 
     def _get_client(self):
         """Lazily initialize Anthropic client"""
@@ -27,6 +77,30 @@ class ClaudeHandler:
                 raise
         return self.anthropic
 
+    def _history(self) -> ChatHistoryStore:
+        """Lazily open the shared chat history store"""
+        if self.history_store is None:
+            self.history_store = ChatHistoryStore()
+        return self.history_store
+
+    def _extract_text(self, response) -> str:
+        """Extract the text from a messages API response"""
+        response_text = ""
+        if hasattr(response, 'content') and isinstance(response.content, list):
+            for content_block in response.content:
+                if hasattr(content_block, 'text'):
+                    response_text += content_block.text
+                elif isinstance(content_block, dict) and 'text' in content_block:
+                    response_text += content_block['text']
+        elif hasattr(response, 'content') and isinstance(response.content, str):
+            response_text = response.content
+        elif hasattr(response, 'text'):
+            response_text = response.text
+        else:
+            self.logger.error(f"Unexpected response format: {type(response)}")
+            response_text = str(response)
+        return response_text
+
     def enhance_analysis(self, stock_data: Dict, technical_analysis: Dict, fundamental_analysis: Dict) -> Dict:
         """Enhance stock analysis with Claude's insights"""
         try:
@@ -58,25 +132,9 @@ class ClaudeHandler:
                     "content": prompt
                 }]
             )
-            
-            # Extract text from response
-            response_text = ""
-            if hasattr(response, 'content') and isinstance(response.content, list):
-                for content_block in response.content:
-                    if hasattr(content_block, 'text'):
-                        response_text += content_block.text
-                    elif isinstance(content_block, dict) and 'text' in content_block:
-                        response_text += content_block['text']
-            elif hasattr(response, 'content') and isinstance(response.content, str):
-                response_text = response.content
-            elif hasattr(response, 'text'):
-                response_text = response.text
-            else:
-                self.logger.error(f"Unexpected response format: {type(response)}")
-                response_text = str(response)
 
             return {
-                'ai_insights': response_text,
+                'ai_insights': self._extract_text(response),
                 'status': 'success'
             }
         except Exception as e:
@@ -106,143 +164,130 @@ class ClaudeHandler:
                     "content": prompt
                 }]
             )
-            
-            # Extract text from response
-            response_text = ""
-            if hasattr(response, 'content') and isinstance(response.content, list):
-                for content_block in response.content:
-                    if hasattr(content_block, 'text'):
-                        response_text += content_block.text
-                    elif isinstance(content_block, dict) and 'text' in content_block:
-                        response_text += content_block['text']
-            elif hasattr(response, 'content') and isinstance(response.content, str):
-                response_text = response.content
-            elif hasattr(response, 'text'):
-                response_text = response.text
-            else:
-                self.logger.error(f"Unexpected response format: {type(response)}")
-                response_text = str(response)
 
             return {
-                'validation_result': response_text,
+                'validation_result': self._extract_text(response),
                 'status': 'success'
             }
         except Exception as e:
             self.logger.error(f"Validation failed: {str(e)}")
             return {'status': 'error', 'error': str(e)}
-            
-    def chat_with_assistant(self, user_id: str, user_message: str, 
+
+    def _compact_value(self, value: Any) -> Any:
+        """Drop empty fields, truncate long lists and strings and round floats"""
+        if isinstance(value, dict):
+            return {str(k): self._compact_value(v) for k, v in value.items() if v is not None}
+        if isinstance(value, (list, tuple)):
+            items = [self._compact_value(v) for v in value[:self.MAX_CONTEXT_ITEMS]]
+            if len(value) > self.MAX_CONTEXT_ITEMS:
+                items.append(f"... {len(value) - self.MAX_CONTEXT_ITEMS} more")
+            return items
+        if isinstance(value, float):
+            return round(value, 4)
+        if isinstance(value, str) and len(value) > self.MAX_CONTEXT_STRING:
+            return value[:self.MAX_CONTEXT_STRING] + "..."
+        return value
+
+    def compact_context(self, context: Any) -> str:
+        """
+        Serialize a context object compactly for the prompt.
+
+        Args:
+            context: JSON-like stock or portfolio context
+
+        Returns:
+            Minified JSON, cut to MAX_CONTEXT_CHARS
+        """
+        text = json.dumps(self._compact_value(context), separators=(',', ':'), default=str)
+        if len(text) > self.MAX_CONTEXT_CHARS:
+            text = text[:self.MAX_CONTEXT_CHARS] + "...(truncated)"
+        return text
+
+    def _build_chat_request(self, user_id: str, user_message: str,
+                            stock_context: Optional[Dict] = None,
+                            portfolio_context: Optional[Dict] = None) -> Dict[str, Any]:
+        """Build the messages API arguments for one chat turn"""
+        # Add relevant context about user's stocks or portfolio if available
+        context = ""
+        if stock_context:
+            context += f"\nCurrent stock being analyzed: {self.compact_context(stock_context)}\n"
+
+        if portfolio_context:
+            context += f"\nUser portfolio summary: {self.compact_context(portfolio_context)}\n"
+
+        # Combine context with user message
+        full_message = user_message
+        if context:
+            full_message = f"{context}\n\nUser message: {user_message}"
+
+        # Prior conversation from the shared store, plus the current user message
+        messages = self._history().recent(user_id, self.HISTORY_WINDOW)
+        messages.append({"role": "user", "content": full_message})
+
+        # The system prompt is identical for every request, so mark it cacheable
+        return {
+            'model': self.model,
+            'max_tokens': 4096,
+            'system': [{"type": "text", "text": CHAT_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}],
+            'messages': messages
+        }
+
+    def chat_with_assistant(self, user_id: str, user_message: str,
                            stock_context: Optional[Dict] = None,
                            portfolio_context: Optional[Dict] = None) -> Dict:
         """Chat with Claude assistant with context about user's portfolio and preferences"""
         try:
-            # Initialize conversation history for new users
-            if user_id not in self.conversation_history:
-                self.conversation_history[user_id] = []
-            
-            # Prepare context for the conversation
-            system_prompt = """You are an AI investment assistant for the Investment Bot platform. 
-            You help users understand investment concepts, analyze stocks, and make informed decisions.
-            Your responses should be:
-            1. Clear and educational
-            2. Balanced and objective
-            3. Factual and data-driven
-            4. Risk-aware and responsible
-
-            CAPABILITIES:
-            - Stock analysis (technical, fundamental, sentiment, valuation)
-            - Portfolio management and optimization
-            - Risk assessment and Monte Carlo simulations
-            - Market sector analysis
-            - Investment strategy recommendations
-            - Balance sheet analysis
-            - Naif Al-Rasheed model implementation for US and Saudi markets
-            - Personalized stock recommendations based on user preferences and risk profile
-            
-            INSTRUCTIONS:
-            - If a user asks for analysis, suggest specific commands they can use (e.g., "analyze AAPL", "run technical analysis for TSLA")
-            - When users ask about concepts like P/E ratio, ROTC, or investment strategies, provide educational explanations
-            - For complex questions, break down your answers into clear steps or points
-            - When appropriate, suggest commands for deeper insights (e.g., "You can run 'analyze portfolio risk' for detailed metrics")
-            - Always include appropriate risk disclaimers when providing investment advice
-            - Focus on explaining concepts clearly rather than making specific buy or sell recommendations
-            - Remember user preferences to provide personalized advice
-            """
-            
-            # Add relevant context about user's stocks or portfolio if available
-            context = ""
-            if stock_context:
-                context += f"\nCurrent stock being analyzed: {json.dumps(stock_context, indent=2)}\n"
-            
-            if portfolio_context:
-                context += f"\nUser portfolio summary: {json.dumps(portfolio_context, indent=2)}\n"
-            
-            # Combine context with user message
-            full_message = user_message
-            if context:
-                full_message = f"{context}\n\nUser message: {user_message}"
-            
-            # Build message history for the API call
-            # For Claude API, "system" is not a message role, but a top-level parameter
-            
-            # Prepare conversation history (limit to last 10 exchanges to control token usage)
-            history_messages = []
-            for msg in self.conversation_history[user_id][-10:]:
-                history_messages.append(msg)
-            
-            # Add current user message
-            history_messages.append({"role": "user", "content": full_message})
-            
-            # Call Claude API - system prompt is a separate parameter
-            response = self._get_client().messages.create(
-                model=self.model,
-                max_tokens=4096,
-                system=system_prompt,
-                messages=history_messages
-            )
-            
-            # Extract text from response
-            # The new Claude API returns content objects that need text extraction
-            response_text = ""
-            if hasattr(response, 'content') and isinstance(response.content, list):
-                for content_block in response.content:
-                    if hasattr(content_block, 'text'):
-                        response_text += content_block.text
-                    elif isinstance(content_block, dict) and 'text' in content_block:
-                        response_text += content_block['text']
-            elif hasattr(response, 'content') and isinstance(response.content, str):
-                response_text = response.content
-            elif hasattr(response, 'text'):
-                response_text = response.text
-            else:
-                self.logger.error(f"Unexpected response format: {type(response)}")
-                response_text = str(response)
-            
-            # Store the exchange in conversation history
-            self.conversation_history[user_id].append({"role": "user", "content": user_message})
-            self.conversation_history[user_id].append({"role": "assistant", "content": response_text})
-            
-            # Limit history size to prevent excessive memory usage
-            if len(self.conversation_history[user_id]) > 50:
-                self.conversation_history[user_id] = self.conversation_history[user_id][-50:]
-            
+            request = self._build_chat_request(user_id, user_message, stock_context, portfolio_context)
+            response = self._get_client().messages.create(**request)
+            response_text = self._extract_text(response)
+
+            # Store the exchange in the shared conversation history
+            self._history().append_exchange(user_id, user_message, response_text)
+
             return {
                 'response': response_text,
                 'timestamp': datetime.datetime.now().isoformat(),
                 'status': 'success'
             }
-            
+
         except Exception as e:
             self.logger.error(f"Chat with assistant failed: {str(e)}")
             return {'status': 'error', 'error': str(e)}
-    
+
+    def stream_chat(self, user_id: str, user_message: str,
+                    stock_context: Optional[Dict] = None,
+                    portfolio_context: Optional[Dict] = None) -> Iterator[str]:
+        """
+        Chat with Claude assistant, yielding text as it is generated.
+
+        The exchange is stored in the conversation history once the stream
+        completes. Errors are logged and re-raised to the consumer.
+
+        Args:
+            user_id: User the conversation belongs to
+            user_message: The user's message
+            stock_context: Optional stock context
+            portfolio_context: Optional portfolio context
+
+        Yields:
+            Text deltas
+        """
+        try:
+            request = self._build_chat_request(user_id, user_message, stock_context, portfolio_context)
+            chunks = []
+            with self._get_client().messages.stream(**request) as stream:
+                for text in stream.text_stream:
+                    chunks.append(text)
+                    yield text
+            self._history().append_exchange(user_id, user_message, "".join(chunks))
+        except Exception as e:
+            self.logger.error(f"Streaming chat with assistant failed: {str(e)}")
+            raise
+
     def get_conversation_history(self, user_id: str) -> List:
         """Get conversation history for a specific user"""
-        if user_id in self.conversation_history:
-            return self.conversation_history[user_id]
-        return []
-    
+        return self._history().recent(user_id)
+
     def clear_conversation_history(self, user_id: str) -> None:
         """Clear conversation history for a specific user"""
-        if user_id in self.conversation_history:
-            self.conversation_history[user_id] = []
\ No newline at end of file
+        self._history().clear(user_id)
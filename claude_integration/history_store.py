@@ -0,0 +1,101 @@
+"""
+SQLite-backed chat history shared by every web worker
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class ChatHistoryStore:
+    """
+    Bounded per-user conversation history.
+
+    Messages live in one SQLite table (WAL mode), so any worker process can
+    serve any user, and each user's history is trimmed to the newest
+    ``max_messages`` entries whenever an exchange is recorded.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS chat_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_chat_messages_user ON chat_messages (user_id, id);
+    """
+
+    def __init__(self, path: Optional[str] = None, max_messages: int = 50):
+        """
+        Args:
+            path: SQLite file (defaults to $CHAT_HISTORY_DB or ./cache/chat/history.sqlite3)
+            max_messages: Messages kept per user
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path or os.environ.get('CHAT_HISTORY_DB', './cache/chat/history.sqlite3')
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_messages = max(2, int(max_messages))
+        self._local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def append_exchange(self, user_id: str, user_message: str, assistant_message: str) -> None:
+        """Record one user/assistant exchange and trim the user's history."""
+        user_id = str(user_id)
+        now = time.time()
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'INSERT INTO chat_messages (user_id, role, content, created_at) VALUES (?, ?, ?, ?)',
+                [(user_id, 'user', user_message, now), (user_id, 'assistant', assistant_message, now)]
+            )
+            conn.execute(
+                """DELETE FROM chat_messages
+                   WHERE user_id = ? AND id <= (
+                       SELECT id FROM chat_messages WHERE user_id = ?
+                       ORDER BY id DESC LIMIT 1 OFFSET ?)""",
+                (user_id, user_id, self.max_messages)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def recent(self, user_id: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Newest messages for a user, oldest first.
+
+        Args:
+            user_id: User whose history to read
+            limit: Maximum number of messages (defaults to the whole retained history)
+
+        Returns:
+            List of {'role', 'content'} dicts
+        """
+        limit = self.max_messages if limit is None else limit
+        rows = self._connection().execute(
+            'SELECT role, content FROM chat_messages WHERE user_id = ? ORDER BY id DESC LIMIT ?',
+            (str(user_id), limit)
+        ).fetchall()
+        return [{'role': role, 'content': content} for role, content in reversed(rows)]
+
+    def clear(self, user_id: str) -> None:
+        """Delete a user's history."""
+        self._connection().execute('DELETE FROM chat_messages WHERE user_id = ?', (str(user_id),))
@@ -9,18 +9,48 @@ import json
 import time
 import logging
 import requests
-import pickle
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Union, Tuple
+import numpy as np
 import pandas as pd
-from threading import Lock
 import concurrent.futures
 import sys
+import threading
 
 # Import config for API key
 sys.path.append('..')
 from config import DevelopmentConfig as Config
+from analysis import indicators as technical_indicators
+from caching import TieredCache, SQLiteCacheStore, get_cache
+from utils.rate_limiter import (
+    PriorityGate, SlidingWindowLimiter, current_priority, get_priority_gate, get_window_limiter
+)
+
+_stores: Dict[str, SQLiteCacheStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _shared_cache(cache_dir: Path, ttls: Dict[str, float]) -> TieredCache:
+    """
+    Process-wide cache for a cache directory.
+
+    Views build a new client per request, so the memory tier and the in-flight
+    map that coalesces concurrent misses must outlive any one client.
+    """
+    directory = str(cache_dir.resolve())
+    with _stores_lock:
+        store = _stores.get(directory)
+        if store is None:
+            store = SQLiteCacheStore(directory)
+            _stores[directory] = store
+    return get_cache(
+        f"alpha_vantage:{directory}",
+        disk=store,
+        ttls=ttls,
+        default_ttl=3600,  # Default 1 hour TTL
+        max_entries=2000
+    )
 
 
 class AlphaVantageClient:
@@ -71,18 +101,17 @@ class AlphaVantageClient:
         self.api_key = api_key or Config.ALPHA_VANTAGE_API_KEY
         self.logger = logging.getLogger(__name__)
         
-        # Rate limiting settings (5 calls per minute on free tier)
-        self.rate_limit = 5
-        self.rate_limit_period = 60  # seconds
-        self.last_call_times = []
-        self.rate_limit_lock = Lock()
+        # Rate limiting settings (5 calls per minute on free tier), shared by every
+        # client in the process (and across processes when RATE_LIMIT_DB is set)
+        self.rate_limiter = get_window_limiter('alpha_vantage', limit=5, period=60)
+        self.request_gate = get_priority_gate('alpha_vantage', self.rate_limiter)
         
-        # Set up caching
+        # Set up caching (bounded LRU memory tier in front of a single SQLite store;
+        # legacy per-key pickle files in the same directory are imported on first read).
+        # Clients using the same directory share one cache, including its in-flight fetches
         self.cache_dir = Path(cache_dir) if cache_dir else Path('./cache/alpha_vantage/')
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
-        # In-memory cache
-        self.memory_cache = {}
+        self.cache = _shared_cache(self.cache_dir, self.CACHE_TTL)
+        self.store = self.cache.disk
         
         # Executor for concurrent requests
         self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=5)
@@ -98,28 +127,49 @@ class AlphaVantageClient:
         """Get the base URL for Alpha Vantage API"""
         return "https://www.alphavantage.co/query"
     
-    def _enforce_rate_limit(self) -> None:
+    @property
+    def rate_limit(self) -> int:
+        """Maximum API calls per rate limit period"""
+        return self.rate_limiter.limit
+    
+    @rate_limit.setter
+    def rate_limit(self, value: int) -> None:
+        self._override_rate_limit(int(value), self.rate_limit_period)
+    
+    @property
+    def rate_limit_period(self) -> float:
+        """Length of the rate limit window in seconds"""
+        return self.rate_limiter.period
+    
+    @rate_limit_period.setter
+    def rate_limit_period(self, value: float) -> None:
+        self._override_rate_limit(self.rate_limit, float(value))
+    
+    def _override_rate_limit(self, limit: int, period: float) -> None:
+        """
+        Give this client its own limiter and gate with the given window.
+        
+        The shared 'alpha_vantage' limiter is left untouched, so an override on
+        one client does not change the limit every other client runs under.
+        """
+        self.rate_limiter = SlidingWindowLimiter(limit, period)
+        self.request_gate = PriorityGate(self.rate_limiter.try_acquire)
+    
+    def _enforce_rate_limit(self, priority: Optional[int] = None, key: Optional[str] = None) -> None:
         """
         Enforce the rate limit by waiting if necessary.
-        Uses a sliding window approach for rate limiting.
+        Uses a sliding window approach for rate limiting; when the window is full,
+        waiting callers are admitted in priority order (interactive first).
+        
+        Args:
+            priority: Request priority; defaults to the calling thread's priority
+            key: Cache key of the request, so a queued request can be promoted
         """
-        with self.rate_limit_lock:
-            current_time = time.time()
-            
-            # Remove call times outside the current window
-            self.last_call_times = [t for t in self.last_call_times 
-                                   if current_time - t <= self.rate_limit_period]
-            
-            # If we've exceeded our rate limit, wait until we can make another call
-            if len(self.last_call_times) >= self.rate_limit:
-                oldest_call = min(self.last_call_times)
-                sleep_time = self.rate_limit_period - (current_time - oldest_call) + 0.1
-                if sleep_time > 0:
-                    self.logger.info(f"Rate limit reached, waiting {sleep_time:.2f} seconds")
-                    time.sleep(sleep_time)
-            
-            # Record this call
-            self.last_call_times.append(time.time())
+        start = time.time()
+        self.request_gate.acquire(priority=priority, key=key)
+        waited = time.time() - start
+        if waited > 0.1:
+            self.logger.info(f"Rate limit reached, waited {waited:.2f} seconds")
     
     def _check_circuit_breaker(self) -> bool:
         """
@@ -151,97 +201,80 @@ class AlphaVantageClient:
         param_str = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
         return f"{endpoint}_{param_str}"
     
-    def _get_from_memory_cache(self, cache_key: str) -> Optional[Dict]:
+    @property
+    def memory_cache(self):
+        """Memory tier of the cache, as a mapping of cache key to entry"""
+        return self.cache.memory
+    
+    @memory_cache.setter
+    def memory_cache(self, entries: Dict) -> None:
+        self.cache.memory.clear()
+        self.cache.memory.update(entries)
+    
+    def get_cache_stats(self) -> Dict:
+        """Hit/miss and size metrics for this client's cache"""
+        stats = self.cache.get_stats()
+        stats['store'] = self.store.stats()
+        return stats
+    
+    def get_cached_many(self, endpoint: str, symbols: List[str],
+                        params: Optional[Dict[str, str]] = None) -> Dict[str, Dict]:
         """
-        Get data from memory cache if available and not expired.
+        Read fresh cached responses for many symbols with a single store query.
+        
+        Symbols that are missing or expired are left out of the result, so callers
+        only need to fetch the remainder from the API.
         
         Args:
-            cache_key: Cache key to look up
+            endpoint: The API endpoint, e.g. 'OVERVIEW'
+            symbols: Symbols to look up
+            params: Extra request parameters that are part of the cache key
             
         Returns:
-            Cached data or None if not found or expired
+            Dictionary mapping symbol to cached response
         """
-        if cache_key in self.memory_cache:
-            entry = self.memory_cache[cache_key]
-            if time.time() < entry['expires_at']:
-                self.logger.debug(f"Memory cache hit for {cache_key}")
-                return entry['data']
-            
-            # Remove expired cache
-            del self.memory_cache[cache_key]
+        keys = {
+            self._get_cache_key(endpoint, {**(params or {}), 'symbol': symbol}): symbol
+            for symbol in symbols
+        }
+        ttl = self.cache.ttl_for(endpoint)
+        now = time.time()
+        results = {}
+        
+        # Serve what the memory tier already holds, then batch the rest
+        remaining = []
+        for key, symbol in keys.items():
+            entry = self.cache.memory.get_entry(key)
+            if entry is not None and now < entry['expires_at']:
+                results[symbol] = entry['data']
+            else:
+                remaining.append(key)
         
-        return None
+        for key, (value, fetched_at) in self.store.read_many(remaining).items():
+            if now - fetched_at <= ttl:
+                self.cache.memory.set_value(key, value, ttl, stored_at=fetched_at)
+                results[keys[key]] = value
+        
+        return results
     
-    def _get_from_disk_cache(self, endpoint: str, cache_key: str) -> Optional[Dict]:
+    def get_cached_price_series(self, symbol: str, weekly: bool = False) -> Optional[Dict]:
         """
-        Get data from disk cache if available and not expired.
+        Stored daily (or weekly) bars for a symbol as column arrays, without an API call.
         
         Args:
-            endpoint: API endpoint (used to determine TTL)
-            cache_key: Cache key to look up
+            symbol: Stock symbol
+            weekly: Read weekly bars instead of daily bars
             
         Returns:
-            Cached data or None if not found or expired
+            Dictionary of NumPy arrays ('dates', 'open', 'high', 'low', 'close', 'volume')
+            plus 'fetched_at', or None if nothing is stored
         """
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
-        if not cache_file.exists():
-            return None
-        
-        try:
-            # Check if cache is expired
-            file_age = time.time() - cache_file.stat().st_mtime
-            ttl = self.CACHE_TTL.get(endpoint, 3600)  # Default 1 hour TTL
-            
-            if file_age > ttl:
-                self.logger.debug(f"Disk cache expired for {cache_key} (age: {file_age:.0f}s, ttl: {ttl}s)")
-                return None
-            
-            with open(cache_file, 'rb') as f:
-                data = pickle.load(f)
-                
-                # Add to memory cache
-                self.memory_cache[cache_key] = {
-                    'data': data,
-                    'expires_at': time.time() + ttl
-                }
-                
-                self.logger.debug(f"Disk cache hit for {cache_key}")
-                return data
-                
-        except Exception as e:
-            self.logger.error(f"Error reading from disk cache: {str(e)}")
-            # If there's an error reading the cache, treat it as a cache miss
-            return None
-    
-    def _save_to_cache(self, endpoint: str, cache_key: str, data: Dict) -> None:
-        """
-        Save data to both memory and disk cache.
-        
-        Args:
-            endpoint: API endpoint (used to determine TTL)
-            cache_key: Cache key to store under
-            data: Data to cache
-        """
-        ttl = self.CACHE_TTL.get(endpoint, 3600)  # Default 1 hour TTL
-        
-        # Save to memory cache
-        self.memory_cache[cache_key] = {
-            'data': data,
-            'expires_at': time.time() + ttl
-        }
-        
-        # Save to disk cache
-        try:
-            cache_file = self.cache_dir / f"{cache_key}.pkl"
-            with open(cache_file, 'wb') as f:
-                pickle.dump(data, f)
-                
-            self.logger.debug(f"Saved to cache: {cache_key}")
-        except Exception as e:
-            self.logger.error(f"Error saving to disk cache: {str(e)}")
+        endpoint = 'TIME_SERIES_WEEKLY' if weekly else 'TIME_SERIES_DAILY'
+        return self.store.get_series(symbol, endpoint)
     
     def _make_api_request(self, endpoint: str, params: Dict[str, str], 
-                         retry_count: int = 3) -> Optional[Dict]:
+                         retry_count: int = 3, priority: Optional[int] = None,
+                         cache_key: Optional[str] = None) -> Optional[Dict]:
         """
         Make an API request with rate limiting and retries.
         
@@ -249,6 +282,8 @@ class AlphaVantageClient:
             endpoint: API endpoint function
             params: API parameters
             retry_count: Number of retries on failure
+            priority: Rate limit queue priority (PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND)
+            cache_key: Cache key of the request, used to promote it while queued
             
         Returns:
             API response as dict or None on failure
@@ -264,7 +299,7 @@ class AlphaVantageClient:
             try:
                 # Only enforce rate limit on the first attempt
                 if attempt == 0:
-                    self._enforce_rate_limit()
+                    self._enforce_rate_limit(priority, cache_key)
                 elif attempt > 0:
                     # Add increasing delays for retries
                     delay = 2 ** attempt  # Exponential backoff: 2, 4, 8...
@@ -328,7 +363,7 @@ class AlphaVantageClient:
         return None
     
     def _call_api(self, endpoint: str, params: Dict[str, str], 
-                 force_refresh: bool = False) -> Optional[Dict]:
+                 force_refresh: bool = False, priority: Optional[int] = None) -> Optional[Dict]:
         """
         Call the Alpha Vantage API with caching.
         
@@ -336,32 +371,27 @@ class AlphaVantageClient:
             endpoint: API endpoint function
             params: API parameters
             force_refresh: If True, ignore cache and force fresh API call
+            priority: Rate limit queue priority; defaults to the calling thread's
+                      priority (see utils.rate_limiter.request_priority)
             
         Returns:
             API response or None on failure
         """
         cache_key = self._get_cache_key(endpoint, params)
-        
-        # Check cache if not forcing refresh
-        if not force_refresh:
-            # Check memory cache first
-            memory_data = self._get_from_memory_cache(cache_key)
-            if memory_data:
-                return memory_data
-            
-            # Then check disk cache
-            disk_data = self._get_from_disk_cache(endpoint, cache_key)
-            if disk_data:
-                return disk_data
-        
-        # Make API request
-        data = self._make_api_request(endpoint, params)
-        
-        # Save to cache if we got data
-        if data:
-            self._save_to_cache(endpoint, cache_key, data)
-        
-        return data
+        priority = current_priority() if priority is None else priority
+        
+        # If a lower-priority fetch of this key is still queued for a rate limit
+        # slot, move it up to our priority before we wait on it
+        self.request_gate.promote(cache_key, priority)
+        
+        # Concurrent misses for the same key share a single upstream request
+        return self.cache.get_or_fetch(
+            cache_key,
+            lambda: self._make_api_request(endpoint, params, priority=priority, cache_key=cache_key),
+            endpoint=endpoint,
+            force_refresh=force_refresh,
+            should_cache=bool
+        )
     
     def get_quote(self, symbol: str, force_refresh: bool = False) -> Optional[Dict]:
         """
@@ -1041,17 +1071,12 @@ class AlphaVantageClient:
             return 0.0
         
         try:
-            # Calculate daily returns
-            prices = [day['price'] for day in price_history]
-            returns = []
-            
-            for i in range(1, len(prices)):
-                daily_return = (prices[i-1] / prices[i]) - 1 if prices[i] > 0 else 0
-                returns.append(daily_return)
+            # Price history is newest first; compute returns in chronological order
+            prices = np.array([day['price'] for day in price_history], dtype=float)[::-1]
+            returns = np.nan_to_num(technical_indicators.returns(prices)[1:], nan=0.0)
             
             # Calculate volatility (standard deviation of returns * sqrt(252) * 100)
-            import numpy as np
-            volatility = np.std(returns) * np.sqrt(252) * 100 if returns else 0
+            volatility = np.std(returns) * np.sqrt(252) * 100 if len(returns) else 0
             return volatility
         except Exception as e:
             self.logger.error(f"Error calculating volatility: {str(e)}")
@@ -1069,32 +1094,17 @@ class AlphaVantageClient:
             }
         
         try:
-            import numpy as np
+            # Price history is newest first; compute returns in chronological order
+            prices = np.array([day['price'] for day in price_history], dtype=float)[::-1]
+            returns_arr = np.nan_to_num(technical_indicators.returns(prices)[1:], nan=0.0)
             
             # Calculate volatility
-            prices = [day['price'] for day in price_history]
-            returns = []
+            volatility = np.std(returns_arr) * np.sqrt(252) * 100 if len(returns_arr) > 0 else 0
             
-            for i in range(1, len(prices)):
-                daily_return = (prices[i-1] / prices[i]) - 1 if prices[i] > 0 else 0
-                returns.append(daily_return)
-            
-            volatility = np.std(returns) * np.sqrt(252) * 100 if returns else 0
-            
-            # Calculate max drawdown
-            max_drawdown = 0
-            peak = prices[0]
-            
-            for price in prices:
-                if price > peak:
-                    peak = price
-                drawdown = (peak - price) / peak
-                max_drawdown = max(max_drawdown, drawdown)
-            
-            max_drawdown *= 100  # Convert to percentage
+            # Calculate max drawdown (peak to trough, in time order)
+            max_drawdown = float(technical_indicators.max_drawdown(prices)) * 100  # Convert to percentage
             
             # Calculate Value at Risk (95% confidence)
-            returns_arr = np.array(returns)
             var_95 = np.percentile(returns_arr, 5) * 100 if len(returns_arr) > 0 else 0
             
             # Calculate Sharpe Ratio (assume risk-free rate of 3%)
@@ -1271,31 +1281,12 @@ class AlphaVantageClient:
         """
         try:
             if symbol:
-                # Clear cache for specific symbol
-                # First clear memory cache
-                keys_to_remove = []
-                for cache_key in self.memory_cache:
-                    if f"symbol={symbol}" in cache_key:
-                        keys_to_remove.append(cache_key)
-                
-                for key in keys_to_remove:
-                    del self.memory_cache[key]
-                
-                # Then clear disk cache
-                count = 0
-                for cache_file in self.cache_dir.glob(f"*symbol={symbol}*.pkl"):
-                    cache_file.unlink()
-                    count += 1
-                
+                # Clear memory and disk entries for this symbol
+                count = self.cache.invalidate(f"symbol={symbol}")
                 self.logger.info(f"Cleared {count} cache files for {symbol}")
             else:
                 # Clear all cache
-                self.memory_cache = {}
-                count = 0
-                for cache_file in self.cache_dir.glob("*.pkl"):
-                    cache_file.unlink()
-                    count += 1
-                
+                count = self.cache.clear()
                 self.logger.info(f"Cleared all cache ({count} files)")
             
             return True
@@ -10,6 +10,9 @@ import random
 from functools import lru_cache, wraps
 from datetime import datetime, timedelta
 
+from caching import TieredCache
+from utils.rate_limiter import get_window_limiter
+
 # Custom retry decorator with exponential backoff
 def retry_with_backoff(retries=5, backoff_in_seconds=1):
     """
@@ -35,11 +38,6 @@ def retry_with_backoff(retries=5, backoff_in_seconds=1):
 class DataFetcher:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        # Cache dictionaries with expiration timestamps
-        self._sector_cache = {}
-        self._stock_info_cache = {}
-        self._rotc_cache = {}
-        self._growth_metrics_cache = {}
         self._sp500_cache = None
         self._sp500_cache_expiry = None
         # Cache expiration times (in seconds)
@@ -48,20 +46,25 @@ class DataFetcher:
         self.ROTC_CACHE_EXPIRY = 24 * 60 * 60  # 24 hours
         self.GROWTH_CACHE_EXPIRY = 24 * 60 * 60  # 24 hours
         self.SP500_CACHE_EXPIRY = 7 * 24 * 60 * 60  # 7 days
+        # Bounded in-memory cache; expired entries are kept as a fallback for fetch errors
+        self._cache = TieredCache(
+            'data_fetcher',
+            ttls={
+                'sector': self.SECTOR_CACHE_EXPIRY,
+                'stock_info': self.STOCK_INFO_CACHE_EXPIRY,
+                'rotc': self.ROTC_CACHE_EXPIRY,
+                'growth': self.GROWTH_CACHE_EXPIRY
+            },
+            max_entries=5000
+        )
         # Settings for API access
         self.request_delay = 1.0  # Delay between Yahoo Finance API calls
-        self.last_request_time = 0
+        # Shared across threads and DataFetcher instances (and processes when RATE_LIMIT_DB is set)
+        self.rate_limiter = get_window_limiter('yfinance', limit=1, period=self.request_delay)
 
     def _throttle_api_call(self):
         """Ensures we don't make too many requests too quickly"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        if time_since_last_request < self.request_delay:
-            sleep_time = self.request_delay - time_since_last_request
-            time.sleep(sleep_time)
-            
-        self.last_request_time = time.time()
+        self.rate_limiter.acquire()
 
     def get_macro_data(self, metric: str) -> float:
         """Fetch macroeconomic indicators like inflation or interest rates."""
@@ -131,14 +134,12 @@ class DataFetcher:
                 else:
                     self.logger.error(f"Dictionary does not contain 'symbol' key: {symbol}")
                     return None
-            current_time = time.time()
             
             # Check for cached data
-            if symbol in self._stock_info_cache:
-                cache_time, cache_data = self._stock_info_cache[symbol]
-                if current_time < cache_time + self.STOCK_INFO_CACHE_EXPIRY:
-                    self.logger.debug(f"Using cached info for {symbol}")
-                    return cache_data
+            cache_data = self._cache.get(f"stock_info:{symbol}", 'stock_info')
+            if cache_data is not None:
+                self.logger.debug(f"Using cached info for {symbol}")
+                return cache_data
             
             self.logger.info(f"Fetching info for {symbol}...")
             # Throttle API calls
@@ -160,23 +161,22 @@ class DataFetcher:
             }
             
             # Cache the result
-            self._stock_info_cache[symbol] = (current_time, result)
+            self._cache.set(f"stock_info:{symbol}", result, 'stock_info')
             return result
             
         except Exception as e:
             self.logger.error(f"Error fetching info for {symbol}: {str(e)}")
             # Return cached data if available, even if expired
-            if symbol in self._stock_info_cache:
+            stale_data = self._cache.get(f"stock_info:{symbol}", 'stock_info', allow_stale=True)
+            if stale_data is not None:
                 self.logger.warning(f"Using expired cache for {symbol} due to fetch error")
-                return self._stock_info_cache[symbol][1]
+                return stale_data
             return None
 
     @retry_with_backoff(retries=3, backoff_in_seconds=2)
     def calculate_rotc(self, symbol) -> Dict:
         """Calculate return on tangible capital with caching."""
         try:
-            current_time = time.time()
-            
             # Handle the case where symbol is a dictionary (e.g., mock data)
             if isinstance(symbol, dict):
                 self.logger.warning(f"Symbol parameter is a dictionary, extracting symbol from dict")
@@ -187,11 +187,10 @@ class DataFetcher:
                     return {'rotc': None, 'quarters': []}
             
             # Check for cached data
-            if symbol in self._rotc_cache:
-                cache_time, cache_data = self._rotc_cache[symbol]
-                if current_time < cache_time + self.ROTC_CACHE_EXPIRY:
-                    self.logger.debug(f"Using cached ROTC for {symbol}")
-                    return cache_data
+            cache_data = self._cache.get(f"rotc:{symbol}", 'rotc')
+            if cache_data is not None:
+                self.logger.debug(f"Using cached ROTC for {symbol}")
+                return cache_data
             
             self.logger.info(f"Calculating ROTC for {symbol}...")
             # Throttle API calls
@@ -204,7 +203,7 @@ class DataFetcher:
             if income_stmt.empty or balance_sheet.empty:
                 self.logger.warning(f"No financial data available for {symbol}")
                 result = {'rotc': None, 'quarters': []}
-                self._rotc_cache[symbol] = (current_time, result)
+                self._cache.set(f"rotc:{symbol}", result, 'rotc')
                 return result
 
             results = []
@@ -255,15 +254,16 @@ class DataFetcher:
             }
             
             # Cache the result
-            self._rotc_cache[symbol] = (current_time, result)
+            self._cache.set(f"rotc:{symbol}", result, 'rotc')
             return result
 
         except Exception as e:
             self.logger.error(f"Error calculating ROTC for {symbol}: {e}")
             # Return cached data if available, even if expired
-            if symbol in self._rotc_cache:
+            stale_data = self._cache.get(f"rotc:{symbol}", 'rotc', allow_stale=True)
+            if stale_data is not None:
                 self.logger.warning(f"Using expired ROTC cache for {symbol} due to error")
-                return self._rotc_cache[symbol][1]
+                return stale_data
             return {'rotc': None, 'quarters': []}
 
     @retry_with_backoff(retries=3, backoff_in_seconds=2)
@@ -278,14 +278,12 @@ class DataFetcher:
                 else:
                     self.logger.error(f"Dictionary does not contain 'symbol' key: {symbol}")
                     return {'revenue_growth': None, 'operating_cash_flow': None}
-            current_time = time.time()
             
             # Check for cached data
-            if symbol in self._growth_metrics_cache:
-                cache_time, cache_data = self._growth_metrics_cache[symbol]
-                if current_time < cache_time + self.GROWTH_CACHE_EXPIRY:
-                    self.logger.debug(f"Using cached growth metrics for {symbol}")
-                    return cache_data
+            cache_data = self._cache.get(f"growth:{symbol}", 'growth')
+            if cache_data is not None:
+                self.logger.debug(f"Using cached growth metrics for {symbol}")
+                return cache_data
             
             self.logger.info(f"Calculating growth metrics for {symbol}...")
             # Throttle API calls
@@ -297,7 +295,7 @@ class DataFetcher:
             
             if income_stmt.empty or cash_flow.empty:
                 result = {'revenue_growth': None, 'operating_cash_flow': None}
-                self._growth_metrics_cache[symbol] = (current_time, result)
+                self._cache.set(f"growth:{symbol}", result, 'growth')
                 return result
 
             revenues = income_stmt.loc['Total Revenue']
@@ -319,28 +317,26 @@ class DataFetcher:
             }
             
             # Cache the result
-            self._growth_metrics_cache[symbol] = (current_time, result)
+            self._cache.set(f"growth:{symbol}", result, 'growth')
             return result
 
         except Exception as e:
             self.logger.error(f"Error calculating growth metrics for {symbol}: {str(e)}")
             # Return cached data if available, even if expired
-            if symbol in self._growth_metrics_cache:
+            stale_data = self._cache.get(f"growth:{symbol}", 'growth', allow_stale=True)
+            if stale_data is not None:
                 self.logger.warning(f"Using expired growth metrics cache for {symbol} due to error")
-                return self._growth_metrics_cache[symbol][1]
+                return stale_data
             return {'revenue_growth': None, 'operating_cash_flow': None}
 
     def get_sector_stocks(self, sector: str) -> List[Dict]:
         """Get stocks in a specific sector with caching."""
         try:
-            current_time = time.time()
-            
             # Check if we have valid cached sector data
-            if sector in self._sector_cache:
-                cache_time, cache_data = self._sector_cache[sector]
-                if current_time < cache_time + self.SECTOR_CACHE_EXPIRY:
-                    self.logger.debug(f"Using cached data for {sector} sector")
-                    return cache_data
+            cache_data = self._cache.get(f"sector:{sector}", 'sector')
+            if cache_data is not None:
+                self.logger.debug(f"Using cached data for {sector} sector")
+                return cache_data
 
             self.logger.info(f"Fetching stocks for {sector} sector...")
             sector_data = self.get_sp500_sector_stocks()
@@ -362,7 +358,7 @@ class DataFetcher:
             stocks_info.sort(key=lambda x: x['market_cap'], reverse=True)
             
             # Cache the result
-            self._sector_cache[sector] = (current_time, stocks_info)
+            self._cache.set(f"sector:{sector}", stocks_info, 'sector')
             
             self.logger.info(f"Found {len(stocks_info)} stocks in {sector} sector")
             return stocks_info
@@ -370,18 +366,16 @@ class DataFetcher:
         except Exception as e:
             self.logger.error(f"Error getting sector stocks: {str(e)}")
             # Return cached data if available, even if expired
-            if sector in self._sector_cache:
+            stale_data = self._cache.get(f"sector:{sector}", 'sector', allow_stale=True)
+            if stale_data is not None:
                 self.logger.warning(f"Using expired sector cache for {sector} due to error")
-                return self._sector_cache[sector][1]
+                return stale_data
             return []
         
     # Helper method to clear all caches
     def clear_caches(self):
         """Clear all caches for testing or when fresh data is required."""
-        self._sector_cache = {}
-        self._stock_info_cache = {}
-        self._rotc_cache = {}
-        self._growth_metrics_cache = {}
+        self._cache.clear()
         self._sp500_cache = None
         self._sp500_cache_expiry = None
         self.logger.info("All caches cleared")
\ No newline at end of file
@@ -9,16 +9,17 @@ import json
 import time
 import logging
 import requests
-import pickle
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Union, Tuple
 import pandas as pd
-from threading import Lock
 import concurrent.futures
 import sys
 import urllib3
 
+from caching import TieredCache
+from utils.rate_limiter import get_window_limiter
+
 # Disable insecure warnings when connecting to local IB gateway
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -58,14 +59,13 @@ class IBDataClient:
         self.last_authenticated = 0
         self.session_timeout = 60 * 60  # Session timeout in seconds (1 hour)
         
-        # Rate limiting settings
-        self.rate_limit_lock = Lock()
-        self.last_call_times = []
+        # Rate limiting settings (max 10 calls in 5 seconds, shared by every client)
         self.min_api_interval = 0.5  # Minimum time between API calls in seconds
+        self.rate_limiter = get_window_limiter('interactive_brokers', limit=10, period=5,
+                                               min_interval=self.min_api_interval)
 
         # Set up caching
         self.cache_dir = Path(cache_dir) if cache_dir else Path('./cache/interactive_brokers/')
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
         
         # Cache TTL settings in seconds
         self.cache_ttl = {
@@ -75,8 +75,14 @@ class IBDataClient:
             'fundamentals': 3600 * 24 * 7, # 1 week for fundamentals
         }
         
-        # In-memory cache
-        self.memory_cache = {}
+        # Bounded LRU memory tier in front of one pickle per key on disk
+        self.cache = TieredCache(
+            'interactive_brokers',
+            directory=str(self.cache_dir),
+            ttls=self.cache_ttl,
+            default_ttl=3600,  # Default 1 hour TTL
+            max_entries=1000
+        )
         
         self.logger.info("Interactive Brokers client initialized")
     
@@ -187,29 +193,10 @@ class IBDataClient:
         """
         Enforce rate limits to avoid overloading the IB Gateway.
         """
-        with self.rate_limit_lock:
-            current_time = time.time()
-            
-            # Remove call times outside the current window (5 seconds)
-            self.last_call_times = [t for t in self.last_call_times 
-                                  if current_time - t <= 5]
-            
-            # If we've made too many calls in the window, wait
-            if len(self.last_call_times) >= 10:  # Max 10 calls in 5 seconds
-                oldest_call = min(self.last_call_times)
-                sleep_time = self.min_api_interval - (current_time - oldest_call) + 0.1
-                if sleep_time > 0:
-                    self.logger.debug(f"Rate limiting, sleeping for {sleep_time:.2f} seconds")
-                    time.sleep(sleep_time)
-            
-            # Ensure minimum time between consecutive calls
-            if self.last_call_times and current_time - max(self.last_call_times) < self.min_api_interval:
-                sleep_time = self.min_api_interval - (current_time - max(self.last_call_times))
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-            
-            # Record this call
-            self.last_call_times.append(time.time())
+        wait = self.rate_limiter.try_acquire()
+        if wait > 0:
+            self.logger.debug(f"Rate limiting, sleeping for up to {wait:.2f} seconds")
+            self.rate_limiter.acquire()
     
     def _get_cache_key(self, endpoint: str, params: Dict) -> str:
         """
@@ -226,6 +213,16 @@ class IBDataClient:
         param_str = json.dumps(params, sort_keys=True)
         return f"{endpoint}_{param_str}"
     
+    @property
+    def memory_cache(self):
+        """Memory tier of the cache, as a mapping of cache key to entry"""
+        return self.cache.memory
+    
+    @memory_cache.setter
+    def memory_cache(self, entries: Dict) -> None:
+        self.cache.memory.clear()
+        self.cache.memory.update(entries)
+    
     def _get_from_memory_cache(self, endpoint: str, cache_key: str) -> Optional[Dict]:
         """
         Get data from memory cache if available and not expired.
@@ -237,15 +234,10 @@ class IBDataClient:
         Returns:
             Cached data or None if not found or expired
         """
-        if cache_key in self.memory_cache:
-            entry = self.memory_cache[cache_key]
-            if time.time() < entry['expires_at']:
-                self.logger.debug(f"Memory cache hit for {cache_key}")
-                return entry['data']
-            
-            # Remove expired cache
-            del self.memory_cache[cache_key]
-        
+        entry = self.cache.memory.get_entry(cache_key)
+        if entry is not None and time.time() < entry['expires_at']:
+            self.logger.debug(f"Memory cache hit for {cache_key}")
+            return entry['data']
         return None
     
     def _get_from_disk_cache(self, endpoint: str, cache_key: str) -> Optional[Dict]:
@@ -259,34 +251,20 @@ class IBDataClient:
         Returns:
             Cached data or None if not found or expired
         """
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
-        if not cache_file.exists():
+        found = self.cache.disk.read(cache_key)
+        if found is None:
             return None
         
-        try:
-            # Check if cache is expired
-            file_age = time.time() - cache_file.stat().st_mtime
-            ttl = self.cache_ttl.get(endpoint, 3600)  # Default 1 hour TTL
-            
-            if file_age > ttl:
-                self.logger.debug(f"Disk cache expired for {cache_key}")
-                return None
-            
-            with open(cache_file, 'rb') as f:
-                data = pickle.load(f)
-                
-                # Add to memory cache
-                self.memory_cache[cache_key] = {
-                    'data': data,
-                    'expires_at': time.time() + ttl
-                }
-                
-                self.logger.debug(f"Disk cache hit for {cache_key}")
-                return data
-                
-        except Exception as e:
-            self.logger.error(f"Error reading from disk cache: {str(e)}")
+        data, stored_at, size = found
+        ttl = self.cache.ttl_for(endpoint)
+        if time.time() - stored_at > ttl:
+            self.logger.debug(f"Disk cache expired for {cache_key}")
             return None
+        
+        # Promote to memory cache
+        self.cache.memory.set_value(cache_key, data, ttl, stored_at=stored_at, size=size)
+        self.logger.debug(f"Disk cache hit for {cache_key}")
+        return data
     
     def _save_to_cache(self, endpoint: str, cache_key: str, data: Dict) -> None:
         """
@@ -297,23 +275,12 @@ class IBDataClient:
             cache_key: Cache key to store under
             data: Data to cache
         """
-        ttl = self.cache_ttl.get(endpoint, 3600)  # Default 1 hour TTL
-        
-        # Save to memory cache
-        self.memory_cache[cache_key] = {
-            'data': data,
-            'expires_at': time.time() + ttl
-        }
-        
-        # Save to disk cache
-        try:
-            cache_file = self.cache_dir / f"{cache_key}.pkl"
-            with open(cache_file, 'wb') as f:
-                pickle.dump(data, f)
-                
-            self.logger.debug(f"Saved to cache: {cache_key}")
-        except Exception as e:
-            self.logger.error(f"Error saving to disk cache: {str(e)}")
+        self.cache.set(cache_key, data, endpoint)
+        self.logger.debug(f"Saved to cache: {cache_key}")
+    
+    def get_cache_stats(self) -> Dict:
+        """Hit/miss and size metrics for this client's cache"""
+        return self.cache.get_stats()
     
     def _make_api_request(self, method: str, endpoint: str, params: Optional[Dict] = None, 
                          data: Optional[Dict] = None, force_refresh: bool = False) -> Optional[Dict]:
@@ -715,26 +682,8 @@ class IBDataClient:
         Returns:
             True if successful
         """
-        # Clear memory cache
-        if pattern:
-            keys_to_remove = [k for k in self.memory_cache if pattern in k]
-            for key in keys_to_remove:
-                del self.memory_cache[key]
-        else:
-            self.memory_cache = {}
-        
-        # Clear disk cache
         try:
-            count = 0
-            if pattern:
-                for cache_file in self.cache_dir.glob(f"*{pattern}*.pkl"):
-                    cache_file.unlink()
-                    count += 1
-            else:
-                for cache_file in self.cache_dir.glob("*.pkl"):
-                    cache_file.unlink()
-                    count += 1
-            
+            count = self.cache.invalidate(pattern)
             self.logger.info(f"Cleared {count} cache files")
             return True
         except Exception as e:
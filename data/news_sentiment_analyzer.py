@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import pandas as pd
 
+from caching import TieredCache
+
 class NewsSentimentAnalyzer:
     """
     Class to fetch and analyze news and social media sentiment for stocks.
@@ -43,6 +45,13 @@ class NewsSentimentAnalyzer:
         self.cache_dir = Path("./cache/news_sentiment")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.cache_expiry = 4 * 3600  # 4 hours in seconds (news data becomes stale quickly)
+        self.cache = TieredCache(
+            'news_sentiment',
+            directory=str(self.cache_dir),
+            default_ttl=self.cache_expiry,
+            max_entries=500,
+            disk_format='json'
+        )
         
         # Track API call times to respect rate limits
         self.last_alpha_vantage_call = 0
@@ -603,35 +612,15 @@ class NewsSentimentAnalyzer:
     
     def _save_to_cache(self, symbol: str, data: Dict) -> None:
         """Save sentiment data to local cache"""
-        try:
-            cache_file = self.cache_dir / f"{symbol.upper()}_sentiment.json"
-            with open(cache_file, 'w') as f:
-                json.dump(data, f)
-            self.logger.debug(f"Sentiment data for {symbol} saved to cache")
-        except Exception as e:
-            self.logger.error(f"Error saving sentiment to cache: {str(e)}")
+        self.cache.set(f"{symbol.upper()}_sentiment", data)
+        self.logger.debug(f"Sentiment data for {symbol} saved to cache")
 
     def _get_from_cache(self, symbol: str) -> Optional[Dict]:
         """Get sentiment data from local cache if available and not expired"""
-        try:
-            cache_file = self.cache_dir / f"{symbol.upper()}_sentiment.json"
-            if not cache_file.exists():
-                return None
-                
-            # Check if cache is expired
-            file_age = time.time() - cache_file.stat().st_mtime
-            if file_age > self.cache_expiry:
-                self.logger.debug(f"Sentiment cache for {symbol} is expired")
-                return None
-                
-            with open(cache_file, 'r') as f:
-                data = json.load(f)
+        data = self.cache.get(f"{symbol.upper()}_sentiment")
+        if data is not None:
             self.logger.debug(f"Sentiment data for {symbol} loaded from cache")
-            return data
-            
-        except Exception as e:
-            self.logger.error(f"Error reading sentiment from cache: {str(e)}")
-            return None
+        return data
 
 # Example usage
 if __name__ == "__main__":
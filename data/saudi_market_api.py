@@ -9,6 +9,9 @@ from datetime import datetime, timedelta
 import os
 from functools import lru_cache
 
+from caching import TieredCache
+from utils.rate_limiter import get_window_limiter
+
 class SaudiMarketAPIException(Exception):
     """Exception for Saudi market API errors"""
     pass
@@ -31,12 +34,20 @@ class SaudiMarketAPI:
             'historical': 24 * 60 * 60  # 1 day
         }
         
-        # Rate limiting for Yahoo Finance
-        self.rate_limit = 5  # requests per minute to avoid overloading YF
-        self.request_timestamps = []
-        
-        # Create cache directory if it doesn't exist
-        os.makedirs(self.cache_dir, exist_ok=True)
+        # Rate limiting for Yahoo Finance (5 requests per minute to avoid overloading YF),
+        # shared by every SaudiMarketAPI instance
+        self.rate_limit = 5
+        self.rate_limiter = get_window_limiter('saudi_market', limit=self.rate_limit, period=60)
+        
+        # Memory tier in front of the JSON files in cache_dir
+        self.cache = TieredCache(
+            'saudi_market',
+            directory=self.cache_dir,
+            ttls=self.cache_expiry,
+            default_ttl=3600,  # Default 1 hour
+            max_entries=500,
+            disk_format='json'
+        )
         
         # Saudi market major stocks mapping (symbol → name) for common stocks
         # Note: Using numeric codes for Saudi stocks (5110.SR format)
@@ -78,29 +89,55 @@ class SaudiMarketAPI:
             'STC': '7010.SR',
             'MAADEN': '1211.SR'
         }
+        
+        # Precomputed upper-case company names for name → symbol lookups, and
+        # memoized lookup results
+        self._name_index = [(name.upper(), symbol) for symbol, name in self.saudi_stocks.items()]
+        self._name_matches: Dict[str, Optional[str]] = {}
     
     def _check_rate_limit(self):
         """
         Check if we're exceeding the rate limit and wait if necessary
         Uses a moving window approach to track requests
         """
-        current_time = time.time()
-        
-        # Remove timestamps older than 1 minute
-        self.request_timestamps = [ts for ts in self.request_timestamps 
-                                 if current_time - ts < 60]
+        wait_time = self.rate_limiter.try_acquire()
+        if wait_time > 0:
+            self.logger.info(f"Rate limit reached. Waiting {wait_time:.2f} seconds")
+            self.rate_limiter.acquire()
+    
+    def _match_name(self, name: str) -> Optional[str]:
+        """
+        Find the known stock whose company name contains name (case-insensitive)
         
-        # If we've reached the rate limit, wait
-        if len(self.request_timestamps) >= self.rate_limit:
-            oldest_timestamp = min(self.request_timestamps)
-            wait_time = 61 - (current_time - oldest_timestamp)
+        Args:
+            name: Company name or fragment, e.g. 'ARAMCO'
             
-            if wait_time > 0:
-                self.logger.info(f"Rate limit reached. Waiting {wait_time:.2f} seconds")
-                time.sleep(wait_time)
+        Returns:
+            Yahoo Finance symbol or None if no known stock matches
+        """
+        key = name.upper()
+        if key not in self._name_matches:
+            self._name_matches[key] = next(
+                (symbol for upper_name, symbol in self._name_index if key in upper_name), None
+            )
+        return self._name_matches[key]
+    
+    def _resolve_symbol(self, symbol: str) -> str:
+        """
+        Convert a symbol in any supported format to the Yahoo Finance XXXX.SR form
         
-        # Add current timestamp to the list
-        self.request_timestamps.append(time.time())
+        Args:
+            symbol: Numeric code, code with .SA/.SR suffix, legacy ticker or company name
+            
+        Returns:
+            Yahoo Finance symbol
+        """
+        clean_symbol = symbol.replace('.SA', '').replace('.SR', '')
+        if clean_symbol in self.symbol_mappings:
+            return self.symbol_mappings[clean_symbol]
+        if clean_symbol.isdigit():
+            return f"{clean_symbol}.SR"
+        return self._match_name(clean_symbol) or f"{clean_symbol}.SR"
     
     def _get_ticker_data(self, symbol: str) -> yf.Ticker:
         """
@@ -130,11 +167,8 @@ class SaudiMarketAPI:
             symbol = self.symbol_mappings[symbol]
         # If not already a SR symbol and not a numeric code, try to find it
         elif not symbol.endswith('.SR') and not symbol.isdigit():
-            # Look through our known stocks
-            for known_symbol in self.saudi_stocks:
-                if symbol.upper() in self.saudi_stocks[known_symbol].upper():
-                    symbol = known_symbol
-                    break
+            # Look up our known stocks by name
+            symbol = self._match_name(symbol) or symbol
         # If it's just a numeric code without suffix, add .SR
         elif symbol.isdigit():
             symbol = f"{symbol}.SR"
@@ -185,7 +219,7 @@ class SaudiMarketAPI:
     
     def _get_cache_path(self, cache_type: str, key: str) -> str:
         """Get the cache file path for a given type and key"""
-        return os.path.join(self.cache_dir, f"{cache_type}_{key}.json")
+        return str(self.cache.disk.path_for(f"{cache_type}_{key}"))
     
     def _get_from_cache(self, cache_type: str, key: str) -> Optional[Dict]:
         """
@@ -198,26 +232,10 @@ class SaudiMarketAPI:
         Returns:
             Cached data or None if not available or expired
         """
-        cache_path = self._get_cache_path(cache_type, key)
-        
-        if os.path.exists(cache_path):
-            try:
-                with open(cache_path, 'r') as f:
-                    cache_data = json.load(f)
-                
-                # Check if cache is expired
-                cache_time = cache_data.get('cache_time', 0)
-                expiry_time = self.cache_expiry.get(cache_type, 3600)  # Default 1 hour
-                
-                if time.time() - cache_time <= expiry_time:
-                    self.logger.debug(f"Using cached {cache_type} data for {key}")
-                    return cache_data.get('data')
-                
-                self.logger.debug(f"Cached {cache_type} data for {key} is expired")
-            except Exception as e:
-                self.logger.warning(f"Error reading cache: {str(e)}")
-        
-        return None
+        data = self.cache.get(f"{cache_type}_{key}", endpoint=cache_type)
+        if data is not None:
+            self.logger.debug(f"Using cached {cache_type} data for {key}")
+        return data
     
     def _save_to_cache(self, cache_type: str, key: str, data: Dict):
         """
@@ -228,20 +246,8 @@ class SaudiMarketAPI:
             key: Cache key (usually symbol or index name)
             data: Data to cache
         """
-        cache_path = self._get_cache_path(cache_type, key)
-        
-        try:
-            cache_data = {
-                'cache_time': time.time(),
-                'data': data
-            }
-            
-            with open(cache_path, 'w') as f:
-                json.dump(cache_data, f)
-                
-            self.logger.debug(f"Saved {cache_type} data for {key} to cache")
-        except Exception as e:
-            self.logger.warning(f"Error saving to cache: {str(e)}")
+        self.cache.set(f"{cache_type}_{key}", data, endpoint=cache_type)
+        self.logger.debug(f"Saved {cache_type} data for {key} to cache")
     
     def get_symbols(self) -> List[Dict]:
         """
@@ -306,111 +312,50 @@ class SaudiMarketAPI:
         """
         Get current quotes for multiple Saudi symbols
         
+        Quotes are cached per symbol, so overlapping requests reuse earlier
+        quotes, and all uncached symbols are fetched with a single batch download.
+        
         Args:
             symbols: List of symbols to get quotes for
             
         Returns:
             Dictionary mapping symbols to quote data
         """
-        # Join symbols for cache key
-        cache_key = '_'.join(sorted(symbols))
-        
-        # Try to get from cache first
-        cached_data = self._get_from_cache('quotes', cache_key)
-        if cached_data:
-            return cached_data
-        
         try:
             # Prepare results dictionary
             quotes = {}
             
-            # Process each symbol
+            # Serve cached symbols, collect the rest for one batch request
+            missing = {}
             for symbol in symbols:
-                # Use the same symbol processing from _get_ticker_data
-                original_symbol = symbol
-                # Remove any suffixes first
-                clean_symbol = symbol.replace('.SA', '').replace('.SR', '')
-                
-                # Apply mappings and formatting
-                if clean_symbol in self.symbol_mappings:
-                    symbol_sa = self.symbol_mappings[clean_symbol]
-                elif clean_symbol.isdigit():
-                    symbol_sa = f"{clean_symbol}.SR"
+                symbol_sa = self._resolve_symbol(symbol)
+                cached_quote = self._get_from_cache('quotes', symbol_sa)
+                if cached_quote:
+                    quotes[symbol] = {**cached_quote, 'symbol': symbol}
                 else:
-                    # Try to map to known symbols
-                    mapped = False
-                    for known_symbol in self.saudi_stocks:
-                        if clean_symbol.upper() in self.saudi_stocks[known_symbol].upper():
-                            symbol_sa = known_symbol
-                            mapped = True
-                            break
-                    
-                    if not mapped:
-                        # Default to adding .SR suffix
-                        symbol_sa = f"{clean_symbol}.SR"
-                    
-                try:
-                    # Get ticker data
-                    ticker = self._get_ticker_data(symbol_sa)
-                    
-                    # Get latest price information
-                    history = ticker.history(period="1d")
-                    
-                    if not history.empty:
-                        # Extract price data
-                        current_price = float(history['Close'].iloc[-1]) if 'Close' in history.columns else 0
-                        open_price = float(history['Open'].iloc[0]) if 'Open' in history.columns else 0
-                        high_price = float(history['High'].max()) if 'High' in history.columns else 0
-                        low_price = float(history['Low'].min()) if 'Low' in history.columns else 0
-                        volume = int(history['Volume'].sum()) if 'Volume' in history.columns else 0
-                        
-                        # Calculate price change
-                        change = 0
-                        change_percent = 0
-                        
-                        if open_price > 0:
-                            change = current_price - open_price
-                            change_percent = (change / open_price) * 100
-                        
-                        # Add to quotes dictionary
-                        quotes[symbol] = {
-                            'symbol': symbol,
-                            'price': current_price,
-                            'change': round(change, 2),
-                            'change_percent': round(change_percent, 2),
-                            'volume': volume,
-                            'high': high_price,
-                            'low': low_price,
-                            'open': open_price,
-                            'timestamp': datetime.now().isoformat()
-                        }
-                    else:
-                        # If history is empty, use info from ticker
-                        info = ticker.info
-                        current_price = info.get('currentPrice', 0) or info.get('previousClose', 0)
-                        
-                        quotes[symbol] = {
-                            'symbol': symbol,
-                            'price': current_price,
-                            'change': 0,
-                            'change_percent': 0,
-                            'volume': info.get('volume', 0) or 0,
-                            'high': info.get('dayHigh', 0) or current_price,
-                            'low': info.get('dayLow', 0) or current_price,
-                            'open': info.get('open', 0) or current_price,
-                            'timestamp': datetime.now().isoformat()
-                        }
-                        
-                except Exception as e:
-                    self.logger.warning(f"Error getting quote for {symbol}: {str(e)}")
-                    
-                    # Add fallback data for this symbol
-                    fallback = self._get_fallback_quotes([symbol])
-                    if symbol in fallback:
-                        quotes[symbol] = fallback[symbol]
+                    missing.setdefault(symbol_sa, []).append(symbol)
             
-            # Cache the results
-            self._save_to_cache('quotes', cache_key, quotes)
+            if not missing:
+                return quotes
+            
+            fetched = self._download_quotes(list(missing))
+            
+            for symbol_sa, requested in missing.items():
+                quote = fetched.get(symbol_sa)
+                if quote is None:
+                    # Not in the batch result, try the ticker on its own
+                    try:
+                        quote = self._get_single_quote(symbol_sa)
+                    except Exception as e:
+                        self.logger.warning(f"Error getting quote for {symbol_sa}: {str(e)}")
+                
+                if quote is not None:
+                    self._save_to_cache('quotes', symbol_sa, quote)
+                    for symbol in requested:
+                        quotes[symbol] = {**quote, 'symbol': symbol}
+                else:
+                    # Add fallback data for these symbols (not cached)
+                    quotes.update(self._get_fallback_quotes(requested))
             
             return quotes
         except Exception as e:
@@ -420,6 +365,100 @@ class SaudiMarketAPI:
             fallback_data = self._get_fallback_quotes(symbols)
             return fallback_data
     
+    def _download_quotes(self, symbols_sa: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch today's quotes for many Yahoo Finance symbols with one download call
+        
+        Args:
+            symbols_sa: Symbols in XXXX.SR format
+            
+        Returns:
+            Dictionary mapping each symbol with price data to its quote
+        """
+        self._check_rate_limit()
+        try:
+            data = yf.download(symbols_sa, period="1d", group_by='ticker',
+                               auto_adjust=False, progress=False, threads=True)
+        except Exception as e:
+            self.logger.warning(f"Batch quote download failed: {str(e)}")
+            return {}
+        
+        if data is None or data.empty:
+            return {}
+        
+        quotes = {}
+        multi_ticker = isinstance(data.columns, pd.MultiIndex)
+        for symbol_sa in symbols_sa:
+            if multi_ticker:
+                if symbol_sa in data.columns.get_level_values(0):
+                    history = data[symbol_sa]
+                elif symbol_sa in data.columns.get_level_values(1):
+                    history = data.xs(symbol_sa, axis=1, level=1)
+                else:
+                    continue
+            elif len(symbols_sa) == 1:
+                history = data
+            else:
+                continue
+            
+            history = history.dropna(how='all')
+            if not history.empty:
+                quotes[symbol_sa] = self._quote_from_history(symbol_sa, history)
+        
+        return quotes
+    
+    def _get_single_quote(self, symbol_sa: str) -> Dict:
+        """Quote for one symbol from its ticker history, or ticker info if there is none"""
+        ticker = self._get_ticker_data(symbol_sa)
+        history = ticker.history(period="1d")
+        if not history.empty:
+            return self._quote_from_history(symbol_sa, history)
+        
+        # If history is empty, use info from ticker
+        info = ticker.info
+        current_price = info.get('currentPrice', 0) or info.get('previousClose', 0)
+        
+        return {
+            'symbol': symbol_sa,
+            'price': current_price,
+            'change': 0,
+            'change_percent': 0,
+            'volume': info.get('volume', 0) or 0,
+            'high': info.get('dayHigh', 0) or current_price,
+            'low': info.get('dayLow', 0) or current_price,
+            'open': info.get('open', 0) or current_price,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def _quote_from_history(self, symbol: str, history: pd.DataFrame) -> Dict:
+        """Build a quote dictionary from a day of OHLCV history"""
+        # Extract price data
+        current_price = float(history['Close'].iloc[-1]) if 'Close' in history.columns else 0
+        open_price = float(history['Open'].iloc[0]) if 'Open' in history.columns else 0
+        high_price = float(history['High'].max()) if 'High' in history.columns else 0
+        low_price = float(history['Low'].min()) if 'Low' in history.columns else 0
+        volume = int(history['Volume'].sum()) if 'Volume' in history.columns else 0
+        
+        # Calculate price change
+        change = 0
+        change_percent = 0
+        
+        if open_price > 0:
+            change = current_price - open_price
+            change_percent = (change / open_price) * 100
+        
+        return {
+            'symbol': symbol,
+            'price': current_price,
+            'change': round(change, 2),
+            'change_percent': round(change_percent, 2),
+            'volume': volume,
+            'high': high_price,
+            'low': low_price,
+            'open': open_price,
+            'timestamp': datetime.now().isoformat()
+        }
+    
     def get_historical_data(self, symbol: str, period: str = '1y') -> Dict:
         """
         Get historical price data for a Saudi symbol
@@ -11,6 +11,12 @@ worker_connections = 1000
 timeout = 120
 keepalive = 5
 
+# Background job workers for long-running screening/optimization jobs (0 disables)
+job_workers = int(os.getenv('JOB_WORKERS', '2'))
+
+# Load published ML models in the master so forked workers share them (set to 0 to skip)
+warm_models = os.getenv('WARM_MODELS', '1') != '0'
+
 # Logging
 accesslog = '-'
 errorlog = '-'
@@ -28,4 +34,23 @@ preload_app = True
 
 # SSL (handled by AWS App Runner)
 forwarded_allow_ips = '*'
-proxy_allow_ips = '*'
\ No newline at end of file
+proxy_allow_ips = '*'
+
+
+def when_ready(server):
+    """Warm the model registry and start the supervised background job workers alongside the web workers"""
+    if warm_models:
+        from ml_components.model_registry import get_model_registry
+        loaded = get_model_registry().warm()
+        server.log.info(f"Loaded {loaded} published models before forking workers")
+    if job_workers > 0:
+        from jobs.worker import WorkerSupervisor
+        server.job_supervisor = WorkerSupervisor(job_workers).start()
+        server.log.info(f"Started {job_workers} background job workers")
+
+
+def on_exit(server):
+    """Let running jobs finish (up to the graceful timeout), then stop the job workers"""
+    supervisor = getattr(server, 'job_supervisor', None)
+    if supervisor is not None:
+        supervisor.stop(timeout=server.cfg.graceful_timeout)
@@ -0,0 +1,27 @@
+"""
+Background job subsystem for long-running screening, optimization and simulation work.
+
+Web requests submit jobs to a SQLite-backed queue and poll their status; worker
+processes (``python -m jobs``, supervised by ``WorkerSupervisor``) claim
+and run them.
+"""
+
+from .store import JobStore, QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED
+from .worker import (JobCancelled, JobContext, JobWorker, register_job, get_handler,
+                     registered_kinds, WorkerSupervisor)
+
+__all__ = [
+    'JobStore',
+    'JobCancelled',
+    'JobContext',
+    'JobWorker',
+    'register_job',
+    'get_handler',
+    'registered_kinds',
+    'WorkerSupervisor',
+    'QUEUED',
+    'RUNNING',
+    'SUCCEEDED',
+    'FAILED',
+    'CANCELLED',
+]
@@ -0,0 +1,7 @@
+"""
+Entry point for ``python -m jobs``: runs the background job workers.
+"""
+
+from .worker import main
+
+main()
@@ -0,0 +1,236 @@
+"""
+Built-in background jobs for the long-running web endpoints
+
+Heavy components are created lazily, once per worker process, and jobs that
+touch the database run inside the Flask application context.
+"""
+
+import asyncio
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from .worker import JobContext, register_job
+
+
+logger = logging.getLogger(__name__)
+
+_components: Dict[str, Any] = {}
+
+
+def _component(name: str, factory: Callable[[], Any]) -> Any:
+    if name not in _components:
+        _components[name] = factory()
+    return _components[name]
+
+
+def _naif_model():
+    from ml_components.naif_alrasheed_model import NaifAlRasheedModel
+    return _component('naif_model', NaifAlRasheedModel)
+
+
+@contextmanager
+def _app_context():
+    # Imported lazily: the web app imports this module for the shared helpers
+    from app import app
+    with app.app_context():
+        yield
+
+
+def compute_sector_analysis(model, market: str,
+                            report: Optional[Callable[[str, float], None]] = None) -> Dict[str, Any]:
+    """
+    Rank sectors and compute the detailed metrics shown on the sector analysis page.
+
+    Args:
+        model: NaifAlRasheedModel instance
+        market: Market to analyze ('us' or 'saudi')
+        report: Optional progress callback receiving (stage, fraction complete)
+
+    Returns:
+        Dict with macro_analysis, sorted_sectors, top_sectors and sector_metrics
+    """
+    report = report or (lambda stage, progress: None)
+
+    report('macro', 0.0)
+    macro_analysis = model._analyze_macro_conditions(market)
+
+    report('sector_ranking', 0.1)
+    sector_scores = model._rank_sectors(market, macro_analysis)
+    top_sectors = model._select_top_sectors(sector_scores, market)
+    sorted_sectors = sorted(sector_scores.items(), key=lambda x: x[1], reverse=True)
+
+    sector_metrics = {}
+    for index, (sector_name, _) in enumerate(sorted_sectors):
+        report('sector_metrics', 0.5 + 0.5 * index / max(len(sorted_sectors), 1))
+        # Create a mock list of companies in this sector for metrics calculation
+        mock_companies = [{'sector': sector_name, 'symbol': f'MOCK_{i}_{sector_name}'} for i in range(5)]
+        sector_metrics[sector_name] = {
+            'growth': model._calculate_sector_growth(mock_companies, market),
+            'momentum': model._calculate_sector_momentum(mock_companies, market),
+            'profitability': model._calculate_sector_profitability(mock_companies, market),
+            'valuation': model._calculate_sector_valuation(mock_companies, market)
+        }
+
+    return {
+        'macro_analysis': macro_analysis,
+        'sorted_sectors': sorted_sectors,
+        'top_sectors': top_sectors,
+        'sector_metrics': sector_metrics
+    }
+
+
+def refresh_prediction_outcomes(analyzer, report: Optional[Callable[[str, float], None]] = None) -> int:
+    """
+    Record actual prices for predictions that are at least a week old.
+
+    Must run inside the Flask application context.
+
+    Args:
+        analyzer: Stock analyzer providing analyze_stock
+        report: Optional progress callback receiving (stage, fraction complete)
+
+    Returns:
+        Number of predictions updated
+    """
+    from models import db, PredictionRecord
+
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    predictions = PredictionRecord.query.filter(
+        PredictionRecord.prediction_date < week_ago,
+        PredictionRecord.actual_value.is_(None)
+    ).all()
+
+    updated_count = 0
+    for index, prediction in enumerate(predictions):
+        if report:
+            report('update_predictions', index / max(len(predictions), 1))
+        try:
+            # Get current data for the stock
+            data = analyzer.analyze_stock(prediction.symbol)
+            if data and 'current_price' in data:
+                prediction.actual_value = data['current_price']
+                prediction.error = abs(prediction.predicted_value - data['current_price'])
+                db.session.add(prediction)
+                updated_count += 1
+        except Exception as e:
+            logger.error(f"Error updating prediction for {prediction.symbol}: {str(e)}")
+
+    if updated_count > 0:
+        db.session.commit()
+    return updated_count
+
+
+@register_job('naif_screening')
+def run_naif_screening(params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """
+    Naif Al-Rasheed screening. Uses the concurrent fast path when a symbol list is
+    given and falls back to the full staged screening. When user_id is supplied the
+    resulting portfolio is saved for that user.
+    """
+    model = _naif_model()
+    market = params.get('market', 'us').lower()
+    custom_params = params.get('custom_params') or None
+    risk_profile = params.get('risk_profile')
+
+    results = None
+    if params.get('symbols'):
+        from ml_components.naif_model_optimizer import OptimizedNaifModel
+        context.report(stage='fast_screening', progress=0.0)
+        results = asyncio.run(OptimizedNaifModel(model).analyze_portfolio_fast(
+            params['symbols'], market.upper(), custom_params=custom_params, risk_profile=risk_profile,
+            existing_portfolio=params.get('existing_portfolio')))
+        if not results or results.get('fallback_mode'):
+            results = None
+        else:
+            results['market'] = market
+
+    if results is None:
+        results = model.run_full_screening(
+            market=market,
+            custom_params=custom_params,
+            risk_profile=risk_profile,
+            existing_portfolio=params.get('existing_portfolio'),
+            progress_callback=context.stage_reporter(model.SCREENING_STAGES)
+        )
+
+    if results.get('success') and params.get('user_id') and results.get('portfolio', {}).get('holdings'):
+        from models import db, Portfolio
+        with _app_context():
+            portfolio = Portfolio(
+                user_id=params['user_id'],
+                name=params.get('portfolio_name') or f"Naif Al-Rasheed {market.upper()} Portfolio",
+                stocks=results['portfolio'],
+                created_date=datetime.utcnow()
+            )
+            db.session.add(portfolio)
+            db.session.commit()
+            results['portfolio_id'] = portfolio.id
+    return results
+
+
+@register_job('naif_sector_analysis')
+def run_sector_analysis(params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """Sector ranking and detailed sector metrics for one market."""
+    report = lambda stage, progress: context.report(stage=stage, progress=progress)
+    return compute_sector_analysis(_naif_model(), params.get('market', 'us').lower(), report)
+
+
+@register_job('portfolio_optimize')
+def run_portfolio_optimization(params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """Optimize a saved portfolio and store the optimized holdings."""
+    from models import db, Portfolio
+    from portfolio.portfolio_management import PortfolioManager
+
+    with _app_context():
+        portfolio = Portfolio.query.filter_by(id=params['portfolio_id'], user_id=params['user_id']).first()
+        if portfolio is None:
+            return {'success': False, 'message': 'Portfolio not found'}
+
+        context.report(stage='optimize', progress=0.1)
+        manager = PortfolioManager()
+        manager.current_portfolio = portfolio.stocks
+        result = manager.optimize_portfolio(params.get('constraints') or {})
+
+        context.report(stage='save', progress=0.9)
+        if result.get('success'):
+            portfolio.stocks = result.get('portfolio')
+            db.session.commit()
+        return result
+
+
+@register_job('portfolio_margin_review')
+def run_portfolio_margin_review(params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """Batch margin of safety review of a saved portfolio's holdings."""
+    from models import Portfolio
+    from services.margin_safety_calculator import MarginOfSafetyCalculator
+
+    with _app_context():
+        portfolio = Portfolio.query.filter_by(id=params['portfolio_id'], user_id=params['user_id']).first()
+        if portfolio is None:
+            return {'success': False, 'message': 'Portfolio not found'}
+        stocks = portfolio.stocks
+
+    context.report(stage='valuation', progress=0.1)
+    calculator = _component('margin_calculator', MarginOfSafetyCalculator)
+    result = calculator.analyze_many(
+        stocks,
+        valuation_method=params.get('valuation_method', 'all'),
+        portfolio_value=params.get('portfolio_value'),
+        max_position_percent=params.get('max_position_percent', 0.05)
+    )
+    result['portfolio_id'] = params['portfolio_id']
+    return result
+
+
+@register_job('update_predictions')
+def run_prediction_updates(params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """Fill in actual outcomes for week-old predictions."""
+    from analysis.enhanced_stock_analyzer import EnhancedStockAnalyzer
+
+    analyzer = _component('stock_analyzer', EnhancedStockAnalyzer)
+    report = lambda stage, progress: context.report(stage=stage, progress=progress)
+    with _app_context():
+        updated_count = refresh_prediction_outcomes(analyzer, report)
+    return {'success': True, 'updated_count': updated_count}
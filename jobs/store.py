@@ -0,0 +1,325 @@
+"""
+SQLite-backed job queue
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobStore:
+    """
+    Persistent job queue shared by the web workers and the job worker processes.
+
+    Jobs live in one SQLite table (WAL mode, so status polls never block a worker
+    writing progress). Workers claim queued jobs inside ``BEGIN IMMEDIATE``
+    transactions, so each job runs exactly once even with several worker
+    processes. Submitting a job whose kind and parameters match a job that is
+    still in flight, or one that succeeded within the result TTL, returns that
+    job instead of queueing new work.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL,
+            params_hash TEXT NOT NULL,
+            owner TEXT,
+            status TEXT NOT NULL,
+            stage TEXT,
+            progress REAL NOT NULL DEFAULT 0,
+            message TEXT,
+            result BLOB,
+            error TEXT,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            heartbeat_at REAL,
+            finished_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+        CREATE INDEX IF NOT EXISTS idx_jobs_hash ON jobs (kind, params_hash, status);
+    """
+
+    STATUS_COLUMNS = ('job_id', 'kind', 'owner', 'status', 'stage', 'progress', 'message', 'error',
+                      'cancel_requested', 'created_at', 'started_at', 'finished_at')
+
+    def __init__(self, path: Optional[str] = None, result_ttl: float = 3600, stale_after: float = 900):
+        """
+        Args:
+            path: SQLite file (defaults to $JOB_QUEUE_DB or ./cache/jobs/jobs.sqlite3)
+            result_ttl: Seconds a succeeded job's result is reused for identical submissions
+            stale_after: Seconds without a heartbeat after which a running job is requeued
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path or os.environ.get('JOB_QUEUE_DB', './cache/jobs/jobs.sqlite3')
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.result_ttl = result_ttl
+        self.stale_after = stale_after
+        self._local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def params_hash(kind: str, params: Dict[str, Any]) -> str:
+        encoded = json.dumps({'kind': kind, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def _status(self, row: Optional[sqlite3.Row], cached: bool = False) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        status = {column: row[column] for column in self.STATUS_COLUMNS}
+        status['cancel_requested'] = bool(status['cancel_requested'])
+        status['cached'] = cached
+        return status
+
+    def submit(self, kind: str, params: Optional[Dict[str, Any]] = None, owner: Optional[str] = None,
+               use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Queue a job, or return an identical in-flight or recently completed one.
+
+        Args:
+            kind: Registered job kind
+            params: JSON-serializable job parameters
+            owner: Optional owner id (e.g. the user id) used for access checks
+            use_cache: Reuse in-flight or cached jobs with the same kind and parameters
+
+        Returns:
+            Job status dict; 'cached' is True when an existing job was returned
+        """
+        params = params or {}
+        params_hash = self.params_hash(kind, params)
+        owner = str(owner) if owner is not None else None
+        now = time.time()
+        conn = self._connection()
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if use_cache:
+                row = conn.execute(
+                    """SELECT * FROM jobs
+                       WHERE kind = ? AND params_hash = ? AND owner IS ?
+                         AND (status IN (?, ?) OR (status = ? AND finished_at >= ?))
+                       ORDER BY created_at DESC LIMIT 1""",
+                    (kind, params_hash, owner, QUEUED, RUNNING, SUCCEEDED, now - self.result_ttl)
+                ).fetchone()
+                if row is not None and not row['cancel_requested']:
+                    conn.execute('COMMIT')
+                    return self._status(row, cached=True)
+
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                """INSERT INTO jobs (job_id, kind, params, params_hash, owner, status, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (job_id, kind, json.dumps(params, default=str), params_hash, owner, QUEUED, now)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the status of a job, or None if it does not exist."""
+        row = self._connection().execute('SELECT * FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return self._status(row)
+
+    def list_jobs(self, owner: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent jobs first, optionally for one owner."""
+        if owner is None:
+            rows = self._connection().execute(
+                'SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?', (limit,)).fetchall()
+        else:
+            rows = self._connection().execute(
+                'SELECT * FROM jobs WHERE owner = ? ORDER BY created_at DESC LIMIT ?',
+                (str(owner), limit)).fetchall()
+        return [self._status(row) for row in rows]
+
+    def result(self, job_id: str) -> Any:
+        """Return a succeeded job's result (None for any other job)."""
+        row = self._connection().execute(
+            'SELECT result FROM jobs WHERE job_id = ? AND status = ?', (job_id, SUCCEEDED)).fetchone()
+        if row is None or row['result'] is None:
+            return None
+        return pickle.loads(row['result'])
+
+    def params(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute('SELECT params FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return json.loads(row['params']) if row is not None else None
+
+    def claim(self, worker: str, kinds: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Atomically move the oldest queued job to running.
+
+        Running jobs whose heartbeat is older than stale_after (their worker died)
+        are requeued first.
+
+        Args:
+            worker: Identifier of the claiming worker
+            kinds: Optional job kinds this worker can run
+
+        Returns:
+            Dict with 'job_id', 'kind' and 'params', or None when the queue is empty
+        """
+        now = time.time()
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'UPDATE jobs SET status = ?, worker = NULL WHERE status = ? AND heartbeat_at < ?',
+                (QUEUED, RUNNING, now - self.stale_after)
+            )
+            query = 'SELECT job_id, kind, params FROM jobs WHERE status = ?'
+            args: List[Any] = [QUEUED]
+            if kinds:
+                query += f" AND kind IN ({','.join('?' * len(kinds))})"
+                args.extend(kinds)
+            row = conn.execute(query + ' ORDER BY created_at LIMIT 1', args).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            conn.execute(
+                """UPDATE jobs SET status = ?, worker = ?, started_at = ?, heartbeat_at = ?
+                   WHERE job_id = ?""",
+                (RUNNING, worker, now, now, row['job_id'])
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return {'job_id': row['job_id'], 'kind': row['kind'], 'params': json.loads(row['params'])}
+
+    def report(self, job_id: str, stage: Optional[str] = None, progress: Optional[float] = None,
+               message: Optional[str] = None, worker: Optional[str] = None) -> bool:
+        """
+        Record progress for a running job and refresh its heartbeat.
+
+        Args:
+            worker: Worker running the job; when given, progress is only recorded
+                while the job is still running under that worker
+
+        Returns:
+            True if the job should stop: cancellation has been requested, or the
+            job is no longer running under the given worker
+        """
+        conn = self._connection()
+        conn.execute(
+            """UPDATE jobs SET stage = COALESCE(?, stage), progress = COALESCE(?, progress),
+                               message = COALESCE(?, message), heartbeat_at = ?
+               WHERE job_id = ? AND (? IS NULL OR worker = ?)""",
+            (stage, None if progress is None else min(max(float(progress), 0.0), 1.0),
+             message, time.time(), job_id, worker, worker)
+        )
+        row = conn.execute('SELECT cancel_requested, status, worker FROM jobs WHERE job_id = ?',
+                           (job_id,)).fetchone()
+        if row is None:
+            return False
+        if worker is not None and (row['status'] != RUNNING or row['worker'] != worker):
+            return True
+        return bool(row['cancel_requested'])
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        """
+        Refresh the heartbeat of a job while its handler runs.
+
+        Returns:
+            False if the job is no longer running under this worker (it finished,
+            or went stale and was claimed by another worker)
+        """
+        cursor = self._connection().execute(
+            'UPDATE jobs SET heartbeat_at = ? WHERE job_id = ? AND status = ? AND worker = ?',
+            (time.time(), job_id, RUNNING, worker)
+        )
+        return cursor.rowcount > 0
+
+    # complete, fail and mark_cancelled only finish a job still running under the
+    # given worker, so a worker whose job was requeued cannot overwrite the outcome
+    # of the worker that claimed it next. They return whether the job was updated.
+
+    def complete(self, job_id: str, result: Any, worker: Optional[str] = None) -> bool:
+        cursor = self._connection().execute(
+            """UPDATE jobs SET status = ?, result = ?, progress = 1, finished_at = ?
+               WHERE job_id = ? AND status = ? AND (? IS NULL OR worker = ?)""",
+            (SUCCEEDED, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), time.time(),
+             job_id, RUNNING, worker, worker)
+        )
+        return cursor.rowcount > 0
+
+    def fail(self, job_id: str, error: str, worker: Optional[str] = None) -> bool:
+        cursor = self._connection().execute(
+            """UPDATE jobs SET status = ?, error = ?, finished_at = ?
+               WHERE job_id = ? AND status = ? AND (? IS NULL OR worker = ?)""",
+            (FAILED, error, time.time(), job_id, RUNNING, worker, worker)
+        )
+        return cursor.rowcount > 0
+
+    def mark_cancelled(self, job_id: str, worker: Optional[str] = None) -> bool:
+        cursor = self._connection().execute(
+            """UPDATE jobs SET status = ?, finished_at = ?
+               WHERE job_id = ? AND status IN (?, ?) AND (? IS NULL OR worker = ?)""",
+            (CANCELLED, time.time(), job_id, QUEUED, RUNNING, worker, worker)
+        )
+        return cursor.rowcount > 0
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job. Queued jobs are cancelled immediately; running jobs stop at
+        their next progress report.
+
+        Returns:
+            Updated job status, or None if the job does not exist
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'UPDATE jobs SET status = ?, cancel_requested = 1, finished_at = ? WHERE job_id = ? AND status = ?',
+                (CANCELLED, time.time(), job_id, QUEUED)
+            )
+            conn.execute(
+                'UPDATE jobs SET cancel_requested = 1 WHERE job_id = ? AND status = ?',
+                (job_id, RUNNING)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return self.get(job_id)
+
+    def purge(self, older_than: float = 7 * 24 * 3600) -> int:
+        """Delete finished jobs older than the given number of seconds."""
+        cursor = self._connection().execute(
+            f"DELETE FROM jobs WHERE status IN ({','.join('?' * len(FINISHED_STATES))}) AND finished_at < ?",
+            (*FINISHED_STATES, time.time() - older_than)
+        )
+        return cursor.rowcount
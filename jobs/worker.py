@@ -0,0 +1,358 @@
+"""
+Job handler registry and worker processes
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .store import JobStore
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled."""
+
+
+_HANDLERS: Dict[str, Callable[[Dict[str, Any], 'JobContext'], Any]] = {}
+
+
+def register_job(kind: str):
+    """
+    Decorator registering a handler for a job kind.
+
+    Handlers are called as ``handler(params, context)`` and return the job result,
+    which must be picklable.
+    """
+    def decorator(func):
+        _HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def get_handler(kind: str) -> Optional[Callable]:
+    return _HANDLERS.get(kind)
+
+
+def registered_kinds() -> List[str]:
+    return sorted(_HANDLERS)
+
+
+class JobContext:
+    """
+    Passed to handlers for progress reporting and cooperative cancellation.
+    """
+
+    def __init__(self, store: JobStore, job_id: str, worker: Optional[str] = None):
+        self.store = store
+        self.job_id = job_id
+        self.worker = worker
+        self.cancelled = False
+        # Set when the job went stale and another worker claimed it
+        self.lost = False
+
+    def report(self, stage: Optional[str] = None, progress: Optional[float] = None,
+               message: Optional[str] = None) -> None:
+        """
+        Record progress; raises JobCancelled if the job has been cancelled or
+        is no longer running under this worker.
+
+        Args:
+            stage: Current pipeline stage
+            progress: Fraction complete (0-1)
+            message: Optional human readable status
+        """
+        if self.store.report(self.job_id, stage, progress, message, worker=self.worker):
+            self.cancelled = True
+            raise JobCancelled(self.job_id)
+
+    def stage_reporter(self, stages: Sequence[str]) -> Callable[[str], None]:
+        """
+        Build a callback reporting progress as the fraction of stages started.
+
+        Args:
+            stages: Ordered stage names of the pipeline
+
+        Returns:
+            Callable taking the name of the stage about to run
+        """
+        def report_stage(stage: str, *_):
+            position = stages.index(stage) if stage in stages else 0
+            self.report(stage=stage, progress=position / max(len(stages), 1))
+        return report_stage
+
+
+class JobWorker:
+    """
+    Claims queued jobs and runs their registered handlers.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, poll_interval: float = 1.0,
+                 kinds: Optional[List[str]] = None, name: Optional[str] = None,
+                 heartbeat_interval: Optional[float] = None):
+        """
+        Args:
+            store: Job store (defaults to JobStore())
+            poll_interval: Seconds to sleep when the queue is empty
+            kinds: Optional job kinds to run (defaults to every registered kind)
+            name: Worker identifier recorded on claimed jobs
+            heartbeat_interval: Seconds between heartbeats while a handler runs
+                (defaults to a third of the store's stale_after)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.store = store or JobStore()
+        self.poll_interval = poll_interval
+        self.kinds = kinds
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.heartbeat_interval = heartbeat_interval or max(self.store.stale_after / 3.0, 1.0)
+
+    def _keep_alive(self, context: JobContext, stop: threading.Event) -> None:
+        """
+        Refresh the job's heartbeat until stop is set.
+
+        Handlers only report progress between stages, and a single stage (e.g. a
+        rate-limited fundamentals fetch) can outlast stale_after; without this the
+        job would be requeued and run a second time while it is still running here.
+        """
+        while not stop.wait(self.heartbeat_interval):
+            try:
+                if not self.store.heartbeat(context.job_id, self.name):
+                    context.lost = True
+                    return
+            except Exception as e:
+                self.logger.warning(f"Heartbeat for job {context.job_id} failed: {str(e)}")
+
+    def run_once(self) -> bool:
+        """
+        Run at most one job.
+
+        Returns:
+            True if a job was claimed
+        """
+        job = self.store.claim(self.name, self.kinds or registered_kinds())
+        if job is None:
+            return False
+
+        job_id, kind = job['job_id'], job['kind']
+        handler = get_handler(kind)
+        if handler is None:
+            self.store.fail(job_id, f"No handler registered for job kind '{kind}'", worker=self.name)
+            return True
+
+        context = JobContext(self.store, job_id, worker=self.name)
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=self._keep_alive, args=(context, stop_heartbeat),
+                                     name=f"job-heartbeat-{job_id[:8]}", daemon=True)
+        heartbeat.start()
+        self.logger.info(f"Running job {job_id} ({kind})")
+        try:
+            result = handler(job['params'], context)
+            if context.cancelled:
+                raise JobCancelled(job_id)
+            if self.store.complete(job_id, result, worker=self.name):
+                self.logger.info(f"Job {job_id} ({kind}) succeeded")
+            else:
+                self.logger.warning(f"Job {job_id} ({kind}) is no longer owned by {self.name}; "
+                                    f"result discarded")
+        except JobCancelled:
+            if self.store.mark_cancelled(job_id, worker=self.name):
+                self.logger.info(f"Job {job_id} ({kind}) cancelled")
+            else:
+                self.logger.warning(f"Job {job_id} ({kind}) stopped after being claimed by another worker")
+        except Exception as e:
+            self.logger.error(f"Job {job_id} ({kind}) failed: {str(e)}")
+            self.logger.debug(traceback.format_exc())
+            self.store.fail(job_id, str(e), worker=self.name)
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+        return True
+
+    def run(self, stop_event: Optional[threading.Event] = None, max_jobs: Optional[int] = None) -> int:
+        """
+        Process jobs until stopped.
+
+        Args:
+            stop_event: Event that ends the loop when set
+            max_jobs: Optional number of jobs after which to return
+
+        Returns:
+            Number of jobs processed
+        """
+        processed = 0
+        while not (stop_event and stop_event.is_set()):
+            if max_jobs is not None and processed >= max_jobs:
+                break
+            try:
+                ran = self.run_once()
+            except Exception as e:
+                self.logger.error(f"Job worker error: {str(e)}")
+                ran = False
+            if ran:
+                processed += 1
+            elif stop_event is not None:
+                stop_event.wait(self.poll_interval)
+            else:
+                time.sleep(self.poll_interval)
+        return processed
+
+
+# Signals the gunicorn master installs handlers for; a worker forked from it would
+# otherwise queue them for the master's loop, which never runs in the worker
+_INHERITED_SIGNALS = ('SIGHUP', 'SIGQUIT', 'SIGTERM', 'SIGTTIN', 'SIGTTOU',
+                      'SIGUSR1', 'SIGUSR2', 'SIGWINCH', 'SIGCHLD')
+
+
+def _reset_inherited_signals() -> None:
+    for name in _INHERITED_SIGNALS:
+        signum = getattr(signal, name, None)
+        if signum is not None:
+            signal.signal(signum, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    try:
+        signal.set_wakeup_fd(-1)
+    except (ValueError, OSError):
+        pass
+
+
+def _worker_main(db_path: Optional[str], poll_interval: float) -> None:
+    _reset_inherited_signals()
+
+    # SIGTERM lets the running job finish, then exits; a second SIGTERM exits at once
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        signal.signal(signum, signal.SIG_DFL)
+        stop.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+
+    # Importing the built-in handlers registers them in this process
+    from . import handlers  # noqa: F401
+    JobWorker(JobStore(db_path), poll_interval=poll_interval).run(stop)
+
+
+class WorkerSupervisor:
+    """
+    Runs job workers as ``python -m jobs`` child processes and restarts
+    any that exit.
+
+    Children are exec'd rather than forked, so they start with default signal
+    handling and none of the parent's state (e.g. the gunicorn master's signal
+    queue, or models preloaded for the web workers).
+    """
+
+    def __init__(self, count: int, db_path: Optional[str] = None, poll_interval: float = 1.0,
+                 check_interval: float = 5.0):
+        """
+        Args:
+            count: Number of worker processes
+            db_path: Job store path (defaults to $JOB_QUEUE_DB)
+            poll_interval: Seconds between polls of an empty queue
+            check_interval: Seconds between checks for exited workers (also the
+                minimum delay before a crashed worker is restarted)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.count = count
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.check_interval = check_interval
+        self.processes: List[Optional[subprocess.Popen]] = [None] * count
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+
+    def _command(self) -> List[str]:
+        command = [sys.executable, '-m', 'jobs', '--processes', '1',
+                   '--poll-interval', str(self.poll_interval)]
+        if self.db_path:
+            command += ['--db', self.db_path]
+        return command
+
+    def _spawn(self, index: int) -> None:
+        # Run from the project root so `-m jobs` resolves to this package
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.processes[index] = subprocess.Popen(self._command(), cwd=root)
+
+    def start(self) -> 'WorkerSupervisor':
+        with self._lock:
+            for index in range(self.count):
+                self._spawn(index)
+        self._monitor = threading.Thread(target=self._watch, name='job-worker-supervisor', daemon=True)
+        self._monitor.start()
+        return self
+
+    def _watch(self) -> None:
+        while not self._stopping.wait(self.check_interval):
+            with self._lock:
+                if self._stopping.is_set():
+                    return
+                for index, process in enumerate(self.processes):
+                    if process is not None and process.poll() is not None:
+                        self.logger.warning(f"Job worker {process.pid} exited with code "
+                                            f"{process.returncode}; restarting")
+                        self._spawn(index)
+
+    @property
+    def pids(self) -> List[int]:
+        with self._lock:
+            return [process.pid for process in self.processes if process is not None]
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """
+        Stop restarting workers, ask them to finish their current job and kill
+        any still running after timeout seconds.
+        """
+        with self._lock:
+            self._stopping.set()
+            processes = [process for process in self.processes if process is not None]
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in processes:
+            try:
+                process.wait(max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        if self._monitor is not None:
+            self._monitor.join()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument('--processes', type=int, default=int(os.environ.get('JOB_WORKERS', '2')),
+                        help="Number of worker processes")
+    parser.add_argument('--db', default=None, help="Job store path (defaults to $JOB_QUEUE_DB)")
+    parser.add_argument('--poll-interval', type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.processes <= 1:
+        _worker_main(args.db, args.poll_interval)
+        return
+
+    supervisor = WorkerSupervisor(args.processes, args.db, args.poll_interval).start()
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    while not stop.wait(1.0):
+        pass
+    supervisor.stop()
+
+
+if __name__ == '__main__':
+    # Run the package module's copy so the handlers imported by _worker_main
+    # register in the same registry JobWorker reads (not in __main__'s);
+    # `python -m jobs` avoids the double import altogether
+    from jobs.worker import main as package_main
+    package_main()
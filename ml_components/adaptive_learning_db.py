@@ -5,60 +5,104 @@ This module provides functions to interact with the database models for the adap
 making it easier to store and retrieve user preferences, feature weights, and prediction records.
 """
 
+from collections import namedtuple
 from datetime import datetime
+from numbers import Real
 from models import db, StockPreference, FeatureWeight, SectorPreference, PredictionRecord
+from .feedback_buffer import get_feedback_buffer
 import json
 import numpy as np
 
+# Recommendation features as (stock data key, feature weight key, scale).
+# Missing values contribute nothing to the score.
+RECOMMENDATION_FEATURES = (
+    ('price_momentum', 'price_momentum', 1.0),
+    ('52_week_range_position', 'weekly_range', 100.0),
+    ('ytd_performance', 'ytd_performance', 1.0),
+    ('news_sentiment', 'news_sentiment', 100.0),
+    ('rotc', 'rotc', 1.0),
+    ('pe_ratio', 'pe_ratio', 1.0),
+    ('dividend_yield', 'dividend_yield', 1.0),
+    ('volume_change', 'volume_change', 1.0),
+)
+DEFAULT_FEATURE_WEIGHT = 0.1
+PREFERRED_SECTOR_BONUS = 1.2
+
+RecommendationCandidates = namedtuple('RecommendationCandidates', ['stocks', 'features', 'sectors'])
+
+
+def _numeric(stock, key):
+    """Numeric value of a stock metric, or None when missing, non-numeric or NaN"""
+    value = stock.get(key)
+    if not isinstance(value, Real) or value != value:
+        return None
+    return float(value)
+
+
+def _feature_value(stock, key):
+    value = _numeric(stock, key)
+    if value is None:
+        return 0.0
+    if key == 'pe_ratio':
+        # Lower PE ratio is better, so invert the relationship
+        return 25 / max(value, 1) if value > 0 else 0.0
+    return value
+
+
+def build_recommendation_candidates(stock_data):
+    """
+    Gather candidate stocks into a feature matrix for scoring.
+    
+    The matrix does not depend on the user, so it can be built once for a
+    stock universe and scored against every user's weights.
+    
+    Args:
+        stock_data (list): List of dictionaries containing stock data
+        
+    Returns:
+        RecommendationCandidates: The stocks, an (n_stocks, n_features) float
+        matrix in RECOMMENDATION_FEATURES order, and the stocks' sectors
+    """
+    stocks = list(stock_data)
+    features = np.array(
+        [[_feature_value(stock, key) * scale for key, _, scale in RECOMMENDATION_FEATURES] for stock in stocks],
+        dtype=float
+    ).reshape(len(stocks), len(RECOMMENDATION_FEATURES))
+    sectors = np.array([stock.get('sector') for stock in stocks], dtype=object)
+    return RecommendationCandidates(stocks, features, sectors)
+
+
 class AdaptiveLearningDB:
     """
     Database interface for the adaptive learning system.
     Handles database operations for storing and retrieving user preferences.
     """
     
-    def __init__(self, user_id):
+    def __init__(self, user_id, feedback_buffer=None):
         """
         Initialize with a user ID.
         
         Args:
             user_id (int): Database ID for the current user
+            feedback_buffer (FeedbackBuffer, optional): Buffer that coalesces view,
+                sector and feature weight writes (the process-wide one by default)
         """
         self.user_id = user_id
+        self.feedback = feedback_buffer or get_feedback_buffer()
     
     def record_stock_view(self, symbol, sector=None, view_duration=None):
         """
         Record that a user viewed a particular stock.
         
+        Views are buffered and written in batches by the feedback buffer, so
+        other processes see them after its next flush.
+        
         Args:
             symbol (str): The stock symbol
             sector (str, optional): The stock's sector
             view_duration (float, optional): Time spent viewing in seconds
         """
-        # Get or create stock preference record
-        stock_pref = StockPreference.query.filter_by(
-            user_id=self.user_id, 
-            symbol=symbol
-        ).first()
-        
-        if not stock_pref:
-            stock_pref = StockPreference(
-                user_id=self.user_id,
-                symbol=symbol,
-                sector=sector,
-                view_count=0,
-                total_view_time=0
-            )
-        
-        # Update view data
-        stock_pref.view_count += 1
-        stock_pref.last_viewed = datetime.utcnow()
-        
-        if view_duration:
-            stock_pref.total_view_time += view_duration
-        
-        # Commit to database
-        db.session.add(stock_pref)
-        db.session.commit()
+        self.feedback.record_view(self.user_id, symbol, sector=sector, duration=view_duration)
     
     def record_stock_feedback(self, symbol, reaction, stock_data=None):
         """
@@ -123,145 +167,48 @@ class AdaptiveLearningDB:
         """
         Update a sector preference score.
         
+        The change is buffered; the score is kept between -10 and +10 when written.
+        
         Args:
             sector (str): The sector to update
             score_change (int): Amount to adjust score (+1 for like, -1 for dislike)
         """
-        sector_pref = SectorPreference.query.filter_by(
-            user_id=self.user_id,
-            sector=sector
-        ).first()
-        
-        if not sector_pref:
-            sector_pref = SectorPreference(
-                user_id=self.user_id,
-                sector=sector,
-                score=0
-            )
-        
-        # Update score (keeping within bounds)
-        new_score = sector_pref.score + score_change
-        sector_pref.score = max(min(new_score, 10), -10)  # Keep between -10 and +10
-        sector_pref.last_updated = datetime.utcnow()
-        
-        db.session.add(sector_pref)
-        db.session.commit()
+        self.feedback.record_sector_change(self.user_id, sector, score_change)
     
     def _update_feature_relevance(self, stock_data, reaction):
         """
         Update feature weights based on user feedback.
         
+        Weights of metrics that were particularly strong in the stock are scaled
+        up for likes and purchases and down for dislikes. The multipliers are
+        buffered; weights are renormalized to sum to 1.0 when written.
+        
         Args:
             stock_data (dict): Stock metrics and data
             reaction (str): 'like', 'dislike', or 'purchase'
         """
-        # Get or create feature weights
-        weights = FeatureWeight.query.filter_by(user_id=self.user_id).first()
-        
-        if not weights:
-            weights = FeatureWeight(user_id=self.user_id)
-            db.session.add(weights)
-            db.session.commit()
-        
-        # For now, just a basic implementation that focuses on metrics that were
-        # particularly strong in stocks the user liked
-        
-        # If the user liked or purchased this stock
         if reaction in ('like', 'purchase'):
-            # If this stock has strong price momentum, slightly increase that weight
-            if stock_data.get('price_momentum', 0) > 50:
-                weights.price_momentum_weight *= 1.05
-            
-            # If this stock has a good 52-week position, slightly increase that weight
-            if stock_data.get('52_week_range_position', 0) > 0.7:
-                weights.weekly_range_weight *= 1.05
-            
-            # If this stock has strong YTD performance, slightly increase that weight
-            if stock_data.get('ytd_performance', 0) > 15:
-                weights.ytd_performance_weight *= 1.05
-            
-            # If this stock has good sentiment, slightly increase that weight
-            if stock_data.get('news_sentiment', 0) > 0.6:
-                weights.news_sentiment_weight *= 1.05
-                
-            # If this stock has good ROTC, slightly increase that weight
-            if stock_data.get('rotc', 0) > 10:
-                weights.rotc_weight *= 1.05
-                
-            # If this stock has a good PE ratio, slightly increase that weight
-            if stock_data.get('pe_ratio', 100) < 20 and stock_data.get('pe_ratio', 0) > 0:
-                weights.pe_ratio_weight *= 1.05
-                
-            # If this stock has good dividend yield, slightly increase that weight
-            if stock_data.get('dividend_yield', 0) > 2:
-                weights.dividend_yield_weight *= 1.05
-                
-            # If this stock has good volume, slightly increase that weight
-            if stock_data.get('volume_change', 0) > 10:
-                weights.volume_change_weight *= 1.05
-                
-        # If the user disliked this stock, do the opposite
+            factor = 1.05
         elif reaction == 'dislike':
-            # If this stock has strong price momentum, slightly decrease that weight
-            if stock_data.get('price_momentum', 0) > 50:
-                weights.price_momentum_weight *= 0.95
-            
-            # If this stock has a good 52-week position, slightly decrease that weight
-            if stock_data.get('52_week_range_position', 0) > 0.7:
-                weights.weekly_range_weight *= 0.95
-            
-            # If this stock has strong YTD performance, slightly decrease that weight
-            if stock_data.get('ytd_performance', 0) > 15:
-                weights.ytd_performance_weight *= 0.95
-            
-            # If this stock has good sentiment, slightly decrease that weight
-            if stock_data.get('news_sentiment', 0) > 0.6:
-                weights.news_sentiment_weight *= 0.95
-                
-            # If this stock has good ROTC, slightly decrease that weight
-            if stock_data.get('rotc', 0) > 10:
-                weights.rotc_weight *= 0.95
-                
-            # If this stock has a good PE ratio, slightly decrease that weight
-            if stock_data.get('pe_ratio', 100) < 20 and stock_data.get('pe_ratio', 0) > 0:
-                weights.pe_ratio_weight *= 0.95
-                
-            # If this stock has good dividend yield, slightly decrease that weight
-            if stock_data.get('dividend_yield', 0) > 2:
-                weights.dividend_yield_weight *= 0.95
-                
-            # If this stock has good volume, slightly decrease that weight
-            if stock_data.get('volume_change', 0) > 10:
-                weights.volume_change_weight *= 0.95
-                
-        # Normalize weights to sum to 1.0
-        total = (
-            weights.price_momentum_weight + 
-            weights.weekly_range_weight + 
-            weights.ytd_performance_weight + 
-            weights.news_sentiment_weight + 
-            weights.rotc_weight + 
-            weights.pe_ratio_weight + 
-            weights.dividend_yield_weight + 
-            weights.volume_change_weight +
-            weights.market_cap_weight
-        )
+            factor = 0.95
+        else:
+            return
+        
+        pe_ratio = stock_data.get('pe_ratio', 0)
+        strong_features = {
+            'price_momentum_weight': stock_data.get('price_momentum', 0) > 50,
+            'weekly_range_weight': stock_data.get('52_week_range_position', 0) > 0.7,
+            'ytd_performance_weight': stock_data.get('ytd_performance', 0) > 15,
+            'news_sentiment_weight': stock_data.get('news_sentiment', 0) > 0.6,
+            'rotc_weight': stock_data.get('rotc', 0) > 10,
+            'pe_ratio_weight': 0 < pe_ratio < 20,
+            'dividend_yield_weight': stock_data.get('dividend_yield', 0) > 2,
+            'volume_change_weight': stock_data.get('volume_change', 0) > 10,
+        }
         
-        # Normalize only if total is not 0
-        if total > 0:
-            weights.price_momentum_weight /= total
-            weights.weekly_range_weight /= total
-            weights.ytd_performance_weight /= total
-            weights.news_sentiment_weight /= total
-            weights.rotc_weight /= total
-            weights.pe_ratio_weight /= total
-            weights.dividend_yield_weight /= total
-            weights.volume_change_weight /= total
-            weights.market_cap_weight /= total
-        
-        weights.last_updated = datetime.utcnow()
-        db.session.add(weights)
-        db.session.commit()
+        self.feedback.record_weight_factors(self.user_id, {
+            column: factor for column, strong in strong_features.items() if strong
+        })
     
     def record_prediction(self, symbol, prediction_type, predicted, actual=None):
         """
@@ -310,6 +257,9 @@ class AdaptiveLearningDB:
         Returns:
             dict: Feature weights as a dictionary
         """
+        # Include this user's feedback buffered in this process (other workers flush on their interval)
+        self.feedback.flush_if_pending(self.user_id)
+        
         weights = FeatureWeight.query.filter_by(user_id=self.user_id).first()
         
         if not weights:
@@ -339,6 +289,7 @@ class AdaptiveLearningDB:
         Returns:
             list: List of (sector, score) tuples
         """
+        self.feedback.flush_if_pending(self.user_id)
         sectors = SectorPreference.query.filter_by(
             user_id=self.user_id
         ).order_by(SectorPreference.score.desc()).limit(limit).all()
@@ -355,6 +306,7 @@ class AdaptiveLearningDB:
         Returns:
             list: List of (sector, score) tuples
         """
+        self.feedback.flush_if_pending(self.user_id)
         sectors = SectorPreference.query.filter_by(
             user_id=self.user_id
         ).order_by(SectorPreference.score.asc()).limit(limit).all()
@@ -445,76 +397,57 @@ class AdaptiveLearningDB:
         errors = [r.error for r in records]
         return float(np.mean(errors)) if errors else None
     
-    def get_recommended_stocks(self, stock_data):
+    def get_recommended_stocks(self, stock_data, top_n=None):
         """
         Get personalized stock recommendations based on user preferences and feature weights.
         
         Args:
-            stock_data (list): List of dictionaries containing stock data
+            stock_data (list or RecommendationCandidates): List of dictionaries
+                containing stock data, or candidates from build_recommendation_candidates
+            top_n (int, optional): Number of recommendations to return (all by default)
             
         Returns:
-            list: List of recommended stocks with scores
+            list: List of recommended stocks with scores, best first
         """
-        if not stock_data:
+        candidates = stock_data if isinstance(stock_data, RecommendationCandidates) \
+            else build_recommendation_candidates(stock_data or [])
+        if not candidates.stocks:
             return []
         
         # Get user's feature weights
         weights = self.get_user_feature_weights()
+        weight_vector = np.array([
+            weights.get(weight_key, DEFAULT_FEATURE_WEIGHT) for _, weight_key, _ in RECOMMENDATION_FEATURES
+        ], dtype=float)
         
         # Get preferred sectors
         preferred_sectors = [s[0] for s in self.get_preferred_sectors()]
         
-        # Score each stock based on user preferences
-        scored_stocks = []
-        for stock in stock_data:
-            score = 0
-            symbol = stock.get('symbol', '')
-            
-            # Base score from features weighted by user preferences
-            if 'price_momentum' in stock:
-                score += stock['price_momentum'] * weights.get('price_momentum', 0.1)
-                
-            if '52_week_range_position' in stock:
-                score += stock['52_week_range_position'] * 100 * weights.get('weekly_range', 0.1)
-                
-            if 'ytd_performance' in stock:
-                score += stock['ytd_performance'] * weights.get('ytd_performance', 0.1)
-                
-            if 'news_sentiment' in stock:
-                score += stock['news_sentiment'] * 100 * weights.get('news_sentiment', 0.1)
-                
-            if 'rotc' in stock:
-                score += stock['rotc'] * weights.get('rotc', 0.1)
-                
-            if 'pe_ratio' in stock and stock['pe_ratio'] > 0:
-                # Lower PE ratio is better, so invert the relationship
-                pe_score = 25 / max(stock['pe_ratio'], 1) * weights.get('pe_ratio', 0.1)
-                score += pe_score
-                
-            if 'dividend_yield' in stock:
-                score += stock['dividend_yield'] * weights.get('dividend_yield', 0.1)
-                
-            if 'volume_change' in stock:
-                score += stock['volume_change'] * weights.get('volume_change', 0.1)
-                
-            # Sector bonus
-            if 'sector' in stock and stock['sector'] in preferred_sectors:
-                score *= 1.2  # 20% bonus for preferred sectors
-            
-            # Add to scored list with explanation
-            explanation = self._generate_recommendation_explanation(stock, weights, preferred_sectors)
-            scored_stocks.append({
-                'symbol': symbol,
-                'score': score,
-                'data': stock,
-                'explanation': explanation
-            })
-        
-        # Sort by score
-        sorted_stocks = sorted(scored_stocks, key=lambda x: x['score'], reverse=True)
-        
-        # Return top recommendations (all of them for now)
-        return sorted_stocks
+        # Score every stock at once, with a bonus for preferred sectors
+        scores = candidates.features @ weight_vector
+        if preferred_sectors:
+            scores = np.where(np.isin(candidates.sectors, preferred_sectors), scores * PREFERRED_SECTOR_BONUS, scores)
+        
+        # Select the top stocks without sorting the whole universe; ties keep input order
+        if top_n is not None and top_n <= 0:
+            return []
+        if top_n is not None and top_n < len(scores):
+            cutoff = scores[np.argpartition(-scores, top_n - 1)[:top_n]].min()
+            order = np.flatnonzero(scores >= cutoff)
+            order = order[np.argsort(-scores[order], kind='stable')][:top_n]
+        else:
+            order = np.argsort(-scores, kind='stable')
+        
+        # Explanations only for the stocks returned
+        return [
+            {
+                'symbol': candidates.stocks[i].get('symbol', ''),
+                'score': float(scores[i]),
+                'data': candidates.stocks[i],
+                'explanation': self._generate_recommendation_explanation(candidates.stocks[i], weights, preferred_sectors)
+            }
+            for i in order
+        ]
     
     def _generate_recommendation_explanation(self, stock, weights, preferred_sectors):
         """
@@ -529,28 +462,29 @@ class AdaptiveLearningDB:
             str: Explanation text
         """
         reasons = []
+        metrics = {key: _numeric(stock, key) for key, _, _ in RECOMMENDATION_FEATURES}
         
-        # Check for strong features
-        if 'price_momentum' in stock and stock['price_momentum'] > 50:
+        # Check for strong features (missing or non-numeric metrics are skipped)
+        if (metrics['price_momentum'] or 0) > 50:
             reasons.append("Strong price momentum")
             
-        if '52_week_range_position' in stock and stock['52_week_range_position'] > 0.7:
+        if (metrics['52_week_range_position'] or 0) > 0.7:
             reasons.append("Trading near 52-week high")
             
-        if 'ytd_performance' in stock and stock['ytd_performance'] > 15:
-            reasons.append(f"Strong YTD performance ({stock['ytd_performance']:.1f}%)")
+        if (metrics['ytd_performance'] or 0) > 15:
+            reasons.append(f"Strong YTD performance ({metrics['ytd_performance']:.1f}%)")
             
-        if 'news_sentiment' in stock and stock['news_sentiment'] > 0.6:
+        if (metrics['news_sentiment'] or 0) > 0.6:
             reasons.append("Positive news sentiment")
             
-        if 'rotc' in stock and stock['rotc'] > 12:
-            reasons.append(f"High return on invested capital ({stock['rotc']:.1f}%)")
+        if (metrics['rotc'] or 0) > 12:
+            reasons.append(f"High return on invested capital ({metrics['rotc']:.1f}%)")
             
-        if 'pe_ratio' in stock and 0 < stock['pe_ratio'] < 20:
-            reasons.append(f"Attractive P/E ratio ({stock['pe_ratio']:.1f})")
+        if 0 < (metrics['pe_ratio'] or 0) < 20:
+            reasons.append(f"Attractive P/E ratio ({metrics['pe_ratio']:.1f})")
             
-        if 'dividend_yield' in stock and stock['dividend_yield'] > 2:
-            reasons.append(f"Good dividend yield ({stock['dividend_yield']:.1f}%)")
+        if (metrics['dividend_yield'] or 0) > 2:
+            reasons.append(f"Good dividend yield ({metrics['dividend_yield']:.1f}%)")
             
         if 'sector' in stock and stock['sector'] in preferred_sectors:
             reasons.append(f"In your preferred sector: {stock['sector']}")
@@ -568,6 +502,9 @@ class AdaptiveLearningDB:
         Returns:
             dict: Summary of user preferences and tendencies
         """
+        # View counts may still be buffered in this process
+        self.feedback.flush_if_pending(self.user_id)
+        
         liked = len(self.get_liked_stocks())
         disliked = len(self.get_disliked_stocks())
         purchased = len(self.get_purchased_stocks())
@@ -611,6 +548,9 @@ class AdaptiveLearningDB:
             bool: True if reset was successful, False otherwise
         """
         try:
+            # Drop buffered feedback so it is not written after the reset
+            self.feedback.discard(self.user_id)
+            
             # Delete all stock preferences
             StockPreference.query.filter_by(user_id=self.user_id).delete()
             
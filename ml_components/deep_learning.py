@@ -1,19 +1,31 @@
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import as_strided
+from sklearn.base import clone
 from sklearn.neural_network import MLPRegressor
 from sklearn.preprocessing import StandardScaler
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator, Union
 import logging
 import joblib
 from datetime import datetime
 import json
 
-class DeepLearningEngine:
+from caching import get_cache
+from .model_registry import RegistryBackedModels
+
+class DeepLearningEngine(RegistryBackedModels):
+    # Extracted feature frames are immutable for a given (symbol, last bar, rows)
+    FEATURE_CACHE_TTL = 24 * 3600
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.models = {}
         self.scalers = {}
         self.model_metadata = {}
+        self._registry_models = set()
+        # Shared by every engine in the process so retraining runs reuse extracted features
+        self.feature_cache = get_cache('deep_learning_features', default_ttl=self.FEATURE_CACHE_TTL,
+                                       max_entries=2000, max_bytes=256 * 1024 * 1024)
         self.setup_models()
         
     def setup_models(self):
@@ -62,21 +74,140 @@ class DeepLearningEngine:
         except Exception as e:
             self.logger.error(f"Error setting up deep learning models: {str(e)}")
 
+    @staticmethod
+    def _as_float32(data: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """Contiguous (rows, features) float32 matrix for the window views"""
+        values = data.to_numpy(dtype=np.float32) if isinstance(data, pd.DataFrame) else data
+        values = np.ascontiguousarray(values, dtype=np.float32)
+        return values.reshape(len(values), -1)
+
+    @staticmethod
+    def _window_view(values: np.ndarray, sequence_length: int) -> np.ndarray:
+        """
+        Read-only (n_windows, sequence_length * features) view over a C-contiguous matrix.
+
+        Row i starts at bar i and spans sequence_length consecutive bars, which are
+        already adjacent in memory, so each flattened window is a plain stride and
+        nothing is copied. The last window is left out so every window has a next bar
+        to predict.
+        """
+        n_rows, n_features = values.shape
+        n_windows = max(n_rows - sequence_length, 0)
+        return as_strided(values, shape=(n_windows, sequence_length * n_features),
+                          strides=(values.strides[0], values.strides[1]), writeable=False)
+
     def create_feature_sequences(self, data: pd.DataFrame, 
                                sequence_length: int = 50) -> np.ndarray:
-        """Create sequences for temporal learning"""
+        """
+        Create sequences for temporal learning
+        
+        Args:
+            data: Feature frame (or 2-D array) with one row per bar
+            sequence_length: Number of bars per sequence
+            
+        Returns:
+            Read-only float32 array of shape (len(data) - sequence_length,
+            sequence_length * n_features); windows are strided views of one buffer
+        """
         try:
-            features = []
-            for i in range(len(data) - sequence_length):
-                sequence = data.iloc[i:(i + sequence_length)]
-                features.append(sequence.values.flatten())
-            return np.array(features)
+            return self._window_view(self._as_float32(data), sequence_length)
         except Exception as e:
             self.logger.error(f"Error creating sequences: {str(e)}")
             return np.array([])
 
-    def extract_advanced_features(self, data: pd.DataFrame) -> pd.DataFrame:
-        """Extract advanced features for deep learning"""
+    def iter_sequence_batches(self, histories: Union[Dict[str, pd.DataFrame], Iterable[Tuple[str, pd.DataFrame]]],
+                              sequence_length: int = 50, batch_size: int = 256,
+                              target_column: Optional[str] = None,
+                              extract_features: bool = True) -> Iterator:
+        """
+        Stream training mini-batches of sequences across many symbols
+        
+        Only one symbol's feature matrix and one batch are materialized at a time,
+        so memory stays flat however large the universe is.
+        
+        Args:
+            histories: Mapping (or iterable of pairs) of symbol to price history
+            sequence_length: Number of bars per sequence
+            batch_size: Sequences per yielded batch; the last batch may be smaller
+            target_column: Feature column whose value on the bar after each window
+                is the training target; when None only X is yielded
+            extract_features: Run (cached) extract_advanced_features on each history
+                first; pass False when histories are already feature frames
+            
+        Yields:
+            X batches of shape (batch, sequence_length * n_features), or (X, y) pairs
+            when target_column is set
+        """
+        items = histories.items() if isinstance(histories, dict) else histories
+        batch_x, batch_y = [], []
+        filled = 0
+        n_features = None
+
+        for symbol, history in items:
+            try:
+                frame = self.extract_advanced_features(history, symbol=symbol) if extract_features else history
+                if frame.empty:
+                    continue
+                values = self._as_float32(frame)
+                targets = frame[target_column].to_numpy(dtype=np.float32)[sequence_length:] if target_column else None
+            except Exception as e:
+                self.logger.error(f"Error preparing sequences for {symbol}: {str(e)}")
+                continue
+
+            if n_features is None:
+                n_features = values.shape[1]
+            elif values.shape[1] != n_features:
+                self.logger.warning(f"Skipping {symbol}: {values.shape[1]} features, expected {n_features}")
+                continue
+
+            windows = self._window_view(values, sequence_length)
+            start = 0
+            while start < len(windows):
+                take = min(batch_size - filled, len(windows) - start)
+                batch_x.append(windows[start:start + take])
+                if targets is not None:
+                    batch_y.append(targets[start:start + take])
+                filled += take
+                start += take
+                if filled == batch_size:
+                    yield self._emit_batch(batch_x, batch_y, target_column)
+                    batch_x, batch_y = [], []
+                    filled = 0
+
+        if filled:
+            yield self._emit_batch(batch_x, batch_y, target_column)
+
+    @staticmethod
+    def _emit_batch(batch_x: List[np.ndarray], batch_y: List[np.ndarray], target_column: Optional[str]):
+        X = np.concatenate(batch_x)
+        return (X, np.concatenate(batch_y)) if target_column else X
+
+    def extract_advanced_features(self, data: pd.DataFrame, symbol: Optional[str] = None) -> pd.DataFrame:
+        """
+        Extract advanced features for deep learning
+        
+        Args:
+            data: OHLCV price history
+            symbol: When given, the result is cached under (symbol, last bar, rows)
+                so repeated training runs over unchanged histories skip the rolling
+                computations
+            
+        Returns:
+            Feature frame with incomplete leading rows dropped
+        """
+        if symbol is None or data.empty:
+            return self._compute_advanced_features(data)
+
+        key = f"{symbol.upper()}:{pd.Timestamp(data.index[-1]).isoformat()}:{len(data)}"
+        features = self.feature_cache.get(key)
+        if features is None:
+            features = self._compute_advanced_features(data)
+            if not features.empty:
+                self.feature_cache.set(key, features)
+        # Callers may add columns; the cached frame must stay as extracted
+        return features.copy()
+
+    def _compute_advanced_features(self, data: pd.DataFrame) -> pd.DataFrame:
         try:
             df = data.copy()
             
@@ -111,6 +242,12 @@ class DeepLearningEngine:
                    validation_split: float = 0.2) -> Dict:
         """Train a specific model with advanced tracking"""
         try:
+            # Registry-loaded models are shared and read-only; refit unfitted clones
+            if model_name in self._registry_models:
+                self.scalers[model_name] = clone(self.scalers[model_name])
+                self.models[model_name] = clone(self.models[model_name])
+                self._registry_models.discard(model_name)
+            
             # Scale features
             X_scaled = self.scalers[model_name].fit_transform(X)
             
@@ -184,6 +321,19 @@ class DeepLearningEngine:
             self.logger.error(f"Error estimating confidence: {str(e)}")
             return 0.0
 
+    def _registry_artifacts(self) -> Dict:
+        return {
+            'models': dict(self.models),
+            'scalers': dict(self.scalers),
+            'model_metadata': dict(self.model_metadata)
+        }
+
+    def _restore_artifacts(self, artifacts: Dict) -> None:
+        self.models.update(artifacts['models'])
+        self.scalers.update(artifacts['scalers'])
+        self.model_metadata.update(artifacts.get('model_metadata', {}))
+        self._registry_models.update(artifacts['models'])
+
     def save_model(self, model_name: str, path: str):
         """Save model and its metadata"""
         try:
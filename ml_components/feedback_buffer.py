@@ -0,0 +1,463 @@
+"""
+Write-coalescing buffer for adaptive learning feedback
+
+Stock views, sector preference changes and feature weight adjustments are
+aggregated in memory per user and written to the database in one transaction
+every ``flush_interval`` seconds, or sooner once ``max_pending`` interactions
+are waiting. A burst of browsing therefore becomes a single batched upsert per
+table instead of one query and commit per interaction.
+
+Aggregation is exact rather than approximate. Views add up. Feature weight
+multipliers compose by multiplication, since normalizing after every step and
+normalizing once give the same weights. Sector scores are clamped to [-10, 10]
+after every change, and a chain of "add, then clamp" steps collapses into a
+single add-then-clamp, so the flushed score matches one commit per change.
+
+Every interaction is also appended to a per-process JSONL log before it is
+buffered, tagged with the buffer's id and a sequence number. A flush records
+the highest sequence number it covered per buffer in ``FeedbackFlushMark``, in
+the same transaction as the deltas, and then deletes the log lines it covered.
+Logs left behind by a process that died are claimed and replayed by the next
+buffer that starts, skipping events at or below the committed mark, so a crash
+between the commit and the log deletion does not apply that batch twice.
+
+Reads flush the reading user's pending interactions first, so a user reads
+their own writes within one process. Interactions buffered by another process
+(another gunicorn worker, say) reach the database, and become visible
+everywhere, within ``flush_interval`` seconds.
+"""
+
+import atexit
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+from models import db, StockPreference, FeatureWeight, SectorPreference, FeedbackFlushMark
+
+FEATURE_WEIGHT_COLUMNS = (
+    'price_momentum_weight', 'weekly_range_weight', 'ytd_performance_weight',
+    'news_sentiment_weight', 'rotc_weight', 'pe_ratio_weight',
+    'dividend_yield_weight', 'volume_change_weight', 'market_cap_weight'
+)
+SECTOR_SCORE_MIN = -10
+SECTOR_SCORE_MAX = 10
+# Flush marks of buffers that have not flushed for this long are dropped
+FLUSH_MARK_RETENTION = timedelta(days=7)
+
+_LOG_PATTERN = re.compile(r'feedback-(\d+)(?:-\d+)?\.(?:jsonl|flushing)')
+
+
+def _compose_clamps(first: Tuple[float, float, float], then: Tuple[float, float, float]) -> Tuple[float, float, float]:
+    """
+    Compose two ``x -> min(max(x + shift, low), high)`` steps into one.
+
+    Clamping clamp(z, p, q) to [l, u] equals clamping z to
+    [clamp(p, l, u), clamp(q, l, u)], which keeps the form closed.
+    """
+    shift1, low1, high1 = first
+    shift2, low2, high2 = then
+    low = min(max(low1 + shift2, low2), high2)
+    high = max(min(high1 + shift2, high2), low2)
+    return shift1 + shift2, low, high
+
+
+class PendingFeedback:
+    """Interaction deltas aggregated per user, waiting to be written"""
+
+    def __init__(self):
+        # (user_id, symbol) -> {'count', 'view_time', 'last_viewed', 'sector'}
+        self.views: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        # (user_id, sector) -> (shift, low, high) applied to the stored score
+        self.sectors: Dict[Tuple[int, str], Tuple[float, float, float]] = {}
+        # user_id -> {column: multiplier}
+        self.weights: Dict[int, Dict[str, float]] = {}
+        # user_id -> interactions folded in
+        self.counts: Dict[int, int] = {}
+        self.discarded: set = set()
+        # buffer id -> highest sequence number folded in
+        self.high_water: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+    def users(self) -> set:
+        return set(self.counts)
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        """Fold one logged interaction into the aggregates"""
+        source = event.get('src')
+        if source is not None:
+            self.high_water[source] = max(self.high_water.get(source, 0), event['seq'])
+        kind = event['type']
+        user_id = event['user_id']
+        if kind == 'view':
+            view = self.views.setdefault((user_id, event['symbol']), {
+                'count': 0, 'view_time': 0.0, 'last_viewed': None, 'sector': None
+            })
+            view['count'] += 1
+            view['view_time'] += event.get('duration') or 0.0
+            view['last_viewed'] = max(filter(None, (view['last_viewed'], event['ts'])))
+            view['sector'] = view['sector'] or event.get('sector')
+        elif kind == 'sector':
+            key = (user_id, event['sector'])
+            step = (event['change'], SECTOR_SCORE_MIN, SECTOR_SCORE_MAX)
+            self.sectors[key] = _compose_clamps(self.sectors.get(key, (0, float('-inf'), float('inf'))), step)
+        elif kind == 'weights':
+            factors = self.weights.setdefault(user_id, {})
+            for column, factor in event['factors'].items():
+                factors[column] = factors.get(column, 1.0) * factor
+        elif kind == 'discard':
+            self.discard(user_id)
+            return
+        else:
+            logging.getLogger(__name__).warning(f"Skipping unknown feedback event type: {kind}")
+            return
+        self.counts[user_id] = self.counts.get(user_id, 0) + 1
+
+    def discard(self, user_id: int) -> None:
+        self.views = {key: view for key, view in self.views.items() if key[0] != user_id}
+        self.sectors = {key: step for key, step in self.sectors.items() if key[0] != user_id}
+        self.weights.pop(user_id, None)
+        self.counts.pop(user_id, None)
+        self.discarded.add(user_id)
+
+    def absorb_newer(self, newer: 'PendingFeedback') -> 'PendingFeedback':
+        """Fold deltas recorded after this batch into it (used when a flush fails)"""
+        for user_id in newer.discarded:
+            self.discard(user_id)
+        for key, view in newer.views.items():
+            mine = self.views.setdefault(key, dict(view, count=0, view_time=0.0))
+            mine['count'] += view['count']
+            mine['view_time'] += view['view_time']
+            mine['last_viewed'] = max(filter(None, (mine['last_viewed'], view['last_viewed'])))
+            mine['sector'] = mine['sector'] or view['sector']
+        for key, step in newer.sectors.items():
+            self.sectors[key] = _compose_clamps(self.sectors.get(key, (0, float('-inf'), float('inf'))), step)
+        for user_id, factors in newer.weights.items():
+            mine = self.weights.setdefault(user_id, {})
+            for column, factor in factors.items():
+                mine[column] = mine.get(column, 1.0) * factor
+        for user_id, count in newer.counts.items():
+            self.counts[user_id] = self.counts.get(user_id, 0) + count
+        for source, seq in newer.high_water.items():
+            self.high_water[source] = max(self.high_water.get(source, 0), seq)
+        return self
+
+
+class FeedbackBuffer:
+    """
+    Process-wide buffer of adaptive learning writes.
+
+    Flushes run on a background thread inside a fresh application context, so
+    they never commit a request's own session state.
+    """
+
+    def __init__(self, log_dir: Optional[str] = None, flush_interval: float = 5.0,
+                 max_pending: int = 500, app=None):
+        """
+        Args:
+            log_dir: Directory for the append logs (defaults to $FEEDBACK_LOG_DIR or ./cache/feedback)
+            flush_interval: Seconds between background flushes
+            max_pending: Buffered interactions that trigger an early flush
+            app: Flask app whose context flushes run in (see init_app)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.log_dir = log_dir or os.environ.get('FEEDBACK_LOG_DIR', './cache/feedback')
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.app = app
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        self.app = app
+
+    def _ensure_started(self) -> None:
+        """Set up per-process state on first use (and again after a fork)"""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            self._lock = threading.Lock()
+            self._flush_lock = threading.Lock()
+            self._wake = threading.Event()
+            self._pending = PendingFeedback()
+            self._covered: List[str] = []
+            # Events replayed from orphaned logs, filtered against the flush marks on write
+            self._recovered: List[Dict[str, Any]] = []
+            self._log = None
+            self._log_path = os.path.join(self.log_dir, f"feedback-{pid}.jsonl")
+            self._source = uuid.uuid4().hex
+            self._seq = 0
+            os.makedirs(self.log_dir, exist_ok=True)
+            self._recover_orphaned_logs(pid)
+
+            thread = threading.Thread(target=self._run, name='feedback-flush', daemon=True)
+            thread.start()
+            atexit.register(self.flush)
+            self._pid = pid
+
+    @staticmethod
+    def _process_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _next_flushing_path(self) -> str:
+        while True:
+            path = os.path.join(self.log_dir, f"feedback-{os.getpid()}-{time.time_ns()}.flushing")
+            if not os.path.exists(path):
+                return path
+
+    def _recover_orphaned_logs(self, own_pid: int) -> None:
+        """Claim the logs of dead processes and queue their interactions for replay"""
+        for name in sorted(os.listdir(self.log_dir)):
+            match = _LOG_PATTERN.fullmatch(name)
+            if not match:
+                continue
+            # Logs under our own pid predate this process (pids are reused across restarts)
+            pid = int(match.group(1))
+            if pid != own_pid and self._process_alive(pid):
+                continue
+            claimed = self._next_flushing_path()
+            try:
+                # Rename is atomic, so only one starting process claims each log
+                os.rename(os.path.join(self.log_dir, name), claimed)
+            except OSError:
+                continue
+            events = list(self._read_log(claimed))
+            self._recovered.extend(events)
+            self._covered.append(claimed)
+            self.logger.info(f"Recovered {len(events)} buffered feedback events from {name}")
+
+    def _read_log(self, path: str) -> Iterable[Dict[str, Any]]:
+        with open(path, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write
+                    self.logger.warning(f"Discarding unreadable feedback log line {line_number} in {path}")
+                    return
+
+    def _record(self, event_type: str, user_id: int, **payload) -> None:
+        self._ensure_started()
+        with self._lock:
+            self._seq += 1
+            event = {'src': self._source, 'seq': self._seq, 'type': event_type, 'user_id': user_id, **payload}
+            if self._log is None:
+                self._log = open(self._log_path, 'a')
+            self._log.write(json.dumps(event) + "\n")
+            self._log.flush()
+            self._pending.apply(event)
+            due = len(self._pending) >= self.max_pending
+        if due:
+            self._wake.set()
+
+    def record_view(self, user_id: int, symbol: str, sector: Optional[str] = None,
+                    duration: Optional[float] = None) -> None:
+        """Buffer one stock view"""
+        self._record('view', user_id, symbol=symbol, sector=sector, duration=duration,
+                     ts=datetime.utcnow().isoformat())
+
+    def record_sector_change(self, user_id: int, sector: str, change: float) -> None:
+        """Buffer a sector preference score change"""
+        self._record('sector', user_id, sector=sector, change=change)
+
+    def record_weight_factors(self, user_id: int, factors: Dict[str, float]) -> None:
+        """Buffer feature weight multipliers (weights are renormalized on flush)"""
+        if factors:
+            self._record('weights', user_id, factors=factors)
+
+    def discard(self, user_id: int) -> None:
+        """
+        Drop a user's buffered interactions, e.g. when their data is reset.
+
+        Waits for an in-flight flush first, so a batch it already swapped out
+        cannot commit after the caller deletes the user's rows.
+        """
+        self._ensure_started()
+        with self._flush_lock:
+            self._record('discard', user_id)
+
+    def has_pending(self, user_id: int) -> bool:
+        self._ensure_started()
+        with self._lock:
+            return user_id in self._pending.users() or bool(self._recovered)
+
+    def flush_if_pending(self, user_id: int) -> int:
+        """
+        Flush before reading a user's data so reads see their own interactions.
+
+        Only this process's buffer is flushed. Interactions buffered by other
+        processes show up once their next flush commits.
+        """
+        return self.flush() if self.has_pending(user_id) else 0
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error(f"Error flushing feedback buffer: {str(e)}")
+
+    def _app_context(self):
+        app = self.app
+        if app is None and has_app_context():
+            app = current_app._get_current_object()
+        if app is None:
+            raise RuntimeError("FeedbackBuffer needs init_app(app) or an application context to flush")
+        return app.app_context()
+
+    def flush(self) -> int:
+        """
+        Write every buffered interaction in one transaction.
+
+        Returns:
+            Number of interactions written
+        """
+        self._ensure_started()
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, PendingFeedback()
+                covered, self._covered = self._covered, []
+                recovered, self._recovered = self._recovered, []
+                if self._log is not None:
+                    self._log.close()
+                    self._log = None
+                    rotated = self._next_flushing_path()
+                    try:
+                        os.replace(self._log_path, rotated)
+                        covered.append(rotated)
+                    except OSError as e:
+                        self.logger.warning(f"Could not rotate feedback log {self._log_path}: {str(e)}")
+
+            written = 0
+            if pending.users() or recovered:
+                try:
+                    with self._app_context():
+                        try:
+                            written = self._write(pending, recovered)
+                        except Exception:
+                            db.session.rollback()
+                            raise
+                except Exception as e:
+                    self.logger.error(f"Error writing {len(pending)} buffered feedback events: {str(e)}")
+                    with self._lock:
+                        self._pending = pending.absorb_newer(self._pending)
+                        self._covered = covered + self._covered
+                        self._recovered = recovered + self._recovered
+                    return 0
+
+            for path in covered:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return written
+
+    def _write(self, pending: PendingFeedback, recovered: List[Dict[str, Any]]) -> int:
+        now = datetime.utcnow()
+
+        sources = set(pending.high_water) | {event['src'] for event in recovered if event.get('src')}
+        marks = {mark.source: mark for mark in FeedbackFlushMark.query.filter(
+            FeedbackFlushMark.source.in_(sources)).all()} if sources else {}
+
+        # Replayed events at or below a committed mark were written before the crash
+        pending, buffered = PendingFeedback(), pending
+        for event in recovered:
+            mark = marks.get(event.get('src'))
+            if mark is None or event['seq'] > mark.last_seq:
+                pending.apply(event)
+        pending.absorb_newer(buffered)
+
+        if pending.views:
+            users = {user_id for user_id, _ in pending.views}
+            symbols = {symbol for _, symbol in pending.views}
+            rows = {(row.user_id, row.symbol): row for row in StockPreference.query.filter(
+                StockPreference.user_id.in_(users), StockPreference.symbol.in_(symbols)).all()}
+            for (user_id, symbol), view in pending.views.items():
+                row = rows.get((user_id, symbol))
+                if row is None:
+                    row = StockPreference(user_id=user_id, symbol=symbol, sector=view['sector'],
+                                          view_count=0, total_view_time=0)
+                    db.session.add(row)
+                row.view_count = (row.view_count or 0) + view['count']
+                row.total_view_time = (row.total_view_time or 0) + view['view_time']
+                row.last_viewed = datetime.fromisoformat(view['last_viewed'])
+
+        if pending.sectors:
+            users = {user_id for user_id, _ in pending.sectors}
+            sectors = {sector for _, sector in pending.sectors}
+            rows = {(row.user_id, row.sector): row for row in SectorPreference.query.filter(
+                SectorPreference.user_id.in_(users), SectorPreference.sector.in_(sectors)).all()}
+            for (user_id, sector), (shift, low, high) in pending.sectors.items():
+                row = rows.get((user_id, sector))
+                if row is None:
+                    row = SectorPreference(user_id=user_id, sector=sector, score=0)
+                    db.session.add(row)
+                row.score = min(max((row.score or 0) + shift, low), high)
+                row.last_updated = now
+
+        if pending.weights:
+            rows = {row.user_id: row for row in FeatureWeight.query.filter(
+                FeatureWeight.user_id.in_(set(pending.weights))).all()}
+            for user_id, factors in pending.weights.items():
+                row = rows.get(user_id)
+                if row is None:
+                    row = FeatureWeight(user_id=user_id, **{
+                        column: FeatureWeight.__table__.c[column].default.arg for column in FEATURE_WEIGHT_COLUMNS
+                    })
+                    db.session.add(row)
+                values = {column: getattr(row, column) * factors.get(column, 1.0) for column in FEATURE_WEIGHT_COLUMNS}
+                # Normalize weights to sum to 1.0, only if total is not 0
+                total = sum(values.values())
+                for column, value in values.items():
+                    setattr(row, column, value / total if total > 0 else value)
+                row.last_updated = now
+
+        for source, seq in pending.high_water.items():
+            mark = marks.get(source)
+            if mark is None:
+                mark = FeedbackFlushMark(source=source, last_seq=0)
+                db.session.add(mark)
+            mark.last_seq = max(mark.last_seq or 0, seq)
+            mark.updated_at = now
+        FeedbackFlushMark.query.filter(
+            FeedbackFlushMark.updated_at < now - FLUSH_MARK_RETENTION,
+            FeedbackFlushMark.source.notin_(set(pending.high_water)),
+        ).delete(synchronize_session=False)
+
+        db.session.commit()
+        return len(pending)
+
+
+_buffer: Optional[FeedbackBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_feedback_buffer() -> FeedbackBuffer:
+    """Process-wide feedback buffer, created on first use"""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = FeedbackBuffer()
+        return _buffer
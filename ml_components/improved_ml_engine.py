@@ -7,8 +7,11 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.feature_selection import VarianceThreshold
 from sklearn.model_selection import cross_val_score
 
+from analysis import indicators as technical_indicators
+from .model_registry import RegistryBackedModels
 
-class ImprovedMLEngine:
+
+class ImprovedMLEngine(RegistryBackedModels):
     def __init__(self):
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
@@ -128,11 +131,7 @@ class ImprovedMLEngine:
     def calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Calculate RSI (Relative Strength Index) for the given prices."""
         try:
-            delta = prices.diff()
-            gain = delta.where(delta > 0, 0).rolling(window=period).mean()
-            loss = -delta.where(delta < 0, 0).rolling(window=period).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
+            rsi = pd.Series(technical_indicators.rsi(prices.to_numpy(dtype=float), period), index=prices.index)
             return rsi.fillna(0)  # Replace NaN values with 0
         except Exception as e:
             self.logger.error(f"Error calculating RSI: {str(e)}")
@@ -155,6 +154,10 @@ class ImprovedMLEngine:
     def train_model(self, features: np.ndarray, targets: np.ndarray, validation_split: float = 0.2) -> dict:
         """Train models with improved validation."""
         try:
+            # Fresh scalers: the current ones may be shared, read-only registry copies
+            self.feature_scaler = StandardScaler()
+            self.target_scaler = StandardScaler()
+
             # Scale features and targets
             X_scaled = self.feature_scaler.fit_transform(features)
             y_scaled = self.target_scaler.fit_transform(targets.reshape(-1, 1)).ravel()
@@ -193,6 +196,18 @@ class ImprovedMLEngine:
             self.logger.error(f"Error training model: {str(e)}")
             return {}
 
+    def _registry_artifacts(self) -> dict:
+        return {
+            'models': dict(self.models),
+            'feature_scaler': self.feature_scaler,
+            'target_scaler': self.target_scaler
+        }
+
+    def _restore_artifacts(self, artifacts: dict) -> None:
+        self.models = dict(artifacts['models'])
+        self.feature_scaler = artifacts['feature_scaler']
+        self.target_scaler = artifacts['target_scaler']
+
     def optimize_hyperparameters(self, features: np.ndarray, targets: np.ndarray) -> dict:
         """Simplified hyperparameter tuning.
         
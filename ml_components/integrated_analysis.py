@@ -1,9 +1,10 @@
 from .valuation_analyzer import ValuationAnalyzer
 from .improved_ml_engine import ImprovedMLEngine
+from .model_registry import get_model_registry
 from .fundamental_analysis import FundamentalAnalyzer
 import numpy as np
 import pandas as pd
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 import logging
 import yfinance as yf
 from datetime import datetime, timedelta
@@ -12,6 +13,7 @@ class IntegratedAnalysis:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.ml_engine = ImprovedMLEngine()
+        self.model_registry = get_model_registry()
         self.fundamental_analyzer = FundamentalAnalyzer()
         self.valuation_analyzer = ValuationAnalyzer()
         self.symbol = None
@@ -124,7 +126,69 @@ class IntegratedAnalysis:
             start_date = end_date - pd.Timedelta(days=365)
             stock = yf.Ticker(symbol)
             data = stock.history(start=start_date, end=end_date)
+            return self._technical_analysis_from_history(symbol, data)
+        except Exception as e:
+            self.logger.error(f"Error in technical analysis for {symbol}: {str(e)}")
+            return self._get_default_technical_analysis()
 
+    def predict_many(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Technical analysis and ML prediction for several symbols
+        
+        Price history comes from one batched download and each symbol's model is
+        taken from the registry when it was already fitted on the same bars.
+        
+        Args:
+            symbols: Ticker symbols
+            
+        Returns:
+            Mapping of symbol to the get_technical_analysis result
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        if not symbols:
+            return {}
+        try:
+            data = yf.download(symbols, period='1y', group_by='ticker', auto_adjust=False,
+                               progress=False, threads=True)
+        except Exception as e:
+            self.logger.error(f"Error downloading history for {len(symbols)} symbols: {str(e)}")
+            data = pd.DataFrame()
+
+        results = {}
+        for symbol in symbols:
+            self.symbol = symbol
+            try:
+                if isinstance(data.columns, pd.MultiIndex) and symbol in data.columns.get_level_values(0):
+                    history = data[symbol].dropna(how='all')
+                else:
+                    history = data.dropna(how='all') if len(symbols) == 1 else pd.DataFrame()
+                results[symbol] = self._technical_analysis_from_history(symbol, history)
+            except Exception as e:
+                self.logger.error(f"Error in technical analysis for {symbol}: {str(e)}")
+                results[symbol] = self._get_default_technical_analysis()
+        return results
+
+    def _fit_or_load_model(self, symbol: str, data: pd.DataFrame, features_df: pd.DataFrame,
+                           returns: pd.Series) -> None:
+        """Reuse the registry model fitted on the same bars and features, otherwise train and publish"""
+        name = f"technical/{symbol.upper()}"
+        data_version = pd.Timestamp(data.index[-1]).isoformat()
+        feature_columns = [str(c) for c in features_df.columns]
+
+        published = self.model_registry.metadata(name)
+        if published and published.get('data_version') == data_version \
+                and published.get('feature_columns') == feature_columns:
+            if self.ml_engine.load_from_registry(name, self.model_registry) is not None:
+                return
+
+        scores = self.ml_engine.train_model(features_df.values, returns.values)
+        if scores:
+            self.ml_engine.save_to_registry(name, self.model_registry, data_version=data_version,
+                                            feature_columns=feature_columns,
+                                            scores={k: float(v) for k, v in scores.items()})
+
+    def _technical_analysis_from_history(self, symbol: str, data: pd.DataFrame) -> Dict:
+        try:
             if data.empty:
                 return self._get_default_technical_analysis()
 
@@ -146,10 +210,8 @@ class IntegratedAnalysis:
             returns = returns.loc[common_index]
 
             if len(features_df) > 0:
-                # Train model
-                training_features = features_df.values
-                training_targets = returns.values
-                self.ml_engine.train_model(training_features, training_targets)
+                # Train model, or reuse the one already fitted on these bars
+                self._fit_or_load_model(symbol, data, features_df, returns)
 
                 # Prepare latest features for prediction
                 latest_features = features_df.iloc[-1:].values
@@ -1,12 +1,17 @@
 import numpy as np
 import pandas as pd
+from sklearn.base import clone
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor, RandomForestRegressor
 from sklearn.neural_network import MLPRegressor
 from typing import List, Dict, Tuple
 import logging
 
-class MarketMLEngine:
+from analysis import indicators as technical_indicators
+from .model_registry import RegistryBackedModels
+
+
+class MarketMLEngine(RegistryBackedModels):
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.scaler = StandardScaler()
@@ -137,6 +142,13 @@ class MarketMLEngine:
         except Exception as e:
             self.logger.error(f"Error setting up ML models: {str(e)}")
 
+    def _registry_artifacts(self) -> Dict:
+        return {'models': dict(self.models), 'scaler': self.scaler}
+
+    def _restore_artifacts(self, artifacts: Dict) -> None:
+        self.models = dict(artifacts['models'])
+        self.scaler = artifacts['scaler']
+
 class MarketPatternLearner:
     def __init__(self, ml_engine: MarketMLEngine):
         self.ml_engine = ml_engine
@@ -150,11 +162,13 @@ class MarketPatternLearner:
             # Extract features
             features = self.extract_features(market_data)
             
-            # Train pattern recognition model
-            self.ml_engine.models['pattern_recognition'].fit(
+            # Train pattern recognition model on a clone; the current one may be a shared registry copy
+            model = clone(self.ml_engine.models['pattern_recognition'])
+            model.fit(
                 features,
                 self.generate_pattern_labels(market_data)
             )
+            self.ml_engine.models['pattern_recognition'] = model
             
         except Exception as e:
             logging.error(f"Error in pattern learning: {str(e)}")
@@ -190,13 +204,8 @@ class MarketPatternLearner:
     def calculate_rsi(self, prices: pd.Series, periods: int = 14) -> pd.Series:
         """Calculate RSI technical indicator"""
         try:
-            delta = prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=periods).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=periods).mean()
-            
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            return rsi
+            rsi = technical_indicators.rsi(prices.to_numpy(dtype=float), periods)
+            return pd.Series(rsi, index=prices.index)
             
         except Exception as e:
             logging.error(f"Error calculating RSI: {str(e)}")
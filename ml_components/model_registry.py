@@ -0,0 +1,272 @@
+"""
+Versioned on-disk registry of fitted models shared by the ML engines
+
+Each ``save`` writes a new version directory holding the engine's fitted
+models and scalers (one uncompressed joblib file) next to a JSON metadata
+file, then moves the ``LATEST`` pointer. ``load`` is lazy: nothing is read
+until a model is first needed, and the joblib file is opened with
+``mmap_mode='r'`` so the numpy arrays inside the estimators (tree nodes,
+network weights, scaler statistics) are pages of the file rather than private
+copies. Models loaded in the gunicorn master before the fork (``preload_app``
+plus ``warm``) and models memory-mapped by several workers are therefore held
+in memory once.
+
+Loaded artifacts are shared and read-only: engines restore them by reference
+and must replace, not refit, an estimator they got from the registry. At most
+``max_loaded`` models are kept loaded per process; the least recently used
+one is dropped first.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import joblib
+import sklearn
+
+logger = logging.getLogger(__name__)
+
+ARTIFACTS_FILE = 'artifacts.joblib'
+METADATA_FILE = 'metadata.json'
+LATEST_FILE = 'LATEST'
+
+
+class ModelRegistry:
+    """
+    Fitted models stored as ``<root>/<name>/v<N>/`` with a ``LATEST`` pointer.
+
+    Names may contain ``/`` to group models (e.g. ``technical/AAPL``).
+    """
+
+    def __init__(self, root: Optional[str] = None, keep_versions: int = 3,
+                 max_loaded: Optional[int] = None):
+        """
+        Args:
+            root: Registry directory (defaults to $MODEL_REGISTRY_DIR or ./cache/models)
+            keep_versions: Versions kept per model; older ones are pruned on save
+            max_loaded: Models kept loaded in this process (defaults to
+                $MODEL_REGISTRY_MAX_LOADED or 64)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root or os.environ.get('MODEL_REGISTRY_DIR', './cache/models'))
+        self.keep_versions = keep_versions
+        self.max_loaded = max(1, max_loaded or int(os.environ.get('MODEL_REGISTRY_MAX_LOADED', '64')))
+        self._loaded: 'OrderedDict[str, Tuple[int, Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _safe_name(name: str) -> str:
+        parts = [re.sub(r'[^A-Za-z0-9._-]', '_', part) for part in name.strip('/').split('/')]
+        return '/'.join(part for part in parts if part not in ('', '.', '..'))
+
+    def _model_dir(self, name: str) -> Path:
+        return self.root / self._safe_name(name)
+
+    def versions(self, name: str) -> List[int]:
+        """Stored versions of a model, oldest first"""
+        directory = self._model_dir(name)
+        if not directory.is_dir():
+            return []
+        found = []
+        for path in directory.iterdir():
+            match = re.fullmatch(r'v(\d+)', path.name)
+            if match and path.is_dir():
+                found.append(int(match.group(1)))
+        return sorted(found)
+
+    def latest_version(self, name: str) -> Optional[int]:
+        try:
+            return int((self._model_dir(name) / LATEST_FILE).read_text().strip())
+        except (OSError, ValueError):
+            versions = self.versions(name)
+            return versions[-1] if versions else None
+
+    def names(self, newest_first: bool = False) -> List[str]:
+        """Every model name with a published version (alphabetical, or by publish time)"""
+        if not self.root.is_dir():
+            return []
+        pointers = list(self.root.rglob(LATEST_FILE))
+        if newest_first:
+            pointers.sort(key=lambda path: path.stat().st_mtime, reverse=True)
+            return [path.parent.relative_to(self.root).as_posix() for path in pointers]
+        return sorted(path.parent.relative_to(self.root).as_posix() for path in pointers)
+
+    def metadata(self, name: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Metadata of a version (the latest by default), without loading the models"""
+        version = self.latest_version(name) if version is None else version
+        if version is None:
+            return None
+        try:
+            with open(self._model_dir(name) / f"v{version}" / METADATA_FILE) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, name: str, artifacts: Dict[str, Any], **metadata) -> Optional[int]:
+        """
+        Publish fitted artifacts as the next version of a model.
+
+        Args:
+            name: Model name
+            artifacts: Picklable fitted state (estimators, scalers, column lists)
+            **metadata: JSON-serializable details stored with the version,
+                e.g. ``data_version``, ``feature_columns`` or training scores
+
+        Returns:
+            The new version number, or None if it could not be written
+        """
+        directory = self._model_dir(name)
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            # Two processes publishing at once each claim a version by renaming
+            # their staging directory into place; the loser retries on the next number
+            for _ in range(5):
+                version = (self.versions(name) or [0])[-1] + 1
+                staging = directory / f".v{version}.{os.getpid()}.{threading.get_ident()}.tmp"
+                staging.mkdir()
+                joblib.dump(artifacts, staging / ARTIFACTS_FILE)
+                with open(staging / METADATA_FILE, 'w') as f:
+                    json.dump(dict(metadata, name=name, version=version, created_at=time.time(),
+                                   sklearn_version=sklearn.__version__), f, default=str)
+                try:
+                    os.rename(staging, directory / f"v{version}")
+                    break
+                except OSError:
+                    shutil.rmtree(staging, ignore_errors=True)
+            else:
+                raise RuntimeError("could not claim a version number")
+
+            pointer = directory / f".{LATEST_FILE}.{os.getpid()}.tmp"
+            pointer.write_text(str(version))
+            os.replace(pointer, directory / LATEST_FILE)
+            self._prune(name)
+            return version
+        except Exception as e:
+            self.logger.error(f"Error saving model {name}: {str(e)}")
+            return None
+
+    def _prune(self, name: str) -> None:
+        for version in self.versions(name)[:-self.keep_versions]:
+            shutil.rmtree(self._model_dir(name) / f"v{version}", ignore_errors=True)
+
+    def load(self, name: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Artifacts of a version (the latest by default), loaded once per process.
+
+        Returns:
+            The artifacts dict passed to ``save``, or None if there is none
+        """
+        version = self.latest_version(name) if version is None else version
+        if version is None:
+            return None
+
+        with self._lock:
+            loaded = self._loaded.get(name)
+            if loaded is not None and loaded[0] == version:
+                self._loaded.move_to_end(name)
+                return loaded[1]
+
+        path = self._model_dir(name) / f"v{version}" / ARTIFACTS_FILE
+        try:
+            artifacts = joblib.load(path, mmap_mode='r')
+        except Exception as e:
+            self.logger.error(f"Error loading model {name} v{version}: {str(e)}")
+            return None
+
+        stored_with = (self.metadata(name, version) or {}).get('sklearn_version')
+        if stored_with and stored_with != sklearn.__version__:
+            self.logger.warning(f"Model {name} v{version} was saved with scikit-learn {stored_with}, "
+                                f"running {sklearn.__version__}")
+
+        with self._lock:
+            self._loaded[name] = (version, artifacts)
+            self._loaded.move_to_end(name)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return artifacts
+
+    def warm(self, names: Optional[Iterable[str]] = None) -> int:
+        """
+        Load the latest version of models up front (by default the most recently
+        published models, up to ``max_loaded``).
+
+        Called in the gunicorn master with ``preload_app`` so forked workers
+        start with the models already in memory.
+
+        Returns:
+            Number of models loaded
+        """
+        names = self.names(newest_first=True) if names is None else list(names)
+        return sum(1 for name in names[:self.max_loaded] if self.load(name) is not None)
+
+    def evict(self, name: Optional[str] = None) -> None:
+        """Drop loaded artifacts from this process (all models if name is None)"""
+        with self._lock:
+            if name is None:
+                self._loaded.clear()
+            else:
+                self._loaded.pop(name, None)
+
+
+class RegistryBackedModels(ABC):
+    """
+    Mixin persisting an engine's fitted state through a ModelRegistry.
+
+    Engines define ``_registry_artifacts`` (what to save) and
+    ``_restore_artifacts`` (how to adopt a loaded copy).
+    """
+
+    @abstractmethod
+    def _registry_artifacts(self) -> Dict[str, Any]:
+        """Picklable fitted state to publish"""
+
+    @abstractmethod
+    def _restore_artifacts(self, artifacts: Dict[str, Any]) -> None:
+        """Adopt artifacts loaded from the registry (shared, read-only)"""
+
+    def save_to_registry(self, name: str, registry: Optional[ModelRegistry] = None,
+                         **metadata) -> Optional[int]:
+        """Publish the engine's fitted models; returns the new version"""
+        registry = registry or get_model_registry()
+        return registry.save(name, self._registry_artifacts(), engine=type(self).__name__, **metadata)
+
+    def load_from_registry(self, name: str, registry: Optional[ModelRegistry] = None,
+                           version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Adopt a published version of the engine's models.
+
+        Returns:
+            The version's metadata, or None if nothing was loaded
+        """
+        registry = registry or get_model_registry()
+        version = registry.latest_version(name) if version is None else version
+        artifacts = registry.load(name, version) if version is not None else None
+        if artifacts is None:
+            return None
+        try:
+            self._restore_artifacts(artifacts)
+        except Exception as e:
+            logger.error(f"Error restoring model {name} into {type(self).__name__}: {str(e)}")
+            return None
+        return registry.metadata(name, version)
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide registry, created on first use"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
@@ -0,0 +1,160 @@
+# ml_components/monte_carlo_engine.py
+"""
+Vectorized Monte Carlo Engine
+
+Simulates correlated multi-asset portfolio paths in batched NumPy arrays instead
+of drawing one scalar return at a time. Asset shocks are correlated through the
+Cholesky factor of the covariance matrix, paths are generated in fixed-size
+chunks so memory stays bounded regardless of the number of simulations, and all
+randomness comes from a seedable ``np.random.Generator``.
+"""
+
+import numpy as np
+import logging
+from typing import Dict, List, Optional, Sequence
+
+
+class MonteCarloEngine:
+    """
+    Batched, Cholesky-correlated Monte Carlo simulator for portfolio paths.
+
+    Each period every asset draws a correlated normal return; the portfolio is
+    rebalanced to the target weights every period, so the portfolio return is
+    the weighted sum of the asset returns.
+    """
+
+    DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+    def __init__(self, num_simulations: int = 5000, num_periods: int = 60,
+                 chunk_size: Optional[int] = 2000, seed: Optional[int] = None):
+        """
+        Args:
+            num_simulations: Number of simulated paths
+            num_periods: Number of periods per path (e.g. months)
+            chunk_size: Paths generated per block; None generates all at once
+            seed: Optional seed for reproducible runs
+        """
+        self.logger = logging.getLogger(__name__)
+        self.num_simulations = int(num_simulations)
+        self.num_periods = int(num_periods)
+        self.chunk_size = int(chunk_size) if chunk_size else self.num_simulations
+        self.rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def cholesky_factor(cov_matrix: np.ndarray) -> np.ndarray:
+        """
+        Lower-triangular factor L with L @ L.T ~= cov_matrix.
+
+        Sample covariance matrices estimated from short or overlapping histories
+        are frequently only positive semi-definite; in that case negative
+        eigenvalues are clipped and a small jitter is added before factoring.
+        """
+        cov = np.atleast_2d(np.asarray(cov_matrix, dtype=np.float64))
+        cov = (cov + cov.T) / 2.0
+        try:
+            return np.linalg.cholesky(cov)
+        except np.linalg.LinAlgError:
+            eigvals, eigvecs = np.linalg.eigh(cov)
+            eigvals = np.clip(eigvals, 0.0, None)
+            repaired = (eigvecs * eigvals) @ eigvecs.T
+            jitter = 1e-12 * max(float(np.trace(repaired)) / len(repaired), 1.0)
+            return np.linalg.cholesky(repaired + np.eye(len(repaired)) * jitter)
+
+    def _chunk_sizes(self) -> List[int]:
+        full, rest = divmod(self.num_simulations, self.chunk_size)
+        return [self.chunk_size] * full + ([rest] if rest else [])
+
+    def simulate_portfolio_returns(self, mean_returns: Sequence[float],
+                                   cov_matrix: np.ndarray,
+                                   weights: Sequence[float],
+                                   num_paths: int) -> np.ndarray:
+        """
+        Draw one block of portfolio period returns.
+
+        Returns:
+            Array of shape (num_paths, num_periods)
+        """
+        mu = np.asarray(mean_returns, dtype=np.float64)
+        w = np.asarray(weights, dtype=np.float64)
+        chol = self.cholesky_factor(cov_matrix)
+
+        shocks = self.rng.standard_normal((num_paths, self.num_periods, len(mu)))
+        asset_returns = shocks @ chol.T + mu
+        return asset_returns @ w
+
+    def simulate_paths(self, mean_returns: Sequence[float], cov_matrix: np.ndarray,
+                       weights: Sequence[float], initial_value: float = 1.0) -> np.ndarray:
+        """
+        Simulate full portfolio value paths.
+
+        Holds every path in memory; prefer ``run`` for large simulation counts.
+
+        Returns:
+            Array of shape (num_simulations, num_periods + 1), starting at initial_value
+        """
+        blocks = [
+            self._values_from_returns(
+                self.simulate_portfolio_returns(mean_returns, cov_matrix, weights, n),
+                initial_value
+            )
+            for n in self._chunk_sizes()
+        ]
+        return np.vstack(blocks)
+
+    @staticmethod
+    def _values_from_returns(portfolio_returns: np.ndarray, initial_value: float) -> np.ndarray:
+        growth = np.cumprod(1.0 + portfolio_returns, axis=1)
+        start = np.ones((growth.shape[0], 1))
+        return initial_value * np.hstack([start, growth])
+
+    @staticmethod
+    def max_drawdowns(paths: np.ndarray) -> np.ndarray:
+        """Maximum peak-to-trough drawdown of each path as a positive fraction"""
+        running_peak = np.maximum.accumulate(paths, axis=1)
+        return np.max(1.0 - paths / running_peak, axis=1)
+
+    def run(self, mean_returns: Sequence[float], cov_matrix: np.ndarray,
+            weights: Sequence[float], initial_value: float = 1.0,
+            percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict:
+        """
+        Run the simulation chunk by chunk and summarize the outcome.
+
+        Only final values and per-path drawdowns are kept between chunks, so
+        memory is bounded by ``chunk_size * num_periods * num_assets``.
+
+        Returns:
+            Dict with final values, drawdowns and their summary statistics
+        """
+        final_values = np.empty(self.num_simulations)
+        drawdowns = np.empty(self.num_simulations)
+
+        offset = 0
+        for n in self._chunk_sizes():
+            paths = self._values_from_returns(
+                self.simulate_portfolio_returns(mean_returns, cov_matrix, weights, n),
+                initial_value
+            )
+            final_values[offset:offset + n] = paths[:, -1]
+            drawdowns[offset:offset + n] = self.max_drawdowns(paths)
+            offset += n
+
+        percentile_values = np.percentile(final_values, percentiles)
+
+        return {
+            'final_values': final_values,
+            'max_drawdowns': drawdowns,
+            'percentiles': {
+                f"{p:g}%": float(v) for p, v in zip(percentiles, percentile_values)
+            },
+            'mean': float(np.mean(final_values)),
+            'median': float(np.median(final_values)),
+            'min': float(np.min(final_values)),
+            'max': float(np.max(final_values)),
+            'loss_probability': float(np.mean(final_values < initial_value) * 100),
+            'drawdown_statistics': {
+                'mean': float(np.mean(drawdowns)),
+                'median': float(np.median(drawdowns)),
+                'worst_5%': float(np.percentile(drawdowns, 95)),
+                'max': float(np.max(drawdowns))
+            }
+        }
@@ -24,7 +24,7 @@ from matplotlib.figure import Figure
 import seaborn as sns
 import io
 import base64
-from typing import List, Dict, Optional, Tuple, Any, Union
+from typing import List, Dict, Optional, Tuple, Any, Union, Callable
 import logging
 from datetime import datetime, timedelta
 import os
@@ -43,6 +43,10 @@ from analysis.enhanced_stock_analyzer import EnhancedStockAnalyzer
 from portfolio.portfolio_management import PortfolioManager
 from portfolio.portfolio_optimization import PortfolioOptimizer
 from user_profiling.risk_profiler import RiskProfiler
+from ml_components.monte_carlo_engine import MonteCarloEngine
+from ml_components.screening_executor import ScreeningExecutor
+from ml_components.screening_checkpoints import ScreeningCheckpointStore
+from analysis.indicators import latest_indicators, latest_indicators_many
 
 
 class NaifAlRasheedModel:
@@ -60,7 +64,20 @@ class NaifAlRasheedModel:
     with long-term economic growth trends.
     """
 
-    def __init__(self):
+    # Pipeline stages of run_full_screening, in order (used for checkpoints and progress)
+    SCREENING_STAGES = ('macro', 'sectors', 'companies', 'fundamentals', 'management',
+                        'valuation', 'ranking', 'portfolio', 'simulation', 'visualizations')
+    
+    # Criteria read by the later screening stages (used to scope checkpoints)
+    MANAGEMENT_CRITERIA = ('min_management_score',)
+    VALUATION_CRITERIA = ('max_pe_ratio',)
+
+    def __init__(self, checkpoint_dir: Optional[str] = None):
+        """
+        Args:
+            checkpoint_dir: Directory for screening stage checkpoints (defaults to
+                $SCREENING_CHECKPOINT_DIR or ./cache/naif_model/checkpoints)
+        """
         self.logger = logging.getLogger(__name__)
         self.saudi_api = SaudiMarketAPI()
         self.data_fetcher = DataFetcher()
@@ -68,6 +85,7 @@ class NaifAlRasheedModel:
         self.portfolio_manager = PortfolioManager()
         self.portfolio_optimizer = PortfolioOptimizer()
         self.risk_profiler = RiskProfiler()
+        self.screening_executor = ScreeningExecutor(max_workers=8)
         
         # Pipeline stages and their weights
         self.pipeline_stages = {
@@ -111,6 +129,8 @@ class NaifAlRasheedModel:
             'max_sector_weight': 0.25,     # Maximum weight for any sector
             'cash_allocation': 0.05,       # 5% cash position
             'simulation_runs': 5000,       # Number of Monte Carlo simulations (limited for testing, should be 10000 for production)
+            'simulation_chunk_size': 2000, # Paths generated per batch (caps simulation memory)
+            'simulation_seed': None,       # Optional seed for reproducible simulations
             'time_horizon': 5,             # 5-year investment horizon
             'benchmark': {
                 'us': 'SPY',               # S&P 500 ETF for US
@@ -123,19 +143,34 @@ class NaifAlRasheedModel:
         os.makedirs("./cache/naif_model/us", exist_ok=True)
         os.makedirs("./cache/naif_model/saudi", exist_ok=True)
         os.makedirs("./cache/naif_model/simulations", exist_ok=True)
+        
+        # Per-stage checkpoints let an interrupted screening resume where it stopped
+        self.checkpoints = ScreeningCheckpointStore(checkpoint_dir)
     
     def run_full_screening(self, market: str = 'us', 
                           custom_params: Optional[Dict] = None, 
                           risk_profile: Optional[Dict] = None,
-                          existing_portfolio: Optional[Dict] = None) -> Dict:
+                          existing_portfolio: Optional[Dict] = None,
+                          resume: bool = True,
+                          data_date: Optional[str] = None,
+                          progress_callback: Optional[Callable[[str, float], None]] = None) -> Dict:
         """
         Run the complete multi-stage screening process for either US or Saudi market
         
+        Each stage's output is checkpointed under a key built from the market, the
+        data date, the parameters the stage reads and the upstream stage's key, so
+        a rerun (for example after a worker timeout) skips completed stages and a
+        parameter change only recomputes the stages downstream of it.
+        
         Args:
             market: Market to analyze ('us' or 'saudi')
             custom_params: Optional custom screening parameters
             risk_profile: Optional user risk profile information
             existing_portfolio: Optional existing portfolio to optimize from
+            resume: Reuse checkpoints from earlier runs when available
+            data_date: Market data date the checkpoints belong to (defaults to today)
+            progress_callback: Optional callable receiving each stage name and the
+                               fraction of stages completed before it starts
             
         Returns:
             Dict with screening results and portfolio recommendations
@@ -156,52 +191,102 @@ class NaifAlRasheedModel:
             criteria.update(custom_params)
             self.logger.info(f"Using custom parameters: {custom_params}")
         
+        data_date = data_date or self.checkpoints.today()
+        restored_stages = []
+        parent_key = None
+        
+        def report(name: str):
+            if progress_callback:
+                progress_callback(name, self.SCREENING_STAGES.index(name) / len(self.SCREENING_STAGES))
+        
+        def stage(name: str, params: Optional[Dict], compute, complete=None):
+            nonlocal parent_key
+            report(name)
+            value, parent_key, restored = self.checkpoints.run_stage(
+                name, market, data_date, params, parent_key, compute, resume=resume, complete=complete)
+            if restored:
+                restored_stages.append(name)
+            return value
+        
+        # Criteria are split by the stage that reads them; anything not claimed by a
+        # later stage is treated as a fundamental screening parameter
+        management_criteria = {k: v for k, v in criteria.items() if k in self.MANAGEMENT_CRITERIA}
+        valuation_criteria = {k: v for k, v in criteria.items() if k in self.VALUATION_CRITERIA}
+        fundamental_criteria = {k: v for k, v in criteria.items()
+                                if k not in self.MANAGEMENT_CRITERIA and k not in self.VALUATION_CRITERIA}
+        
         try:
             # Stage 1: Analyze macro-economic conditions
             self.logger.info("Stage 1: Analyzing macro-economic conditions")
-            macro_analysis = self._analyze_macro_conditions(market)
+            # The fallback outlook used when indicators cannot be fetched has none
+            macro_analysis = stage('macro', None, lambda: self._analyze_macro_conditions(market),
+                                   complete=lambda macro: bool(macro.get('indicators')))
             
             # Stage 2: Sector ranking and selection
             self.logger.info("Stage 2: Ranking market sectors")
-            sector_scores = self._rank_sectors(market, macro_analysis)
-            top_sectors = self._select_top_sectors(sector_scores, market)
+            def rank_sectors():
+                scores = self._rank_sectors(market, macro_analysis)
+                return scores, self._select_top_sectors(scores, market)
+            sector_scores, top_sectors = stage('sectors', None, rank_sectors)
             
             # Stage 3: Get companies in top sectors
             self.logger.info(f"Stage 3: Getting companies in {len(top_sectors)} top sectors")
-            companies = self._get_companies_in_sectors(top_sectors, market)
+            companies = stage('companies', None, lambda: self._get_companies_in_sectors(top_sectors, market))
             
             # Stage 4: Fundamental screening
             self.logger.info(f"Stage 4: Running fundamental screening on {len(companies)} companies")
-            screened_companies = self._run_fundamental_screening(companies, criteria, market)
+            screened_companies = stage('fundamentals', fundamental_criteria,
+                                       lambda: self._run_fundamental_screening(companies, criteria, market))
             
             # Stage 5: Management quality assessment
             self.logger.info(f"Stage 5: Analyzing management quality for {len(screened_companies)} companies")
-            quality_companies = self._analyze_management_quality(screened_companies, criteria, market)
+            quality_companies = stage('management', management_criteria,
+                                      lambda: self._analyze_management_quality(screened_companies, criteria, market))
             
             # Stage 6: Valuation analysis
             self.logger.info(f"Stage 6: Running valuation analysis on {len(quality_companies)} companies")
-            valuated_companies = self._run_valuation_analysis(quality_companies, criteria, market)
+            valuated_companies = stage('valuation', valuation_criteria,
+                                       lambda: self._run_valuation_analysis(quality_companies, criteria, market))
             
             # Stage 7: Final ranking and selection
             self.logger.info("Stage 7: Final ranking and selection")
-            ranked_companies = self._rank_companies(valuated_companies, market)
-            selected_companies = self._select_final_candidates(ranked_companies, market)
+            def rank_and_select():
+                ranked = self._rank_companies(valuated_companies, market)
+                return ranked, self._select_final_candidates(ranked, market)
+            ranked_companies, selected_companies = stage(
+                'ranking', {k: self.portfolio_params[k] for k in ('min_stocks', 'max_stocks', 'min_sectors')},
+                rank_and_select)
             
             # Stage 8: Generate portfolio
             self.logger.info("Stage 8: Constructing portfolio")
-            portfolio = self._construct_portfolio(selected_companies, risk_profile, existing_portfolio, market)
+            portfolio = stage(
+                'portfolio',
+                {
+                    'risk_profile': risk_profile,
+                    'existing_portfolio': existing_portfolio,
+                    'portfolio_params': {k: v for k, v in self.portfolio_params.items()
+                                         if not k.startswith('simulation_') and k != 'time_horizon'}
+                },
+                lambda: self._construct_portfolio(selected_companies, risk_profile, existing_portfolio, market),
+                complete=lambda result: bool(result.get('holdings')))
             
             # Stage 9: Run Monte Carlo simulation
             self.logger.info("Stage 9: Running Monte Carlo simulation")
-            simulation_results = self._run_monte_carlo_simulation(portfolio, market)
+            simulation_results = stage(
+                'simulation',
+                {k: v for k, v in self.portfolio_params.items()
+                 if k.startswith('simulation_') or k == 'time_horizon'},
+                lambda: self._run_monte_carlo_simulation(portfolio, market))
             
             # Stage 10: Prepare final output with visualizations
             self.logger.info("Stage 10: Preparing final output with visualizations")
+            report('visualizations')
             visualizations = self._generate_visualizations(portfolio, simulation_results, market)
             
             return {
                 'success': True,
                 'analysis_date': datetime.now().isoformat(),
+                'data_date': data_date,
                 'market': market.upper(),
                 'parameters': criteria,
                 'macro_analysis': macro_analysis,
@@ -214,7 +299,8 @@ class NaifAlRasheedModel:
                 'portfolio': portfolio,
                 'simulation_results': simulation_results,
                 'visualizations': visualizations,
-                'recommendations': self._generate_recommendations(portfolio, simulation_results, market)
+                'recommendations': self._generate_recommendations(portfolio, simulation_results, market),
+                'restored_stages': restored_stages
             }
             
         except Exception as e:
@@ -222,9 +308,23 @@ class NaifAlRasheedModel:
             return {
                 'success': False,
                 'market': market.upper(),
-                'message': f"Screening failed: {str(e)}"
+                'message': f"Screening failed: {str(e)}",
+                'restored_stages': restored_stages
             }
     
+    def clear_checkpoints(self, market: Optional[str] = None, data_date: Optional[str] = None) -> int:
+        """
+        Remove saved screening checkpoints so the next run recomputes every stage
+        
+        Args:
+            market: Optional market to restrict the removal to ('us' or 'saudi')
+            data_date: Optional data date to restrict the removal to
+            
+        Returns:
+            Number of checkpoints removed
+        """
+        return self.checkpoints.clear(market.lower() if market else None, data_date)
+    
     def _analyze_macro_conditions(self, market: str) -> Dict:
         """
         Analyze macro-economic conditions to assess growth outlook and favorable sectors
@@ -1071,7 +1171,26 @@ class NaifAlRasheedModel:
             self.logger.info(f"Found {len(companies)} Saudi companies in selected sectors")
             return companies
     
-    def _run_fundamental_screening(self, companies: List, criteria: Dict, market: str) -> List[Dict]:
+    def _fundamental_fetchers(self, market: str) -> Dict[str, Any]:
+        """
+        Per-symbol data fetchers used by the fundamental screen
+        
+        Args:
+            market: Market being analyzed ('us' or 'saudi')
+            
+        Returns:
+            Dict mapping field name to a callable taking a symbol
+        """
+        if market == 'us':
+            return {
+                'rotc': self.data_fetcher.calculate_rotc,
+                'growth': self.data_fetcher.get_growth_metrics,
+                'stock_info': lambda s: self.stock_analyzer.get_stock_info(s)
+            }
+        return {'info': self.saudi_api.get_symbol_info}
+    
+    def _run_fundamental_screening(self, companies: List, criteria: Dict, market: str,
+                                   prefetched: Optional[Dict[str, Dict]] = None) -> List[Dict]:
         """
         Apply fundamental screening criteria to companies, focusing on ROTC, revenue growth,
         EBITDA positivity, and free cash flow
@@ -1080,6 +1199,8 @@ class NaifAlRasheedModel:
             companies: List of company data dictionaries
             criteria: Investment criteria to apply
             market: Market being analyzed ('us' or 'saudi')
+            prefetched: Optional results of the _fundamental_fetchers keyed by symbol;
+                        fetched here when not supplied
             
         Returns:
             Filtered list of companies that pass screening with fundamental metrics
@@ -1087,40 +1208,36 @@ class NaifAlRasheedModel:
         self.logger.info(f"Screening {len(companies)} companies for {market.upper()} market")
         screened_companies = []
         
-        # Extract screening criteria
-        min_rotc = criteria.get('min_rotc', 15.0)
-        min_revenue_growth = criteria.get('min_revenue_growth', 5.0)
-        min_market_cap = criteria.get('min_market_cap', 1_000_000_000)
-        positive_ebitda = criteria.get('positive_ebitda', True)
-        positive_fcf = criteria.get('positive_fcf', True)
+        def symbol_of(company) -> str:
+            symbol = company.get('symbol', '') if isinstance(company, dict) else company
+            # Make sure we have a string symbol
+            if isinstance(symbol, dict):
+                symbol = symbol.get('symbol', '')
+            return symbol
         
-        for company in companies:
+        symbols = [symbol_of(company) for company in companies]
+        
+        # Fetch every symbol's inputs concurrently; each client applies its own shared rate limit
+        if prefetched is None:
+            prefetched = self.screening_executor.prefetch(symbols, self._fundamental_fetchers(market))
+        
+        # Build one metrics row per company, then evaluate criteria in a single pass
+        candidates = []
+        metric_rows = []
+        
+        for company, symbol in zip(companies, symbols):
             try:
-                # Different approach based on market
+                data = prefetched.get(symbol, {})
+                base = company.copy() if isinstance(company, dict) else {'symbol': symbol}
+                
                 if market == 'us':
-                    # Get symbol as string
-                    if isinstance(company, dict):
-                        symbol = company.get('symbol', '')
-                    else:
-                        symbol = company
-                    
-                    # Get ROTC (Return on Tangible Capital)
-                    # Make sure we have a string symbol
-                    if isinstance(symbol, dict):
-                        symbol_str = symbol.get('symbol', '')
-                    else:
-                        symbol_str = symbol
-                        
-                    rotc_data = self.data_fetcher.calculate_rotc(symbol_str)
+                    rotc_data = data.get('rotc')
                     rotc = rotc_data.get('rotc', 0) if rotc_data else 0
                     
-                    # Get growth metrics
-                    growth_metrics = self.data_fetcher.get_growth_metrics(symbol_str)
+                    growth_metrics = data.get('growth')
                     revenue_growth = growth_metrics.get('revenue_growth', 0) if growth_metrics else 0
                     
-                    # Get additional fundamental data
-                    stock_info = self.stock_analyzer.get_stock_info(symbol_str)
-                    
+                    stock_info = data.get('stock_info')
                     if not stock_info:
                         continue
                         
@@ -1134,140 +1251,71 @@ class NaifAlRasheedModel:
                     total_equity = stock_info.get('totalStockholderEquity', 1)  # Use 1 to avoid division by zero
                     debt_to_equity = total_debt / total_equity if total_equity else float('inf')
                     
-                    # Extract profitability metrics
+                    # Extract profitability metrics (converted to percentages)
                     roe = stock_info.get('returnOnEquity', 0)
-                    if roe is not None:
-                        roe = roe * 100  # Convert to percentage
-                    else:
-                        roe = 0
-                        
+                    roe = roe * 100 if roe is not None else 0
                     profit_margin = stock_info.get('profitMargin', 0)
-                    if profit_margin is not None:
-                        profit_margin = profit_margin * 100  # Convert to percentage
-                    else:
-                        profit_margin = 0
-                    
-                    # Check if company passes key criteria
-                    passes_criteria = (
-                        market_cap >= min_market_cap and 
-                        rotc is not None and rotc >= min_rotc and
-                        revenue_growth is not None and revenue_growth >= min_revenue_growth and
-                        (not positive_ebitda or (ebitda is not None and ebitda > 0)) and
-                        (not positive_fcf or (free_cash_flow is not None and free_cash_flow > 0))
-                    )
-                    
-                    if passes_criteria:
-                        # Prepare company data with all relevant metrics
-                        company_with_scores = company.copy()
-                        company_with_scores.update({
-                            'name': stock_info.get('longName', symbol),
-                            'market_cap': market_cap,
-                            'rotc': rotc,
-                            'revenue_growth': revenue_growth,
-                            'ebitda': ebitda,
-                            'free_cash_flow': free_cash_flow,
-                            'debt_to_equity': debt_to_equity,
-                            'roe': roe,
-                            'profit_margin': profit_margin,
-                            'pe_ratio': stock_info.get('trailingPE', 0),
-                            'pb_ratio': stock_info.get('priceToBook', 0),
-                            'dividend_yield': stock_info.get('dividendYield', 0) * 100 if stock_info.get('dividendYield') else 0,
-                            'price': stock_info.get('regularMarketPrice', 0),
-                            'high_52w': stock_info.get('fiftyTwoWeekHigh', 0),
-                            'low_52w': stock_info.get('fiftyTwoWeekLow', 0),
-                            'market': 'US'
-                        })
-                        
-                        # Calculate fundamental score (0-100 scale)
-                        rotc_score = min(rotc / min_rotc, 3) * 25  # Up to 75 points for 3x minimum ROTC
-                        growth_score = min(revenue_growth / min_revenue_growth, 4) * 15  # Up to 60 points for 4x minimum growth
-                        margin_score = min(profit_margin / 10, 2) * 10  # Up to 20 points for 20% margin
-                        
-                        # Cash flow/EBITDA positive bonus
-                        ebitda_bonus = 10 if ebitda > 0 else 0
-                        fcf_bonus = 15 if free_cash_flow > 0 else 0
-                        
-                        # Penalty for high debt
-                        debt_penalty = min(debt_to_equity * 10, 25) if debt_to_equity > 1 else 0
-                        
-                        fundamental_score = min(
-                            rotc_score + growth_score + margin_score + ebitda_bonus + fcf_bonus - debt_penalty,
-                            100
-                        )
-                        
-                        company_with_scores['fundamental_score'] = fundamental_score
-                        screened_companies.append(company_with_scores)
+                    profit_margin = profit_margin * 100 if profit_margin is not None else 0
+                    
+                    base.update({
+                        'name': stock_info.get('longName', symbol),
+                        'market_cap': market_cap,
+                        'rotc': rotc,
+                        'revenue_growth': revenue_growth,
+                        'ebitda': ebitda,
+                        'free_cash_flow': free_cash_flow,
+                        'debt_to_equity': debt_to_equity,
+                        'roe': roe,
+                        'profit_margin': profit_margin,
+                        'pe_ratio': stock_info.get('trailingPE', 0),
+                        'pb_ratio': stock_info.get('priceToBook', 0),
+                        'dividend_yield': stock_info.get('dividendYield', 0) * 100 if stock_info.get('dividendYield') else 0,
+                        'price': stock_info.get('regularMarketPrice', 0),
+                        'high_52w': stock_info.get('fiftyTwoWeekHigh', 0),
+                        'low_52w': stock_info.get('fiftyTwoWeekLow', 0),
+                        'market': 'US'
+                    })
                 
                 elif market == 'saudi':
-                    # Get symbol as string
-                    if isinstance(company, dict):
-                        symbol = company.get('symbol', '')
-                    else:
-                        symbol = company
-                    info = self.saudi_api.get_symbol_info(symbol)
-                    
-                    # Extract metrics
-                    market_cap = info.get('market_cap', 0)
-                    roic = info.get('roic', 0)  # Use ROIC as proxy for ROTC
-                    revenue_growth = info.get('revenue_growth', 0)
-                    ebitda = info.get('ebitda', 0)
-                    free_cash_flow = info.get('free_cash_flow', 0)
-                    profit_margin = info.get('profit_margin', 0)
-                    roe = info.get('roe', 0)
-                    debt_to_equity = info.get('debt_to_equity', 0)
-                    
-                    # Check if company passes key criteria
-                    passes_criteria = (
-                        market_cap >= min_market_cap and 
-                        roic >= min_rotc and  # Using ROIC as proxy for ROTC
-                        revenue_growth >= min_revenue_growth and
-                        (not positive_ebitda or ebitda > 0) and
-                        (not positive_fcf or free_cash_flow > 0)
-                    )
+                    info = data.get('info')
+                    if not info:
+                        continue
                     
-                    if passes_criteria:
-                        # Add fundamental scores to company data
-                        company_with_scores = company.copy()
-                        company_with_scores.update({
-                            'market_cap': market_cap,
-                            'rotc': roic,  # Using ROIC as proxy for ROTC
-                            'revenue_growth': revenue_growth,
-                            'ebitda': ebitda,
-                            'free_cash_flow': free_cash_flow,
-                            'roe': roe,
-                            'profit_margin': profit_margin,
-                            'debt_to_equity': debt_to_equity,
-                            'pe_ratio': info.get('pe_ratio', 0),
-                            'pb_ratio': info.get('pb_ratio', 0),
-                            'dividend_yield': info.get('dividend_yield', 0),
-                            'price': info.get('price', 0),
-                            'high_52w': info.get('high_52w', 0),
-                            'low_52w': info.get('low_52w', 0),
-                            'market': 'Saudi'
-                        })
-                        
-                        # Calculate fundamental score (0-100 scale)
-                        rotc_score = min(roic / min_rotc, 3) * 25  # Up to 75 points for 3x minimum ROTC
-                        growth_score = min(revenue_growth / min_revenue_growth, 4) * 15  # Up to 60 points for 4x minimum growth
-                        margin_score = min(profit_margin / 10, 2) * 10  # Up to 20 points for 20% margin
-                        
-                        # Cash flow/EBITDA positive bonus
-                        ebitda_bonus = 10 if ebitda > 0 else 0
-                        fcf_bonus = 15 if free_cash_flow > 0 else 0
-                        
-                        # Penalty for high debt
-                        debt_penalty = min(debt_to_equity * 10, 25) if debt_to_equity > 1 else 0
-                        
-                        fundamental_score = min(
-                            rotc_score + growth_score + margin_score + ebitda_bonus + fcf_bonus - debt_penalty,
-                            100
-                        )
-                        
-                        company_with_scores['fundamental_score'] = fundamental_score
-                        screened_companies.append(company_with_scores)
+                    base.update({
+                        'market_cap': info.get('market_cap', 0),
+                        'rotc': info.get('roic', 0),  # Using ROIC as proxy for ROTC
+                        'revenue_growth': info.get('revenue_growth', 0),
+                        'ebitda': info.get('ebitda', 0),
+                        'free_cash_flow': info.get('free_cash_flow', 0),
+                        'roe': info.get('roe', 0),
+                        'profit_margin': info.get('profit_margin', 0),
+                        'debt_to_equity': info.get('debt_to_equity', 0),
+                        'pe_ratio': info.get('pe_ratio', 0),
+                        'pb_ratio': info.get('pb_ratio', 0),
+                        'dividend_yield': info.get('dividend_yield', 0),
+                        'price': info.get('price', 0),
+                        'high_52w': info.get('high_52w', 0),
+                        'low_52w': info.get('low_52w', 0),
+                        'market': 'Saudi'
+                    })
+                else:
+                    continue
+                
+                candidates.append(base)
+                metric_rows.append({column: base.get(column) for column in ScreeningExecutor.METRIC_COLUMNS})
                     
             except Exception as e:
-                self.logger.debug(f"Error screening {company.get('symbol', 'unknown')}: {str(e)}")
+                self.logger.debug(f"Error screening {symbol or 'unknown'}: {str(e)}")
+        
+        if candidates:
+            # Fundamental score (0-100 scale) and pass/fail for all companies at once
+            scores = ScreeningExecutor.score_fundamentals(pd.DataFrame(metric_rows), criteria)
+            
+            for company_with_scores, passes, score in zip(
+                    candidates, scores['passes_criteria'], scores['fundamental_score']):
+                if passes:
+                    company_with_scores['fundamental_score'] = float(score)
+                    screened_companies.append(company_with_scores)
         
         # Sort by fundamental score
         screened_companies.sort(key=lambda x: x.get('fundamental_score', 0), reverse=True)
@@ -1671,19 +1719,31 @@ class NaifAlRasheedModel:
             self.logger.debug(f"Error calculating intrinsic value for {company.get('symbol', 'unknown')}: {str(e)}")
             return company.get('price', 0) * 1.05  # Default to 5% above current price as fallback
     
-    def _rank_companies(self, companies: List[Dict], market: str) -> List[Dict]:
+    def _rank_companies(self, companies: List[Dict], market: str,
+                        technical_scores: Optional[Dict[str, float]] = None) -> List[Dict]:
         """
         Rank companies based on combined scores from all analysis stages
         
         Args:
             companies: List of company data dictionaries with all analysis scores
             market: Market being analyzed ('us' or 'saudi')
+            technical_scores: Optional precomputed technical scores keyed by symbol
             
         Returns:
             List of companies sorted by combined score
         """
         self.logger.info(f"Ranking {len(companies)} companies based on combined metrics")
         
+        # Get technical scores (price momentum, etc.) for all companies in one batch
+        if technical_scores is None:
+            try:
+                technical_scores = self._calculate_technical_scores(
+                    [company.get('symbol') for company in companies], market
+                )
+            except Exception as e:
+                self.logger.debug(f"Error calculating technical scores: {str(e)}")
+                technical_scores = {}
+        
         for company in companies:
             # Extract component scores
             fundamental_score = company.get('fundamental_score', 0)
@@ -1691,13 +1751,8 @@ class NaifAlRasheedModel:
             valuation_score = company.get('valuation_score', 0)
             sector_score = company.get('sector_score', 0)
             
-            # Get technical score (price momentum, etc.)
-            try:
-                symbol = company.get('symbol')
-                technical_score = self._calculate_technical_score(symbol, market)
-            except Exception as e:
-                self.logger.debug(f"Error calculating technical score for {symbol}: {str(e)}")
-                technical_score = 50  # Neutral score as fallback
+            symbol = company.get('symbol')
+            technical_score = technical_scores.get(symbol, 50)  # Neutral score as fallback
             
             # Store technical score
             company['technical_score'] = technical_score
@@ -1722,180 +1777,6 @@ class NaifAlRasheedModel:
         
         return ranked_companies
     
-    def _calculate_technical_score(self, symbol: str, market: str) -> float:
-        """
-        Calculate technical score based on price momentum, volume, and chart patterns
-        
-        Args:
-            symbol: Stock symbol (string or dict)
-            market: Market being analyzed ('us' or 'saudi')
-            
-        Returns:
-            Technical score (0-100)
-        """
-        """
-        Calculate technical score based on price momentum, volume, and chart patterns
-        
-        Args:
-            symbol: Stock symbol
-            market: Market being analyzed ('us' or 'saudi')
-            
-        Returns:
-            Technical score (0-100)
-        """
-        try:
-            if market == 'us':
-                # Get historical data for US stock
-                hist_data = self.stock_analyzer.get_historical_prices(symbol, days=180)
-                
-                if hist_data is None or len(hist_data) < 50:  # Need sufficient history
-                    return 50  # Neutral score if insufficient data
-                
-                # Extract closing prices and volume
-                prices = hist_data['Close'].values
-                volumes = hist_data['Volume'].values
-                
-                # 1. Price momentum (recent performance)
-                latest_price = prices[-1]
-                week_ago_idx = max(0, len(prices) - 5)  # ~1 week
-                month_ago_idx = max(0, len(prices) - 21)  # ~1 month
-                three_month_idx = max(0, len(prices) - 63)  # ~3 months
-                
-                week_change = (latest_price / prices[week_ago_idx] - 1) * 100
-                month_change = (latest_price / prices[month_ago_idx] - 1) * 100
-                three_month_change = (latest_price / prices[three_month_idx] - 1) * 100
-                
-                momentum_score = (
-                    week_change * 0.3 +
-                    month_change * 0.4 +
-                    three_month_change * 0.3
-                )
-                momentum_score = min(max(50 + momentum_score * 2, 0), 100)  # Scale and clamp to 0-100
-                
-                # 2. Volume trend
-                recent_volumes = volumes[-20:]
-                older_volumes = volumes[-40:-20]
-                
-                avg_recent_volume = np.mean(recent_volumes) if len(recent_volumes) > 0 else 0
-                avg_older_volume = np.mean(older_volumes) if len(older_volumes) > 0 else avg_recent_volume
-                
-                volume_trend = (avg_recent_volume / avg_older_volume - 0.8) * 100 if avg_older_volume > 0 else 50
-                volume_score = min(max(volume_trend, 0), 100)  # Clamp to 0-100
-                
-                # 3. Moving average analysis
-                # Calculate moving averages
-                ma20 = np.mean(prices[-20:]) if len(prices) >= 20 else latest_price
-                ma50 = np.mean(prices[-50:]) if len(prices) >= 50 else latest_price
-                ma200 = np.mean(prices[-200:]) if len(prices) >= 200 else latest_price
-                
-                # Score based on price relative to MAs
-                ma_score = 0
-                
-                # Uptrend conditions
-                if latest_price > ma20 and ma20 > ma50 and ma50 > ma200:
-                    ma_score = 100  # Strong uptrend
-                elif latest_price > ma20 and ma20 > ma50:
-                    ma_score = 80  # Moderate uptrend
-                elif latest_price > ma50 and ma50 > ma200:
-                    ma_score = 70  # Long-term uptrend
-                elif latest_price > ma20:
-                    ma_score = 60  # Above short-term MA
-                
-                # Downtrend conditions
-                elif latest_price < ma20 and ma20 < ma50 and ma50 < ma200:
-                    ma_score = 0  # Strong downtrend
-                elif latest_price < ma20 and ma20 < ma50:
-                    ma_score = 20  # Moderate downtrend
-                elif latest_price < ma50 and ma50 < ma200:
-                    ma_score = 30  # Long-term downtrend
-                
-                # Neutral conditions
-                else:
-                    ma_score = 50  # Neutral MA configuration
-                
-                # Combined technical score
-                technical_score = (
-                    momentum_score * 0.4 +
-                    volume_score * 0.2 +
-                    ma_score * 0.4
-                )
-                
-                return technical_score
-            
-            elif market == 'saudi':
-                # Get historical data for Saudi stock
-                historical = self.saudi_api.get_historical_data(symbol, period='6m')
-                
-                if not historical or 'data' not in historical:
-                    return 50  # Neutral score if no data
-                    
-                data = historical['data']
-                
-                if len(data) < 20:  # Need sufficient data
-                    return 50
-                
-                # Extract prices and volumes from historical data
-                prices = [day['close'] for day in data]
-                volumes = [day.get('volume', 0) for day in data]
-                
-                latest_price = prices[-1]
-                
-                # Calculate moving averages
-                ma_short = np.mean(prices[-10:]) if len(prices) >= 10 else latest_price
-                ma_medium = np.mean(prices[-30:]) if len(prices) >= 30 else latest_price
-                ma_long = np.mean(prices[-90:]) if len(prices) >= 90 else latest_price
-                
-                # Price momentum analysis
-                short_term_return = (latest_price / prices[-10]) - 1 if len(prices) >= 10 else 0
-                medium_term_return = (latest_price / prices[-30]) - 1 if len(prices) >= 30 else 0
-                long_term_return = (latest_price / prices[-90]) - 1 if len(prices) >= 90 else 0
-                
-                momentum_score = (
-                    short_term_return * 100 * 0.3 +
-                    medium_term_return * 100 * 0.4 +
-                    long_term_return * 100 * 0.3
-                )
-                momentum_score = min(max(50 + momentum_score * 2, 0), 100)  # Scale and clamp
-                
-                # Moving average analysis
-                ma_score = 0
-                
-                if latest_price > ma_short and ma_short > ma_medium and ma_medium > ma_long:
-                    ma_score = 100  # Strong uptrend
-                elif latest_price > ma_short and ma_short > ma_medium:
-                    ma_score = 80  # Moderate uptrend
-                elif latest_price > ma_medium:
-                    ma_score = 60  # Above medium-term MA
-                elif latest_price < ma_short and ma_short < ma_medium and ma_medium < ma_long:
-                    ma_score = 0  # Strong downtrend
-                elif latest_price < ma_short and ma_short < ma_medium:
-                    ma_score = 20  # Moderate downtrend
-                else:
-                    ma_score = 50  # Neutral
-                
-                # Volume analysis (simplified for Saudi market)
-                recent_volume = np.mean(volumes[-10:]) if len(volumes) >= 10 else 0
-                older_volume = np.mean(volumes[-30:-10]) if len(volumes) >= 30 else recent_volume
-                
-                volume_score = 50  # Default neutral
-                if recent_volume > older_volume * 1.2:
-                    volume_score = 80  # Increasing volume (bullish)
-                elif recent_volume < older_volume * 0.8:
-                    volume_score = 30  # Decreasing volume (bearish)
-                
-                # Combined technical score
-                technical_score = (
-                    momentum_score * 0.4 +
-                    ma_score * 0.4 +
-                    volume_score * 0.2
-                )
-                
-                return technical_score
-                
-        except Exception as e:
-            self.logger.debug(f"Error in technical analysis for {symbol}: {str(e)}")
-            return 50  # Neutral score on error
-    
     def _generate_investment_thesis(self, company: Dict) -> str:
         """
         Generate an investment thesis explanation for the company
@@ -2030,6 +1911,130 @@ class NaifAlRasheedModel:
         self.logger.info(f"Selected {len(selected)} final candidates from {len(selected_sectors)} sectors")
         return selected
     
+    def _load_price_history(self, symbol: Any, market: str) -> Optional[Dict]:
+        """
+        Load closing prices and volumes for technical scoring
+        
+        Args:
+            symbol: Stock symbol (string or dict with a 'symbol' key)
+            market: Market being analyzed ('us' or 'saudi')
+            
+        Returns:
+            Dict with 'close', 'volume' and 'last_bar', or None if there are
+            fewer than 50 bars
+        """
+        symbol_str = symbol.get('symbol', symbol) if isinstance(symbol, dict) else symbol
+        
+        if market == 'us':
+            historical_prices = self.stock_analyzer.get_historical_prices(symbol_str, days=180)
+            if historical_prices is None or len(historical_prices) < 50:  # Need sufficient history
+                return None
+            close = historical_prices['Close'].to_numpy(dtype=float)
+            volume = (historical_prices['Volume'].to_numpy(dtype=float) if 'Volume' in historical_prices
+                      else np.zeros(len(close)))
+            return {'close': close, 'volume': volume, 'last_bar': historical_prices.index[-1]}
+        
+        historical = self.saudi_api.get_historical_data(symbol_str, period='6m')
+        if not historical or 'data' not in historical:
+            return None
+        data = historical['data']
+        if len(data) < 50:  # Need enough data for analysis
+            return None
+        return {
+            'close': np.array([day['close'] for day in data], dtype=float),
+            'volume': np.array([day['volume'] for day in data], dtype=float),
+            'last_bar': data[-1].get('date')
+        }
+    
+    def _technical_score_from_indicators(self, values: Dict[str, float], market: str) -> float:
+        """
+        Combine momentum, volume trend and moving average position into a 0-100 score
+        
+        Args:
+            values: Latest indicator values from analysis.indicators
+            market: Market being analyzed ('us' or 'saudi')
+            
+        Returns:
+            Technical score (0-100)
+        """
+        latest_price = values['close']
+        
+        # 1. Price momentum over ~1 week and ~1 month
+        week_change = values['return_5'] * 100
+        month_change = (values['return_21'] if market == 'us' else values['return_20']) * 100
+        
+        momentum_score = (week_change * 0.4 + month_change * 0.6 + 10) * 2.5
+        momentum_score = min(max(momentum_score, 0), 100)  # Clamp to 0-100
+        
+        # 2. Volume trend (last 20 bars against the 20 before)
+        volume_ratio = values.get('volume_ratio_20', float('nan'))
+        volume_trend = (volume_ratio - 0.8) * 50 if not math.isnan(volume_ratio) else 50
+        volume_score = min(max(volume_trend, 0), 100)  # Clamp to 0-100
+        
+        # 3. Moving average analysis
+        ma20 = values['sma_20']
+        ma50 = values['sma_50']
+        
+        # Score based on price relative to MAs
+        ma_score = 0
+        if latest_price > ma20 and ma20 > ma50:
+            ma_score = 100  # Strong uptrend
+        elif latest_price > ma20:
+            ma_score = 75  # Above short-term MA
+        elif latest_price > ma50:
+            ma_score = 50  # Above long-term MA
+        elif ma20 > ma50:
+            ma_score = 25  # MAs in positive configuration but price below
+        
+        # Combined technical score
+        return (
+            momentum_score * 0.4 +
+            volume_score * 0.3 +
+            ma_score * 0.3
+        )
+    
+    def _calculate_technical_scores(self, symbols: List[Any], market: str,
+                                    histories: Optional[Dict[str, Optional[Dict]]] = None) -> Dict[str, float]:
+        """
+        Calculate technical scores for many symbols at once
+        
+        Price histories are fetched concurrently and the indicators for all
+        symbols are computed in one vectorized pass (memoized per symbol and
+        last bar, so repeated screens only recompute symbols with new data).
+        
+        Args:
+            symbols: Stock symbols
+            market: Market being analyzed ('us' or 'saudi')
+            histories: Optional _load_price_history results keyed by symbol;
+                       fetched here when not supplied
+            
+        Returns:
+            Dictionary mapping symbol to technical score (50 when data is insufficient)
+        """
+        symbol_strs = [s.get('symbol', s) if isinstance(s, dict) else s for s in symbols]
+        if histories is None:
+            fetched = self.screening_executor.prefetch(
+                symbol_strs, {'history': lambda s: self._load_price_history(s, market)}
+            )
+            histories = {symbol: result.get('history') for symbol, result in fetched.items()}
+        
+        scores = {symbol: 50 for symbol in symbol_strs if symbol}  # Neutral score if insufficient data
+        available = {symbol: history for symbol, history in histories.items()
+                     if symbol in scores and history is not None}
+        
+        try:
+            latest = latest_indicators_many(available)
+        except Exception as e:
+            self.logger.debug(f"Error computing indicators for {market} market: {str(e)}")
+            return scores
+        
+        for symbol, values in latest.items():
+            try:
+                scores[symbol] = self._technical_score_from_indicators(values, market)
+            except Exception as e:
+                self.logger.debug(f"Error in technical analysis for {symbol} in {market} market: {str(e)}")
+        return scores
+    
     def _calculate_technical_score(self, symbol: str, market: str = 'saudi') -> float:
         """
         Calculate technical score based on price momentum, volume, and chart patterns
@@ -2042,128 +2047,12 @@ class NaifAlRasheedModel:
             Technical score (0-100)
         """
         try:
-            if market == 'us':
-                # Ensure symbol is a string
-                symbol_str = symbol.get('symbol', symbol) if isinstance(symbol, dict) else symbol
-                
-                # Get historical data for US stock
-                historical_prices = self.stock_analyzer.get_historical_prices(symbol_str, days=180)
-                
-                if historical_prices is None or len(historical_prices) < 50:  # Need sufficient history
-                    return 50  # Neutral score if insufficient data
-                
-                # Extract data
-                prices = historical_prices['Close'].values
-                volumes = historical_prices['Volume'].values if 'Volume' in historical_prices else np.zeros(len(prices))
-                
-                # Calculate price momentum scores
-                latest_price = prices[-1]
-                week_ago_idx = max(0, len(prices) - 5)  # ~1 week
-                month_ago_idx = max(0, len(prices) - 21)  # ~1 month
-                
-                week_change = (latest_price / prices[week_ago_idx] - 1) * 100
-                month_change = (latest_price / prices[month_ago_idx] - 1) * 100
-                
-                momentum_score = (week_change * 0.4 + month_change * 0.6 + 10) * 2.5
-                momentum_score = min(max(momentum_score, 0), 100)  # Clamp to 0-100
-                
-                # Volume trend
-                recent_volumes = volumes[-20:]
-                older_volumes = volumes[-40:-20]
-                
-                avg_recent_volume = np.mean(recent_volumes) if len(recent_volumes) > 0 else 0
-                avg_older_volume = np.mean(older_volumes) if len(older_volumes) > 0 else avg_recent_volume
-                
-                volume_trend = (avg_recent_volume / avg_older_volume - 0.8) * 50 if avg_older_volume > 0 else 50
-                volume_score = min(max(volume_trend, 0), 100)  # Clamp to 0-100
-                
-                # Moving average analysis
-                ma20 = np.mean(prices[-20:])
-                ma50 = np.mean(prices[-50:])
-                
-                # Score based on price relative to MAs
-                ma_score = 0
-                if latest_price > ma20 and ma20 > ma50:
-                    ma_score = 100  # Strong uptrend
-                elif latest_price > ma20:
-                    ma_score = 75  # Above short-term MA
-                elif latest_price > ma50:
-                    ma_score = 50  # Above long-term MA
-                elif ma20 > ma50:
-                    ma_score = 25  # MAs in positive configuration but price below
-                
-                # Combined technical score
-                technical_score = (
-                    momentum_score * 0.4 +
-                    volume_score * 0.3 +
-                    ma_score * 0.3
-                )
-                
-                return technical_score
-                
-            else:  # market == 'saudi'
-                # Ensure symbol is a string
-                symbol_str = symbol.get('symbol', symbol) if isinstance(symbol, dict) else symbol
-                
-                # Get historical data for Saudi stock
-                historical = self.saudi_api.get_historical_data(symbol_str, period='6m')
-                
-                if not historical or 'data' not in historical:
-                    return 50  # Return neutral score
-                    
-                data = historical['data']
-                
-                if len(data) < 50:  # Need enough data for analysis
-                    return 50  # Return neutral score
-                
-                # 1. Price momentum (recent performance)
-                latest_price = data[-1]['close']
-                week_ago_idx = max(0, len(data) - 5)  # ~1 week (5 trading days)
-                month_ago_idx = max(0, len(data) - 20)  # ~1 month (20 trading days)
-                
-                week_change = (latest_price / data[week_ago_idx]['close'] - 1) * 100
-                month_change = (latest_price / data[month_ago_idx]['close'] - 1) * 100
-                
-                momentum_score = (week_change * 0.4 + month_change * 0.6 + 10) * 2.5
-                momentum_score = min(max(momentum_score, 0), 100)  # Clamp to 0-100
-                
-                # 2. Volume trend
-                recent_volumes = [day['volume'] for day in data[-20:]]
-                avg_volume = sum(recent_volumes) / len(recent_volumes)
-                
-                older_volumes = [day['volume'] for day in data[-40:-20]]
-                older_avg_volume = sum(older_volumes) / len(older_volumes) if older_volumes else avg_volume
-                
-                volume_trend = (avg_volume / older_avg_volume - 0.8) * 50 if older_avg_volume > 0 else 50
-                volume_score = min(max(volume_trend, 0), 100)  # Clamp to 0-100
-                
-                # 3. Moving average analysis
-                prices = [day['close'] for day in data]
-                
-                # Calculate moving averages
-                ma20 = sum(prices[-20:]) / 20
-                ma50 = sum(prices[-50:]) / 50
-                
-                # Score based on price relative to MAs
-                ma_score = 0
-                if latest_price > ma20 and ma20 > ma50:
-                    ma_score = 100  # Strong uptrend
-                elif latest_price > ma20:
-                    ma_score = 75  # Above short-term MA
-                elif latest_price > ma50:
-                    ma_score = 50  # Above long-term MA
-                elif ma20 > ma50:
-                    ma_score = 25  # MAs in positive configuration but price below
-                
-                # Combined technical score
-                technical_score = (
-                    momentum_score * 0.4 +
-                    volume_score * 0.3 +
-                    ma_score * 0.3
-                )
-                
-                return technical_score
-            
+            history = self._load_price_history(symbol, market)
+            if history is None:
+                return 50  # Neutral score if insufficient data
+            symbol_str = symbol.get('symbol', symbol) if isinstance(symbol, dict) else symbol
+            values = latest_indicators(symbol_str, history['close'], history['volume'], history['last_bar'])
+            return self._technical_score_from_indicators(values, market)
         except Exception as e:
             self.logger.debug(f"Error in technical analysis for {symbol} in {market} market: {str(e)}")
             return 50  # Return neutral score on error
@@ -2749,70 +2638,47 @@ class NaifAlRasheedModel:
                         synthetic_returns = available_returns + variation
                         returns_df[symbol] = synthetic_returns
             
+            # Align columns with the weight vector before estimating moments
+            returns_df = returns_df[symbols]
+            
             # Calculate mean returns and covariance matrix
             mean_returns = returns_df.mean().values
             cov_matrix = returns_df.cov().values
+            weights = np.asarray(weights, dtype=float)
             
             # Monte Carlo simulation parameters
             num_simulations = self.portfolio_params['simulation_runs']
             time_horizon = self.portfolio_params['time_horizon']
             num_periods = time_horizon * 12  # Monthly periods
             
-            # Create initial investment array (all starting at 1.0)
-            initial_investment = np.ones(num_simulations)
-            
             # Calculate portfolio expected return and volatility
             portfolio_return = np.sum(mean_returns * weights)
             portfolio_volatility = np.sqrt(np.dot(weights, np.dot(cov_matrix, weights)))
             
-            # Generate correlated random returns for each period
-            all_simulations = []
-            
-            # Run simulations
-            for i in range(num_simulations):
-                # Initialize cumulative return
-                cumulative_return = initial_investment[i]
-                simulation_path = [cumulative_return]
-                
-                for j in range(num_periods):
-                    # Generate random return from normal distribution with portfolio mean and volatility
-                    period_return = np.random.normal(portfolio_return, portfolio_volatility)
-                    
-                    # Update cumulative return
-                    cumulative_return = cumulative_return * (1 + period_return)
-                    simulation_path.append(cumulative_return)
-                
-                all_simulations.append(simulation_path)
-            
-            # Convert to numpy array for easier analysis
-            all_simulations = np.array(all_simulations)
-            
-            # Calculate final values for each simulation
-            final_values = all_simulations[:, -1]
-            
-            # Calculate percentiles
-            percentiles = {
-                '5%': np.percentile(final_values, 5),
-                '25%': np.percentile(final_values, 25),
-                '50%': np.percentile(final_values, 50),  # Median
-                '75%': np.percentile(final_values, 75),
-                '95%': np.percentile(final_values, 95)
-            }
+            # Simulate correlated per-asset paths in batched chunks
+            engine = MonteCarloEngine(
+                num_simulations=num_simulations,
+                num_periods=num_periods,
+                chunk_size=self.portfolio_params.get('simulation_chunk_size'),
+                seed=self.portfolio_params.get('simulation_seed')
+            )
+            simulation = engine.run(mean_returns, cov_matrix, weights)
             
-            # Calculate other statistics
-            mean_final_value = np.mean(final_values)
-            median_final_value = np.median(final_values)
-            min_final_value = np.min(final_values)
-            max_final_value = np.max(final_values)
+            # Percentiles and summary statistics of the final values
+            percentiles = simulation['percentiles']
+            mean_final_value = simulation['mean']
+            median_final_value = simulation['median']
+            min_final_value = simulation['min']
+            max_final_value = simulation['max']
             
             # Calculate probability of loss
-            loss_probability = np.mean(final_values < 1.0) * 100
+            loss_probability = simulation['loss_probability']
             
             # Calculate expected annual return
             expected_annual_return = (mean_final_value ** (1/time_horizon) - 1) * 100
             
             # Calculate value at risk (VaR) at 95% confidence
-            var_95 = (1 - np.percentile(final_values, 5)) * 100
+            var_95 = (1 - percentiles['5%']) * 100
             
             # Add cash effect to final results 
             cash_allocation = portfolio.get('cash_allocation', 0)
@@ -2836,6 +2702,7 @@ class NaifAlRasheedModel:
                 'value_at_risk_95': var_95,
                 'adjusted_var_95': adjusted_var,
                 'loss_probability': loss_probability,
+                'max_drawdown_statistics': simulation['drawdown_statistics'],
                 'final_value_statistics': {
                     'mean': mean_final_value,
                     'median': median_final_value,
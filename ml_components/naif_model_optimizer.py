@@ -0,0 +1,291 @@
+# ml_components/naif_model_optimizer.py
+"""
+Optimized Naif Al-Rasheed Model
+
+Asyncio fast path for screening a known list of symbols with the Naif
+Al-Rasheed model. Instead of discovering companies sector by sector and
+fetching their data one at a time, every quote, fundamental input and price
+history for the list is fetched concurrently up front (the market data clients
+still enforce their shared rate limits), after which the same screening,
+management, valuation, ranking, portfolio and simulation stages as
+NaifAlRasheedModel are applied. The result has the same shape as
+NaifAlRasheedModel.run_full_screening plus a 'processing_time' field.
+
+The management stage calls EnhancedStockAnalyzer.analyze_stock, which keeps
+per-call state, so it runs on a long-lived pool whose threads each own an
+analyzer rather than on the model's shared one.
+"""
+
+import asyncio
+import copy
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from analysis.enhanced_stock_analyzer import EnhancedStockAnalyzer
+from ml_components.naif_alrasheed_model import NaifAlRasheedModel
+
+# Management analysis threads are shared by all runs so each thread's
+# analyzer (and its trained ML engines) is built once, not once per request
+MANAGEMENT_WORKERS = 8
+_management_pool = None
+_management_pool_lock = threading.Lock()
+_management_analyzers = threading.local()
+
+
+def _management_executor() -> ThreadPoolExecutor:
+    global _management_pool
+    with _management_pool_lock:
+        if _management_pool is None:
+            _management_pool = ThreadPoolExecutor(max_workers=MANAGEMENT_WORKERS,
+                                                  thread_name_prefix='naif-management')
+        return _management_pool
+
+
+def _thread_analyzer() -> EnhancedStockAnalyzer:
+    analyzer = getattr(_management_analyzers, 'analyzer', None)
+    if analyzer is None:
+        analyzer = EnhancedStockAnalyzer()
+        _management_analyzers.analyzer = analyzer
+    return analyzer
+
+
+class OptimizedNaifModel:
+    """
+    Concurrent screening pipeline for a fixed symbol list.
+    """
+
+    # Bonus added to sectors the macro analysis marks as favorable (as in _rank_sectors)
+    MACRO_ALIGNMENT_BONUS = 15.0
+
+    def __init__(self, model: Optional[NaifAlRasheedModel] = None, max_concurrency: int = 8):
+        """
+        Args:
+            model: Model whose clients, criteria and scoring stages are reused
+                   (a new NaifAlRasheedModel is created when omitted)
+            max_concurrency: Maximum number of blocking fetches in flight at once
+        """
+        self.logger = logging.getLogger(__name__)
+        self.model = model or NaifAlRasheedModel()
+        self.max_concurrency = max_concurrency
+
+    async def _run(self, semaphore: asyncio.Semaphore, func: Callable, *args,
+                   executor: Optional[ThreadPoolExecutor] = None) -> Any:
+        """Run a blocking call in a worker thread (of executor, if given), bounded by the semaphore."""
+        async with semaphore:
+            if executor is None:
+                return await asyncio.to_thread(func, *args)
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    async def _run_safely(self, semaphore: asyncio.Semaphore, func: Callable, *args,
+                          executor: Optional[ThreadPoolExecutor] = None) -> Any:
+        """Like _run, but log failures and return None."""
+        try:
+            return await self._run(semaphore, func, *args, executor=executor)
+        except Exception as e:
+            self.logger.debug(f"Error in {getattr(func, '__name__', 'fetch')}{args}: {str(e)}")
+            return None
+
+    async def _fetch_market_data(self, semaphore: asyncio.Semaphore, symbols: List[str],
+                                 market: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch quotes, fundamental inputs and price histories for every symbol concurrently.
+
+        Returns:
+            Dict of symbol -> {'quote': ..., 'history': ..., <fundamental fields>: ...}
+        """
+        model = self.model
+        fetchers = dict(model._fundamental_fetchers(market))
+        fetchers['history'] = lambda s: model._load_price_history(s, market)
+        if market == 'us':
+            fetchers['quote'] = model.data_fetcher.get_stock_info
+
+        tasks = [
+            self._run_safely(semaphore, fetcher, symbol)
+            for symbol in symbols
+            for fetcher in fetchers.values()
+        ]
+        if market == 'saudi':
+            # Saudi quotes come from a single batch download
+            tasks.append(self._run_safely(semaphore, model.saudi_api.get_quotes, symbols))
+
+        results = await asyncio.gather(*tasks)
+
+        data = {symbol: {} for symbol in symbols}
+        position = 0
+        for symbol in symbols:
+            for field in fetchers:
+                data[symbol][field] = results[position]
+                position += 1
+        if market == 'saudi':
+            quotes = results[position] or {}
+            for symbol in symbols:
+                data[symbol]['quote'] = quotes.get(symbol)
+        return data
+
+    @staticmethod
+    def _company_from_data(symbol: str, fetched: Dict[str, Any]) -> Dict[str, Any]:
+        """Seed a company record with the name and sector from its quote or info."""
+        company = {'symbol': symbol}
+        for source in (fetched.get('quote'), fetched.get('info')):
+            if not isinstance(source, dict):
+                continue
+            if source.get('name') and 'name' not in company:
+                company['name'] = source['name']
+            if source.get('sector') and source['sector'] != 'Unknown' and 'sector' not in company:
+                company['sector'] = source['sector']
+        company.setdefault('sector', 'Unknown')
+        return company
+
+    def _score_sectors(self, companies: List[Dict], screened: List[Dict],
+                       macro_analysis: Dict) -> Dict[str, float]:
+        """
+        Score the sectors present in the symbol list.
+
+        A sector scores the mean fundamental score of its companies that passed
+        the screen (0 when none did), plus the macro alignment bonus used by
+        NaifAlRasheedModel._rank_sectors, capped at 100.
+        """
+        favorable = set(macro_analysis.get('favorable_sectors', []))
+        passed = {}
+        for company in screened:
+            passed.setdefault(company.get('sector', 'Unknown'), []).append(company.get('fundamental_score', 0))
+
+        sector_scores = {}
+        for sector in dict.fromkeys(c.get('sector', 'Unknown') for c in companies):
+            base_score = float(np.mean(passed[sector])) if sector in passed else 0.0
+            bonus = self.MACRO_ALIGNMENT_BONUS if sector in favorable else 0.0
+            sector_scores[sector] = min(base_score + bonus, 100.0)
+        return sector_scores
+
+    def _analyze_management_quality(self, companies: List[Dict], criteria: Dict, market: str) -> List[Dict]:
+        """Run the model's management stage with the calling thread's own stock analyzer."""
+        model = copy.copy(self.model)
+        model.stock_analyzer = _thread_analyzer()
+        return model._analyze_management_quality(companies, criteria, market)
+
+    async def _per_company(self, semaphore: asyncio.Semaphore, stage: Callable,
+                           companies: List[Dict], *args,
+                           executor: Optional[ThreadPoolExecutor] = None) -> List[Dict]:
+        """Run a list-based model stage one company at a time, concurrently, keeping order."""
+        results = await asyncio.gather(*[
+            self._run_safely(semaphore, stage, [company], *args, executor=executor) for company in companies
+        ])
+        return [company for result in results if result for company in result]
+
+    async def analyze_portfolio_fast(self, symbols: List[str], market: str = 'US',
+                                     custom_params: Optional[Dict] = None,
+                                     risk_profile: Optional[Dict] = None,
+                                     existing_portfolio: Optional[Dict] = None,
+                                     data_date: Optional[str] = None) -> Dict:
+        """
+        Screen a list of symbols and build a portfolio with concurrent data fetching.
+
+        Args:
+            symbols: Symbols to screen
+            market: Market of the symbols ('US'/'us' or 'SAUDI'/'saudi')
+            custom_params: Optional custom screening parameters
+            risk_profile: Optional user risk profile information
+            existing_portfolio: Optional existing portfolio to optimize from
+            data_date: Market data date of the run (defaults to today)
+
+        Returns:
+            Dict in the NaifAlRasheedModel.run_full_screening format (including
+            'data_date' and an always empty 'restored_stages', since this path
+            does not checkpoint) plus 'processing_time' (seconds); on failure
+            {'success': False, 'fallback_mode': True, 'message': ...} so callers
+            can fall back to the full screening
+        """
+        start_time = time.perf_counter()
+        market = market.lower()
+        model = self.model
+        data_date = data_date or model.checkpoints.today()
+
+        if market not in ['us', 'saudi']:
+            return {
+                'success': False,
+                'fallback_mode': True,
+                'message': f"Invalid market: {market}. Use 'us' or 'saudi'."
+            }
+
+        criteria = model.investment_criteria[market].copy()
+        if custom_params:
+            criteria.update(custom_params)
+
+        symbols = list(dict.fromkeys(s for s in symbols if s))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        try:
+            # Macro analysis runs alongside the market data fetch
+            macro_analysis, data = await asyncio.gather(
+                self._run(semaphore, model._analyze_macro_conditions, market),
+                self._fetch_market_data(semaphore, symbols, market)
+            )
+
+            companies = [self._company_from_data(symbol, data[symbol]) for symbol in symbols]
+            prefetched = {symbol: {field: value for field, value in fetched.items()
+                                   if field not in ('quote', 'history')}
+                          for symbol, fetched in data.items()}
+            screened_companies = await asyncio.to_thread(
+                model._run_fundamental_screening, companies, criteria, market, prefetched)
+
+            sector_scores = self._score_sectors(companies, screened_companies, macro_analysis)
+            top_sectors = model._select_top_sectors(sector_scores, market)
+            for company in screened_companies:
+                company['sector_score'] = sector_scores.get(company.get('sector', 'Unknown'), 0)
+
+            quality_companies = await self._per_company(
+                semaphore, self._analyze_management_quality, screened_companies, criteria, market,
+                executor=_management_executor())
+            valuated_companies = await self._per_company(
+                semaphore, model._run_valuation_analysis, quality_companies, criteria, market)
+            valuated_companies.sort(key=lambda x: x.get('valuation_score', 0), reverse=True)
+
+            technical_scores = model._calculate_technical_scores(
+                [c['symbol'] for c in valuated_companies], market,
+                histories={symbol: fetched.get('history') for symbol, fetched in data.items()})
+            ranked_companies = model._rank_companies(valuated_companies, market, technical_scores)
+            selected_companies = model._select_final_candidates(ranked_companies, market)
+
+            portfolio = await asyncio.to_thread(
+                model._construct_portfolio, selected_companies, risk_profile, existing_portfolio, market)
+            simulation_results = await asyncio.to_thread(model._run_monte_carlo_simulation, portfolio, market)
+            visualizations = await asyncio.to_thread(
+                model._generate_visualizations, portfolio, simulation_results, market)
+
+            return {
+                'success': True,
+                'analysis_date': datetime.now().isoformat(),
+                'data_date': data_date,
+                'market': market.upper(),
+                'parameters': criteria,
+                'macro_analysis': macro_analysis,
+                'sector_scores': sector_scores,
+                'selected_sectors': top_sectors,
+                'screened_companies': [c['symbol'] for c in screened_companies],
+                'quality_companies': [c['symbol'] for c in quality_companies],
+                'valuated_companies': [c['symbol'] for c in valuated_companies],
+                'selected_companies': [c['symbol'] for c in selected_companies],
+                'portfolio': portfolio,
+                'simulation_results': simulation_results,
+                'visualizations': visualizations,
+                'recommendations': model._generate_recommendations(portfolio, simulation_results, market),
+                'restored_stages': [],
+                'processing_time': time.perf_counter() - start_time
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error in optimized Naif Al-Rasheed screening: {str(e)}")
+            return {
+                'success': False,
+                'fallback_mode': True,
+                'market': market.upper(),
+                'message': f"Optimized screening failed: {str(e)}",
+                'restored_stages': [],
+                'processing_time': time.perf_counter() - start_time
+            }
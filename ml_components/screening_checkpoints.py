@@ -0,0 +1,164 @@
+# ml_components/screening_checkpoints.py
+"""
+Screening Checkpoints
+
+Persists the output of each stage of the Naif Al-Rasheed screening pipeline so
+that a rerun can skip the stages it has already completed. Every checkpoint is
+keyed by the market, the data date, the parameters the stage depends on and the
+key of the stage that fed it, so changing a parameter only invalidates the
+stage that reads it and everything downstream of it.
+
+Only complete stage outputs are persisted: an empty output or one a stage
+returned from its error fallback is recomputed on the next run instead of
+being restored for the rest of the day.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import date
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from caching import DiskCache
+
+
+class ScreeningCheckpointStore:
+    """
+    Stores one pickled checkpoint per (stage, market, data date, inputs) key.
+    """
+
+    DEFAULT_DIRECTORY = "./cache/naif_model/checkpoints"
+
+    def __init__(self, directory: Optional[str] = None,
+                 max_bytes: Optional[int] = 256 * 1024 * 1024):
+        """
+        Args:
+            directory: Directory holding the checkpoint files (defaults to
+                $SCREENING_CHECKPOINT_DIR or ./cache/naif_model/checkpoints)
+            max_bytes: Size cap for the directory; the oldest checkpoints are pruned first
+        """
+        self.logger = logging.getLogger(__name__)
+        directory = directory or os.environ.get('SCREENING_CHECKPOINT_DIR', self.DEFAULT_DIRECTORY)
+        self.disk = DiskCache(directory, format='pickle', max_bytes=max_bytes)
+
+    @classmethod
+    def is_complete(cls, value: Any) -> bool:
+        """
+        Whether a stage output is worth persisting.
+
+        None, empty containers, results flagged ``success: False`` and tuples
+        with any such member are treated as incomplete.
+        """
+        if value is None:
+            return False
+        if isinstance(value, dict) and value.get('success') is False:
+            return False
+        if isinstance(value, tuple):
+            return bool(value) and all(cls.is_complete(member) for member in value)
+        if isinstance(value, (list, dict, set)):
+            return bool(value)
+        return True
+
+    @staticmethod
+    def params_hash(params: Any) -> str:
+        """Stable hash of a JSON-like parameter structure."""
+        encoded = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def stage_key(self, stage: str, market: str, data_date: str,
+                  params: Optional[Dict] = None, parent: Optional[str] = None) -> str:
+        """
+        Build the checkpoint key for a stage.
+
+        Args:
+            stage: Stage name
+            market: Market being screened
+            data_date: Date of the market data the run is based on
+            params: Parameters the stage reads
+            parent: Key of the upstream stage whose output this stage consumes
+
+        Returns:
+            Key of the form '<market>_<data date>_<stage>_<digest>'
+        """
+        digest = self.params_hash({
+            'stage': stage,
+            'market': market,
+            'data_date': data_date,
+            'params': params or {},
+            'parent': parent
+        })
+        return f"{market}_{data_date}_{stage}_{digest[:20]}"
+
+    def load(self, key: str) -> Tuple[bool, Any]:
+        """
+        Returns:
+            (found, value); value is None when no checkpoint exists
+        """
+        entry = self.disk.read(key)
+        if entry is None:
+            return False, None
+        payload = entry[0]
+        if not isinstance(payload, dict) or 'value' not in payload:
+            return False, None
+        return True, payload['value']
+
+    def save(self, key: str, stage: str, value: Any) -> bool:
+        return self.disk.write(key, {'stage': stage, 'saved_at': time.time(), 'value': value}) is not None
+
+    def run_stage(self, stage: str, market: str, data_date: str, params: Optional[Dict],
+                  parent: Optional[str], compute: Callable[[], Any],
+                  resume: bool = True,
+                  complete: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, str, bool]:
+        """
+        Return a stage's checkpointed output, computing and persisting it on a miss.
+
+        Args:
+            stage: Stage name
+            market: Market being screened
+            data_date: Date of the market data the run is based on
+            params: Parameters the stage reads
+            parent: Key of the upstream stage
+            compute: Callable producing the stage output
+            resume: Whether an existing checkpoint may be reused
+            complete: Predicate deciding whether the output is persisted
+                (defaults to ``is_complete``); stages with a degraded fallback
+                result pass a stricter check
+
+        Returns:
+            (output, checkpoint key, whether the output came from a checkpoint)
+        """
+        key = self.stage_key(stage, market, data_date, params, parent)
+        if resume:
+            found, value = self.load(key)
+            if found:
+                self.logger.info(f"Stage '{stage}' restored from checkpoint")
+                return value, key, True
+
+        value = compute()
+        if not (complete or self.is_complete)(value):
+            self.logger.info(f"Stage '{stage}' output is empty or degraded; not checkpointed")
+        elif not self.save(key, stage, value):
+            self.logger.warning(f"Could not save checkpoint for stage '{stage}'")
+        return value, key, False
+
+    def clear(self, market: Optional[str] = None, data_date: Optional[str] = None) -> int:
+        """
+        Delete checkpoints, optionally restricted to a market and/or data date.
+
+        Returns:
+            Number of checkpoints removed
+        """
+        def matches(name: str) -> bool:
+            parts = name.split('_', 2)
+            if len(parts) < 3:
+                return False
+            return ((market is None or parts[0] == market) and
+                    (data_date is None or parts[1] == data_date))
+
+        return self.disk.delete_matching(matches)
+
+    @staticmethod
+    def today() -> str:
+        return date.today().isoformat()
@@ -0,0 +1,139 @@
+# ml_components/screening_executor.py
+"""
+Screening Executor
+
+Concurrent per-symbol data prefetch and vectorized criteria evaluation for the
+Naif Al-Rasheed fundamental screen. All network calls for a screen are fanned
+out over a bounded thread pool (each client still honours its own shared rate
+limiter), after which the pass/fail criteria and fundamental scores are
+computed for every company in a single pass over a DataFrame.
+"""
+
+import numpy as np
+import pandas as pd
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable
+
+from utils.rate_limiter import PRIORITY_BACKGROUND, request_priority
+
+
+class ScreeningExecutor:
+    """
+    Prefetches screening inputs concurrently and scores them in bulk.
+    """
+
+    # Metric columns expected by score_fundamentals
+    METRIC_COLUMNS = [
+        'market_cap', 'rotc', 'revenue_growth', 'ebitda',
+        'free_cash_flow', 'profit_margin', 'debt_to_equity'
+    ]
+
+    def __init__(self, max_workers: int = 8):
+        """
+        Args:
+            max_workers: Maximum number of concurrent fetches
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers
+
+    def _fetch(self, fetcher: Callable[[str], Any], symbol: str) -> Any:
+        # Screening is background work: interactive requests go ahead of it
+        # wherever a client queues for its API quota
+        with request_priority(PRIORITY_BACKGROUND):
+            return fetcher(symbol)
+
+    def prefetch(self, symbols: Iterable[str],
+                 fetchers: Dict[str, Callable[[str], Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Run every fetcher for every symbol concurrently.
+
+        Args:
+            symbols: Symbols to fetch (duplicates are fetched once)
+            fetchers: Mapping of field name to a callable taking a symbol
+
+        Returns:
+            Dict of symbol -> {field: result}; failed fetches are stored as None
+        """
+        unique_symbols = list(dict.fromkeys(s for s in symbols if s))
+        results = {symbol: {} for symbol in unique_symbols}
+        if not unique_symbols:
+            return results
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._fetch, fetcher, symbol): (symbol, field)
+                for symbol in unique_symbols
+                for field, fetcher in fetchers.items()
+            }
+            for future in as_completed(futures):
+                symbol, field = futures[future]
+                try:
+                    results[symbol][field] = future.result()
+                except Exception as e:
+                    self.logger.debug(f"Error fetching {field} for {symbol}: {str(e)}")
+                    results[symbol][field] = None
+
+        return results
+
+    @classmethod
+    def score_fundamentals(cls, metrics: pd.DataFrame, criteria: Dict) -> pd.DataFrame:
+        """
+        Evaluate screening criteria and fundamental scores for all companies at once.
+
+        Missing metrics (None/NaN) fail any criterion that depends on them.
+
+        Args:
+            metrics: DataFrame with METRIC_COLUMNS, one row per company
+            criteria: Investment criteria to apply
+
+        Returns:
+            DataFrame with boolean 'passes_criteria' and float 'fundamental_score' columns
+        """
+        min_rotc = criteria.get('min_rotc', 15.0)
+        min_revenue_growth = criteria.get('min_revenue_growth', 5.0)
+        min_market_cap = criteria.get('min_market_cap', 1_000_000_000)
+        positive_ebitda = criteria.get('positive_ebitda', True)
+        positive_fcf = criteria.get('positive_fcf', True)
+
+        values = metrics.reindex(columns=cls.METRIC_COLUMNS).apply(pd.to_numeric, errors='coerce')
+        market_cap = values['market_cap'].to_numpy(dtype=float)
+        rotc = values['rotc'].to_numpy(dtype=float)
+        revenue_growth = values['revenue_growth'].to_numpy(dtype=float)
+        ebitda = values['ebitda'].to_numpy(dtype=float)
+        free_cash_flow = values['free_cash_flow'].to_numpy(dtype=float)
+        profit_margin = values['profit_margin'].to_numpy(dtype=float)
+        debt_to_equity = values['debt_to_equity'].to_numpy(dtype=float)
+
+        # NaN comparisons are False, so missing data fails the criteria
+        with np.errstate(invalid='ignore', divide='ignore'):
+            passes = (
+                (market_cap >= min_market_cap) &
+                (rotc >= min_rotc) &
+                (revenue_growth >= min_revenue_growth)
+            )
+            if positive_ebitda:
+                passes &= ebitda > 0
+            if positive_fcf:
+                passes &= free_cash_flow > 0
+
+            rotc_score = np.minimum(rotc / min_rotc, 3) * 25  # Up to 75 points for 3x minimum ROTC
+            growth_score = np.minimum(revenue_growth / min_revenue_growth, 4) * 15  # Up to 60 points for 4x minimum growth
+            margin_score = np.minimum(np.nan_to_num(profit_margin) / 10, 2) * 10  # Up to 20 points for 20% margin
+
+            # Cash flow/EBITDA positive bonus
+            ebitda_bonus = np.where(ebitda > 0, 10, 0)
+            fcf_bonus = np.where(free_cash_flow > 0, 15, 0)
+
+            # Penalty for high debt
+            debt_penalty = np.where(debt_to_equity > 1, np.minimum(debt_to_equity * 10, 25), 0)
+
+            fundamental_score = np.minimum(
+                rotc_score + growth_score + margin_score + ebitda_bonus + fcf_bonus - debt_penalty,
+                100
+            )
+
+        return pd.DataFrame({
+            'passes_criteria': passes,
+            'fundamental_score': fundamental_score
+        }, index=metrics.index)
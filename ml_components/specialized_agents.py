@@ -18,6 +18,7 @@ import pandas as pd
 from datetime import datetime, timedelta
 
 from .ml_engine import MarketMLEngine, MarketPatternLearner, MarketPredictor
+from analysis import indicators as technical_indicators
 
 class BaseAgent:
     """Base class for all specialized agents with common functionality."""
@@ -138,10 +139,12 @@ class TechnicalAnalysisAgent(BaseAgent):
         indicators = {}
         
         try:
+            close = df["Close"].to_numpy(dtype=float)
+            
             # Simple Moving Averages
-            df["SMA20"] = df["Close"].rolling(window=20).mean()
-            df["SMA50"] = df["Close"].rolling(window=50).mean()
-            df["SMA200"] = df["Close"].rolling(window=200).mean()
+            df["SMA20"] = technical_indicators.rolling_mean(close, 20)
+            df["SMA50"] = technical_indicators.rolling_mean(close, 50)
+            df["SMA200"] = technical_indicators.rolling_mean(close, 200)
             
             # Price relative to SMAs
             last_close = df["Close"].iloc[-1]
@@ -160,21 +163,15 @@ class TechnicalAnalysisAgent(BaseAgent):
             )
             
             # RSI
-            delta = df["Close"].diff()
-            gain = delta.where(delta > 0, 0).rolling(window=14).mean()
-            loss = -delta.where(delta < 0, 0).rolling(window=14).mean()
-            rs = gain / loss
-            df["RSI"] = 100 - (100 / (1 + rs))
+            df["RSI"] = technical_indicators.rsi(close, 14)
             indicators["RSI"] = df["RSI"].iloc[-1]
             indicators["RSI_overbought"] = indicators["RSI"] > 70
             indicators["RSI_oversold"] = indicators["RSI"] < 30
             
             # MACD
-            df["EMA12"] = df["Close"].ewm(span=12, adjust=False).mean()
-            df["EMA26"] = df["Close"].ewm(span=26, adjust=False).mean()
-            df["MACD"] = df["EMA12"] - df["EMA26"]
-            df["Signal"] = df["MACD"].ewm(span=9, adjust=False).mean()
-            df["Histogram"] = df["MACD"] - df["Signal"]
+            df["EMA12"] = technical_indicators.ema(close, 12)
+            df["EMA26"] = technical_indicators.ema(close, 26)
+            df["MACD"], df["Signal"], df["Histogram"] = technical_indicators.macd(close)
             
             indicators["MACD"] = df["MACD"].iloc[-1]
             indicators["MACD_Signal"] = df["Signal"].iloc[-1]
@@ -182,20 +179,18 @@ class TechnicalAnalysisAgent(BaseAgent):
             indicators["MACD_positive"] = df["MACD"].iloc[-1] > df["Signal"].iloc[-1]
             
             # Bollinger Bands
-            df["BB_Middle"] = df["Close"].rolling(window=20).mean()
-            df["BB_Std"] = df["Close"].rolling(window=20).std()
-            df["BB_Upper"] = df["BB_Middle"] + 2 * df["BB_Std"]
-            df["BB_Lower"] = df["BB_Middle"] - 2 * df["BB_Std"]
+            df["BB_Middle"], df["BB_Upper"], df["BB_Lower"] = technical_indicators.bollinger_bands(close, 20, 2)
+            df["BB_Std"] = (df["BB_Upper"] - df["BB_Middle"]) / 2
             
             indicators["BB_Position"] = (last_close - df["BB_Lower"].iloc[-1]) / (df["BB_Upper"].iloc[-1] - df["BB_Lower"].iloc[-1])
             indicators["BB_Width"] = (df["BB_Upper"].iloc[-1] - df["BB_Lower"].iloc[-1]) / df["BB_Middle"].iloc[-1]
             
             # Volume analysis
-            df["Volume_SMA20"] = df["Volume"].rolling(window=20).mean()
+            df["Volume_SMA20"] = technical_indicators.rolling_mean(df["Volume"].to_numpy(dtype=float), 20)
             indicators["volume_trend"] = "increasing" if df["Volume"].iloc[-1] > df["Volume_SMA20"].iloc[-1] else "decreasing"
             
             # Momentum
-            df["ROC"] = df["Close"].pct_change(periods=10) * 100
+            df["ROC"] = technical_indicators.returns(close, 10) * 100
             indicators["momentum"] = df["ROC"].iloc[-1]
             
         except Exception as e:
@@ -299,11 +294,10 @@ class TechnicalAnalysisAgent(BaseAgent):
                 return 0.5
                 
             # Calculate average true range
-            df["H-L"] = df["High"] - df["Low"]
-            df["H-PC"] = abs(df["High"] - df["Close"].shift(1))
-            df["L-PC"] = abs(df["Low"] - df["Close"].shift(1))
-            df["TR"] = df[["H-L", "H-PC", "L-PC"]].max(axis=1)
-            df["ATR"] = df["TR"].rolling(window=14).mean()
+            df["ATR"] = technical_indicators.average_true_range(
+                df["High"].to_numpy(dtype=float), df["Low"].to_numpy(dtype=float),
+                df["Close"].to_numpy(dtype=float), 14
+            )
             
             # Normalize ATR by price level
             atr_pct = df["ATR"].iloc[-1] / df["Close"].iloc[-1]
@@ -104,6 +104,12 @@ class SectorPreference(db.Model):
     
     __table_args__ = (db.UniqueConstraint('user_id', 'sector', name='_user_sector_uc'),)
 
+class FeedbackFlushMark(db.Model):
+    """Last feedback log sequence number committed per buffer, so log replay skips flushed events"""
+    source = db.Column(db.String(32), primary_key=True)  # Feedback buffer instance id
+    last_seq = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
 class PredictionRecord(db.Model):
     """Records prediction accuracy to improve future recommendations"""
     id = db.Column(db.Integer, primary_key=True)
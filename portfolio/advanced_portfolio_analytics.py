@@ -347,116 +347,59 @@ class AdvancedPortfolioAnalytics:
     def generate_efficient_frontier(self, 
                                    returns_data: pd.DataFrame, 
                                    risk_free_rate: float = 0.03, 
-                                   num_portfolios: int = 50) -> List[Dict[str, Any]]:
+                                   num_portfolios: int = 50,
+                                   method: str = 'analytic',
+                                   num_points: int = 10,
+                                   allow_short: bool = False) -> List[Dict[str, Any]]:
         """
         Generate the efficient frontier for a set of assets.
         
+        The default ``analytic`` method solves the mean-variance problem directly
+        along an evenly spaced grid of target returns: in closed form when short
+        selling is allowed, and with warm-started SLSQP solves for the long-only
+        case. ``sampling`` keeps the original random-portfolio approximation.
+        
         Args:
             returns_data: DataFrame of asset returns (assets in columns)
             risk_free_rate: Annual risk-free rate
-            num_portfolios: Number of portfolios to generate
+            num_portfolios: Number of random portfolios for the sampling method
+            method: 'analytic' (default) or 'sampling'
+            num_points: Number of evenly spaced frontier points to return
+            allow_short: Allow negative weights (closed-form solution)
             
         Returns:
-            List of efficient frontier portfolios
+            List of efficient frontier portfolios sorted by risk
         """
         if not isinstance(returns_data, pd.DataFrame) or returns_data.empty:
             return []
             
         try:
             # Calculate expected returns and covariance matrix
-            expected_returns = returns_data.mean()
-            cov_matrix = returns_data.cov()
-            
-            # Number of assets
-            num_assets = len(expected_returns)
-            
-            # Generate random portfolios
-            all_weights = np.zeros((num_portfolios, num_assets))
-            returns_array = np.zeros(num_portfolios)
-            volatility_array = np.zeros(num_portfolios)
-            sharpe_array = np.zeros(num_portfolios)
-            
-            for i in range(num_portfolios):
-                # Generate random weights
-                weights = np.random.random(num_assets)
-                weights /= np.sum(weights)
-                all_weights[i, :] = weights
-                
-                # Calculate portfolio return
-                returns_array[i] = np.sum(expected_returns * weights)
-                
-                # Calculate portfolio volatility
-                volatility_array[i] = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
-                
-                # Calculate Sharpe Ratio
-                sharpe_array[i] = (returns_array[i] - risk_free_rate) / volatility_array[i]
-            
-            # Create results array
-            results = np.column_stack((returns_array, volatility_array, sharpe_array))
-            
-            # Convert to DataFrame
-            results_df = pd.DataFrame(results, columns=['Return', 'Volatility', 'Sharpe'])
-            
-            # Add weight columns
-            for j in range(num_assets):
-                results_df[f'Weight_{j}'] = all_weights[:, j]
-            
-            # Find portfolio with maximum Sharpe ratio
-            max_sharpe_idx = results_df['Sharpe'].idxmax()
-            max_sharpe_return = results_df.loc[max_sharpe_idx, 'Return']
-            max_sharpe_volatility = results_df.loc[max_sharpe_idx, 'Volatility']
+            expected_returns = returns_data.mean().values.astype(float)
+            cov_matrix = returns_data.cov().values.astype(float)
+            columns = list(returns_data.columns)
             
-            # Find portfolio with minimum volatility
-            min_vol_idx = results_df['Volatility'].idxmin()
-            min_vol_return = results_df.loc[min_vol_idx, 'Return']
-            min_vol_volatility = results_df.loc[min_vol_idx, 'Volatility']
+            if method == 'sampling':
+                return self._sampled_frontier(expected_returns, cov_matrix, columns,
+                                              risk_free_rate, num_portfolios)
             
-            # Create efficient frontier portfolios
-            frontier_portfolios = []
-            
-            # Add minimum volatility portfolio
-            min_vol_weights = {}
-            for j in range(num_assets):
-                min_vol_weights[returns_data.columns[j]] = results_df.loc[min_vol_idx, f'Weight_{j}']
-                
-            frontier_portfolios.append({
-                "return": min_vol_return,
-                "risk": min_vol_volatility,
-                "sharpe": results_df.loc[min_vol_idx, 'Sharpe'],
-                "weights": min_vol_weights,
-                "type": "Minimum Volatility"
-            })
-            
-            # Add maximum Sharpe ratio portfolio
-            max_sharpe_weights = {}
-            for j in range(num_assets):
-                max_sharpe_weights[returns_data.columns[j]] = results_df.loc[max_sharpe_idx, f'Weight_{j}']
-                
-            frontier_portfolios.append({
-                "return": max_sharpe_return,
-                "risk": max_sharpe_volatility,
-                "sharpe": results_df.loc[max_sharpe_idx, 'Sharpe'],
-                "weights": max_sharpe_weights,
-                "type": "Maximum Sharpe"
-            })
-            
-            # Sort results by volatility to get efficient frontier
-            results_df = results_df.sort_values('Volatility')
-            
-            # Add efficient frontier portfolios
-            for i in range(0, len(results_df), len(results_df) // 10):  # Select ~10 points along frontier
-                if i != min_vol_idx and i != max_sharpe_idx:  # Skip if already added
-                    weights = {}
-                    for j in range(num_assets):
-                        weights[returns_data.columns[j]] = results_df.iloc[i][f'Weight_{j}']
-                        
-                    frontier_portfolios.append({
-                        "return": results_df.iloc[i]['Return'],
-                        "risk": results_df.iloc[i]['Volatility'],
-                        "sharpe": results_df.iloc[i]['Sharpe'],
-                        "weights": weights,
-                        "type": "Efficient Frontier"
-                    })
+            if allow_short:
+                min_vol, max_sharpe, frontier = self._closed_form_frontier(
+                    expected_returns, cov_matrix, risk_free_rate, num_points)
+            else:
+                min_vol, max_sharpe, frontier = self._long_only_frontier(
+                    expected_returns, cov_matrix, risk_free_rate, num_points)
+            
+            frontier_portfolios = [
+                self._frontier_portfolio(min_vol, expected_returns, cov_matrix, columns,
+                                         risk_free_rate, "Minimum Volatility"),
+                self._frontier_portfolio(max_sharpe, expected_returns, cov_matrix, columns,
+                                         risk_free_rate, "Maximum Sharpe")
+            ]
+            for weights in frontier:
+                frontier_portfolios.append(
+                    self._frontier_portfolio(weights, expected_returns, cov_matrix, columns,
+                                             risk_free_rate, "Efficient Frontier"))
             
             # Sort by risk
             frontier_portfolios.sort(key=lambda x: x["risk"])
@@ -467,6 +410,227 @@ class AdvancedPortfolioAnalytics:
             self.logger.error(f"Error generating efficient frontier: {str(e)}")
             return []
     
+    @staticmethod
+    def _frontier_metrics(weights: np.ndarray, 
+                          expected_returns: np.ndarray, 
+                          cov_matrix: np.ndarray, 
+                          risk_free_rate: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Evaluate return, volatility and Sharpe ratio for a matrix of portfolios.
+        
+        Args:
+            weights: Array of shape (portfolios, assets) or a single weight vector
+            expected_returns: Expected asset returns
+            cov_matrix: Asset covariance matrix
+            risk_free_rate: Risk-free rate
+            
+        Returns:
+            Tuple of (returns, volatilities, sharpe ratios) arrays
+        """
+        weights = np.atleast_2d(weights)
+        portfolio_returns = weights @ expected_returns
+        variances = np.einsum('ij,jk,ik->i', weights, cov_matrix, weights)
+        volatilities = np.sqrt(np.maximum(variances, 0.0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = np.where(volatilities > 0,
+                              (portfolio_returns - risk_free_rate) / volatilities,
+                              0.0)
+        return portfolio_returns, volatilities, sharpe
+    
+    def _frontier_portfolio(self, 
+                            weights: np.ndarray, 
+                            expected_returns: np.ndarray, 
+                            cov_matrix: np.ndarray, 
+                            columns: List[str], 
+                            risk_free_rate: float, 
+                            portfolio_type: str) -> Dict[str, Any]:
+        """Build a frontier entry in the format returned by generate_efficient_frontier."""
+        returns, volatilities, sharpe = self._frontier_metrics(
+            weights, expected_returns, cov_matrix, risk_free_rate)
+        return {
+            "return": float(returns[0]),
+            "risk": float(volatilities[0]),
+            "sharpe": float(sharpe[0]),
+            "weights": {column: float(w) for column, w in zip(columns, weights)},
+            "type": portfolio_type
+        }
+    
+    @staticmethod
+    def _target_return_grid(min_return: float, max_return: float, num_points: int) -> np.ndarray:
+        """Evenly spaced target returns above the minimum variance portfolio."""
+        if num_points <= 0 or max_return - min_return <= 1e-12 * max(1.0, abs(max_return)):
+            return np.empty(0)
+        return np.linspace(min_return, max_return, num_points + 1)[1:]
+    
+    def _closed_form_frontier(self, 
+                              expected_returns: np.ndarray, 
+                              cov_matrix: np.ndarray, 
+                              risk_free_rate: float, 
+                              num_points: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Solve the unconstrained (short selling allowed) frontier in closed form.
+        
+        Every frontier portfolio is w(r) = g + h * r, so the whole grid is a single
+        outer product once the two linear systems against the covariance matrix
+        have been solved.
+        
+        Returns:
+            Tuple of (minimum volatility weights, maximum Sharpe weights, frontier weights matrix)
+        """
+        num_assets = len(expected_returns)
+        ones = np.ones(num_assets)
+        
+        try:
+            solved = np.linalg.solve(cov_matrix, np.column_stack((ones, expected_returns)))
+        except np.linalg.LinAlgError:
+            solved = np.linalg.pinv(cov_matrix) @ np.column_stack((ones, expected_returns))
+        inv_ones, inv_mu = solved[:, 0], solved[:, 1]
+        
+        a = ones @ inv_mu
+        b = expected_returns @ inv_mu
+        c = ones @ inv_ones
+        d = b * c - a * a
+        
+        min_vol = inv_ones / c
+        min_return = a / c
+        
+        if abs(d) <= 1e-12 * max(1.0, abs(b * c)):
+            # All assets share the same expected return: the frontier is one point
+            return min_vol, min_vol, np.empty((0, num_assets))
+        
+        g = (b * inv_ones - a * inv_mu) / d
+        h = (c * inv_mu - a * inv_ones) / d
+        targets = self._target_return_grid(min_return, float(expected_returns.max()), num_points)
+        frontier = g[None, :] + targets[:, None] * h[None, :]
+        
+        # Tangency portfolio exists when the minimum variance return beats the risk-free rate
+        excess = inv_mu - risk_free_rate * inv_ones
+        if min_return > risk_free_rate and ones @ excess > 0:
+            max_sharpe = excess / (ones @ excess)
+        else:
+            candidates = np.vstack((min_vol[None, :], frontier))
+            _, _, sharpe = self._frontier_metrics(candidates, expected_returns, cov_matrix, risk_free_rate)
+            max_sharpe = candidates[int(np.argmax(sharpe))]
+        
+        return min_vol, max_sharpe, frontier
+    
+    def _long_only_frontier(self, 
+                            expected_returns: np.ndarray, 
+                            cov_matrix: np.ndarray, 
+                            risk_free_rate: float, 
+                            num_points: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Solve the long-only frontier with SLSQP along a grid of target returns.
+        
+        Each solve starts from the previous frontier point, which is already close
+        to the next optimum, so the sweep converges in a handful of iterations even
+        for large universes.
+        
+        Returns:
+            Tuple of (minimum volatility weights, maximum Sharpe weights, frontier weights matrix)
+        """
+        num_assets = len(expected_returns)
+        bounds = tuple((0.0, 1.0) for _ in range(num_assets))
+        budget = {'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': lambda x: np.ones_like(x)}
+        
+        def variance(weights):
+            return weights @ cov_matrix @ weights
+        
+        def variance_grad(weights):
+            return 2.0 * (cov_matrix @ weights)
+        
+        def solve(x0, extra_constraints=()):
+            result = sco.minimize(variance, x0, jac=variance_grad, method='SLSQP',
+                                  bounds=bounds, constraints=[budget, *extra_constraints],
+                                  options={'maxiter': 500, 'ftol': 1e-12})
+            weights = np.clip(result.x, 0.0, 1.0)
+            return weights / weights.sum()
+        
+        min_vol = solve(np.ones(num_assets) / num_assets)
+        min_return = float(min_vol @ expected_returns)
+        targets = self._target_return_grid(min_return, float(expected_returns.max()), num_points)
+        
+        frontier = np.empty((len(targets), num_assets))
+        previous = min_vol
+        for i, target in enumerate(targets):
+            target_constraint = {
+                'type': 'eq',
+                'fun': lambda x, r=target: x @ expected_returns - r,
+                'jac': lambda x: expected_returns
+            }
+            previous = solve(previous, (target_constraint,))
+            frontier[i] = previous
+        
+        # Maximum Sharpe: refine the best frontier point directly
+        candidates = np.vstack((min_vol[None, :], frontier))
+        _, _, sharpe = self._frontier_metrics(candidates, expected_returns, cov_matrix, risk_free_rate)
+        best = candidates[int(np.argmax(sharpe))]
+        
+        def neg_sharpe(weights):
+            volatility = np.sqrt(max(variance(weights), 1e-18))
+            return -(weights @ expected_returns - risk_free_rate) / volatility
+        
+        def neg_sharpe_grad(weights):
+            var = max(variance(weights), 1e-18)
+            volatility = np.sqrt(var)
+            excess = weights @ expected_returns - risk_free_rate
+            return -(expected_returns / volatility - excess * (cov_matrix @ weights) / (var * volatility))
+        
+        result = sco.minimize(neg_sharpe, best, jac=neg_sharpe_grad, method='SLSQP',
+                              bounds=bounds, constraints=[budget],
+                              options={'maxiter': 500, 'ftol': 1e-12})
+        max_sharpe = best
+        if result.success:
+            refined = np.clip(result.x, 0.0, 1.0)
+            refined = refined / refined.sum()
+            if neg_sharpe(refined) <= neg_sharpe(best):
+                max_sharpe = refined
+        
+        return min_vol, max_sharpe, frontier
+    
+    def _sampled_frontier(self, 
+                          expected_returns: np.ndarray, 
+                          cov_matrix: np.ndarray, 
+                          columns: List[str], 
+                          risk_free_rate: float, 
+                          num_portfolios: int) -> List[Dict[str, Any]]:
+        """
+        Approximate the frontier from random long-only portfolios.
+        
+        Returns:
+            List of sampled frontier portfolios sorted by risk
+        """
+        num_assets = len(expected_returns)
+        
+        # Generate random portfolios and evaluate them in one pass
+        all_weights = np.random.random((num_portfolios, num_assets))
+        all_weights /= all_weights.sum(axis=1, keepdims=True)
+        _, volatility_array, sharpe_array = self._frontier_metrics(
+            all_weights, expected_returns, cov_matrix, risk_free_rate)
+        
+        max_sharpe_idx = int(np.argmax(sharpe_array))
+        min_vol_idx = int(np.argmin(volatility_array))
+        
+        frontier_portfolios = [
+            self._frontier_portfolio(all_weights[min_vol_idx], expected_returns, cov_matrix,
+                                     columns, risk_free_rate, "Minimum Volatility"),
+            self._frontier_portfolio(all_weights[max_sharpe_idx], expected_returns, cov_matrix,
+                                     columns, risk_free_rate, "Maximum Sharpe")
+        ]
+        
+        # Select ~10 points along the volatility-sorted samples
+        order = np.argsort(volatility_array)
+        for idx in order[::max(1, num_portfolios // 10)]:
+            if idx != min_vol_idx and idx != max_sharpe_idx:  # Skip if already added
+                frontier_portfolios.append(
+                    self._frontier_portfolio(all_weights[idx], expected_returns, cov_matrix,
+                                             columns, risk_free_rate, "Efficient Frontier"))
+        
+        # Sort by risk
+        frontier_portfolios.sort(key=lambda x: x["risk"])
+        
+        return frontier_portfolios
+    
     def optimize_for_maximum_sharpe(self, 
                                    returns_data: pd.DataFrame, 
                                    risk_free_rate: float = 0.03,
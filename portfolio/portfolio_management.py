@@ -672,68 +672,37 @@ class PortfolioManager:
         try:
             self.logger.info(f"Monitoring portfolio performance over {days} days")
             
-            # Get holdings
+            # Get holdings and their weights
             holdings = self.current_portfolio.get('holdings', [])
-            
-            # Get historical data for each holding
-            historical_data = {}
+            weights = {}
             for holding in holdings:
                 symbol = holding.get('symbol')
-                weight = holding.get('weight', 0)
-                
-                try:
-                    # Get historical prices
-                    stock_data = self.analyzer.get_historical_prices(symbol, days=days)
-                    if stock_data is not None:
-                        historical_data[symbol] = {
-                            'prices': stock_data,
-                            'weight': weight
-                        }
-                except Exception as e:
-                    self.logger.warning(f"Error getting historical data for {symbol}: {str(e)}")
+                if symbol:
+                    weights[symbol.upper()] = weights.get(symbol.upper(), 0) + holding.get('weight', 0)
             
-            if not historical_data:
+            # Load every holding and the benchmark (S&P 500) as one aligned panel
+            benchmark = '^GSPC'
+            panel = None
+            try:
+                panel = self.optimizer.price_panels.load(list(weights) + [benchmark], period=f"{days}d")
+            except Exception as e:
+                self.logger.warning(f"Error getting historical data: {str(e)}")
+            
+            held = [symbol for symbol in weights if panel is not None and symbol in panel.index]
+            if not held:
                 return {
                     'success': False,
                     'message': "Could not get historical data for any holdings"
                 }
             
-            # Create a date index for all dates in the period
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            date_range = pd.date_range(start=start_date, end=end_date, freq='B')  # Business days
+            # Daily returns as an (n_symbols, n_days) matrix; days before a listing count as flat
+            returns = np.nan_to_num(panel.returns(), nan=0.0)
+            rows = [panel.index[symbol] for symbol in held]
+            contributions = returns[rows] * np.array([weights[symbol] for symbol in held])[:, None]
             
-            # Create portfolio performance dataframe
-            portfolio_df = pd.DataFrame(index=date_range)
-            portfolio_df['Portfolio'] = 0
-            
-            # Add each stock's contribution to the portfolio
-            for symbol, data in historical_data.items():
-                prices = data['prices']
-                weight = data['weight']
-                
-                # Convert stock data to Series
-                if isinstance(prices, list):
-                    # Convert list of dicts to Series
-                    stock_series = pd.Series(index=date_range)
-                    for price_data in prices:
-                        date = pd.to_datetime(price_data.get('date'))
-                        if date in stock_series.index:
-                            stock_series[date] = price_data.get('close', 0)
-                    
-                    # Forward fill missing values
-                    stock_series = stock_series.fillna(method='ffill')
-                elif isinstance(prices, pd.Series):
-                    stock_series = prices
-                else:
-                    continue
-                
-                # Calculate daily returns
-                stock_returns = stock_series.pct_change().fillna(0)
-                
-                # Add weighted contribution to portfolio
-                portfolio_df[symbol] = stock_returns * weight
-                portfolio_df['Portfolio'] += portfolio_df[symbol]
+            # Create portfolio performance dataframe with each stock's weighted contribution
+            portfolio_df = pd.DataFrame(contributions.T, index=pd.DatetimeIndex(panel.dates[1:]), columns=held)
+            portfolio_df['Portfolio'] = contributions.sum(axis=0)
             
             # Calculate cumulative returns
             portfolio_df['Cumulative'] = (1 + portfolio_df['Portfolio']).cumprod()
@@ -742,28 +711,10 @@ class PortfolioManager:
             portfolio_df['Rolling_Volatility'] = portfolio_df['Portfolio'].rolling(window=20).std() * np.sqrt(252)
             portfolio_df['Rolling_Sharpe'] = (portfolio_df['Portfolio'].rolling(window=20).mean() * 252) / portfolio_df['Rolling_Volatility']
             
-            # Get benchmark data (S&P 500)
-            try:
-                benchmark_data = self.analyzer.get_historical_prices('^GSPC', days=days)
-                if benchmark_data is not None:
-                    # Convert to Series
-                    if isinstance(benchmark_data, list):
-                        benchmark_series = pd.Series(index=date_range)
-                        for price_data in benchmark_data:
-                            date = pd.to_datetime(price_data.get('date'))
-                            if date in benchmark_series.index:
-                                benchmark_series[date] = price_data.get('close', 0)
-                        
-                        benchmark_series = benchmark_series.fillna(method='ffill')
-                    elif isinstance(benchmark_data, pd.Series):
-                        benchmark_series = benchmark_data
-                    
-                    # Calculate benchmark returns
-                    benchmark_returns = benchmark_series.pct_change().fillna(0)
-                    portfolio_df['Benchmark'] = benchmark_returns
-                    portfolio_df['Benchmark_Cumulative'] = (1 + portfolio_df['Benchmark']).cumprod()
-            except Exception as e:
-                self.logger.warning(f"Error getting benchmark data: {str(e)}")
+            # Benchmark returns from the same panel
+            if benchmark in panel.index:
+                portfolio_df['Benchmark'] = returns[panel.index[benchmark]]
+                portfolio_df['Benchmark_Cumulative'] = (1 + portfolio_df['Benchmark']).cumprod()
             
             # Calculate performance metrics
             performance_metrics = {
@@ -5,7 +5,8 @@ import pandas as pd
 import warnings
 from scipy.optimize import minimize
 from typing import Dict, List, Tuple
-import yfinance as yf
+
+from portfolio.price_panel import PricePanelLoader, period_days
 
 class PortfolioOptimizer:
     def __init__(self):
@@ -13,44 +14,51 @@ class PortfolioOptimizer:
         self.min_weight = 0.03
         self.max_weight = 0.25
         self.user_min_weights = {}  # Add this to store user-specified minimums
+        self.price_panels = PricePanelLoader()
+        self._last_panel = None  # Panel behind the latest get_historical_data call
+        self._last_panel_days = 0  # Calendar days that panel was loaded for
 
     def get_historical_data(self, symbols: List[str], period: str = '1y') -> pd.DataFrame:
-        """Fetch historical data for multiple symbols"""
-        data = pd.DataFrame()
+        """Fetch aligned daily closes for multiple symbols in one batched download"""
         valid_symbols = []
-
         for symbol in symbols:
-            try:
-                # Skip crypto symbols
-                if symbol.upper() in ['BTC', 'GBTC']:
-                    print(f"Skipping {symbol} - cryptocurrency not supported in optimization")
-                    continue
-                    
-                stock = yf.Ticker(symbol)
-                hist = stock.history(period=period)
-                if not hist.empty:
-                    data[symbol] = hist['Close']
-                    valid_symbols.append(symbol)
-                else:
-                    print(f"No data available for {symbol}")
-            except Exception as e:
-                print(f"Error fetching data for {symbol}: {str(e)}")
-                
-        # Return both the data and valid symbols list to ensure consistent symbols throughout
-        return data[valid_symbols]  # Only keep columns for valid symbols
+            # Skip crypto symbols
+            if symbol.upper() in ['BTC', 'GBTC']:
+                print(f"Skipping {symbol} - cryptocurrency not supported in optimization")
+                continue
+            valid_symbols.append(symbol)
+
+        try:
+            panel = self.price_panels.load(valid_symbols, period=period)
+        except Exception as e:
+            print(f"Error fetching data for {', '.join(valid_symbols)}: {str(e)}")
+            return pd.DataFrame()
+
+        for symbol in valid_symbols:
+            if symbol.upper() not in panel.index:
+                print(f"No data available for {symbol}")
+
+        self._last_panel = panel
+        self._last_panel_days = period_days(period)
+        # Only columns for symbols with data, so symbols stay consistent throughout
+        return panel.frame('close')
 
     def get_dividend_yields(self, symbols: List[str]) -> Dict[str, float]:
-        """Get current dividend yields for symbols"""
-        yields = {}
-        for symbol in symbols:
+        """Trailing twelve-month dividend yields computed from the price panel"""
+        # The panel from get_historical_data is only reused when it spans a full
+        # year; a shorter one would leave out part of the trailing dividends
+        panel = self._last_panel
+        if (panel is None or self._last_panel_days < 365
+                or any(symbol.upper() not in panel.index for symbol in symbols)):
             try:
-                stock = yf.Ticker(symbol)
-                info = stock.info
-                yields[symbol] = info.get('dividendYield', 0) or 0
+                panel = self.price_panels.load(symbols, period='1y')
             except Exception as e:
-                print(f"Error fetching dividend yield for {symbol}: {str(e)}")
-                yields[symbol] = 0
-        return yields
+                print(f"Error fetching dividend yields: {str(e)}")
+                return {symbol: 0 for symbol in symbols}
+
+        panel = panel.select(symbols)
+        yields = dict(zip(panel.symbols, panel.dividend_yields()))
+        return {symbol: float(yields.get(symbol.upper(), 0)) for symbol in symbols}
 
     def calculate_portfolio_return(self, returns: pd.DataFrame, weights: np.array) -> float:
         """Calculate annualized portfolio return"""
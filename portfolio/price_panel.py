@@ -0,0 +1,304 @@
+"""
+Aligned multi-symbol price panels for portfolio optimization and monitoring
+
+``PricePanelLoader.load`` fetches close, volume and dividends for a whole
+universe with one batched ``yf.download`` call, aligns them on the union of
+the symbols' trading days and keeps each field as a contiguous float64 matrix
+of shape (n_symbols, n_bars), the layout used by ``analysis.indicators``.
+
+Panels are cached on disk keyed by (universe, range). A cached panel that is
+behind the latest business day is extended by downloading only the bars after
+its last stored bar; rolling ranges such as ``'1y'`` then drop the bars that
+fell out of the window.
+"""
+
+import hashlib
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+logger = logging.getLogger(__name__)
+
+
+class PricePanel:
+    """
+    Daily close, volume and dividends for many symbols on one date index.
+
+    Closes are forward-filled across days a symbol did not trade and are NaN
+    before its first bar; volume and dividends are zero on days without data.
+    """
+
+    FIELDS = ('close', 'volume', 'dividends')
+
+    def __init__(self, symbols: Sequence[str], dates: np.ndarray, close: np.ndarray,
+                 volume: np.ndarray, dividends: np.ndarray, fetched_at: Optional[float] = None):
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.dates = np.asarray(dates).astype('datetime64[D]')
+        self.index = {symbol: row for row, symbol in enumerate(self.symbols)}
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        self.volume = np.ascontiguousarray(volume, dtype=np.float64)
+        self.dividends = np.ascontiguousarray(dividends, dtype=np.float64)
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        for name in self.FIELDS:
+            if getattr(self, name).shape != (len(self.symbols), len(self.dates)):
+                raise ValueError(f"{name} must have shape (n_symbols, n_bars)")
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def last_date(self) -> Optional[np.datetime64]:
+        return self.dates[-1] if len(self.dates) else None
+
+    def select(self, symbols: Sequence[str]) -> 'PricePanel':
+        """Rows for the given symbols, in that order; symbols not in the panel are skipped"""
+        rows = [self.index[s.upper()] for s in symbols if s.upper() in self.index]
+        return PricePanel([self.symbols[row] for row in rows], self.dates, self.close[rows],
+                          self.volume[rows], self.dividends[rows], self.fetched_at)
+
+    def since(self, start) -> 'PricePanel':
+        """Bars on or after start"""
+        keep = self.dates >= np.datetime64(pd.Timestamp(start).date(), 'D')
+        return PricePanel(self.symbols, self.dates[keep], self.close[:, keep],
+                          self.volume[:, keep], self.dividends[:, keep], self.fetched_at)
+
+    def returns(self) -> np.ndarray:
+        """Simple daily returns, shape (n_symbols, n_bars - 1); NaN before a symbol's first bar"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.close[:, 1:] / self.close[:, :-1] - 1.0
+
+    def frame(self, field: str = 'close') -> pd.DataFrame:
+        """One field as a DataFrame indexed by date with a column per symbol"""
+        return pd.DataFrame(getattr(self, field).T, index=pd.DatetimeIndex(self.dates), columns=self.symbols)
+
+    def dividend_yields(self, days: int = 365) -> np.ndarray:
+        """Trailing dividends over the last ``days`` calendar days divided by the latest close"""
+        if not len(self.dates):
+            return np.zeros(len(self.symbols))
+        recent = self.dates > self.dates[-1] - np.timedelta64(days, 'D')
+        paid = self.dividends[:, recent].sum(axis=1)
+        last_close = self.close[:, -1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            yields = paid / last_close
+        return np.where(np.isfinite(yields), yields, 0.0)
+
+
+def _period_start(period: str, end: pd.Timestamp) -> pd.Timestamp:
+    """Start of a yfinance-style period ('30d', '6mo', '1y', '5y') ending at end"""
+    period = period.strip().lower()
+    for suffix, unit in (('mo', 'months'), ('y', 'years'), ('d', 'days'), ('wk', 'weeks')):
+        if period.endswith(suffix):
+            amount = int(period[:-len(suffix)] or 1)
+            return end - pd.DateOffset(**{unit: amount})
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def period_days(period: str) -> int:
+    """Calendar days covered by a yfinance-style period ending today"""
+    end = pd.Timestamp.now().normalize()
+    return (end - _period_start(period, end)).days
+
+
+def _last_business_day(now: Optional[datetime] = None) -> np.datetime64:
+    today = np.datetime64(pd.Timestamp(now or datetime.now()).date(), 'D')
+    return np.busday_offset(today, 0, roll='backward')
+
+
+class PricePanelLoader:
+    """
+    Loads and caches ``PricePanel`` objects.
+
+    A panel younger than ``refresh_interval`` seconds, or already holding the
+    latest business day, is returned from the cache without any network call.
+    """
+
+    def __init__(self, cache_dir: str = './cache/price_panels', refresh_interval: float = 3600,
+                 download=None):
+        """
+        Args:
+            cache_dir: Directory for cached panels (None keeps panels in memory only)
+            refresh_interval: Seconds before a cached panel is checked for new bars
+            download: Optional replacement for yf.download (same signature)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = cache_dir
+        self.refresh_interval = refresh_interval
+        self._download_fn = download or yf.download
+        self._memory: Dict[str, PricePanel] = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def cache_key(symbols: Sequence[str], range_label: str) -> str:
+        universe = ','.join(sorted({s.upper() for s in symbols}))
+        return hashlib.sha1(f"{universe}|{range_label}".encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Optional[str]:
+        return os.path.join(self.cache_dir, f"{key}.npz") if self.cache_dir else None
+
+    def load(self, symbols: Sequence[str], period: Optional[str] = '1y', start=None, end=None,
+             force_refresh: bool = False) -> PricePanel:
+        """
+        Aligned panel for symbols over a rolling period or a fixed date range.
+
+        Args:
+            symbols: Ticker symbols
+            period: Rolling window ending today ('30d', '6mo', '1y', ...); ignored when start is given
+            start: Optional first date of a fixed range
+            end: Optional last date of a fixed range (defaults to today)
+            force_refresh: Download the whole range even when a cached panel exists
+
+        Returns:
+            PricePanel with the requested symbols that have data, in request order
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols if s))
+        if not symbols:
+            return PricePanel([], np.array([], dtype='datetime64[D]'), np.empty((0, 0)),
+                              np.empty((0, 0)), np.empty((0, 0)))
+
+        end_ts = pd.Timestamp(end).normalize() if end is not None else pd.Timestamp(datetime.now().date())
+        if start is not None:
+            start_ts = pd.Timestamp(start).normalize()
+            range_label = f"{start_ts.date()}:{end_ts.date() if end is not None else 'now'}"
+        else:
+            start_ts = _period_start(period, end_ts)
+            range_label = period
+        key = self.cache_key(symbols, range_label)
+
+        cached = None if force_refresh else self._read(key)
+        panel = cached
+        if panel is None:
+            panel = self._download(symbols, start_ts, end_ts)
+        elif end is None and self._is_stale(panel):
+            panel = self._extend(panel, start_ts, end_ts)
+
+        if panel is not cached:
+            if start is None:
+                panel = panel.since(start_ts)
+            self._write(key, panel)
+        return panel.select(symbols)
+
+    def _is_stale(self, panel: PricePanel) -> bool:
+        if time.time() - panel.fetched_at < self.refresh_interval:
+            return False
+        return panel.last_date is None or panel.last_date < _last_business_day()
+
+    def _extend(self, panel: PricePanel, start_ts: pd.Timestamp, end_ts: pd.Timestamp) -> PricePanel:
+        """
+        Append the bars after the panel's last bar.
+
+        The download starts at the second-to-last stored bar: the last stored
+        bar may have been partial, and the (final) bar before it is compared
+        with the fresh data. A mismatch means the adjusted history changed (a
+        dividend or split), so the whole range is downloaded again.
+        """
+        symbols = panel.symbols
+        if len(panel) < 2:
+            return self._download(symbols, start_ts, end_ts)
+
+        overlap = panel.dates[-2]
+        fresh = self._download(symbols, pd.Timestamp(overlap), end_ts, keep_empty=True).select(symbols)
+        if not len(fresh) or fresh.dates[0] != overlap or not np.allclose(
+                fresh.close[:, 0], panel.close[:, -2], rtol=1e-4, equal_nan=True):
+            return self._download(symbols, start_ts, end_ts)
+
+        keep = panel.dates < overlap
+        close = _forward_fill(np.concatenate([panel.close[:, keep], fresh.close], axis=1))
+        return PricePanel(symbols, np.concatenate([panel.dates[keep], fresh.dates]), close,
+                          np.concatenate([panel.volume[:, keep], fresh.volume], axis=1),
+                          np.concatenate([panel.dividends[:, keep], fresh.dividends], axis=1))
+
+    def _download(self, symbols: List[str], start_ts: pd.Timestamp, end_ts: pd.Timestamp,
+                  keep_empty: bool = False) -> PricePanel:
+        """One batched download aligned on the union of the symbols' trading days"""
+        self.logger.info(f"Downloading {len(symbols)} symbols from {start_ts.date()} to {end_ts.date()}")
+        data = self._download_fn(symbols, start=start_ts.strftime('%Y-%m-%d'),
+                                 end=(end_ts + pd.Timedelta(days=1)).strftime('%Y-%m-%d'),
+                                 interval='1d', actions=True, auto_adjust=True, group_by='column',
+                                 progress=False, threads=True)
+        columns = _field_columns(data, symbols)
+        close_frame = columns.get('Close')
+        if close_frame is None or close_frame.empty:
+            if keep_empty:
+                empty = np.empty((len(symbols), 0))
+                return PricePanel(symbols, np.array([], dtype='datetime64[D]'), empty, empty, empty)
+            raise ValueError("No price data returned for any symbol")
+
+        dates = close_frame.index
+        dates = dates.tz_localize(None) if getattr(dates, 'tz', None) is not None else dates
+        traded = close_frame.notna().any(axis=0)
+        found = symbols if keep_empty else [s for s in symbols if s in traded.index and traded[s]]
+        if not found:
+            raise ValueError("No price data returned for any symbol")
+
+        def matrix(name: str, fill: float) -> np.ndarray:
+            frame = columns.get(name)
+            if frame is None:
+                return np.full((len(found), len(dates)), fill)
+            return frame.reindex(columns=found).to_numpy(dtype=np.float64).T
+
+        close = _forward_fill(matrix('Close', np.nan))
+        volume = np.nan_to_num(matrix('Volume', 0.0))
+        dividends = np.nan_to_num(matrix('Dividends', 0.0))
+        return PricePanel(found, dates.values.astype('datetime64[D]'), close, volume, dividends)
+
+    def _read(self, key: str) -> Optional[PricePanel]:
+        panel = self._memory.get(key)
+        if panel is not None:
+            return panel
+        path = self._path(key)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                panel = PricePanel([str(s) for s in stored['symbols']], stored['dates'], stored['close'],
+                                   stored['volume'], stored['dividends'], float(stored['fetched_at']))
+            self._memory[key] = panel
+            return panel
+        except Exception as e:
+            self.logger.warning(f"Discarding unreadable price panel {path}: {str(e)}")
+            return None
+
+    def _write(self, key: str, panel: PricePanel) -> None:
+        self._memory[key] = panel
+        path = self._path(key)
+        if path is None:
+            return
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, symbols=np.array(panel.symbols), dates=panel.dates, close=panel.close,
+                         volume=panel.volume, dividends=panel.dividends, fetched_at=np.float64(panel.fetched_at))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.logger.warning(f"Could not cache price panel {path}: {str(e)}")
+
+
+def _field_columns(data: Optional[pd.DataFrame], symbols: List[str]) -> Dict[str, pd.DataFrame]:
+    """Split a yf.download result into one (dates x symbols) frame per field"""
+    if data is None or data.empty:
+        return {}
+    if isinstance(data.columns, pd.MultiIndex):
+        return {name: data[name] for name in data.columns.get_level_values(0).unique()}
+    # Single-symbol downloads from older yfinance versions have flat columns
+    return {name: data[[name]].set_axis(symbols[:1], axis=1) for name in data.columns}
+
+
+def _forward_fill(matrix: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs along the bar axis of an (n_symbols, n_bars) matrix"""
+    if matrix.size == 0:
+        return matrix
+    mask = np.isnan(matrix)
+    if not mask.any():
+        return matrix
+    positions = np.where(mask, 0, np.arange(matrix.shape[1]))
+    np.maximum.accumulate(positions, axis=1, out=positions)
+    filled = matrix[np.arange(matrix.shape[0])[:, None], positions]
+    # Leading gaps stay NaN (position 0 was itself NaN)
+    return filled
@@ -0,0 +1,120 @@
+"""
+Background Job API Routes
+
+- POST /api/jobs                  submit a job ({"kind": ..., "params": {...}})
+- GET  /api/jobs                  list the current user's jobs
+- GET  /api/jobs/<job_id>         job status and per-stage progress
+- GET  /api/jobs/<job_id>/result  job result once it has succeeded
+- POST /api/jobs/<job_id>/cancel  cancel a queued or running job
+"""
+
+from flask import Blueprint, request, jsonify, url_for
+from flask_login import login_required, current_user
+import logging
+
+from jobs import JobStore, registered_kinds, SUCCEEDED, FAILED, CANCELLED
+import jobs.handlers  # noqa: F401  (registers the built-in job kinds)
+from utils.json_utils import make_json_serializable
+
+logger = logging.getLogger(__name__)
+
+# Initialize Blueprint
+jobs_bp = Blueprint('jobs', __name__)
+
+job_store = JobStore()
+
+# Jobs that act on the submitting user's data always run as that user
+USER_SCOPED_KINDS = {'portfolio_optimize', 'portfolio_margin_review'}
+
+
+def wants_background() -> bool:
+    """True when the request asks for the work to run as a background job."""
+    return request.values.get('async', '').lower() in ('1', 'true', 'yes')
+
+
+def _status_payload(status):
+    payload = dict(status)
+    payload['status_url'] = url_for('jobs.job_status', job_id=status['job_id'])
+    payload['result_url'] = url_for('jobs.job_result', job_id=status['job_id'])
+    payload['cancel_url'] = url_for('jobs.cancel_job', job_id=status['job_id'])
+    return payload
+
+
+def submit_job(kind: str, params: dict):
+    """
+    Submit a job for the current user and build the 202 response.
+
+    Returns:
+        Flask response tuple
+    """
+    params = dict(params or {})
+    if kind in USER_SCOPED_KINDS or 'user_id' in params:
+        params['user_id'] = current_user.id
+    status = job_store.submit(kind, params, owner=current_user.id)
+    return jsonify({'success': True, 'job': _status_payload(status)}), 202
+
+
+def _owned_job(job_id: str):
+    status = job_store.get(job_id)
+    if status is None or status['owner'] != str(current_user.id):
+        return None
+    return status
+
+
+@jobs_bp.route('/api/jobs', methods=['POST'])
+@login_required
+def create_job():
+    """Submit a background job"""
+    data = request.get_json(silent=True) or {}
+    kind = data.get('kind')
+    if kind not in registered_kinds():
+        return jsonify({'success': False, 'error': f"Unknown job kind: {kind}",
+                        'kinds': registered_kinds()}), 400
+    try:
+        return submit_job(kind, data.get('params') or {})
+    except Exception as e:
+        logger.error(f"Error submitting {kind} job: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@jobs_bp.route('/api/jobs', methods=['GET'])
+@login_required
+def list_jobs():
+    """List the current user's recent jobs"""
+    limit = min(request.args.get('limit', 50, type=int), 200)
+    return jsonify({'success': True, 'jobs': job_store.list_jobs(owner=current_user.id, limit=limit)})
+
+
+@jobs_bp.route('/api/jobs/<job_id>', methods=['GET'])
+@login_required
+def job_status(job_id):
+    """Job status with the current stage and progress"""
+    status = _owned_job(job_id)
+    if status is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': _status_payload(status)})
+
+
+@jobs_bp.route('/api/jobs/<job_id>/result', methods=['GET'])
+@login_required
+def job_result(job_id):
+    """Job result; 202 while the job is still queued or running"""
+    status = _owned_job(job_id)
+    if status is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    if status['status'] == SUCCEEDED:
+        return jsonify({'success': True, 'job': _status_payload(status),
+                        'result': make_json_serializable(job_store.result(job_id))})
+    if status['status'] in (FAILED, CANCELLED):
+        return jsonify({'success': False, 'job': _status_payload(status),
+                        'error': status['error'] or status['status']}), 409
+    return jsonify({'success': True, 'job': _status_payload(status)}), 202
+
+
+@jobs_bp.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+@login_required
+def cancel_job(job_id):
+    """Cancel a queued job, or ask a running job to stop at its next stage"""
+    if _owned_job(job_id) is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': _status_payload(job_store.cancel(job_id))})
@@ -12,6 +12,8 @@ from typing import Dict, Any, Optional
 from functools import wraps
 import time
 
+from caching import TieredCache
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -41,39 +43,26 @@ def retry_on_failure(max_retries=3, delay=1):
     return decorator
 
 class CacheManager:
-    """Simple in-memory cache for API responses"""
+    """In-memory cache for API responses backed by a bounded LRU tier"""
     
-    def __init__(self):
-        self._cache = {}
-        self._timestamps = {}
+    def __init__(self, max_entries: int = 1000):
+        self._cache = TieredCache('api_client', max_entries=max_entries)
     
     def get(self, key: str, max_age_minutes: int = 30) -> Optional[Any]:
         """Get cached value if it exists and is not expired"""
-        if key not in self._cache:
-            return None
-        
-        timestamp = self._timestamps.get(key)
-        if not timestamp:
-            return None
-        
-        age = datetime.now() - timestamp
-        if age > timedelta(minutes=max_age_minutes):
-            # Cache expired
-            del self._cache[key]
-            del self._timestamps[key]
-            return None
-        
-        return self._cache[key]
+        return self._cache.get(key, max_age=max_age_minutes * 60)
     
     def set(self, key: str, value: Any):
         """Cache a value with current timestamp"""
-        self._cache[key] = value
-        self._timestamps[key] = datetime.now()
+        self._cache.set(key, value)
     
     def clear(self):
         """Clear all cached data"""
         self._cache.clear()
-        self._timestamps.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss and size metrics"""
+        return self._cache.get_stats()
 
 class UnifiedAPIClient:
     """
@@ -5,12 +5,13 @@ Buffer between price and intrinsic value for protection against mistakes, bad lu
 """
 
 import logging
+import time
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
 import numpy as np
-from .valuation_engine import ValuationEngine, ValuationResult
+from .valuation_engine import ValuationEngine, ValuationResult, FinancialSnapshot
 from monitoring.performance import monitor_performance, metrics_collector
 
 logger = logging.getLogger(__name__)
@@ -79,28 +80,34 @@ class MarginOfSafetyCalculator:
         }
     
     @monitor_performance
-    def analyze_margin_of_safety(self, symbol: str, valuation_method: str = 'dcf') -> MarginOfSafetyResult:
+    def analyze_margin_of_safety(self, symbol: str, valuation_method: str = 'dcf',
+                                 snapshot: Optional[FinancialSnapshot] = None) -> MarginOfSafetyResult:
         """
         Comprehensive margin of safety analysis
         
         Args:
             symbol: Stock symbol
             valuation_method: 'dcf', 'graham', 'nav', or 'all'
+            snapshot: Preloaded financial snapshot shared by every step of the analysis
+                (loaded once here if omitted)
         """
         try:
             logger.info(f"Analyzing margin of safety for {symbol} using {valuation_method} method")
             
+            if valuation_method not in ('dcf', 'graham', 'nav', 'all'):
+                raise ValueError(f"Unknown valuation method: {valuation_method}")
+            if snapshot is None or snapshot.symbol != symbol:
+                snapshot = self.valuation_engine.load_snapshot(symbol)
+            
             # Get intrinsic value based on method
             if valuation_method == 'dcf':
-                valuation_result = self.valuation_engine.calculate_dcf_valuation(symbol)
+                valuation_result = self.valuation_engine.calculate_dcf_valuation(symbol, snapshot=snapshot)
             elif valuation_method == 'graham':
-                valuation_result = self.valuation_engine.calculate_graham_valuation(symbol)
+                valuation_result = self.valuation_engine.calculate_graham_valuation(symbol, snapshot=snapshot)
             elif valuation_method == 'nav':
-                valuation_result = self.valuation_engine.calculate_nav_valuation(symbol)
-            elif valuation_method == 'all':
-                return self._analyze_all_methods(symbol)
+                valuation_result = self.valuation_engine.calculate_nav_valuation(symbol, snapshot=snapshot)
             else:
-                raise ValueError(f"Unknown valuation method: {valuation_method}")
+                return self._analyze_all_methods(symbol, snapshot)
             
             # Assess company quality
             company_quality = self._assess_company_quality(symbol)
@@ -152,13 +159,17 @@ class MarginOfSafetyCalculator:
             logger.error(f"Margin of safety analysis failed for {symbol}: {str(e)}")
             return self._create_error_result(symbol, str(e))
     
-    def _analyze_all_methods(self, symbol: str) -> MarginOfSafetyResult:
+    def _analyze_all_methods(self, symbol: str, snapshot: Optional[FinancialSnapshot] = None) -> MarginOfSafetyResult:
         """Analyze using all valuation methods and provide consensus"""
         try:
+            # Every method reads the same snapshot instead of re-fetching
+            if snapshot is None or snapshot.symbol != symbol:
+                snapshot = self.valuation_engine.load_snapshot(symbol)
+            
             # Get all valuations
-            dcf_result = self.valuation_engine.calculate_dcf_valuation(symbol)
-            graham_result = self.valuation_engine.calculate_graham_valuation(symbol)
-            nav_result = self.valuation_engine.calculate_nav_valuation(symbol)
+            dcf_result = self.valuation_engine.calculate_dcf_valuation(symbol, snapshot=snapshot)
+            graham_result = self.valuation_engine.calculate_graham_valuation(symbol, snapshot=snapshot)
+            nav_result = self.valuation_engine.calculate_nav_valuation(symbol, snapshot=snapshot)
             
             # Calculate consensus intrinsic value (weighted average)
             valuations = [
@@ -215,6 +226,137 @@ class MarginOfSafetyCalculator:
             logger.error(f"All-methods analysis failed for {symbol}: {str(e)}")
             return self._create_error_result(symbol, str(e))
     
+    @staticmethod
+    def _portfolio_symbols(holdings: Any) -> List[str]:
+        """Symbols from a list of symbols, a Portfolio row or its stocks JSON"""
+        if hasattr(holdings, 'stocks'):
+            holdings = holdings.stocks
+        if isinstance(holdings, dict):
+            holdings = holdings.get('holdings', [])
+        
+        symbols = []
+        for holding in holdings or []:
+            symbol = holding if isinstance(holding, str) else (holding or {}).get('symbol')
+            if symbol:
+                symbols.append(str(symbol).upper())
+        return list(dict.fromkeys(symbols))
+    
+    @monitor_performance
+    def analyze_many(self, holdings: Any, valuation_method: str = 'all',
+                     portfolio_value: Optional[float] = None, max_position_percent: float = 0.05,
+                     max_workers: int = 8) -> Dict[str, Any]:
+        """
+        Margin of safety screen for many symbols at once
+        
+        Snapshots are loaded concurrently, DCF/Graham/NAV are evaluated as array
+        operations across all symbols, and the results are ranked by margin of
+        safety (highest first).
+        
+        Args:
+            holdings: List of symbols, a Portfolio row, or its stocks JSON
+            valuation_method: 'dcf', 'graham', 'nav', or 'all' (weighted consensus)
+            portfolio_value: When given, each row includes a position size
+            max_position_percent: Maximum portfolio share of a single position
+            max_workers: Maximum concurrent data loads
+            
+        Returns:
+            Dict with ranked 'results' rows, 'failed' symbols and a 'summary'
+        """
+        start_time = time.time()
+        weights = {'dcf': 0.5, 'graham': 0.3, 'nav': 0.2}
+        if valuation_method not in ('dcf', 'graham', 'nav', 'all'):
+            raise ValueError(f"Unknown valuation method: {valuation_method}")
+        
+        symbols = self._portfolio_symbols(holdings)
+        if not symbols:
+            return {'success': False, 'message': 'No symbols to analyze', 'results': [], 'failed': []}
+        
+        snapshots = list(self.valuation_engine.load_snapshots(symbols, max_workers=max_workers).values())
+        values = self.valuation_engine.batch_intrinsic_values(snapshots)
+        prices = values['current_price']
+        
+        if valuation_method == 'all':
+            method_values = np.column_stack([values[method] for method in weights])
+            method_weights = np.where(method_values > 0, np.array(list(weights.values())), 0.0)
+            total_weight = method_weights.sum(axis=1)
+            intrinsic = np.where(total_weight > 0,
+                                 (method_values * method_weights).sum(axis=1) / np.where(total_weight > 0, total_weight, 1.0),
+                                 0.0)
+        else:
+            intrinsic = values[valuation_method]
+        
+        valid = (intrinsic > 0) & (prices > 0)
+        margins = np.where(valid, (intrinsic - prices) / np.where(valid, intrinsic, 1.0) * 100, 0.0).round(2)
+        
+        rows, failed = [], []
+        for index, snapshot in enumerate(snapshots):
+            symbol = snapshot.symbol
+            if not valid[index]:
+                failed.append({'symbol': symbol,
+                               'error': 'No market price' if prices[index] <= 0 else 'No valid intrinsic value'})
+                continue
+            
+            margin_percentage = float(margins[index])
+            company_quality = self._assess_company_quality(symbol)
+            safety_level = self._determine_safety_level(margin_percentage)
+            recommended_margin = self.quality_margins[company_quality] * 100
+            
+            result = MarginOfSafetyResult(
+                symbol=symbol,
+                intrinsic_value=float(intrinsic[index]),
+                current_price=float(prices[index]),
+                margin_percentage=margin_percentage,
+                safety_level=safety_level,
+                company_quality=company_quality,
+                recommended_margin=recommended_margin,
+                recommendation=self._generate_recommendation(margin_percentage, safety_level,
+                                                             company_quality, recommended_margin),
+                risk_assessment={'overall_risk_score': self._calculate_overall_risk_score(company_quality, margin_percentage)},
+                quality_factors=self._get_quality_factors(symbol),
+                timestamp=datetime.now()
+            )
+            
+            row = {
+                'symbol': symbol,
+                'intrinsic_value': result.intrinsic_value,
+                'current_price': result.current_price,
+                'margin_percentage': margin_percentage,
+                'safety_level': safety_level.value,
+                'company_quality': company_quality.value,
+                'recommended_margin': recommended_margin,
+                'meets_required_margin': margin_percentage >= recommended_margin,
+                'valuations': {method: float(values[method][index]) for method in weights},
+                'recommendation': result.recommendation,
+                'overall_risk': result.risk_assessment['overall_risk_score']
+            }
+            if portfolio_value:
+                row['position'] = self.calculate_position_size(result, portfolio_value, max_position_percent)
+            rows.append(row)
+        
+        rows.sort(key=lambda row: row['margin_percentage'], reverse=True)
+        for rank, row in enumerate(rows, 1):
+            row['rank'] = rank
+        
+        safety_counts: Dict[str, int] = {}
+        for row in rows:
+            safety_counts[row['safety_level']] = safety_counts.get(row['safety_level'], 0) + 1
+        
+        metrics_collector.record_feature_usage('batch_margin_safety_analysis')
+        return {
+            'success': True,
+            'valuation_method': valuation_method,
+            'results': rows,
+            'failed': failed,
+            'summary': {
+                'analyzed': len(rows),
+                'failed': len(failed),
+                'average_margin': float(np.mean([row['margin_percentage'] for row in rows])) if rows else 0.0,
+                'meeting_required_margin': sum(1 for row in rows if row['meets_required_margin']),
+                'by_safety_level': safety_counts
+            },
+            'processing_time': time.time() - start_time
+        }
+    
     def _assess_company_quality(self, symbol: str) -> CompanyQuality:
         """
         Assess company quality based on fundamental metrics
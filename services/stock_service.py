@@ -13,6 +13,7 @@ import logging
 from models import db, StockAnalysis, User, StockPreference
 from .api_client import UnifiedAPIClient
 from analysis.enhanced_stock_analyzer import EnhancedStockAnalyzer
+from analysis.indicators import rolling_mean, rsi
 from ml_components.adaptive_learning_db import AdaptiveLearningDB
 
 logger = logging.getLogger(__name__)
@@ -111,12 +112,10 @@ class StockService:
             signals = []
             
             # Calculate moving averages
-            df['MA_20'] = df['Close'].rolling(window=20).mean()
-            df['MA_50'] = df['Close'].rolling(window=min(50, len(df))).mean()
-            
-            current_price = df['Close'].iloc[-1]
-            ma_20 = df['MA_20'].iloc[-1]
-            ma_50 = df['MA_50'].iloc[-1]
+            close = df['Close'].to_numpy(dtype=float)
+            current_price = close[-1]
+            ma_20 = rolling_mean(close, 20)[-1]
+            ma_50 = rolling_mean(close, min(50, len(close)))[-1]
             
             indicators['ma_20'] = ma_20
             indicators['ma_50'] = ma_50
@@ -134,12 +133,7 @@ class StockService:
                 signals.append({'type': 'bearish', 'indicator': 'MA_Cross', 'message': '20-day MA below 50-day MA'})
             
             # Calculate RSI
-            delta = df['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            current_rsi = rsi.iloc[-1]
+            current_rsi = rsi(close, 14)[-1]
             
             indicators['rsi'] = current_rsi
             
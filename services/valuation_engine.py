@@ -9,7 +9,8 @@ import pandas as pd
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
 from .api_client import UnifiedAPIClient
 from monitoring.performance import monitor_performance, metrics_collector
 import requests
@@ -39,6 +40,19 @@ class ValuationResult:
     calculation_details: Dict[str, Any]
     timestamp: datetime
 
+@dataclass
+class FinancialSnapshot:
+    """
+    Request-scoped inputs for one symbol, loaded once and shared by every
+    valuation method (and the margin of safety analysis) for that request
+    """
+    symbol: str
+    financial_data: Dict[str, Any]
+    current_price: float
+    historical_eps: List[float]
+    macro_analysis: Optional[Dict[str, Any]] = None  # Filled in by the first DCF valuation
+    loaded_at: datetime = field(default_factory=datetime.now)
+
 class MacroEconomicAnalyzer:
     """Analyzes macroeconomic factors affecting company revenues"""
     
@@ -199,8 +213,142 @@ class ValuationEngine:
             'forecast_years': 5
         }
     
+    def load_snapshot(self, symbol: str) -> FinancialSnapshot:
+        """
+        Load a symbol's statements, price and EPS history with a single quote fetch
+        
+        Pass the snapshot to the calculate_* methods so that valuing a symbol
+        several ways does not hit the data providers once per method.
+        
+        Args:
+            symbol: Stock symbol
+            
+        Returns:
+            FinancialSnapshot for the symbol
+        """
+        try:
+            stock_data = self.api_client.get_stock_data(symbol)
+        except Exception as e:
+            logger.error(f"Error loading market data for {symbol}: {str(e)}")
+            stock_data = None
+        
+        return FinancialSnapshot(
+            symbol=symbol,
+            financial_data=self._get_financial_data(symbol, stock_data) if stock_data is not None else {},
+            current_price=self._get_current_price(symbol, stock_data) if stock_data is not None else 0.0,
+            historical_eps=self._get_historical_eps(symbol, years=10)
+        )
+    
+    def _resolve_snapshot(self, symbol: str, snapshot: Optional[FinancialSnapshot]) -> FinancialSnapshot:
+        if snapshot is not None and snapshot.symbol == symbol:
+            return snapshot
+        return self.load_snapshot(symbol)
+    
+    def _macro_analysis(self, snapshot: FinancialSnapshot) -> Dict[str, Any]:
+        if snapshot.macro_analysis is None:
+            snapshot.macro_analysis = self.macro_analyzer.get_macro_correlations(snapshot.symbol)
+        return snapshot.macro_analysis
+    
+    def load_snapshots(self, symbols: List[str], max_workers: int = 8) -> Dict[str, FinancialSnapshot]:
+        """
+        Load snapshots for several symbols concurrently
+        
+        Args:
+            symbols: Stock symbols (duplicates are loaded once)
+            max_workers: Maximum concurrent loads
+            
+        Returns:
+            Dict mapping symbol to snapshot, in first-seen order
+        """
+        unique_symbols = list(dict.fromkeys(symbols))
+        if not unique_symbols:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique_symbols)))) as executor:
+            return dict(zip(unique_symbols, executor.map(self.load_snapshot, unique_symbols)))
+    
+    def batch_intrinsic_values(self, snapshots: List[FinancialSnapshot],
+                               custom_assumptions: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """
+        DCF, Graham and NAV values for many symbols as array operations
+        
+        Uses the same formulas as the calculate_* methods, with one element per
+        snapshot. Values that cannot be computed are 0, as in the single-symbol
+        error results.
+        
+        Args:
+            snapshots: Loaded snapshots
+            custom_assumptions: DCF assumption overrides
+            
+        Returns:
+            Dict of arrays: 'dcf', 'graham', 'nav' and 'current_price'
+        """
+        bases = [self._dcf_base_case(snapshot, custom_assumptions) for snapshot in snapshots]
+        column = lambda key: np.array([base[key] for base in bases], dtype=float)
+        
+        dcf = self.dcf_value_grid(column('base_fcf'), column('discount_rate'), column('terminal_growth_rate'),
+                                  column('fcf_growth_rate'), net_debt=column('net_debt'),
+                                  shares_outstanding=column('shares_outstanding'))
+        
+        avg_eps = np.array([np.mean(s.historical_eps) if s.historical_eps else s.financial_data.get('eps', 0)
+                            for s in snapshots], dtype=float)
+        growth = np.array([self._estimate_growth_rate(s.symbol, s.historical_eps) for s in snapshots], dtype=float)
+        graham = avg_eps * (8.5 + 2 * growth)
+        
+        balance = lambda key: np.array([s.financial_data.get(key, 0) for s in snapshots], dtype=float)
+        shares = balance('shares_outstanding')
+        nav_total = balance('total_assets') - balance('intangible_assets') - balance('total_liabilities')
+        nav = np.where(shares > 0, nav_total / np.where(shares > 0, shares, 1.0), 0.0)
+        
+        return {
+            'dcf': np.nan_to_num(dcf, nan=0.0),
+            'graham': graham,
+            'nav': nav,
+            'current_price': np.array([s.current_price for s in snapshots], dtype=float)
+        }
+    
+    def value_many(self, symbols: List[str], methods: Tuple[str, ...] = ('dcf', 'graham', 'nav'),
+                   custom_assumptions: Optional[Dict[str, Any]] = None,
+                   max_workers: int = 8) -> Dict[str, Dict[str, ValuationResult]]:
+        """
+        Value a batch of symbols, loading each symbol's snapshot once
+        
+        Snapshots are loaded concurrently; the valuation maths itself is cheap
+        and runs sequentially.
+        
+        Args:
+            symbols: Stock symbols (duplicates are valued once)
+            methods: Any of 'dcf', 'graham' and 'nav'
+            custom_assumptions: DCF assumption overrides
+            max_workers: Maximum concurrent snapshot loads
+            
+        Returns:
+            Dict mapping symbol to {method: ValuationResult}
+        """
+        unknown = [method for method in methods if method not in ('dcf', 'graham', 'nav')]
+        if unknown:
+            raise ValueError(f"Unknown valuation method(s): {', '.join(unknown)}")
+        
+        snapshots = self.load_snapshots(symbols, max_workers=max_workers)
+        
+        results = {}
+        for symbol in snapshots:
+            snapshot = snapshots[symbol]
+            valuations = {}
+            if 'dcf' in methods:
+                valuations['dcf'] = self.calculate_dcf_valuation(symbol, custom_assumptions, snapshot=snapshot)
+            if 'graham' in methods:
+                valuations['graham'] = self.calculate_graham_valuation(symbol, snapshot=snapshot)
+            if 'nav' in methods:
+                valuations['nav'] = self.calculate_nav_valuation(symbol, snapshot=snapshot)
+            results[symbol] = valuations
+        
+        metrics_collector.record_feature_usage('batch_valuation')
+        return results
+    
     @monitor_performance
-    def calculate_dcf_valuation(self, symbol: str, custom_assumptions: Optional[Dict[str, Any]] = None) -> ValuationResult:
+    def calculate_dcf_valuation(self, symbol: str, custom_assumptions: Optional[Dict[str, Any]] = None,
+                                snapshot: Optional[FinancialSnapshot] = None) -> ValuationResult:
         """
         Calculate intrinsic value using 2-stage DCF model as specified:
         
@@ -209,15 +357,17 @@ class ValuationEngine:
         Args:
             symbol: Stock symbol
             custom_assumptions: Override default assumptions
+            snapshot: Preloaded financial snapshot (loaded on demand if omitted)
         """
         try:
             logger.info(f"Starting DCF valuation for {symbol}")
+            snapshot = self._resolve_snapshot(symbol, snapshot)
             
             # Get company financial data
-            financial_data = self._get_financial_data(symbol)
+            financial_data = snapshot.financial_data
             
             # Get macro correlations for forecasting
-            macro_analysis = self.macro_analyzer.get_macro_correlations(symbol)
+            macro_analysis = self._macro_analysis(snapshot)
             
             # Build FCF forecasts with macro factor integration
             fcf_forecasts = self._forecast_free_cash_flows(symbol, financial_data, macro_analysis)
@@ -243,7 +393,7 @@ class ValuationEngine:
             dcf_result = self._perform_dcf_calculation(dcf_inputs)
             
             # Get current market price
-            current_price = self._get_current_price(symbol)
+            current_price = snapshot.current_price
             
             # Calculate margin of safety
             margin_of_safety = self._calculate_margin_of_safety(dcf_result['intrinsic_value_per_share'], current_price)
@@ -278,7 +428,8 @@ class ValuationEngine:
             return self._create_error_result(symbol, str(e), 'DCF')
     
     @monitor_performance
-    def calculate_graham_valuation(self, symbol: str, growth_rate: Optional[float] = None) -> ValuationResult:
+    def calculate_graham_valuation(self, symbol: str, growth_rate: Optional[float] = None,
+                                   snapshot: Optional[FinancialSnapshot] = None) -> ValuationResult:
         """
         Calculate intrinsic value using Graham's simplified formula:
         Intrinsic Value = EPS × (8.5 + 2g)
@@ -286,15 +437,18 @@ class ValuationEngine:
         Where:
         - EPS = earnings per share (5-10 year average as specified)
         - g = expected annual growth rate (7-10 years)
+        
+        Pass snapshot to reuse data already loaded for this symbol.
         """
         try:
             logger.info(f"Starting Graham valuation for {symbol}")
+            snapshot = self._resolve_snapshot(symbol, snapshot)
             
             # Get financial data
-            financial_data = self._get_financial_data(symbol)
+            financial_data = snapshot.financial_data
             
             # Calculate average EPS over 5-10 years
-            historical_eps = self._get_historical_eps(symbol, years=10)
+            historical_eps = snapshot.historical_eps
             avg_eps = np.mean(historical_eps) if historical_eps else financial_data.get('eps', 0)
             
             # Estimate growth rate if not provided
@@ -305,7 +459,7 @@ class ValuationEngine:
             intrinsic_value = avg_eps * (8.5 + 2 * growth_rate)
             
             # Get current price and calculate margin of safety
-            current_price = self._get_current_price(symbol)
+            current_price = snapshot.current_price
             margin_of_safety = self._calculate_margin_of_safety(intrinsic_value, current_price)
             
             result = ValuationResult(
@@ -338,17 +492,19 @@ class ValuationEngine:
             return self._create_error_result(symbol, str(e), 'Graham')
     
     @monitor_performance
-    def calculate_nav_valuation(self, symbol: str) -> ValuationResult:
+    def calculate_nav_valuation(self, symbol: str, snapshot: Optional[FinancialSnapshot] = None) -> ValuationResult:
         """
         Calculate Net Asset Value (NAV) / Book Value approach:
         Intrinsic Value = Tangible Assets - Liabilities
         
-        Useful for banks, real estate firms, and asset-heavy companies
+        Useful for banks, real estate firms, and asset-heavy companies.
+        Pass snapshot to reuse data already loaded for this symbol.
         """
         try:
             logger.info(f"Starting NAV valuation for {symbol}")
+            snapshot = self._resolve_snapshot(symbol, snapshot)
             
-            financial_data = self._get_financial_data(symbol)
+            financial_data = snapshot.financial_data
             
             # Get balance sheet data
             total_assets = financial_data.get('total_assets', 0)
@@ -364,7 +520,7 @@ class ValuationEngine:
             nav_per_share = nav_total / shares_outstanding if shares_outstanding > 0 else 0
             
             # Get current price and calculate margin of safety
-            current_price = self._get_current_price(symbol)
+            current_price = snapshot.current_price
             margin_of_safety = self._calculate_margin_of_safety(nav_per_share, current_price)
             
             # Calculate book value multiples
@@ -592,49 +748,88 @@ class ValuationEngine:
             logger.error(f"DCF calculation failed: {str(e)}")
             raise ValueError(f"DCF calculation error: {str(e)}")
     
-    def _perform_sensitivity_analysis(self, inputs: DCFInputs) -> Dict[str, Any]:
-        """Perform Monte Carlo sensitivity analysis"""
+    @staticmethod
+    def dcf_value_grid(base_fcf: Any, discount_rates: Any, terminal_growth_rates: Any,
+                       fcf_growth_rates: Any = None, projected_fcf: Any = None,
+                       net_debt: Any = 0.0, shares_outstanding: Any = 0.0,
+                       forecast_years: int = 5, growth_decay: float = 0.9) -> np.ndarray:
+        """
+        Intrinsic value per share for a whole grid of assumptions in one NumPy broadcast
+        
+        The rate arguments (and base_fcf, net_debt, shares_outstanding) broadcast
+        against each other, so passing discount_rates[:, None] and
+        terminal_growth_rates[None, :] yields a 2-D surface, and 1-D arrays of
+        equal length evaluate independent draws. FCF is projected from base_fcf
+        with the same declining growth path as _forecast_free_cash_flows unless
+        projected_fcf (shape (..., years)) is given.
+        
+        Args:
+            base_fcf: Current free cash flow
+            discount_rates: Discount rates (WACC)
+            terminal_growth_rates: Perpetual growth rates
+            fcf_growth_rates: First-year FCF growth rates (ignored with projected_fcf)
+            projected_fcf: Explicit FCF projections
+            net_debt: Net debt subtracted from enterprise value
+            shares_outstanding: Shares used for the per-share value
+            forecast_years: Projection years when projecting from base_fcf
+            growth_decay: Yearly decay of the FCF growth rate
+            
+        Returns:
+            Array of per-share values; NaN where the discount rate does not exceed terminal growth
+        """
+        discount_rates = np.asarray(discount_rates, dtype=float)
+        terminal_growth_rates = np.asarray(terminal_growth_rates, dtype=float)
+        
+        if projected_fcf is not None:
+            fcf = np.asarray(projected_fcf, dtype=float)
+        else:
+            growth = np.asarray(fcf_growth_rates, dtype=float)[..., None] * growth_decay ** np.arange(forecast_years)
+            fcf = np.asarray(base_fcf, dtype=float)[..., None] * np.cumprod(1 + growth, axis=-1)
+        
+        years = np.arange(1, fcf.shape[-1] + 1)
+        discount_factors = (1 + discount_rates[..., None]) ** -years
+        pv_fcf = np.sum(fcf * discount_factors, axis=-1)
+        
+        spread = discount_rates - terminal_growth_rates
+        with np.errstate(divide='ignore', invalid='ignore'):
+            terminal_value = fcf[..., -1] * (1 + terminal_growth_rates) / spread
+            equity_value = pv_fcf + terminal_value * discount_factors[..., -1] - np.asarray(net_debt, dtype=float)
+            shares = np.asarray(shares_outstanding, dtype=float)
+            per_share = np.where(shares > 0, equity_value / np.where(shares > 0, shares, 1.0), 0.0)
+        
+        return np.where(spread > 0, per_share, np.nan)
+    
+    def _perform_sensitivity_analysis(self, inputs: DCFInputs, grid_size: int = 5) -> Dict[str, Any]:
+        """Sensitivity of the DCF value to the discount rate and terminal growth rate"""
         try:
             # Define sensitivity parameters
-            discount_rate_range = np.linspace(inputs.discount_rate * 0.8, inputs.discount_rate * 1.2, 5)
-            growth_rate_range = np.linspace(inputs.terminal_growth_rate * 0.5, inputs.terminal_growth_rate * 1.5, 5)
-            
-            results_matrix = []
-            
-            for dr in discount_rate_range:
-                row = []
-                for gr in growth_rate_range:
-                    # Create modified inputs
-                    modified_inputs = DCFInputs(
-                        symbol=inputs.symbol,
-                        free_cash_flows=inputs.free_cash_flows,
-                        discount_rate=dr,
-                        terminal_growth_rate=gr,
-                        forecast_years=inputs.forecast_years,
-                        net_debt=inputs.net_debt,
-                        shares_outstanding=inputs.shares_outstanding
-                    )
-                    
-                    # Calculate valuation
-                    result = self._perform_dcf_calculation(modified_inputs)
-                    row.append(result['intrinsic_value_per_share'])
-                
-                results_matrix.append(row)
+            discount_rate_range = np.linspace(inputs.discount_rate * 0.8, inputs.discount_rate * 1.2, grid_size)
+            growth_rate_range = np.linspace(inputs.terminal_growth_rate * 0.5, inputs.terminal_growth_rate * 1.5, grid_size)
+            
+            results_matrix = self.dcf_value_grid(
+                None, discount_rate_range[:, None], growth_rate_range[None, :],
+                projected_fcf=inputs.free_cash_flows,
+                net_debt=inputs.net_debt,
+                shares_outstanding=inputs.shares_outstanding
+            )
             
             # Calculate statistics
-            all_values = [val for row in results_matrix for val in row]
+            all_values = results_matrix[np.isfinite(results_matrix)]
+            if all_values.size == 0:
+                raise ValueError("Discount rate never exceeds terminal growth in the sensitivity range")
             
             return {
-                'sensitivity_matrix': results_matrix,
+                # Cells where the DCF is undefined become None so the result stays valid JSON
+                'sensitivity_matrix': np.where(np.isfinite(results_matrix), results_matrix, None).tolist(),
                 'discount_rate_range': discount_rate_range.tolist(),
                 'growth_rate_range': growth_rate_range.tolist(),
-                'min_value': min(all_values),
-                'max_value': max(all_values),
-                'mean_value': np.mean(all_values),
-                'std_dev': np.std(all_values),
+                'min_value': float(all_values.min()),
+                'max_value': float(all_values.max()),
+                'mean_value': float(all_values.mean()),
+                'std_dev': float(all_values.std()),
                 'confidence_interval_95': [
-                    np.percentile(all_values, 2.5),
-                    np.percentile(all_values, 97.5)
+                    float(np.percentile(all_values, 2.5)),
+                    float(np.percentile(all_values, 97.5))
                 ]
             }
             
@@ -642,11 +837,156 @@ class ValuationEngine:
             logger.error(f"Sensitivity analysis failed: {str(e)}")
             return {'error': str(e)}
     
-    def _get_financial_data(self, symbol: str) -> Dict[str, Any]:
+    def _dcf_base_case(self, snapshot: FinancialSnapshot,
+                       custom_assumptions: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+        """Central DCF assumptions for a symbol, matching calculate_dcf_valuation"""
+        financial_data = snapshot.financial_data
+        assumptions = {**self.default_assumptions, **(custom_assumptions or {})}
+        macro_adjustment = self._calculate_macro_adjustment(self._macro_analysis(snapshot))
+        
+        return {
+            'base_fcf': financial_data.get('free_cash_flow', 0),
+            'fcf_growth_rate': financial_data.get('fcf_growth_rate', 0.05) * (1 + macro_adjustment),
+            'discount_rate': self._calculate_wacc(snapshot.symbol, financial_data),
+            'terminal_growth_rate': assumptions['terminal_growth_rate'],
+            'net_debt': financial_data.get('net_debt', 0),
+            'shares_outstanding': financial_data.get('shares_outstanding', 0)
+        }
+    
+    @monitor_performance
+    def dcf_sensitivity_surface(self, symbol: str, grid_size: int = 50,
+                                discount_rates: Optional[List[float]] = None,
+                                terminal_growth_rates: Optional[List[float]] = None,
+                                fcf_growth_rates: Optional[List[float]] = None,
+                                snapshot: Optional[FinancialSnapshot] = None) -> Dict[str, Any]:
+        """
+        DCF value surface over discount rate × terminal growth (× FCF growth)
+        
+        Ranges default to ±20% around the base discount rate and 50-150% of the
+        base terminal growth. When fcf_growth_rates is given the surface is 3-D
+        with FCF growth as the last axis.
+        
+        Args:
+            symbol: Stock symbol
+            grid_size: Points per default range
+            discount_rates: Explicit discount rate axis
+            terminal_growth_rates: Explicit terminal growth axis
+            fcf_growth_rates: Optional FCF growth axis
+            snapshot: Preloaded financial snapshot
+            
+        Returns:
+            Dict with the axes, the value surface (None where undefined) and the base case
+        """
+        try:
+            snapshot = self._resolve_snapshot(symbol, snapshot)
+            base = self._dcf_base_case(snapshot)
+            
+            if discount_rates is None:
+                discount_rates = np.linspace(base['discount_rate'] * 0.8, base['discount_rate'] * 1.2, grid_size)
+            if terminal_growth_rates is None:
+                terminal_growth_rates = np.linspace(base['terminal_growth_rate'] * 0.5,
+                                                    base['terminal_growth_rate'] * 1.5, grid_size)
+            discount_rates = np.asarray(discount_rates, dtype=float)
+            terminal_growth_rates = np.asarray(terminal_growth_rates, dtype=float)
+            
+            if fcf_growth_rates is None:
+                growth_axis = np.asarray(base['fcf_growth_rate'], dtype=float)
+                surface = self.dcf_value_grid(
+                    base['base_fcf'], discount_rates[:, None], terminal_growth_rates[None, :], growth_axis,
+                    net_debt=base['net_debt'], shares_outstanding=base['shares_outstanding'])
+            else:
+                growth_axis = np.asarray(fcf_growth_rates, dtype=float)
+                surface = self.dcf_value_grid(
+                    base['base_fcf'], discount_rates[:, None, None], terminal_growth_rates[None, :, None],
+                    growth_axis[None, None, :],
+                    net_debt=base['net_debt'], shares_outstanding=base['shares_outstanding'])
+            
+            return {
+                'symbol': symbol,
+                'discount_rate_range': discount_rates.tolist(),
+                'growth_rate_range': terminal_growth_rates.tolist(),
+                'fcf_growth_range': growth_axis.tolist(),
+                'surface': np.where(np.isfinite(surface), surface, None).tolist(),
+                'base_case': base,
+                'current_price': snapshot.current_price
+            }
+            
+        except Exception as e:
+            logger.error(f"Sensitivity surface failed for {symbol}: {str(e)}")
+            return {'symbol': symbol, 'error': str(e)}
+    
+    @monitor_performance
+    def simulate_dcf_distribution(self, symbol: str, num_draws: int = 10000,
+                                  discount_rate_sd: float = 0.01, terminal_growth_sd: float = 0.005,
+                                  fcf_growth_sd: float = 0.03, seed: Optional[int] = None,
+                                  snapshot: Optional[FinancialSnapshot] = None) -> Dict[str, Any]:
+        """
+        Monte Carlo distribution of DCF intrinsic value
+        
+        Samples discount rate, terminal growth and FCF growth independently from
+        normal distributions centred on the base case and values every draw in
+        one vectorized pass. Draws where the discount rate does not exceed
+        terminal growth are discarded.
+        
+        Args:
+            symbol: Stock symbol
+            num_draws: Number of sampled assumption sets
+            discount_rate_sd: Standard deviation of the discount rate
+            terminal_growth_sd: Standard deviation of terminal growth
+            fcf_growth_sd: Standard deviation of first-year FCF growth
+            seed: Optional seed for reproducible runs
+            snapshot: Preloaded financial snapshot
+            
+        Returns:
+            Dict with distribution statistics, percentiles, a histogram and the
+            probability that intrinsic value exceeds the current price
+        """
+        try:
+            snapshot = self._resolve_snapshot(symbol, snapshot)
+            base = self._dcf_base_case(snapshot)
+            rng = np.random.default_rng(seed)
+            
+            discount_rates = rng.normal(base['discount_rate'], discount_rate_sd, num_draws)
+            terminal_growth_rates = rng.normal(base['terminal_growth_rate'], terminal_growth_sd, num_draws)
+            fcf_growth_rates = rng.normal(base['fcf_growth_rate'], fcf_growth_sd, num_draws)
+            
+            values = self.dcf_value_grid(
+                base['base_fcf'], discount_rates, terminal_growth_rates, fcf_growth_rates,
+                net_debt=base['net_debt'], shares_outstanding=base['shares_outstanding'])
+            values = values[np.isfinite(values)]
+            if values.size == 0:
+                raise ValueError("No valid draws (discount rate never exceeded terminal growth)")
+            
+            percentiles = np.percentile(values, [5, 25, 50, 75, 95])
+            counts, bin_edges = np.histogram(values, bins=30)
+            current_price = snapshot.current_price
+            
+            metrics_collector.record_feature_usage('dcf_monte_carlo')
+            return {
+                'symbol': symbol,
+                'num_draws': num_draws,
+                'valid_draws': int(values.size),
+                'mean_value': float(values.mean()),
+                'median_value': float(percentiles[2]),
+                'std_dev': float(values.std()),
+                'percentiles': dict(zip(['p5', 'p25', 'p50', 'p75', 'p95'], percentiles.tolist())),
+                'confidence_interval_95': [float(np.percentile(values, 2.5)), float(np.percentile(values, 97.5))],
+                'current_price': current_price,
+                'probability_undervalued': float(np.mean(values > current_price)) if current_price > 0 else None,
+                'histogram': {'counts': counts.tolist(), 'bin_edges': bin_edges.tolist()},
+                'base_case': base
+            }
+            
+        except Exception as e:
+            logger.error(f"DCF simulation failed for {symbol}: {str(e)}")
+            return {'symbol': symbol, 'error': str(e)}
+    
+    def _get_financial_data(self, symbol: str, stock_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get comprehensive financial data for the company"""
         try:
             # This would integrate with the existing API client
-            stock_data = self.api_client.get_stock_data(symbol)
+            if stock_data is None:
+                stock_data = self.api_client.get_stock_data(symbol)
             
             # Extract or estimate financial metrics
             # In production, this would pull from financial statements
@@ -696,10 +1036,11 @@ class ValuationEngine:
         # Cap growth rate at reasonable levels
         return max(min(cagr, 0.20), -0.10)  # Between -10% and 20%
     
-    def _get_current_price(self, symbol: str) -> float:
+    def _get_current_price(self, symbol: str, stock_data: Optional[Dict[str, Any]] = None) -> float:
         """Get current stock price"""
         try:
-            stock_data = self.api_client.get_stock_data(symbol)
+            if stock_data is None:
+                stock_data = self.api_client.get_stock_data(symbol)
             return stock_data.get('current_price', stock_data.get('close', 0))
         except Exception as e:
             logger.error(f"Error getting current price for {symbol}: {str(e)}")
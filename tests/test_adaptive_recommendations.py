@@ -0,0 +1,113 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from ml_components.adaptive_learning_db import AdaptiveLearningDB, build_recommendation_candidates
+
+WEIGHTS = {
+    "price_momentum": 0.2, "weekly_range": 0.1, "ytd_performance": 0.15, "news_sentiment": 0.05,
+    "rotc": 0.2, "pe_ratio": 0.1, "dividend_yield": 0.1, "volume_change": 0.05, "market_cap": 0.05
+}
+SECTORS = ['Technology', 'Energy', 'Healthcare', 'Financials']
+
+
+def reference_score(stock, weights, preferred_sectors):
+    """The per-stock scoring the matrix version replaces"""
+    score = 0
+    if 'price_momentum' in stock:
+        score += stock['price_momentum'] * weights['price_momentum']
+    if '52_week_range_position' in stock:
+        score += stock['52_week_range_position'] * 100 * weights['weekly_range']
+    if 'ytd_performance' in stock:
+        score += stock['ytd_performance'] * weights['ytd_performance']
+    if 'news_sentiment' in stock:
+        score += stock['news_sentiment'] * 100 * weights['news_sentiment']
+    if 'rotc' in stock:
+        score += stock['rotc'] * weights['rotc']
+    if 'pe_ratio' in stock and stock['pe_ratio'] > 0:
+        score += 25 / max(stock['pe_ratio'], 1) * weights['pe_ratio']
+    if 'dividend_yield' in stock:
+        score += stock['dividend_yield'] * weights['dividend_yield']
+    if 'volume_change' in stock:
+        score += stock['volume_change'] * weights['volume_change']
+    if 'sector' in stock and stock['sector'] in preferred_sectors:
+        score *= 1.2
+    return score
+
+
+def universe(n, seed=0):
+    rng = np.random.default_rng(seed)
+    stocks = []
+    for i in range(n):
+        stock = {
+            'symbol': f"S{i}",
+            'sector': SECTORS[i % len(SECTORS)],
+            'price_momentum': float(rng.uniform(0, 100)),
+            '52_week_range_position': float(rng.uniform(0, 1)),
+            'ytd_performance': float(rng.normal(5, 20)),
+            'news_sentiment': float(rng.uniform(0, 1)),
+            'rotc': float(rng.normal(10, 5)),
+            'pe_ratio': float(rng.uniform(-10, 60)),
+            'dividend_yield': float(rng.uniform(0, 5)),
+        }
+        if i % 3:
+            stock['volume_change'] = float(rng.normal(0, 20))
+        stocks.append(stock)
+    return stocks
+
+
+class TestAdaptiveRecommendations(unittest.TestCase):
+    def setUp(self):
+        self.learning = AdaptiveLearningDB(user_id=1)
+        patcher_weights = patch.object(AdaptiveLearningDB, 'get_user_feature_weights', return_value=WEIGHTS)
+        patcher_sectors = patch.object(AdaptiveLearningDB, 'get_preferred_sectors',
+                                       return_value=[('Energy', 3.0), ('Healthcare', 1.0)])
+        patcher_weights.start()
+        patcher_sectors.start()
+        self.addCleanup(patch.stopall)
+
+    def test_matrix_scores_match_per_stock_scoring(self):
+        stocks = universe(200)
+        results = self.learning.get_recommended_stocks(stocks)
+
+        expected = sorted(((reference_score(s, WEIGHTS, ['Energy', 'Healthcare']), s['symbol']) for s in stocks),
+                          key=lambda item: item[0], reverse=True)
+        self.assertEqual([r['symbol'] for r in results], [symbol for _, symbol in expected])
+        np.testing.assert_allclose([r['score'] for r in results], [score for score, _ in expected])
+        self.assertIs(results[0]['data'], next(s for s in stocks if s['symbol'] == results[0]['symbol']))
+
+    def test_top_n_explains_only_returned_stocks(self):
+        stocks = universe(500, seed=1)
+        # Ties at the cut-off keep their input order
+        stocks[10] = dict(stocks[400], symbol='TIE_FIRST')
+        stocks[450] = dict(stocks[400], symbol='TIE_LAST')
+        candidates = build_recommendation_candidates(stocks)
+        full = self.learning.get_recommended_stocks(candidates)
+
+        with patch.object(AdaptiveLearningDB, '_generate_recommendation_explanation',
+                          return_value='why') as explain:
+            top = self.learning.get_recommended_stocks(candidates, top_n=10)
+        self.assertEqual(explain.call_count, 10)
+        self.assertEqual([r['symbol'] for r in top], [r['symbol'] for r in full[:10]])
+
+        rank = [r['symbol'] for r in full].index('TIE_FIRST')
+        cut = self.learning.get_recommended_stocks(candidates, top_n=rank + 1)
+        self.assertEqual(cut[-1]['symbol'], 'TIE_FIRST')
+        self.assertEqual(self.learning.get_recommended_stocks(candidates, top_n=0), [])
+
+    def test_missing_and_invalid_values_contribute_nothing(self):
+        stocks = [
+            {'symbol': 'A', 'rotc': 10.0, 'pe_ratio': None, 'dividend_yield': float('nan')},
+            {'symbol': 'B', 'rotc': 'n/a', 'pe_ratio': 25.0},
+            {'symbol': 'C'},
+        ]
+        results = {r['symbol']: r['score'] for r in self.learning.get_recommended_stocks(stocks)}
+        self.assertAlmostEqual(results['A'], 10.0 * WEIGHTS['rotc'])
+        self.assertAlmostEqual(results['B'], 1.0 * WEIGHTS['pe_ratio'])
+        self.assertEqual(results['C'], 0.0)
+        self.assertEqual(self.learning.get_recommended_stocks([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ import os
 import unittest
 from unittest.mock import patch, MagicMock
 import json
+import tempfile
 from pathlib import Path
 import time
 import logging
@@ -15,6 +16,7 @@ import logging
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from data.alpha_vantage_client import AlphaVantageClient
+from utils.rate_limiter import reset_rate_limiters
 
 class TestAlphaVantageClient(unittest.TestCase):
     """Test cases for the Alpha Vantage client"""
@@ -24,9 +26,12 @@ class TestAlphaVantageClient(unittest.TestCase):
         # Use a test API key
         self.test_api_key = "test_api_key"
         
-        # Create a test cache directory
-        self.test_cache_dir = Path("./test_cache")
-        self.test_cache_dir.mkdir(exist_ok=True)
+        # Start every test with an empty rate limit window
+        reset_rate_limiters()
+        
+        # Create a test cache directory (clients share the cache of a directory,
+        # so every test gets its own)
+        self.test_cache_dir = Path(tempfile.mkdtemp())
         
         # Initialize the client with test configurations
         self.client = AlphaVantageClient(
@@ -218,6 +223,18 @@ class TestAlphaVantageClient(unittest.TestCase):
         # Check that the API was called 3 times
         self.assertEqual(mock_get.call_count, 3)
     
+    def test_rate_limit_override_is_per_client(self):
+        """Test that changing one client's rate limit leaves other clients on the shared limiter"""
+        other = AlphaVantageClient(api_key=self.test_api_key, cache_dir=str(self.test_cache_dir))
+        self.assertIs(other.rate_limiter, self.client.rate_limiter)
+        
+        self.client.rate_limit = 2
+        self.client.rate_limit_period = 5
+        
+        self.assertEqual((self.client.rate_limit, self.client.rate_limit_period), (2, 5.0))
+        self.assertEqual((other.rate_limit, other.rate_limit_period), (5, 60.0))
+        self.assertIsNot(other.rate_limiter, self.client.rate_limiter)
+    
     @patch('requests.get')
     def test_caching(self, mock_get):
         """Test caching functionality"""
@@ -328,6 +345,63 @@ class TestAlphaVantageClient(unittest.TestCase):
         self.assertTrue(result)
         self.assertEqual(self.client.memory_cache, {})
         self.assertFalse((self.test_cache_dir / "GLOBAL_QUOTE_symbol=MSFT.pkl").exists())
+    
+    @patch('requests.get')
+    def test_concurrent_requests_coalesced(self, mock_get):
+        """Test that concurrent requests for the same symbol share one API call"""
+        import threading
+        
+        def slow_response(*args, **kwargs):
+            time.sleep(0.2)
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = self.sample_quote_response
+            return mock_response
+        
+        mock_get.side_effect = slow_response
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.client.get_quote('AAPL')))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        # One upstream request served all five callers
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result['symbol'] == 'AAPL' for result in results))
+    
+    @patch('requests.get')
+    def test_concurrent_requests_coalesced_across_clients(self, mock_get):
+        """Test that clients built per request share in-flight fetches and cached data"""
+        import threading
+        
+        def slow_response(*args, **kwargs):
+            time.sleep(0.2)
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = self.sample_quote_response
+            return mock_response
+        
+        mock_get.side_effect = slow_response
+        
+        results = []
+        def request_with_new_client():
+            client = AlphaVantageClient(api_key=self.test_api_key, cache_dir=str(self.test_cache_dir))
+            results.append(client.get_quote('AAPL'))
+        
+        threads = [threading.Thread(target=request_with_new_client) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(result['symbol'] == 'AAPL' for result in results))
+        self.assertIs(self.client.cache, AlphaVantageClient(cache_dir=str(self.test_cache_dir)).cache)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
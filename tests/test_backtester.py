@@ -0,0 +1,101 @@
+import unittest
+
+import numpy as np
+
+from trading.backtester import BarPanel, Backtester, TargetWeightsStrategy, MovingAverageCrossStrategy, run_many
+from trading.broker_integration import OrderType, TimeInForce
+
+
+def make_panel():
+    dates = np.array(['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05', '2024-01-08'], dtype='datetime64[D]')
+    opens = np.array([[10, 11, 12, 9, 10], [50, 50, 50, 50, 50]], dtype=float)
+    closes = np.array([[10.5, 11.5, 11.0, 9.5, 10.5], [50, 50, 50, 50, 50]], dtype=float)
+    return BarPanel(['AAA', 'BBB'], dates, open=opens, high=np.maximum(opens, closes) + 0.5,
+                    low=np.minimum(opens, closes) - 0.5, close=closes, volume=np.ones((2, 5)))
+
+
+class OrdersOnFirstBar:
+    def __init__(self, orders):
+        self.orders = orders
+
+    def on_bar(self, context):
+        if context.t == 0:
+            for args in self.orders:
+                context.order(*args[:2], **args[2])
+
+
+class TestBacktester(unittest.TestCase):
+    def setUp(self):
+        self.panel = make_panel()
+        self.backtester = Backtester(self.panel, initial_cash=1000.0)
+
+    def test_market_order_fills_at_next_open(self):
+        """Orders placed after a close execute at the next bar's open and are marked at each close"""
+        result = self.backtester.run(OrdersOnFirstBar([('AAA', 10, {})]))
+
+        self.assertEqual(result.trades[0]['date'], '2024-01-03')
+        self.assertEqual(result.trades[0]['price'], 11.0)
+        self.assertEqual(result.equity[0], 1000.0)
+        self.assertAlmostEqual(result.equity[1], 1000.0 - 110.0 + 115.0)
+        self.assertAlmostEqual(result.equity[-1], 1000.0 - 110.0 + 105.0)
+        self.assertAlmostEqual(result.traded_value.sum(), 110.0)
+
+    def test_intra_bar_limit_and_stop_fills(self):
+        """Limits fill at the limit when touched and at the open on gaps; stops trigger intra-bar"""
+        result = self.backtester.run(OrdersOnFirstBar([
+            ('AAA', 5, {'order_type': OrderType.LIMIT, 'limit_price': 10.6}),
+            ('AAA', 5, {'order_type': OrderType.LIMIT, 'limit_price': 10.2, 'time_in_force': TimeInForce.GTC}),
+            ('BBB', 2, {'order_type': OrderType.STOP, 'stop_price': 49.8}),
+        ]))
+        fills = [(trade['date'], trade['symbol'], trade['price']) for trade in result.trades]
+
+        # The 10.6 limit is touched by the 10.5 low after an 11 open; the stop is already through
+        # at the open; the GTC 10.2 limit rests until AAA gaps down to a 9 open
+        self.assertEqual(fills, [('2024-01-03', 'AAA', 10.6), ('2024-01-03', 'BBB', 50.0),
+                                 ('2024-01-05', 'AAA', 9.0)])
+
+    def test_day_orders_expire_and_no_short_selling(self):
+        """Unfilled day orders expire after one bar; selling unheld shares is rejected"""
+        result = self.backtester.run(OrdersOnFirstBar([
+            ('AAA', 5, {'order_type': OrderType.LIMIT, 'limit_price': 9.0}),
+            ('BBB', -1, {}),
+        ]))
+
+        self.assertEqual(result.trades, [])
+        self.assertEqual(result.metrics['rejected_orders'], 1)
+        self.assertEqual(self.backtester.broker.get_orders(status='expired')[0].symbol, 'AAA')
+
+    def test_target_weights_from_naif_portfolio(self):
+        """Naif portfolios are held at their weights, leaving the cash holding in cash"""
+        portfolio = {'holdings': [{'symbol': 'AAA', 'weight': 0.5}, {'symbol': 'BBB', 'weight': 0.3},
+                                  {'symbol': 'CASH', 'weight': 0.2, 'asset_class': 'Cash'}]}
+        strategy = TargetWeightsStrategy.from_portfolio(portfolio, rebalance_every=100)
+        result = self.backtester.run(strategy)
+
+        self.assertEqual(self.backtester.broker.get_position('AAA').quantity, 47)
+        self.assertEqual(self.backtester.broker.get_position('BBB').quantity, 6)
+        self.assertAlmostEqual(result.metrics['turnover'], result.traded_value.sum() / result.equity.mean())
+
+    def test_alignment_and_parallel_runs(self):
+        """Series with gaps align on the union of dates; parallel runs match in-process runs"""
+        panel = BarPanel.from_series({
+            'X': {'dates': np.array(['2024-01-02', '2024-01-04'], dtype='datetime64[s]'),
+                  'open': [1.0, 2.0], 'high': [1.0, 2.0], 'low': [1.0, 2.0], 'close': [1.0, 2.0], 'volume': [1, 1]},
+            'Y': {'dates': np.array(['2024-01-03'], dtype='datetime64[s]'),
+                  'open': [5.0], 'high': [5.0], 'low': [5.0], 'close': [5.0], 'volume': [1]},
+        })
+        self.assertEqual(len(panel), 3)
+        self.assertTrue(np.isnan(panel.close[0, 1]))
+        self.assertEqual(panel.close[1, 1], 5.0)
+
+        specs = [('fast', MovingAverageCrossStrategy, {'fast': 1, 'slow': 2}),
+                 ('slow', MovingAverageCrossStrategy, {'fast': 2, 'slow': 3})]
+        parallel = run_many(self.panel, specs, processes=2, initial_cash=1000.0)
+        serial = run_many(self.panel, specs, processes=1, initial_cash=1000.0)
+        self.assertEqual(list(parallel), ['fast', 'slow'])
+        for name in parallel:
+            np.testing.assert_allclose(parallel[name].equity, serial[name].equity)
+
+
+if __name__ == '__main__':
+    unittest.main()
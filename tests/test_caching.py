@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from caching import LRUMemoryCache, DiskCache, TieredCache
+
+
+class TestLRUMemoryCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        """Entries beyond max_entries are evicted oldest-use first"""
+        cache = LRUMemoryCache(max_entries=2, max_bytes=None)
+        cache.set_value('a', 1, ttl=60)
+        cache.set_value('b', 2, ttl=60)
+        cache.get_entry('a')
+        cache.set_value('c', 3, ttl=60)
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_byte_budget(self):
+        """The memory tier stays within its byte budget"""
+        cache = LRUMemoryCache(max_entries=100, max_bytes=1000)
+        for i in range(20):
+            cache.set_value(str(i), 'x' * 200, ttl=60)
+
+        self.assertLessEqual(cache.current_bytes, 1000)
+        self.assertIn('19', cache)
+
+    def test_mapping_of_entries(self):
+        """The tier can be seeded and compared like a dict of entries"""
+        cache = LRUMemoryCache()
+        cache.update({'k': {'data': 1, 'expires_at': time.time() + 60}})
+
+        self.assertEqual(cache['k']['data'], 1)
+        cache.clear()
+        self.assertEqual(cache, {})
+
+
+class TestTieredCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_disk_roundtrip_and_promotion(self):
+        """Values written by one instance are read from disk by another"""
+        TieredCache('test', directory=self.directory).set('QUOTE_symbol=AAPL', {'price': 1})
+        cache = TieredCache('test', directory=self.directory)
+
+        self.assertEqual(cache.get('QUOTE_symbol=AAPL'), {'price': 1})
+        self.assertEqual(cache.get('QUOTE_symbol=AAPL'), {'price': 1})
+        stats = cache.get_stats()
+        self.assertEqual(stats['disk_hits'], 1)
+        self.assertEqual(stats['memory_hits'], 1)
+
+    def test_per_endpoint_ttl(self):
+        """Expired entries are misses unless stale data is requested"""
+        cache = TieredCache('test', ttls={'fast': 0.05, 'slow': 60})
+        cache.set('a', 1, 'fast')
+        cache.set('b', 2, 'slow')
+        time.sleep(0.1)
+
+        self.assertIsNone(cache.get('a', 'fast'))
+        self.assertEqual(cache.get('a', 'fast', allow_stale=True), 1)
+        self.assertEqual(cache.get('b', 'slow'), 2)
+
+    def test_json_format_reads_legacy_files(self):
+        """Bare JSON files from the old layout are still readable"""
+        with open(os.path.join(self.directory, 'AAPL_sentiment.json'), 'w') as f:
+            f.write('{"score": 0.5}')
+        cache = TieredCache('test', directory=self.directory, disk_format='json')
+
+        self.assertEqual(cache.get('AAPL_sentiment'), {'score': 0.5})
+
+    def test_single_flight(self):
+        """Concurrent misses for the same key trigger one fetch"""
+        cache = TieredCache('test')
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'value'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_fetch('k', fetch)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 8)
+        self.assertEqual(cache.get_stats()['coalesced'], 7)
+
+    def test_invalidate_pattern(self):
+        """Invalidation removes matching keys from both tiers"""
+        cache = TieredCache('test', directory=self.directory)
+        cache.set('GLOBAL_QUOTE_symbol=AAPL', 1)
+        cache.set('GLOBAL_QUOTE_symbol=MSFT', 2)
+
+        removed = cache.invalidate('symbol=AAPL')
+
+        self.assertEqual(removed, 1)
+        self.assertIsNone(cache.get('GLOBAL_QUOTE_symbol=AAPL'))
+        self.assertEqual(cache.get('GLOBAL_QUOTE_symbol=MSFT'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
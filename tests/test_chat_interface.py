@@ -179,6 +179,21 @@ class TestChatInterface(unittest.TestCase):
         self.assertEqual(self.chat.chat_history[1]['role'], 'assistant')
         self.assertEqual(self.chat.chat_history[1]['content'], "Claude's response")
     
+    def test_stream_message_propagates_claude_errors(self):
+        """A failed stream raises instead of yielding the error as reply text"""
+        def failing_stream(**kwargs):
+            yield "Partial "
+            raise RuntimeError("API unavailable")
+        self.mock_claude.stream_chat.side_effect = failing_stream
+
+        chunks = []
+        with self.assertRaises(RuntimeError):
+            for text in self.chat.stream_message('What do you think about tech stocks?'):
+                chunks.append(text)
+
+        self.assertEqual(chunks, ["Partial "])
+        self.assertEqual([entry['role'] for entry in self.chat.chat_history], ['user'])
+    
     def test_extract_stock_symbols(self):
         """Test extracting stock symbols from text"""
         text = "AAPL is showing strong momentum while MSFT has better fundamentals than INTC."
@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from claude_integration.claude_handler import ClaudeHandler, format_sse_event
+from claude_integration.history_store import ChatHistoryStore
+
+
+class StubStream:
+    def __init__(self, chunks):
+        self.text_stream = iter(chunks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class StubMessages:
+    """Local stand-in for the messages API recording each request"""
+
+    def __init__(self, reply="Hello there"):
+        self.reply = reply
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return SimpleNamespace(content=[SimpleNamespace(text=self.reply)])
+
+    def stream(self, **kwargs):
+        self.requests.append(kwargs)
+        words = self.reply.split(" ")
+        return StubStream([word + " " for word in words[:-1]] + words[-1:])
+
+
+class TestClaudeHandlerChat(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmpdir, 'history.sqlite3')
+        self.messages = StubMessages()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _handler(self, max_messages=50):
+        return ClaudeHandler(client=SimpleNamespace(messages=self.messages),
+                             history_store=ChatHistoryStore(self.db_path, max_messages=max_messages))
+
+    def test_stream_yields_deltas_and_records_history(self):
+        """Streaming yields text as it arrives and stores the finished exchange"""
+        handler = self._handler()
+        chunks = list(handler.stream_chat('7', 'hi'))
+
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual("".join(chunks), "Hello there")
+        self.assertEqual(handler.get_conversation_history('7'), [
+            {'role': 'user', 'content': 'hi'},
+            {'role': 'assistant', 'content': 'Hello there'},
+        ])
+
+    def test_history_shared_and_bounded(self):
+        """A second handler on the same store sees the history, trimmed to the cap"""
+        writer = self._handler(max_messages=4)
+        for i in range(5):
+            self.assertEqual(writer.chat_with_assistant('7', f"question {i}")['status'], 'success')
+
+        reader = self._handler(max_messages=4)
+        history = reader.get_conversation_history('7')
+        self.assertEqual(len(history), 4)
+        self.assertEqual(history[0], {'role': 'user', 'content': 'question 3'})
+
+        # Prior turns are sent with the next request, oldest first
+        reader.chat_with_assistant('7', 'next')
+        sent = self.messages.requests[-1]['messages']
+        self.assertEqual([m['content'] for m in sent[:-1]], [m['content'] for m in history])
+        self.assertEqual(sent[-1]['content'], 'next')
+
+        reader.clear_conversation_history('7')
+        self.assertEqual(writer.get_conversation_history('7'), [])
+
+    def test_context_serialized_compactly_and_capped(self):
+        """Context is minified, trimmed and capped; the system prompt is cacheable"""
+        handler = self._handler()
+        stock_context = {'symbol': 'AAPL', 'price': 189.123456789, 'note': None,
+                         'history': list(range(1000)), 'summary': 'x' * 5000}
+        handler.chat_with_assistant('7', 'what now?', stock_context=stock_context)
+
+        request = self.messages.requests[-1]
+        content = request['messages'][-1]['content']
+        self.assertIn('{"symbol":"AAPL","price":189.1235,', content)
+        self.assertNotIn('"note"', content)
+        self.assertIn('980 more', content)
+        self.assertLess(len(content), ClaudeHandler.MAX_CONTEXT_CHARS + 200)
+        self.assertEqual(request['system'][0]['cache_control'], {'type': 'ephemeral'})
+
+        text = handler.compact_context({'blob': ['y' * 200] * 20})
+        self.assertTrue(text.endswith('...(truncated)'))
+        self.assertEqual(len(text), ClaudeHandler.MAX_CONTEXT_CHARS + len('...(truncated)'))
+
+    def test_sse_event_format(self):
+        self.assertEqual(format_sse_event({'text': 'a b'}), 'data: {"text":"a b"}\n\n')
+        self.assertEqual(format_sse_event({}, event='done'), 'event: done\ndata: {}\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from services.valuation_engine import ValuationEngine, DCFInputs
+
+
+class TestDCFValueGrid(unittest.TestCase):
+    def setUp(self):
+        self.api_client = MagicMock()
+        self.api_client.get_stock_data.return_value = {'current_price': 40.0}
+        self.engine = ValuationEngine(self.api_client)
+        self.inputs = DCFInputs(
+            symbol='AAPL',
+            free_cash_flows=[1.05e9, 1.10e9, 1.14e9, 1.18e9, 1.21e9],
+            discount_rate=0.09,
+            terminal_growth_rate=0.025,
+            net_debt=3e9,
+            shares_outstanding=1e9
+        )
+
+    def test_grid_matches_scalar_dcf(self):
+        """Every grid cell equals the year-by-year DCF calculation"""
+        rates = np.array([0.07, 0.09, 0.11])
+        growths = np.array([0.01, 0.025, 0.04])
+        grid = self.engine.dcf_value_grid(None, rates[:, None], growths[None, :],
+                                          projected_fcf=self.inputs.free_cash_flows,
+                                          net_debt=self.inputs.net_debt,
+                                          shares_outstanding=self.inputs.shares_outstanding)
+
+        for i, rate in enumerate(rates):
+            for j, growth in enumerate(growths):
+                self.inputs.discount_rate, self.inputs.terminal_growth_rate = rate, growth
+                expected = self.engine._perform_dcf_calculation(self.inputs)['intrinsic_value_per_share']
+                self.assertAlmostEqual(grid[i, j], expected, places=6)
+
+    def test_projection_matches_forecast_path(self):
+        """Growth-based projection follows _forecast_free_cash_flows' declining growth"""
+        projected = self.engine._forecast_free_cash_flows('AAPL', {'free_cash_flow': 1e9, 'fcf_growth_rate': 0.05}, {})
+        from_growth = self.engine.dcf_value_grid(1e9, 0.09, 0.025, 0.05, shares_outstanding=1e9)
+        from_projection = self.engine.dcf_value_grid(None, 0.09, 0.025, projected_fcf=projected['projected_fcf'],
+                                                     shares_outstanding=1e9)
+        self.assertAlmostEqual(float(from_growth), float(from_projection), places=6)
+
+    def test_invalid_cells_are_nan(self):
+        """Cells where the discount rate does not exceed terminal growth are undefined"""
+        grid = self.engine.dcf_value_grid(1e9, np.array([0.02, 0.08]), 0.03, 0.05, shares_outstanding=1e9)
+        self.assertTrue(np.isnan(grid[0]))
+        self.assertTrue(np.isfinite(grid[1]))
+
+    def test_sensitivity_matrix_is_json_safe(self):
+        """Undefined sensitivity cells (WACC <= terminal growth) are reported as None"""
+        self.inputs.discount_rate, self.inputs.terminal_growth_rate = 0.05, 0.045
+        result = self.engine._perform_sensitivity_analysis(self.inputs)
+
+        matrix = result['sensitivity_matrix']
+        self.assertIsNone(matrix[0][-1])
+        self.assertIsInstance(matrix[-1][0], float)
+        json.dumps(result, allow_nan=False)
+
+    def test_surface_and_distribution(self):
+        """50x50 surfaces and seeded 10k-draw distributions"""
+        surface = self.engine.dcf_sensitivity_surface('AAPL', grid_size=50)
+        self.assertEqual(np.array(surface['surface'], dtype=float).shape, (50, 50))
+
+        cube = self.engine.dcf_sensitivity_surface('AAPL', grid_size=4, fcf_growth_rates=[0.0, 0.05, 0.1])
+        self.assertEqual(np.array(cube['surface'], dtype=float).shape, (4, 4, 3))
+
+        first = self.engine.simulate_dcf_distribution('AAPL', num_draws=10000, seed=7)
+        second = self.engine.simulate_dcf_distribution('AAPL', num_draws=10000, seed=7)
+        self.assertEqual(first['mean_value'], second['mean_value'])
+        self.assertGreater(first['valid_draws'], 9000)
+        self.assertLess(first['percentiles']['p5'], first['percentiles']['p95'])
+        self.assertEqual(sum(first['histogram']['counts']), first['valid_draws'])
+
+
+if __name__ == '__main__':
+    unittest.main()
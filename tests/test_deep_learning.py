@@ -53,6 +53,63 @@ class TestDeepLearningEngine(unittest.TestCase):
         
         self.assertEqual(sequences.shape, (expected_samples, expected_features))
     
+    def test_sequences_are_strided_views_matching_loop(self):
+        """Each window equals the flattened slice and shares the input buffer"""
+        values = np.random.rand(80, 3).astype(np.float32)
+        data = pd.DataFrame(values, columns=['a', 'b', 'c'])
+        sequences = self.engine.create_feature_sequences(data, sequence_length=20)
+        
+        expected = np.array([values[i:i + 20].flatten() for i in range(80 - 20)])
+        np.testing.assert_array_equal(sequences, expected)
+        self.assertEqual(sequences.dtype, np.float32)
+        self.assertFalse(sequences.flags.writeable)
+        
+        # An already contiguous float32 matrix is windowed without any copy
+        self.assertTrue(np.shares_memory(self.engine.create_feature_sequences(values, 20), values))
+    
+    def test_iter_sequence_batches_across_symbols(self):
+        """Batches span symbols and targets are the bar after each window"""
+        frames = {
+            'AAA': pd.DataFrame({'x': np.arange(30, dtype=float), 'y': np.arange(30, dtype=float) * 10}),
+            'BBB': pd.DataFrame({'x': np.arange(100, 125, dtype=float), 'y': np.zeros(25)}),
+        }
+        batches = list(self.engine.iter_sequence_batches(frames, sequence_length=5, batch_size=16,
+                                                         target_column='x', extract_features=False))
+        
+        # 25 + 20 windows in batches of 16
+        self.assertEqual([len(X) for X, _ in batches], [16, 16, 13])
+        X = np.concatenate([X for X, _ in batches])
+        y = np.concatenate([y for _, y in batches])
+        self.assertEqual(X.shape, (45, 10))
+        np.testing.assert_array_equal(X[0], [0, 0, 1, 10, 2, 20, 3, 30, 4, 40])
+        self.assertEqual(y[0], 5)
+        self.assertEqual(X[25][0], 100)
+        self.assertEqual(y[-1], 124)
+    
+    def test_extracted_features_cached_by_symbol_and_last_bar(self):
+        """Unchanged histories reuse the extracted frame; a new bar recomputes it"""
+        self.engine.feature_cache.clear()
+        self.addCleanup(self.engine.feature_cache.clear)
+        dates = pd.date_range(start='2020-01-01', periods=120, freq='D')
+        price_data = pd.DataFrame({
+            'Open': np.random.normal(100, 2, 120),
+            'High': np.random.normal(102, 2, 120),
+            'Low': np.random.normal(98, 2, 120),
+            'Close': np.random.normal(101, 2, 120),
+            'Volume': np.random.randint(1000, 10000, 120)
+        }, index=dates)
+        
+        with patch.object(DeepLearningEngine, '_compute_advanced_features',
+                          side_effect=self.engine._compute_advanced_features) as compute:
+            first = self.engine.extract_advanced_features(price_data, symbol='AAPL')
+            first['extra'] = 1.0
+            second = DeepLearningEngine().extract_advanced_features(price_data, symbol='AAPL')
+            self.assertEqual(compute.call_count, 1)
+            self.assertNotIn('extra', second.columns)
+            
+            self.engine.extract_advanced_features(price_data.iloc[:-1], symbol='AAPL')
+            self.assertEqual(compute.call_count, 2)
+    
     def test_extract_advanced_features(self):
         """Test feature extraction from price data"""
         # Create dummy price data
@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from portfolio.advanced_portfolio_analytics import AdvancedPortfolioAnalytics
+
+
+def _returns(num_assets, num_days=500, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.01, (num_days, 3))
+    loadings = rng.normal(0, 1, (3, num_assets))
+    drift = rng.normal(0.0005, 0.0005, num_assets)
+    data = factors @ loadings + rng.normal(0, 0.01, (num_days, num_assets)) + drift
+    return pd.DataFrame(data, columns=[f'A{i}' for i in range(num_assets)])
+
+
+class TestEfficientFrontier(unittest.TestCase):
+    def setUp(self):
+        # Synthetic factor history is irrelevant to the frontier
+        patcher = mock.patch.object(AdvancedPortfolioAnalytics, '_initialize_factor_returns',
+                                    return_value=pd.DataFrame())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.analytics = AdvancedPortfolioAnalytics()
+
+    def _by_type(self, frontier, portfolio_type):
+        return [p for p in frontier if p['type'] == portfolio_type]
+
+    def test_closed_form_matches_theory(self):
+        """Unconstrained frontier points solve the minimum variance problem exactly"""
+        returns = _returns(8)
+        frontier = self.analytics.generate_efficient_frontier(
+            returns, risk_free_rate=0.0, allow_short=True, num_points=6)
+
+        self.assertEqual(len(self._by_type(frontier, 'Efficient Frontier')), 6)
+        cov = returns.cov().values
+        mu = returns.mean().values
+        inv_ones = np.linalg.solve(cov, np.ones(8))
+        min_var = 1.0 / inv_ones.sum()
+
+        min_vol = self._by_type(frontier, 'Minimum Volatility')[0]
+        self.assertAlmostEqual(min_vol['risk'] ** 2, min_var, places=12)
+
+        max_sharpe = self._by_type(frontier, 'Maximum Sharpe')[0]
+        tangency_sharpe = np.sqrt(mu @ np.linalg.solve(cov, mu))
+        self.assertAlmostEqual(max_sharpe['sharpe'], tangency_sharpe, places=8)
+
+        for portfolio in frontier:
+            self.assertAlmostEqual(sum(portfolio['weights'].values()), 1.0, places=9)
+
+    def test_long_only_dominates_random_portfolios(self):
+        """Long-only frontier beats sampled portfolios on a 50 asset universe"""
+        returns = _returns(50, seed=3)
+        frontier = self.analytics.generate_efficient_frontier(returns, risk_free_rate=0.0, num_points=15)
+        np.random.seed(0)
+        sampled = self.analytics.generate_efficient_frontier(
+            returns, risk_free_rate=0.0, method='sampling', num_portfolios=2000)
+
+        self.assertEqual(len(self._by_type(frontier, 'Efficient Frontier')), 15)
+        for portfolio in frontier:
+            weights = np.array(list(portfolio['weights'].values()))
+            self.assertTrue(np.all(weights >= 0))
+            self.assertAlmostEqual(weights.sum(), 1.0, places=9)
+
+        self.assertLessEqual(self._by_type(frontier, 'Minimum Volatility')[0]['risk'],
+                             min(p['risk'] for p in sampled))
+        self.assertGreaterEqual(self._by_type(frontier, 'Maximum Sharpe')[0]['sharpe'],
+                                max(p['sharpe'] for p in sampled))
+
+        # Target returns are evenly spaced and risk rises along the frontier
+        points = self._by_type(frontier, 'Efficient Frontier')
+        steps = np.diff([p['return'] for p in points])
+        np.testing.assert_allclose(steps, steps[0], rtol=1e-4)
+        self.assertTrue(np.all(np.diff([p['risk'] for p in points]) > 0))
+
+    def test_empty_input(self):
+        """Empty return data yields an empty frontier"""
+        self.assertEqual(self.analytics.generate_efficient_frontier(pd.DataFrame()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
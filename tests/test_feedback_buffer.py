@@ -0,0 +1,175 @@
+import atexit
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from flask import Flask
+
+from models import db, FeatureWeight, SectorPreference, StockPreference
+from ml_components.adaptive_learning_db import AdaptiveLearningDB
+from ml_components.feedback_buffer import FEATURE_WEIGHT_COLUMNS, FeedbackBuffer
+
+STRONG_STOCK = {'sector': 'Energy', 'price_momentum': 80, 'rotc': 15, 'pe_ratio': 12}
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+class TestFeedbackBuffer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(self.tmpdir, 'test.db')}"
+        db.init_app(self.app)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.log_dir = os.path.join(self.tmpdir, 'feedback')
+        self.buffers = []
+        self.buffer = self._buffer()
+
+    def tearDown(self):
+        for buffer in self.buffers:
+            atexit.unregister(buffer.flush)
+        db.session.remove()
+        self.context.pop()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _buffer(self):
+        # The background thread never fires during a test; flushes are explicit
+        buffer = FeedbackBuffer(log_dir=self.log_dir, flush_interval=3600, app=self.app)
+        self.buffers.append(buffer)
+        return buffer
+
+    def test_interactions_coalesce_into_one_commit(self):
+        learning = AdaptiveLearningDB(1, feedback_buffer=self.buffer)
+        with patch.object(db.session, 'commit', wraps=db.session.commit) as commit:
+            for _ in range(30):
+                learning.record_stock_view('AAPL', sector='Technology', view_duration=2.0)
+            learning.record_stock_view('MSFT')
+            self.assertEqual(commit.call_count, 0)
+            self.assertEqual(self.buffer.flush(), 31)
+        self.assertEqual(commit.call_count, 1)
+
+        aapl = StockPreference.query.filter_by(user_id=1, symbol='AAPL').one()
+        self.assertEqual((aapl.view_count, aapl.total_view_time, aapl.sector), (30, 60.0, 'Technology'))
+
+        # Later views add to the stored row
+        learning.record_stock_view('AAPL')
+        self.buffer.flush()
+        db.session.expire_all()
+        self.assertEqual(StockPreference.query.filter_by(user_id=1, symbol='AAPL').one().view_count, 31)
+
+    def test_flushed_state_matches_sequential_updates(self):
+        learning = AdaptiveLearningDB(1, feedback_buffer=self.buffer)
+        expected = {column: FeatureWeight.__table__.c[column].default.arg for column in FEATURE_WEIGHT_COLUMNS}
+        score = 0
+        reactions = ['like'] * 14 + ['dislike'] * 3 + ['purchase']
+        for reaction in reactions:
+            learning.record_stock_feedback(f"S{len(reaction)}", reaction, dict(STRONG_STOCK))
+            # The per-interaction update this replaces: clamp, scale, renormalize
+            score = max(min(score + (1 if reaction != 'dislike' else -1), 10), -10)
+            factor = 0.95 if reaction == 'dislike' else 1.05
+            for column in ('price_momentum_weight', 'rotc_weight', 'pe_ratio_weight'):
+                expected[column] *= factor
+            total = sum(expected.values())
+            expected = {column: value / total for column, value in expected.items()}
+
+        # Reads include the user's buffered feedback
+        self.assertEqual(learning.get_preferred_sectors(), [('Energy', score)])
+        self.assertEqual(score, 8)
+        weights = FeatureWeight.query.filter_by(user_id=1).one()
+        for column, value in expected.items():
+            self.assertAlmostEqual(getattr(weights, column), value)
+
+    def test_unflushed_log_of_dead_process_is_replayed(self):
+        learning = AdaptiveLearningDB(2, feedback_buffer=self.buffer)
+        learning.record_stock_view('NVDA', sector='Technology')
+        learning._update_sector_preference('Technology', 1)
+
+        # Simulate the worker dying before its flush
+        orphan = os.path.join(self.log_dir, f"feedback-{dead_pid()}.jsonl")
+        os.replace(os.path.join(self.log_dir, f"feedback-{os.getpid()}.jsonl"), orphan)
+        with open(orphan, 'a') as f:
+            f.write('{"seq": 3, "type": "vie')
+
+        recovered = self._buffer()
+        self.assertEqual(recovered.flush(), 2)
+        self.assertEqual(StockPreference.query.filter_by(user_id=2, symbol='NVDA').one().view_count, 1)
+        self.assertEqual(SectorPreference.query.filter_by(user_id=2).one().score, 1)
+        self.assertEqual(os.listdir(self.log_dir), [])
+
+    def test_failed_flush_keeps_deltas_for_retry(self):
+        learning = AdaptiveLearningDB(3, feedback_buffer=self.buffer)
+        learning.record_stock_view('KO')
+        with patch.object(db.session, 'commit', side_effect=RuntimeError('db down')):
+            self.assertEqual(self.buffer.flush(), 0)
+        learning.record_stock_view('KO')
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(StockPreference.query.filter_by(user_id=3, symbol='KO').one().view_count, 2)
+
+    def test_discarded_feedback_is_not_written_or_replayed(self):
+        learning = AdaptiveLearningDB(4, feedback_buffer=self.buffer)
+        learning._update_sector_preference('Energy', 1)
+        learning.record_stock_view('XOM', sector='Energy')
+        AdaptiveLearningDB(5, feedback_buffer=self.buffer).record_stock_view('XOM')
+        self.buffer.discard(4)
+
+        # Replaying the log after a crash honours the discard too
+        orphan = os.path.join(self.log_dir, f"feedback-{dead_pid()}.jsonl")
+        os.replace(os.path.join(self.log_dir, f"feedback-{os.getpid()}.jsonl"), orphan)
+        self.assertEqual(self._buffer().flush(), 1)
+        self.assertIsNone(SectorPreference.query.filter_by(user_id=4).first())
+        self.assertIsNone(StockPreference.query.filter_by(user_id=4).first())
+        self.assertEqual(StockPreference.query.filter_by(user_id=5).one().view_count, 1)
+
+    def test_replay_skips_events_already_flushed(self):
+        learning = AdaptiveLearningDB(6, feedback_buffer=self.buffer)
+        learning.record_stock_view('PEP')
+        learning.record_stock_view('PEP')
+        # The flush commits but the process dies before deleting its log
+        with patch('ml_components.feedback_buffer.os.remove', side_effect=OSError('crashed')):
+            self.assertEqual(self.buffer.flush(), 2)
+        learning.record_stock_view('PEP')
+
+        # Logs under this pid are claimed as a restarted process's orphans
+        self.assertEqual(self._buffer().flush(), 1)
+        self.assertEqual(StockPreference.query.filter_by(user_id=6, symbol='PEP').one().view_count, 3)
+        self.assertEqual(os.listdir(self.log_dir), [])
+
+    def test_discard_waits_for_in_flight_flush(self):
+        learning = AdaptiveLearningDB(7, feedback_buffer=self.buffer)
+        learning.record_stock_view('T')
+        writing, release, order = threading.Event(), threading.Event(), []
+        write = self.buffer._write
+
+        def slow_write(pending, recovered):
+            writing.set()
+            release.wait(5)
+            order.append('flushed')
+            return write(pending, recovered)
+
+        with patch.object(self.buffer, '_write', side_effect=slow_write):
+            flusher = threading.Thread(target=self.buffer.flush)
+            flusher.start()
+            self.assertTrue(writing.wait(5))
+            discarder = threading.Thread(target=lambda: (self.buffer.discard(7), order.append('discarded')))
+            discarder.start()
+            discarder.join(0.2)
+            self.assertTrue(discarder.is_alive())
+            release.set()
+            flusher.join(5)
+            discarder.join(5)
+        self.assertEqual(order, ['flushed', 'discarded'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analysis import indicators
+from analysis.indicators import IndicatorCache
+
+
+def _pandas_rsi(prices, period=14):
+    delta = prices.diff()
+    gain = delta.where(delta > 0, 0).rolling(window=period).mean()
+    loss = -delta.where(delta < 0, 0).rolling(window=period).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+class TestIndicators(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.long = pd.Series(100 + np.cumsum(rng.normal(0, 1, 260)))
+        self.short = pd.Series(50 + np.cumsum(rng.normal(0, 1, 80)))
+        self.matrix = indicators.stack_series([self.long.values, self.short.values])
+
+    def assertRowsMatch(self, result, expected_fn):
+        """Each row of a stacked result equals the pandas result for that series"""
+        for row, series in enumerate([self.long, self.short]):
+            np.testing.assert_allclose(result[row, -len(series):], expected_fn(series).values,
+                                       equal_nan=True)
+
+    def test_stack_series_right_aligns(self):
+        """Shorter series are padded with NaN at the start"""
+        self.assertEqual(self.matrix.shape, (2, 260))
+        self.assertTrue(np.isnan(self.matrix[1, :180]).all())
+        self.assertEqual(self.matrix[1, -1], self.short.values[-1])
+
+    def test_matches_pandas(self):
+        """Vectorized indicators match the pandas formulations they replace"""
+        self.assertRowsMatch(indicators.rolling_mean(self.matrix, 20), lambda s: s.rolling(20).mean())
+        self.assertRowsMatch(indicators.rolling_std(self.matrix, 20), lambda s: s.rolling(20).std())
+        self.assertRowsMatch(indicators.ema(self.matrix, 12), lambda s: s.ewm(span=12, adjust=False).mean())
+        self.assertRowsMatch(indicators.rsi(self.matrix, 14), _pandas_rsi)
+        self.assertRowsMatch(indicators.returns(self.matrix, 10), lambda s: s.pct_change(periods=10))
+
+    def test_one_dimensional_input(self):
+        """1-D input returns 1-D output"""
+        result = indicators.rolling_mean(self.long.values, 50)
+        self.assertEqual(result.shape, (260,))
+        self.assertAlmostEqual(result[-1], self.long.values[-50:].mean())
+
+    def test_max_drawdown_and_volatility(self):
+        """Drawdown and volatility are computed per row"""
+        prices = np.array([[100, 120, 90, 110], [10, 11, 12, 13]], dtype=float)
+
+        np.testing.assert_allclose(indicators.max_drawdown(prices), [0.25, 0.0])
+        returns = np.diff(prices[0]) / prices[0][:-1]
+        self.assertAlmostEqual(indicators.volatility(prices)[0], np.std(returns) * np.sqrt(252))
+
+    def test_latest_values(self):
+        """Latest values for many symbols come from one pass"""
+        volumes = np.ones_like(self.matrix)
+        latest = indicators.latest_values(self.matrix, volumes)
+
+        self.assertAlmostEqual(latest['sma_50'][1], self.short.values[-50:].mean())
+        self.assertTrue(np.isnan(latest['sma_200'][1]))
+        self.assertAlmostEqual(latest['return_5'][0], self.long.values[-1] / self.long.values[-5] - 1)
+        self.assertAlmostEqual(latest['volume_ratio_20'][0], 1.0)
+
+
+class TestIndicatorCache(unittest.TestCase):
+    def test_memoized_per_symbol_and_last_bar(self):
+        """Indicators are recomputed only when a symbol gets a new bar"""
+        cache = IndicatorCache()
+        prices = np.linspace(10, 20, 60)
+
+        first = cache.latest_many({'AAA': {'close': prices, 'last_bar': '2025-01-02'},
+                                   'BBB': {'close': prices * 2, 'last_bar': '2025-01-02'}})
+        again = cache.latest_many({'AAA': {'close': prices, 'last_bar': '2025-01-02'}})
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertEqual(first['AAA'], again['AAA'])
+
+        cache.latest_many({'AAA': {'close': np.append(prices, 21.0), 'last_bar': '2025-01-03'}})
+        self.assertEqual(cache.misses, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
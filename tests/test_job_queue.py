@@ -0,0 +1,226 @@
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+import unittest
+
+from jobs import (JobStore, JobWorker, WorkerSupervisor, register_job,
+                  QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED)
+
+
+@register_job('test_sum')
+def _sum_job(params, context):
+    for index, stage in enumerate(('load', 'add')):
+        context.report(stage=stage, progress=index / 2)
+    return {'total': sum(params['values'])}
+
+
+@register_job('test_fail')
+def _failing_job(params, context):
+    raise ValueError('bad input')
+
+
+@register_job('test_cancel')
+def _cancellable_job(params, context):
+    context.store.cancel(context.job_id)
+    context.report(stage='second')
+    return {'unreachable': True}
+
+
+@register_job('test_slow')
+def _slow_job(params, context):
+    # Runs longer than stale_after without reporting progress
+    time.sleep(params['seconds'])
+    return {'done': True}
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = JobStore(os.path.join(self.tmpdir, 'jobs.sqlite3'))
+        self.worker = JobWorker(self.store, poll_interval=0.01, name='test-worker')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_submit_run_and_result(self):
+        """A submitted job runs once and exposes progress and its result"""
+        job = self.store.submit('test_sum', {'values': [1, 2, 3]}, owner=7)
+        self.assertEqual(job['status'], QUEUED)
+        self.assertEqual(job['owner'], '7')
+
+        self.assertTrue(self.worker.run_once())
+        self.assertFalse(self.worker.run_once())
+
+        status = self.store.get(job['job_id'])
+        self.assertEqual(status['status'], SUCCEEDED)
+        self.assertEqual(status['stage'], 'add')
+        self.assertEqual(status['progress'], 1.0)
+        self.assertEqual(self.store.result(job['job_id']), {'total': 6})
+
+    def test_identical_submissions_are_reused(self):
+        """Identical parameters reuse in-flight and recently completed jobs"""
+        first = self.store.submit('test_sum', {'values': [1, 2]}, owner=1)
+        second = self.store.submit('test_sum', {'values': [1, 2]}, owner=1)
+        self.assertEqual(first['job_id'], second['job_id'])
+        self.assertTrue(second['cached'])
+
+        self.worker.run_once()
+        cached = self.store.submit('test_sum', {'values': [1, 2]}, owner=1)
+        self.assertEqual(cached['job_id'], first['job_id'])
+        self.assertEqual(cached['status'], SUCCEEDED)
+
+        other_user = self.store.submit('test_sum', {'values': [1, 2]}, owner=2)
+        different = self.store.submit('test_sum', {'values': [2, 1]}, owner=1)
+        self.assertNotEqual(other_user['job_id'], first['job_id'])
+        self.assertNotEqual(different['job_id'], first['job_id'])
+
+        self.store.result_ttl = 0
+        expired = self.store.submit('test_sum', {'values': [1, 2]}, owner=1)
+        self.assertNotEqual(expired['job_id'], first['job_id'])
+
+    def test_failure_is_recorded(self):
+        """Handler exceptions mark the job failed with the error message"""
+        job = self.store.submit('test_fail', {})
+        self.worker.run_once()
+
+        status = self.store.get(job['job_id'])
+        self.assertEqual(status['status'], FAILED)
+        self.assertIn('bad input', status['error'])
+        self.assertIsNone(self.store.result(job['job_id']))
+
+    def test_cancellation(self):
+        """Queued jobs cancel immediately and running jobs stop at their next report"""
+        queued = self.store.submit('test_sum', {'values': [1]})
+        self.assertEqual(self.store.cancel(queued['job_id'])['status'], CANCELLED)
+        self.assertFalse(self.worker.run_once())
+
+        running = self.store.submit('test_cancel', {})
+        self.worker.run_once()
+        status = self.store.get(running['job_id'])
+        self.assertEqual(status['status'], CANCELLED)
+        self.assertIsNone(self.store.result(running['job_id']))
+
+    def test_concurrent_workers_claim_each_job_once(self):
+        """Several workers never run the same job twice"""
+        job_ids = [self.store.submit('test_sum', {'values': [i]})['job_id'] for i in range(20)]
+        claimed = []
+        lock = threading.Lock()
+
+        def claim_all():
+            store = JobStore(self.store.path)
+            while True:
+                job = store.claim('worker')
+                if job is None:
+                    return
+                with lock:
+                    claimed.append(job['job_id'])
+
+        threads = [threading.Thread(target=claim_all) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(claimed), sorted(job_ids))
+
+    def test_stale_running_jobs_are_requeued(self):
+        """Jobs whose worker stopped heartbeating are claimed again"""
+        job = self.store.submit('test_sum', {'values': [4]})
+        self.assertEqual(self.store.claim('dead-worker')['job_id'], job['job_id'])
+        self.assertEqual(self.store.get(job['job_id'])['status'], RUNNING)
+        self.assertIsNone(self.store.claim('other'))
+
+        self.store.stale_after = -1
+        self.assertEqual(self.store.claim('other')['job_id'], job['job_id'])
+
+    def test_heartbeat_keeps_long_stage_claimed(self):
+        """A handler that does not report for longer than stale_after is not run twice"""
+        self.store.stale_after = 0.3
+        worker = JobWorker(self.store, poll_interval=0.01, name='busy-worker', heartbeat_interval=0.05)
+        job = self.store.submit('test_slow', {'seconds': 1.0})
+        thread = threading.Thread(target=worker.run_once)
+        thread.start()
+        while self.store.get(job['job_id'])['status'] == QUEUED:
+            time.sleep(0.01)
+
+        other = JobStore(self.store.path, stale_after=0.3)
+        deadline = time.time() + 0.9
+        while time.time() < deadline:
+            self.assertIsNone(other.claim('other-worker'))
+            time.sleep(0.05)
+        thread.join(timeout=5)
+
+        status = self.store.get(job['job_id'])
+        self.assertEqual(status['status'], SUCCEEDED)
+        self.assertEqual(self.store.result(job['job_id']), {'done': True})
+
+    def test_only_the_claiming_worker_finishes_a_job(self):
+        """A worker whose job was requeued and reclaimed cannot complete, fail or cancel it"""
+        job = self.store.submit('test_sum', {'values': [4]})
+        self.store.claim('first')
+        self.store.stale_after = -1
+        self.store.claim('second')
+        self.store.stale_after = 900
+
+        self.assertFalse(self.store.heartbeat(job['job_id'], 'first'))
+        self.assertTrue(self.store.report(job['job_id'], stage='late', worker='first'))
+        self.assertFalse(self.store.complete(job['job_id'], {'total': 0}, worker='first'))
+        self.assertFalse(self.store.fail(job['job_id'], 'late failure', worker='first'))
+        self.assertFalse(self.store.mark_cancelled(job['job_id'], worker='first'))
+        self.assertEqual(self.store.get(job['job_id'])['status'], RUNNING)
+        self.assertIsNone(self.store.get(job['job_id'])['stage'])
+
+        self.assertTrue(self.store.heartbeat(job['job_id'], 'second'))
+        self.assertTrue(self.store.complete(job['job_id'], {'total': 4}, worker='second'))
+        self.assertEqual(self.store.result(job['job_id']), {'total': 4})
+
+    def test_worker_loop_stops(self):
+        """The worker loop processes queued jobs and exits when stopped"""
+        self.store.submit('test_sum', {'values': [1]})
+        self.store.submit('test_sum', {'values': [2]})
+        stop = threading.Event()
+        thread = threading.Thread(target=lambda: self.worker.run(stop))
+        thread.start()
+        deadline = time.time() + 5
+        while time.time() < deadline and any(
+                job['status'] != SUCCEEDED for job in self.store.list_jobs()):
+            time.sleep(0.01)
+        stop.set()
+        thread.join(timeout=5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(all(job['status'] == SUCCEEDED for job in self.store.list_jobs()))
+
+
+
+class TestWorkerSupervisor(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.supervisor = WorkerSupervisor(1, db_path=os.path.join(self.tmpdir, 'jobs.sqlite3'),
+                                           poll_interval=0.05, check_interval=0.1)
+
+    def tearDown(self):
+        self.supervisor.stop(timeout=5)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_exited_worker_is_restarted_and_stop_terminates(self):
+        """A worker that dies is replaced, and stop() ends every worker"""
+        self.supervisor.start()
+        first_pid = self.supervisor.pids[0]
+        os.kill(first_pid, signal.SIGKILL)
+
+        deadline = time.time() + 10
+        while time.time() < deadline and self.supervisor.pids[0] == first_pid:
+            time.sleep(0.05)
+        self.assertNotEqual(self.supervisor.pids[0], first_pid)
+
+        processes = list(self.supervisor.processes)
+        self.supervisor.stop(timeout=5)
+        self.assertTrue(all(process.poll() is not None for process in processes))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import pickle
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from analysis.enhanced_stock_analyzer import EnhancedStockAnalyzer
+
+
+def download_frame(closes):
+    """yf.download-style frame with (field, symbol) columns"""
+    index = pd.date_range('2024-01-01', periods=len(next(iter(closes.values()))), freq='B')
+    columns = pd.MultiIndex.from_product([['Close', 'Volume'], list(closes)])
+    data = np.column_stack([closes[s] for s in closes] + [np.ones(len(index)) for _ in closes])
+    return pd.DataFrame(data, index=index, columns=columns)
+
+
+class TestLiveQuoteCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.analyzer = EnhancedStockAnalyzer()
+        self.analyzer.cache_dir = Path(self.tmpdir)
+        self.analyzer.quote_cache.clear()
+        self.addCleanup(self.analyzer.quote_cache.clear)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _cache_analysis(self, symbol, price):
+        analysis = {
+            'symbol': symbol,
+            'current_price': price,
+            'price_metrics': {'daily_change': 0.0},
+            'integrated_analysis': {'technical_analysis': {'price_metrics': {'current_price': price}}}
+        }
+        with open(Path(self.tmpdir) / f"{symbol}.pkl", 'wb') as f:
+            pickle.dump(analysis, f)
+
+    def test_batch_quotes_populate_shared_cache(self):
+        frame = download_frame({'AAPL': [100.0, 110.0], 'MSFT': [200.0, 190.0]})
+        with patch('analysis.enhanced_stock_analyzer.yf.download', return_value=frame) as download:
+            quotes = self.analyzer.get_live_quotes(['aapl', 'MSFT'])
+            self.assertEqual(download.call_count, 1)
+            self.assertAlmostEqual(quotes['AAPL']['price'], 110.0)
+            self.assertAlmostEqual(quotes['AAPL']['daily_change'], 10.0)
+            self.assertAlmostEqual(quotes['MSFT']['daily_change'], -5.0)
+
+            # Another analyzer in the process reuses the cached quotes
+            EnhancedStockAnalyzer().get_live_quotes(['AAPL', 'MSFT'])
+            self.assertEqual(download.call_count, 1)
+
+    def test_cache_hit_merges_quote_without_rewriting(self):
+        self._cache_analysis('AAPL', 90.0)
+        frame = download_frame({'AAPL': [100.0, 105.0]})
+        with patch('analysis.enhanced_stock_analyzer.yf.download', return_value=frame), \
+                patch.object(EnhancedStockAnalyzer, '_save_to_cache') as save, \
+                patch.object(EnhancedStockAnalyzer, '_get_current_price') as single_price:
+            result = self.analyzer.analyze_stock('AAPL')
+
+        self.assertEqual(result['current_price'], 105.0)
+        self.assertAlmostEqual(result['price_metrics']['daily_change'], 5.0)
+        self.assertEqual(result['integrated_analysis']['technical_analysis']['price_metrics']['current_price'], 105.0)
+        save.assert_not_called()
+        single_price.assert_not_called()
+
+        # The slow tier keeps the analysis as it was written
+        with open(Path(self.tmpdir) / "AAPL.pkl", 'rb') as f:
+            self.assertEqual(pickle.load(f)['current_price'], 90.0)
+
+    def test_symbols_missing_from_batch_fall_back_to_single_lookup(self):
+        frame = download_frame({'AAPL': [100.0, 101.0]})
+        with patch('analysis.enhanced_stock_analyzer.yf.download', return_value=frame), \
+                patch.object(EnhancedStockAnalyzer, '_fetch_live_quote',
+                             return_value={'price': 50.0, 'daily_change': 1.0, 'price_time': 'now'}) as single:
+            quotes = self.analyzer.get_live_quotes(['AAPL', 'XYZ'])
+        single.assert_called_once_with('XYZ')
+        self.assertEqual(quotes['XYZ']['price'], 50.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import MagicMock
+
+from services.valuation_engine import ValuationEngine
+from services.margin_safety_calculator import MarginOfSafetyCalculator
+
+
+class TestBatchMarginOfSafety(unittest.TestCase):
+    def setUp(self):
+        self.prices = {'AAPL': 30.0, 'MSFT': 45.0, 'XOM': 10.0, 'DEAD': 0.0}
+        self.api_client = MagicMock()
+        self.api_client.get_stock_data.side_effect = lambda symbol: {'current_price': self.prices[symbol]}
+        self.engine = ValuationEngine(self.api_client)
+        self.calculator = MarginOfSafetyCalculator(self.engine)
+
+    def test_batch_values_match_single_symbol_methods(self):
+        """Array valuations agree with the per-symbol Graham and NAV calculations"""
+        snapshots = list(self.engine.load_snapshots(['AAPL', 'MSFT']).values())
+        values = self.engine.batch_intrinsic_values(snapshots)
+
+        for index, snapshot in enumerate(snapshots):
+            graham = self.engine.calculate_graham_valuation(snapshot.symbol, snapshot=snapshot)
+            nav = self.engine.calculate_nav_valuation(snapshot.symbol, snapshot=snapshot)
+            self.assertAlmostEqual(values['graham'][index], graham.intrinsic_value_per_share)
+            self.assertAlmostEqual(values['nav'][index], nav.intrinsic_value_per_share)
+            self.assertGreater(values['dcf'][index], 0)
+
+    def test_ranked_table_with_positions(self):
+        """Rows are ranked by margin, sized, and unpriced symbols are reported as failed"""
+        portfolio = MagicMock(stocks=[{'symbol': 'aapl'}, {'symbol': 'MSFT'}, {'symbol': 'XOM'}, {'symbol': 'DEAD'}])
+
+        result = self.calculator.analyze_many(portfolio, valuation_method='graham', portfolio_value=100000)
+
+        self.assertTrue(result['success'])
+        self.assertEqual([row['symbol'] for row in result['results']], ['XOM', 'AAPL', 'MSFT'])
+        self.assertEqual([row['rank'] for row in result['results']], [1, 2, 3])
+        self.assertEqual(result['failed'], [{'symbol': 'DEAD', 'error': 'No market price'}])
+        self.assertIn('shares_to_buy', result['results'][0]['position'])
+        self.assertEqual(self.api_client.get_stock_data.call_count, 4)
+
+    def test_naif_holdings_and_unknown_method(self):
+        """Naif portfolios are read from their holdings list"""
+        result = self.calculator.analyze_many({'holdings': [{'symbol': 'AAPL'}]}, valuation_method='all')
+        self.assertEqual(result['summary']['analyzed'], 1)
+        self.assertNotIn('position', result['results'][0])
+
+        with self.assertRaises(ValueError):
+            self.calculator.analyze_many(['AAPL'], valuation_method='pe')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from ml_components.improved_ml_engine import ImprovedMLEngine
+from ml_components.integrated_analysis import IntegratedAnalysis
+from ml_components.model_registry import ModelRegistry, RegistryBackedModels
+
+
+def price_history(days=260, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, days))
+    index = pd.bdate_range(end='2024-06-28', periods=days)
+    return pd.DataFrame({
+        'Open': close * 0.999,
+        'High': close * 1.01,
+        'Low': close * 0.99,
+        'Close': close,
+        'Volume': rng.integers(1000, 10000, days).astype(float)
+    }, index=index)
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.registry = ModelRegistry(root=self.tmpdir, keep_versions=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _fitted(self, seed):
+        rng = np.random.default_rng(seed)
+        X, y = rng.normal(size=(60, 4)), rng.normal(size=60)
+        scaler = StandardScaler().fit(X)
+        model = RandomForestRegressor(n_estimators=5, random_state=0).fit(scaler.transform(X), y)
+        return {'models': {'rf': model}, 'scaler': scaler}, X
+
+    def test_versions_metadata_and_memory_mapped_load(self):
+        for seed in range(3):
+            artifacts, X = self._fitted(seed)
+            version = self.registry.save('technical/AAPL', artifacts, data_version=f"2024-01-0{seed + 1}")
+        self.assertEqual(version, 3)
+        self.assertEqual(self.registry.versions('technical/AAPL'), [2, 3])
+        self.assertEqual(self.registry.names(), ['technical/AAPL'])
+        self.assertEqual(self.registry.metadata('technical/AAPL')['data_version'], '2024-01-03')
+
+        loaded = self.registry.load('technical/AAPL')
+        self.assertIsInstance(loaded['scaler'].mean_, np.memmap)
+        self.assertFalse(loaded['scaler'].mean_.flags.writeable)
+        np.testing.assert_allclose(loaded['models']['rf'].predict(loaded['scaler'].transform(X)),
+                                   artifacts['models']['rf'].predict(artifacts['scaler'].transform(X)))
+        self.assertIsNone(self.registry.load('technical/MSFT'))
+
+    def test_loaded_once_per_process_until_new_version(self):
+        artifacts, _ = self._fitted(0)
+        self.registry.save('market', artifacts)
+        with patch('ml_components.model_registry.joblib.load', wraps=joblib.load) as load:
+            self.assertEqual(self.registry.warm(), 1)
+            first = self.registry.load('market')
+            self.assertIs(self.registry.load('market'), first)
+            self.assertEqual(load.call_count, 1)
+
+            self.registry.save('market', self._fitted(1)[0])
+            self.assertIsNot(self.registry.load('market'), first)
+            self.assertEqual(load.call_count, 2)
+
+    def test_loaded_models_are_bounded(self):
+        registry = ModelRegistry(root=self.tmpdir, max_loaded=2)
+        for name in ('a', 'b', 'c'):
+            registry.save(name, self._fitted(0)[0])
+
+        # warm() loads only the most recently published models that fit
+        self.assertEqual(registry.warm(), 2)
+        self.assertEqual(list(registry._loaded), ['c', 'b'])
+
+        registry.load('c')
+        registry.load('a')
+        self.assertEqual(list(registry._loaded), ['c', 'a'])
+
+
+class TestRegistryBackedEngines(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.registry = ModelRegistry(root=self.tmpdir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_incomplete_engine_cannot_be_instantiated(self):
+        class SaveOnly(RegistryBackedModels):
+            def _registry_artifacts(self):
+                return {}
+
+        with self.assertRaises(TypeError):
+            SaveOnly()
+
+    def test_engine_round_trip_keeps_shared_copy_intact(self):
+        features, targets = ImprovedMLEngine().prepare_features(price_history())
+        X, y = features.values[:-1], targets.values[:-1]
+        engine = ImprovedMLEngine()
+        engine.train_model(X, y)
+        engine.save_to_registry('engine', self.registry)
+
+        restored = ImprovedMLEngine()
+        self.assertIsNotNone(restored.load_from_registry('engine', self.registry))
+        self.assertEqual(restored.predict(X[-1:]), engine.predict(X[-1:]))
+
+        # Retraining replaces the shared scaler instead of refitting it in place
+        shared_mean = np.array(restored.feature_scaler.mean_)
+        restored.train_model(X[::2], y[::2])
+        np.testing.assert_array_equal(self.registry.load('engine')['feature_scaler'].mean_, shared_mean)
+
+    def test_predict_many_reuses_models_fitted_on_same_bars(self):
+        histories = {'AAPL': price_history(seed=1), 'MSFT': price_history(seed=2)}
+        download = pd.concat(histories, axis=1)
+
+        with patch('ml_components.integrated_analysis.yf.download', return_value=download), \
+                patch('ml_components.integrated_analysis.get_model_registry', return_value=self.registry), \
+                patch.object(ImprovedMLEngine, 'train_model', autospec=True,
+                             side_effect=ImprovedMLEngine.train_model) as train:
+            first = IntegratedAnalysis().predict_many(['aapl', 'MSFT'])
+            self.assertEqual(train.call_count, 2)
+            self.assertTrue(all(result['success'] for result in first.values()))
+
+            second = IntegratedAnalysis().predict_many(['AAPL', 'MSFT'])
+            self.assertEqual(train.call_count, 2)
+            for symbol in histories:
+                self.assertAlmostEqual(second[symbol]['ml_prediction'], first[symbol]['ml_prediction'])
+
+        self.assertEqual(self.registry.names(), ['technical/AAPL', 'technical/MSFT'])
+
+
+if __name__ == '__main__':
+    unittest.main()
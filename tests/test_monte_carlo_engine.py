@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+
+from ml_components.monte_carlo_engine import MonteCarloEngine
+
+
+class TestMonteCarloEngine(unittest.TestCase):
+    def setUp(self):
+        self.mean_returns = np.array([0.008, 0.006, 0.004])
+        vols = np.array([0.05, 0.04, 0.03])
+        corr = np.array([
+            [1.0, 0.6, 0.2],
+            [0.6, 1.0, 0.3],
+            [0.2, 0.3, 1.0]
+        ])
+        self.cov_matrix = corr * np.outer(vols, vols)
+        self.weights = np.array([0.5, 0.3, 0.2])
+
+    def test_paths_shape_and_start(self):
+        """Paths start at the initial value and include every period"""
+        engine = MonteCarloEngine(num_simulations=250, num_periods=12, chunk_size=100, seed=1)
+        paths = engine.simulate_paths(self.mean_returns, self.cov_matrix, self.weights)
+
+        self.assertEqual(paths.shape, (250, 13))
+        self.assertTrue(np.allclose(paths[:, 0], 1.0))
+
+    def test_seed_reproducibility(self):
+        """Identical seeds produce identical simulations"""
+        first = MonteCarloEngine(num_simulations=500, num_periods=24, seed=42)
+        second = MonteCarloEngine(num_simulations=500, num_periods=24, seed=42)
+
+        a = first.run(self.mean_returns, self.cov_matrix, self.weights)
+        b = second.run(self.mean_returns, self.cov_matrix, self.weights)
+
+        np.testing.assert_array_equal(a['final_values'], b['final_values'])
+
+    def test_correlated_moments(self):
+        """Simulated portfolio returns match the analytic mean and volatility"""
+        engine = MonteCarloEngine(num_simulations=20000, num_periods=1, seed=7)
+        returns = engine.simulate_portfolio_returns(
+            self.mean_returns, self.cov_matrix, self.weights, 20000
+        )[:, 0]
+
+        expected_mean = self.mean_returns @ self.weights
+        expected_vol = np.sqrt(self.weights @ self.cov_matrix @ self.weights)
+
+        self.assertAlmostEqual(returns.mean(), expected_mean, delta=0.001)
+        self.assertAlmostEqual(returns.std(), expected_vol, delta=0.001)
+
+    def test_run_summary(self):
+        """Summary statistics are consistent with each other"""
+        engine = MonteCarloEngine(num_simulations=1000, num_periods=60, chunk_size=300, seed=3)
+        result = engine.run(self.mean_returns, self.cov_matrix, self.weights)
+
+        self.assertEqual(len(result['final_values']), 1000)
+        self.assertLessEqual(result['percentiles']['5%'], result['percentiles']['50%'])
+        self.assertLessEqual(result['percentiles']['50%'], result['percentiles']['95%'])
+        self.assertTrue(0 <= result['loss_probability'] <= 100)
+        self.assertTrue(np.all(result['max_drawdowns'] >= 0))
+        self.assertTrue(np.all(result['max_drawdowns'] < 1))
+
+    def test_semidefinite_covariance(self):
+        """Rank-deficient covariance matrices are repaired before factoring"""
+        cov = np.array([[0.04, 0.04], [0.04, 0.04]])
+        chol = MonteCarloEngine.cholesky_factor(cov)
+
+        self.assertTrue(np.allclose(chol @ chol.T, cov, atol=1e-8))
+
+    def test_max_drawdowns(self):
+        """Drawdown is measured from the running peak"""
+        paths = np.array([[1.0, 1.2, 0.9, 1.3], [1.0, 1.1, 1.2, 1.3]])
+        drawdowns = MonteCarloEngine.max_drawdowns(paths)
+
+        self.assertAlmostEqual(drawdowns[0], 0.25)
+        self.assertAlmostEqual(drawdowns[1], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
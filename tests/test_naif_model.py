@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch, MagicMock
 import json
 import os
+import shutil
 import sys
 import tempfile
 
@@ -15,7 +16,10 @@ class TestNaifAlRasheedModel(unittest.TestCase):
     
     def setUp(self):
         """Set up test environment"""
-        self.model = NaifAlRasheedModel()
+        # Keep stage checkpoints of mocked runs out of the shared checkpoint directory
+        checkpoint_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, checkpoint_dir, ignore_errors=True)
+        self.model = NaifAlRasheedModel(checkpoint_dir=checkpoint_dir)
         # Create a mock SaudiMarketAPI
         patcher = patch('ml_components.naif_alrasheed_model.SaudiMarketAPI')
         self.mock_api_class = patcher.start()
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+
+from ml_components.naif_alrasheed_model import NaifAlRasheedModel
+from ml_components import naif_model_optimizer
+from ml_components.naif_model_optimizer import OptimizedNaifModel
+
+
+SYMBOLS = ['1180', '2222', '1010', '2030', '7200', '4700']
+
+
+class TestOptimizedNaifModel(unittest.TestCase):
+    """Test cases for the asyncio Naif Al-Rasheed fast path"""
+
+    def setUp(self):
+        patchers = [
+            patch('ml_components.naif_alrasheed_model.SaudiMarketAPI'),
+            patch('ml_components.naif_alrasheed_model.DataFetcher'),
+            patch('ml_components.naif_alrasheed_model.EnhancedStockAnalyzer'),
+            patch('ml_components.naif_model_optimizer.EnhancedStockAnalyzer'),
+            # Fresh per-thread analyzers for each test
+            patch.object(naif_model_optimizer, '_management_analyzers', threading.local()),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.model = NaifAlRasheedModel()
+        self.model.investment_criteria['saudi']['min_management_score'] = 0
+        self.model.portfolio_params.update({'min_stocks': 2, 'min_sectors': 1, 'simulation_runs': 200})
+        self.model._analyze_macro_conditions = MagicMock(return_value={'favorable_sectors': ['Banks']})
+        self.model._generate_visualizations = MagicMock(return_value={})
+
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.model.saudi_api.get_symbol_info.side_effect = self._symbol_info
+        self.model.saudi_api.get_quotes.side_effect = lambda symbols: {s: {'price': 10.0} for s in symbols}
+        self.model._load_price_history = self._history
+
+    def _track(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+
+    def _symbol_info(self, symbol):
+        self._track()
+        return {
+            'symbol': symbol, 'name': f'Company {symbol}',
+            'sector': 'Banks' if symbol.startswith('1') else 'Materials',
+            'market_cap': 2_000_000_000, 'roic': 5 if symbol == '2222' else 20,
+            'revenue_growth': 10, 'ebitda': 1, 'free_cash_flow': 1, 'roe': 15,
+            'profit_margin': 12, 'debt_to_equity': 0.5, 'pe_ratio': 12, 'pb_ratio': 1.5,
+            'dividend_yield': 3, 'price': 10, 'high_52w': 12, 'low_52w': 8
+        }
+
+    def _history(self, symbol, market):
+        self._track()
+        close = 100 + np.cumsum(np.random.default_rng(int(symbol)).normal(0.1, 1, 120))
+        return {'close': close, 'volume': np.ones(120), 'last_bar': f'{symbol}-120'}
+
+    def test_output_matches_full_screening_shape(self):
+        """The fast path applies the model criteria and returns the full screening format"""
+        optimized = OptimizedNaifModel(self.model)
+        result = asyncio.run(optimized.analyze_portfolio_fast(SYMBOLS, 'SAUDI'))
+
+        self.assertTrue(result['success'])
+        self.assertNotIn('fallback_mode', result)
+        self.assertGreaterEqual(result['processing_time'], 0)
+        for key in ('market', 'parameters', 'macro_analysis', 'sector_scores', 'selected_sectors',
+                    'screened_companies', 'quality_companies', 'valuated_companies',
+                    'selected_companies', 'portfolio', 'simulation_results', 'visualizations',
+                    'recommendations', 'data_date', 'restored_stages'):
+            self.assertIn(key, result)
+        self.assertEqual(result['restored_stages'], [])
+
+        # 2222 fails the minimum ROTC criterion
+        self.assertNotIn('2222', result['screened_companies'])
+        self.assertEqual(set(result['screened_companies']), set(SYMBOLS) - {'2222'})
+        self.assertEqual(set(result['sector_scores']), {'Banks', 'Materials'})
+
+    def test_fetches_run_concurrently(self):
+        """Fundamentals and histories for all symbols are fetched in parallel"""
+        optimized = OptimizedNaifModel(self.model, max_concurrency=6)
+        asyncio.run(optimized.analyze_portfolio_fast(SYMBOLS, 'saudi'))
+
+        self.assertGreater(self.peak, 1)
+        self.assertLessEqual(self.peak, 6)
+
+    def test_concurrent_management_analysis_uses_own_analyzer(self):
+        """Companies analyzed at the same time do not share the analyzer's per-call state"""
+        class StatefulAnalyzer:
+            def analyze_stock(self, symbol):
+                self.symbol = symbol
+                time.sleep(0.05)
+                consistency = 90 if self.symbol == 'AAA' else 40
+                return {'revenue_consistency': consistency, 'margin_consistency': consistency}
+
+        companies = [{'symbol': 'AAA', 'sector': 'Technology'}, {'symbol': 'BBB', 'sector': 'Energy'}]
+        optimized = OptimizedNaifModel(self.model)
+        with patch('ml_components.naif_model_optimizer.EnhancedStockAnalyzer', StatefulAnalyzer):
+            quality = asyncio.run(optimized._per_company(
+                asyncio.Semaphore(2), optimized._analyze_management_quality, companies,
+                {'min_management_score': 0}, 'us', executor=naif_model_optimizer._management_executor()))
+
+        scores = {company['symbol']: company['management_quality']['score'] for company in quality}
+        self.assertEqual(list(scores), ['AAA', 'BBB'])
+        self.assertGreater(scores['AAA'], scores['BBB'])
+
+    def test_invalid_market_requests_fallback(self):
+        """An unsupported market asks the caller to fall back to the full screening"""
+        result = asyncio.run(OptimizedNaifModel(self.model).analyze_portfolio_fast(SYMBOLS, 'EU'))
+
+        self.assertFalse(result['success'])
+        self.assertTrue(result['fallback_mode'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from trading.broker_integration import PaperTradingBroker, Order, OrderSide, OrderType
+
+
+def fixed_quote(symbol, price=100.0):
+    return {"symbol": symbol, "ask_price": price, "bid_price": price}
+
+
+class TestPaperTradingJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _broker(self, **kwargs):
+        broker = PaperTradingBroker(data_path=self.tmpdir, initial_balance=10000.0, **kwargs)
+        self.addCleanup(broker.close)
+        return broker
+
+    def _trade(self, broker):
+        with patch.object(PaperTradingBroker, 'get_quote', side_effect=fixed_quote):
+            broker.market_buy('AAPL', 10)
+            broker.market_buy('MSFT', 5)
+            broker.market_sell('MSFT', 5)
+            broker.limit_buy('AAPL', 1, 90.0)
+
+    def test_state_replayed_on_restart(self):
+        """Orders, positions and cash survive a restart"""
+        broker = self._broker()
+        self._trade(broker)
+        broker.close()
+
+        restored = self._broker()
+        self.assertEqual(len(restored.get_orders()), 4)
+        self.assertEqual([p.symbol for p in restored.get_positions()], ['AAPL'])
+        self.assertEqual(restored.get_position('aapl').quantity, 10)
+        self.assertAlmostEqual(restored.get_account_info()['cash'], 9000.0)
+
+        open_order = restored.get_orders(status='open')[0]
+        self.assertTrue(restored.cancel_order(open_order.id))
+        restored.close()
+        self.assertEqual(self._broker().get_order(open_order.id).status, 'cancelled')
+
+    def test_journal_is_append_only_and_compacted(self):
+        """Events are appended as JSON lines and folded into snapshots"""
+        broker = self._broker(snapshot_interval=3)
+        journal_path = os.path.join(self.tmpdir, 'journal.jsonl')
+        self._trade(broker)
+
+        with open(journal_path) as f:
+            events = [json.loads(line) for line in f]
+        self.assertEqual([event['type'] for event in events], ['order'])
+
+        broker.close()
+        restored = self._broker(snapshot_interval=3)
+        self.assertEqual(len(restored.get_orders()), 4)
+        self.assertAlmostEqual(restored.get_account_info()['cash'], 9000.0)
+
+    def test_torn_last_line_and_legacy_migration(self):
+        """A partially written event is ignored and old JSON files are migrated"""
+        account = {"account_id": "paper_1", "cash": 500.0, "portfolio_value": 500.0,
+                   "equity": 500.0, "buying_power": 1000.0, "broker": "paper"}
+        order = Order('IBM', 1, OrderSide.BUY, OrderType.LIMIT, price=10.0)
+        order.id, order.status = 'paper_order_1_0', 'open'
+        with open(os.path.join(self.tmpdir, 'account.json'), 'w') as f:
+            json.dump(account, f)
+        with open(os.path.join(self.tmpdir, 'orders.json'), 'w') as f:
+            json.dump([order.to_dict()], f)
+
+        broker = self._broker()
+        self.assertEqual(broker.get_account_info()['cash'], 500.0)
+        self.assertEqual(broker.get_order('paper_order_1_0').symbol, 'IBM')
+        broker.close()
+
+        with open(os.path.join(self.tmpdir, 'journal.jsonl'), 'a') as f:
+            f.write('{"seq": 99, "type": "fi')
+        self.assertEqual(len(self._broker().get_orders()), 1)
+
+    def test_in_memory_broker(self):
+        """data_path=None keeps everything in memory"""
+        broker = PaperTradingBroker(data_path=None, initial_balance=1000.0)
+        with patch.object(PaperTradingBroker, 'get_quote', side_effect=fixed_quote):
+            broker.market_buy('AAPL', 2)
+        self.assertEqual(broker.get_position('AAPL').quantity, 2)
+        self.assertIsNone(broker.journal)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from portfolio.price_panel import PricePanelLoader
+from portfolio.portfolio_optimization import PortfolioOptimizer
+
+
+class FakeMarket:
+    """Stand-in for yf.download serving synthetic daily bars up to ``available_until``"""
+
+    def __init__(self, symbols, days=300):
+        end = pd.Timestamp.now().normalize()
+        self.dates = pd.bdate_range(end=end, periods=days)
+        rng = np.random.default_rng(7)
+        self.close = pd.DataFrame(100 * np.cumprod(1 + rng.normal(0, 0.01, (days, len(symbols))), axis=0),
+                                  index=self.dates, columns=symbols)
+        self.dividends = pd.DataFrame(0.0, index=self.dates, columns=symbols)
+        self.available_until = self.dates[-1]
+        self.calls = []
+
+    def __call__(self, symbols, start=None, end=None, **kwargs):
+        self.calls.append((list(symbols), start, end))
+        rows = (self.dates >= pd.Timestamp(start)) & (self.dates < pd.Timestamp(end)) & \
+               (self.dates <= self.available_until)
+        close = self.close.loc[rows].reindex(columns=symbols)
+        frames = {
+            'Close': close,
+            'Volume': close.notna() * 1000.0,
+            'Dividends': self.dividends.loc[rows].reindex(columns=symbols).fillna(0.0),
+        }
+        return pd.concat(frames, axis=1)
+
+
+class TestPricePanelLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.market = FakeMarket(['AAPL', 'MSFT', 'KO'])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _loader(self, **kwargs):
+        return PricePanelLoader(cache_dir=self.tmpdir, download=self.market, **kwargs)
+
+    def test_one_batched_download_aligned_matrix(self):
+        # MSFT misses a day; its close is carried forward on the common index
+        gap_day = self.market.dates[-10]
+        self.market.close.loc[gap_day, 'MSFT'] = np.nan
+
+        panel = self._loader().load(['msft', 'AAPL', 'NOPE'], period='6mo')
+        self.assertEqual(len(self.market.calls), 1)
+        self.assertEqual(panel.symbols, ['MSFT', 'AAPL'])
+        self.assertEqual(panel.close.dtype, np.float64)
+        self.assertTrue(panel.close.flags['C_CONTIGUOUS'])
+        self.assertEqual(panel.close.shape, (2, len(panel.dates)))
+
+        col = list(panel.dates).index(np.datetime64(gap_day.date(), 'D'))
+        self.assertEqual(panel.close[0, col], panel.close[0, col - 1])
+        self.assertGreaterEqual(panel.dates[0], np.datetime64((pd.Timestamp.now() - pd.DateOffset(months=6)).date()))
+
+    def test_cached_panel_reused_then_extended_incrementally(self):
+        self.market.available_until = self.market.dates[-6]
+        first = self._loader().load(['AAPL', 'MSFT'], period='1y')
+        self.assertEqual(first.dates[-1], np.datetime64(self.market.dates[-6].date()))
+
+        # A fresh panel on disk is served without any download
+        self._loader(refresh_interval=3600).load(['MSFT', 'AAPL'], period='1y')
+        self.assertEqual(len(self.market.calls), 1)
+
+        # Once stale, only the bars from the last final stored bar onwards are fetched
+        self.market.available_until = self.market.dates[-1]
+        extended = self._loader(refresh_interval=0).load(['AAPL', 'MSFT'], period='1y')
+        self.assertEqual(len(self.market.calls), 2)
+        self.assertEqual(pd.Timestamp(self.market.calls[-1][1]), self.market.dates[-7])
+        self.assertEqual(extended.dates[-1], np.datetime64(self.market.dates[-1].date()))
+        expected = self.market.close.loc[self.market.dates[-1], ['AAPL', 'MSFT']].to_numpy()
+        np.testing.assert_allclose(extended.close[:, -1], expected)
+        self.assertEqual(len(np.unique(extended.dates)), len(extended.dates))
+
+    def test_adjusted_history_change_triggers_full_reload(self):
+        self.market.available_until = self.market.dates[-6]
+        self._loader().load(['AAPL', 'KO'], period='1y')
+
+        # A dividend re-adjusts KO's earlier closes
+        self.market.close['KO'] *= 0.99
+        self.market.dividends.loc[self.market.dates[-3], 'KO'] = 1.0
+        self.market.available_until = self.market.dates[-1]
+        panel = self._loader(refresh_interval=0).load(['AAPL', 'KO'], period='1y')
+
+        self.assertEqual(len(self.market.calls), 3)
+        np.testing.assert_allclose(panel.close[1], self.market.close['KO'].loc[pd.DatetimeIndex(panel.dates)])
+        ko_yield = panel.dividend_yields()[1]
+        self.assertAlmostEqual(ko_yield, 1.0 / panel.close[1, -1])
+
+    def test_optimizer_uses_panel_for_history_and_yields(self):
+        self.market.dividends.loc[self.market.dates[-20], 'KO'] = 2.0
+        optimizer = PortfolioOptimizer()
+        optimizer.price_panels = self._loader()
+
+        data = optimizer.get_historical_data(['AAPL', 'BTC', 'KO'])
+        self.assertEqual(list(data.columns), ['AAPL', 'KO'])
+        yields = optimizer.get_dividend_yields(['AAPL', 'KO'])
+        self.assertEqual(len(self.market.calls), 1)
+        self.assertEqual(yields['AAPL'], 0.0)
+        self.assertAlmostEqual(yields['KO'], 2.0 / data['KO'].iloc[-1])
+
+    def test_yields_reload_a_full_year_after_a_shorter_history(self):
+        # Paid nine months ago: inside the trailing year, outside a 6mo panel
+        self.market.dividends.loc[self.market.dates[-200], 'KO'] = 2.0
+        optimizer = PortfolioOptimizer()
+        optimizer.price_panels = self._loader()
+
+        optimizer.get_historical_data(['AAPL', 'KO'], period='6mo')
+        yields = optimizer.get_dividend_yields(['AAPL', 'KO'])
+        self.assertEqual(len(self.market.calls), 2)
+        self.assertAlmostEqual(yields['KO'], 2.0 / self.market.close['KO'].iloc[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from utils.rate_limiter import (
+    PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, PriorityGate, SharedSlidingWindowLimiter,
+    SlidingWindowLimiter, TokenBucket, current_priority, get_window_limiter,
+    request_priority, reset_rate_limiters
+)
+
+
+class TestSlidingWindowLimiter(unittest.TestCase):
+    def test_window_limit_and_wait_estimate(self):
+        """Calls beyond the limit are refused with the time until the oldest expires"""
+        limiter = SlidingWindowLimiter(limit=2, period=0.2)
+
+        self.assertEqual(limiter.try_acquire(), 0.0)
+        self.assertEqual(limiter.try_acquire(), 0.0)
+        wait = limiter.try_acquire()
+        self.assertGreater(wait, 0.0)
+        self.assertLessEqual(wait, 0.2)
+        self.assertEqual(limiter.in_window(), 2)
+
+        time.sleep(wait)
+        self.assertEqual(limiter.try_acquire(), 0.0)
+
+    def test_min_interval(self):
+        """Consecutive calls are spaced by min_interval"""
+        limiter = SlidingWindowLimiter(limit=10, period=1, min_interval=0.05)
+
+        start = time.monotonic()
+        for _ in range(3):
+            self.assertTrue(limiter.acquire())
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_acquire_timeout(self):
+        """acquire returns False when no slot frees up in time"""
+        limiter = SlidingWindowLimiter(limit=1, period=10)
+        limiter.acquire()
+
+        self.assertFalse(limiter.acquire(timeout=0.05))
+
+    def test_registry_shares_limiter(self):
+        """Limiters are shared by name until reset"""
+        reset_rate_limiters()
+        first = get_window_limiter('test_upstream', limit=5, period=60)
+        self.assertIs(get_window_limiter('test_upstream', limit=5, period=60), first)
+        reset_rate_limiters()
+        self.assertIsNot(get_window_limiter('test_upstream', limit=5, period=60), first)
+        reset_rate_limiters()
+
+
+class TestSharedSlidingWindowLimiter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'limits.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_window_shared_between_instances(self):
+        """Limiters on the same file and name share one window"""
+        first = SharedSlidingWindowLimiter('av', limit=2, period=60, path=self.path)
+        second = SharedSlidingWindowLimiter('av', limit=2, period=60, path=self.path)
+        other = SharedSlidingWindowLimiter('ib', limit=2, period=60, path=self.path)
+
+        self.assertEqual(first.try_acquire(), 0.0)
+        self.assertEqual(second.try_acquire(), 0.0)
+        self.assertGreater(first.try_acquire(), 50)
+        self.assertEqual(other.try_acquire(), 0.0)
+
+    def test_registry_uses_shared_path(self):
+        """get_window_limiter returns a shared limiter when a path is configured"""
+        reset_rate_limiters()
+        limiter = get_window_limiter('test_shared', limit=1, period=60, shared_path=self.path)
+        reset_rate_limiters()
+
+        self.assertIsInstance(limiter, SharedSlidingWindowLimiter)
+
+
+class TestPriorityGate(unittest.TestCase):
+    def _run_queued(self, gate, callers):
+        """Start callers (name, priority, key) while the gate is closed, then open it"""
+        order = []
+        threads = []
+        for name, priority, key in callers:
+            thread = threading.Thread(
+                target=lambda n=name, p=priority, k=key: gate.acquire(priority=p, key=k) and order.append(n)
+            )
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.02)
+        return order, threads
+
+    def test_interactive_admitted_before_background(self):
+        """Queued interactive callers take slots ahead of earlier background callers"""
+        slots = {'open': False}
+        gate = PriorityGate(lambda: 0.0 if slots['open'] else 0.01)
+
+        order, threads = self._run_queued(gate, [
+            ('bg1', PRIORITY_BACKGROUND, None),
+            ('bg2', PRIORITY_BACKGROUND, None),
+            ('ui', PRIORITY_INTERACTIVE, None),
+        ])
+        self.assertEqual(gate.queued(), {PRIORITY_BACKGROUND: 2, PRIORITY_INTERACTIVE: 1})
+
+        slots['open'] = True
+        for thread in threads:
+            thread.join(timeout=2)
+
+        self.assertEqual(order, ['ui', 'bg1', 'bg2'])
+        self.assertEqual(gate.queued(), {})
+
+    def test_promote_queued_request(self):
+        """A queued background request can be promoted by key"""
+        slots = {'open': False}
+        gate = PriorityGate(lambda: 0.0 if slots['open'] else 0.01)
+
+        order, threads = self._run_queued(gate, [
+            ('bg1', PRIORITY_BACKGROUND, 'a'),
+            ('bg2', PRIORITY_BACKGROUND, 'b'),
+        ])
+        self.assertTrue(gate.promote('b', PRIORITY_INTERACTIVE))
+        self.assertFalse(gate.promote('missing', PRIORITY_INTERACTIVE))
+
+        slots['open'] = True
+        for thread in threads:
+            thread.join(timeout=2)
+
+        self.assertEqual(order, ['bg2', 'bg1'])
+
+    def test_timeout(self):
+        """acquire gives up after the timeout and leaves the queue"""
+        gate = PriorityGate(lambda: 1.0)
+
+        self.assertFalse(gate.acquire(timeout=0.05))
+        self.assertEqual(gate.queued(), {})
+
+    def test_gate_over_token_bucket(self):
+        """The gate can front a TokenBucket"""
+        gate = PriorityGate(TokenBucket(rate=100, capacity=1).try_acquire)
+
+        start = time.monotonic()
+        for _ in range(3):
+            self.assertTrue(gate.acquire())
+        self.assertGreaterEqual(time.monotonic() - start, 0.015)
+
+
+class TestRequestPriority(unittest.TestCase):
+    def test_context_sets_thread_priority(self):
+        """request_priority applies to the current thread only and nests"""
+        self.assertEqual(current_priority(), PRIORITY_INTERACTIVE)
+        with request_priority(PRIORITY_BACKGROUND):
+            self.assertEqual(current_priority(), PRIORITY_BACKGROUND)
+            seen = []
+            thread = threading.Thread(target=lambda: seen.append(current_priority()))
+            thread.start()
+            thread.join()
+            self.assertEqual(seen, [PRIORITY_INTERACTIVE])
+            with request_priority(PRIORITY_INTERACTIVE):
+                self.assertEqual(current_priority(), PRIORITY_INTERACTIVE)
+            self.assertEqual(current_priority(), PRIORITY_BACKGROUND)
+        self.assertEqual(current_priority(), PRIORITY_INTERACTIVE)
+
+
+if __name__ == '__main__':
+    unittest.main()
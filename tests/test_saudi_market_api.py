@@ -0,0 +1,84 @@
+"""
+Test suite for the Saudi market API client
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from caching import TieredCache
+from data.saudi_market_api import SaudiMarketAPI
+from utils.rate_limiter import reset_rate_limiters
+
+
+def _download_frame(prices):
+    """yf.download-style frame grouped by ticker"""
+    columns = pd.MultiIndex.from_product([list(prices), ['Open', 'High', 'Low', 'Close', 'Volume']])
+    row = []
+    for price in prices.values():
+        row.extend([price - 1, price + 1, price - 2, price, 1000])
+    return pd.DataFrame([row], columns=columns, index=[pd.Timestamp('2025-01-02')])
+
+
+class TestSaudiMarketAPI(unittest.TestCase):
+    """Test cases for batched Saudi quotes"""
+
+    def setUp(self):
+        reset_rate_limiters()
+        self.tmpdir = tempfile.mkdtemp()
+        self.api = SaudiMarketAPI()
+        self.api.cache = TieredCache('saudi_market_test', directory=self.tmpdir,
+                                     ttls=self.api.cache_expiry, disk_format='json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_resolve_symbol(self):
+        """Codes, suffixes, legacy tickers and company names resolve to XXXX.SR"""
+        self.assertEqual(self.api._resolve_symbol('2222'), '2222.SR')
+        self.assertEqual(self.api._resolve_symbol('2222.SA'), '2222.SR')
+        self.assertEqual(self.api._resolve_symbol('STC'), '7010.SR')
+        self.assertEqual(self.api._resolve_symbol('Aramco'), '2222.SR')
+        self.assertEqual(self.api._resolve_symbol('UNKNOWN'), 'UNKNOWN.SR')
+
+    @patch('data.saudi_market_api.yf.download')
+    def test_quotes_fetched_in_one_batch(self, mock_download):
+        """All uncached symbols are fetched with a single download"""
+        mock_download.return_value = _download_frame({'2222.SR': 30.0, '1120.SR': 80.0})
+
+        quotes = self.api.get_quotes(['2222', 'Al Rajhi'])
+
+        self.assertEqual(mock_download.call_count, 1)
+        self.assertEqual(sorted(mock_download.call_args[0][0]), ['1120.SR', '2222.SR'])
+        self.assertEqual(quotes['2222']['price'], 30.0)
+        self.assertEqual(quotes['2222']['symbol'], '2222')
+        self.assertEqual(quotes['Al Rajhi']['price'], 80.0)
+        self.assertEqual(quotes['Al Rajhi']['change'], 1.0)
+
+    @patch('data.saudi_market_api.yf.download')
+    def test_overlapping_requests_reuse_cached_quotes(self, mock_download):
+        """Quotes are cached per symbol, so only new symbols are downloaded"""
+        mock_download.return_value = _download_frame({'2222.SR': 30.0, '1120.SR': 80.0})
+        self.api.get_quotes(['2222', '1120'])
+
+        mock_download.return_value = _download_frame({'2010.SR': 70.0})
+        quotes = self.api.get_quotes(['1120.SR', '2010'])
+
+        self.assertEqual(mock_download.call_args[0][0], ['2010.SR'])
+        self.assertEqual(quotes['1120.SR']['price'], 80.0)
+        self.assertEqual(quotes['2010']['price'], 70.0)
+
+        mock_download.reset_mock()
+        self.api.get_quotes(['2222', '2010'])
+        mock_download.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
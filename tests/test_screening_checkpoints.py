@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ml_components.screening_checkpoints import ScreeningCheckpointStore
+
+
+class TestScreeningCheckpointStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = ScreeningCheckpointStore(self.tmpdir)
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _compute(self, value):
+        def compute():
+            self.calls.append(value)
+            return value
+        return compute
+
+    def test_stage_restored_on_rerun(self):
+        """A completed stage is loaded instead of recomputed"""
+        first = self.store.run_stage('macro', 'us', '2024-01-02', None, None, self._compute({'x': 1}))
+        second = self.store.run_stage('macro', 'us', '2024-01-02', None, None, self._compute({'x': 2}))
+
+        self.assertEqual(first[0], {'x': 1})
+        self.assertFalse(first[2])
+        self.assertEqual(second[0], {'x': 1})
+        self.assertTrue(second[2])
+        self.assertEqual(self.calls, [{'x': 1}])
+
+    def test_empty_and_degraded_outputs_are_not_checkpointed(self):
+        """Empty, failed and rejected stage outputs are recomputed on the next run"""
+        for value in ([], ([], ['Banks']), {'success': False, 'message': 'failed'}, None):
+            self.store.run_stage('fundamentals', 'us', '2024-01-02', None, None, self._compute(value))
+            restored = self.store.run_stage('fundamentals', 'us', '2024-01-02', None, None,
+                                            self._compute(['AAPL']))
+            self.assertFalse(restored[2])
+            self.store.clear()
+
+        self.store.run_stage('macro', 'us', '2024-01-02', None, None, self._compute({'indicators': {}}),
+                             complete=lambda macro: bool(macro['indicators']))
+        self.assertFalse(self.store.run_stage('macro', 'us', '2024-01-02', None, None,
+                                              self._compute({'indicators': {'gdp': 2.0}}))[2])
+
+        # Falsy scalars are still complete outputs
+        self.store.run_stage('sectors', 'us', '2024-01-02', None, None, self._compute(0))
+        self.assertEqual(self.store.run_stage('sectors', 'us', '2024-01-02', None, None, self._compute(1))[0], 0)
+
+    def test_directory_from_environment(self):
+        """The default directory can be redirected without code changes"""
+        with patch.dict(os.environ, {'SCREENING_CHECKPOINT_DIR': self.tmpdir}):
+            store = ScreeningCheckpointStore()
+        self.assertEqual(str(store.disk.directory), self.tmpdir)
+
+    def test_keys_depend_on_inputs(self):
+        """Parameters, data date, market and upstream key all change the checkpoint key"""
+        base = self.store.stage_key('fundamentals', 'us', '2024-01-02', {'min_rotc': 15}, 'parent')
+        self.assertEqual(base, self.store.stage_key('fundamentals', 'us', '2024-01-02', {'min_rotc': 15}, 'parent'))
+        self.assertNotEqual(base, self.store.stage_key('fundamentals', 'us', '2024-01-02', {'min_rotc': 12}, 'parent'))
+        self.assertNotEqual(base, self.store.stage_key('fundamentals', 'us', '2024-01-03', {'min_rotc': 15}, 'parent'))
+        self.assertNotEqual(base, self.store.stage_key('fundamentals', 'saudi', '2024-01-02', {'min_rotc': 15}, 'parent'))
+        self.assertNotEqual(base, self.store.stage_key('fundamentals', 'us', '2024-01-02', {'min_rotc': 15}, 'other'))
+
+    def test_resume_disabled_recomputes(self):
+        """resume=False ignores and overwrites existing checkpoints"""
+        self.store.run_stage('macro', 'us', '2024-01-02', None, None, self._compute(1))
+        value, _, restored = self.store.run_stage('macro', 'us', '2024-01-02', None, None,
+                                                  self._compute(2), resume=False)
+        self.assertEqual(value, 2)
+        self.assertFalse(restored)
+        self.assertEqual(self.store.run_stage('macro', 'us', '2024-01-02', None, None, self._compute(3))[0], 2)
+
+    def test_clear_by_market_and_date(self):
+        """Checkpoints can be cleared per market and data date"""
+        self.store.run_stage('macro', 'us', '2024-01-02', None, None, self._compute(1))
+        self.store.run_stage('macro', 'us', '2024-01-03', None, None, self._compute(2))
+        self.store.run_stage('macro', 'saudi', '2024-01-02', None, None, self._compute(3))
+
+        self.assertEqual(self.store.clear(market='us', data_date='2024-01-02'), 1)
+        self.assertEqual(self.store.clear(market='us'), 1)
+        self.assertEqual(self.store.clear(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from ml_components.screening_executor import ScreeningExecutor
+
+
+class TestScreeningExecutor(unittest.TestCase):
+    def setUp(self):
+        self.criteria = {
+            'min_rotc': 15.0,
+            'min_revenue_growth': 5.0,
+            'min_market_cap': 1_000_000_000,
+            'positive_ebitda': True,
+            'positive_fcf': True
+        }
+
+    def test_prefetch_runs_concurrently(self):
+        """Fetches overlap instead of running one symbol at a time"""
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow_fetch(symbol):
+            with lock:
+                active.append(symbol)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(symbol)
+            return {'symbol': symbol}
+
+        executor = ScreeningExecutor(max_workers=4)
+        results = executor.prefetch(['A', 'B', 'C', 'D', 'A'], {'info': slow_fetch})
+
+        self.assertEqual(set(results), {'A', 'B', 'C', 'D'})
+        self.assertEqual(results['C']['info'], {'symbol': 'C'})
+        self.assertGreater(max(peak), 1)
+
+    def test_prefetch_records_failures_as_none(self):
+        """A failing fetcher does not abort the other symbols"""
+        def flaky(symbol):
+            if symbol == 'BAD':
+                raise RuntimeError("upstream error")
+            return 1
+
+        results = ScreeningExecutor(max_workers=2).prefetch(['GOOD', 'BAD'], {'value': flaky})
+
+        self.assertEqual(results['GOOD']['value'], 1)
+        self.assertIsNone(results['BAD']['value'])
+
+    def test_score_fundamentals(self):
+        """Criteria and scores match the per-company formula"""
+        metrics = pd.DataFrame([
+            # Passes: score = 2*25 + 2*15 + 2*10 + 10 + 15 = 125 -> capped at 100
+            {'market_cap': 2e9, 'rotc': 30, 'revenue_growth': 10, 'ebitda': 1, 'free_cash_flow': 1,
+             'profit_margin': 25, 'debt_to_equity': 0.5},
+            # Passes with debt penalty: 25 + 15 + 5 + 10 + 15 - 20 = 50
+            {'market_cap': 2e9, 'rotc': 15, 'revenue_growth': 5, 'ebitda': 1, 'free_cash_flow': 1,
+             'profit_margin': 5, 'debt_to_equity': 2.0},
+            # Fails on missing ROTC
+            {'market_cap': 2e9, 'rotc': None, 'revenue_growth': 10, 'ebitda': 1, 'free_cash_flow': 1,
+             'profit_margin': 10, 'debt_to_equity': 0.5},
+            # Fails on negative free cash flow
+            {'market_cap': 2e9, 'rotc': 30, 'revenue_growth': 10, 'ebitda': 1, 'free_cash_flow': -1,
+             'profit_margin': 10, 'debt_to_equity': 0.5},
+        ])
+
+        scores = ScreeningExecutor.score_fundamentals(metrics, self.criteria)
+
+        self.assertEqual(list(scores['passes_criteria']), [True, True, False, False])
+        self.assertAlmostEqual(scores['fundamental_score'][0], 100)
+        self.assertAlmostEqual(scores['fundamental_score'][1], 50)
+
+    def test_score_fundamentals_optional_cash_flow(self):
+        """Disabling the FCF requirement lets negative cash flow pass"""
+        metrics = pd.DataFrame([{'market_cap': 2e9, 'rotc': 20, 'revenue_growth': 6, 'ebitda': 1,
+                                 'free_cash_flow': -1, 'profit_margin': 10, 'debt_to_equity': 0}])
+        criteria = dict(self.criteria, positive_fcf=False)
+
+        scores = ScreeningExecutor.score_fundamentals(metrics, criteria)
+
+        self.assertTrue(bool(scores['passes_criteria'][0]))
+        self.assertTrue(np.isfinite(scores['fundamental_score'][0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
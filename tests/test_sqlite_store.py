@@ -0,0 +1,118 @@
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from caching import SQLiteCacheStore, TieredCache, migrate_pickle_directory
+from caching.sqlite_store import parse_cache_key
+
+
+def _daily_payload(closes):
+    return {
+        'Meta Data': {'2. Symbol': 'AAPL'},
+        'Time Series (Daily)': {
+            f'2024-01-{day:02d}': {
+                '1. open': str(close - 1), '2. high': str(close + 1),
+                '3. low': str(close - 2), '4. close': str(close), '5. volume': '1000'
+            }
+            for day, close in enumerate(closes, start=1)
+        }
+    }
+
+
+class TestSQLiteCacheStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = SQLiteCacheStore(self.tmpdir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_parse_cache_key(self):
+        """Endpoint and symbol are parsed from Alpha Vantage cache keys"""
+        self.assertEqual(parse_cache_key('TIME_SERIES_DAILY_outputsize=compact&symbol=AAPL'),
+                         ('TIME_SERIES_DAILY', 'AAPL'))
+        self.assertEqual(parse_cache_key('GLOBAL_QUOTE_symbol=MSFT'), ('GLOBAL_QUOTE', 'MSFT'))
+
+    def test_read_write_delete(self):
+        """Entries round-trip with their fetch time and can be deleted"""
+        self.store.write('GLOBAL_QUOTE_symbol=AAPL', {'price': 1}, fetched_at=100.0)
+
+        value, fetched_at, size = self.store.read('GLOBAL_QUOTE_symbol=AAPL')
+        self.assertEqual(value, {'price': 1})
+        self.assertEqual(fetched_at, 100.0)
+        self.assertGreater(size, 0)
+
+        self.assertTrue(self.store.delete('GLOBAL_QUOTE_symbol=AAPL'))
+        self.assertIsNone(self.store.read('GLOBAL_QUOTE_symbol=AAPL'))
+
+    def test_bulk_reads(self):
+        """Many symbols are read and freshness-checked in one query"""
+        for symbol in ('AAPL', 'MSFT', 'GOOG'):
+            self.store.write(f'OVERVIEW_symbol={symbol}', {'Symbol': symbol})
+
+        found = self.store.read_many(['OVERVIEW_symbol=AAPL', 'OVERVIEW_symbol=GOOG', 'OVERVIEW_symbol=X'])
+        self.assertEqual(set(found), {'OVERVIEW_symbol=AAPL', 'OVERVIEW_symbol=GOOG'})
+        self.assertEqual(found['OVERVIEW_symbol=AAPL'][0], {'Symbol': 'AAPL'})
+
+        fetched = self.store.fetched_at_many('OVERVIEW', ['AAPL', 'MSFT', 'TSLA'])
+        self.assertEqual(set(fetched), {'AAPL', 'MSFT'})
+
+    def test_time_series_columns(self):
+        """Time series payloads are exposed as sorted float64 columns"""
+        self.store.write('TIME_SERIES_DAILY_outputsize=compact&symbol=AAPL', _daily_payload([10, 11, 12]))
+
+        series = self.store.get_series('AAPL')
+        self.assertEqual(series['close'].dtype, np.float64)
+        np.testing.assert_array_equal(series['close'], [10.0, 11.0, 12.0])
+        self.assertEqual(str(series['dates'][0]), '2024-01-01T00:00:00')
+        self.assertIsNone(self.store.get_series('MSFT'))
+
+    def test_legacy_pickle_fallback_and_delete(self):
+        """Legacy pickle files are served on a miss and removed by delete_matching"""
+        with open(os.path.join(self.tmpdir, 'GLOBAL_QUOTE_symbol=AAPL.pkl'), 'wb') as f:
+            pickle.dump({'price': 5}, f)
+
+        value, _, _ = self.store.read('GLOBAL_QUOTE_symbol=AAPL')
+        self.assertEqual(value, {'price': 5})
+
+        removed = self.store.delete_matching(lambda key: 'symbol=AAPL' in key)
+        self.assertEqual(removed, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, 'GLOBAL_QUOTE_symbol=AAPL.pkl')))
+        self.assertIsNone(self.store.read('GLOBAL_QUOTE_symbol=AAPL'))
+
+    def test_migrate_pickle_directory(self):
+        """Migration imports every pickle and keeps file times as fetch times"""
+        legacy_dir = tempfile.mkdtemp(dir=self.tmpdir)
+        for symbol in ('AAPL', 'MSFT'):
+            path = os.path.join(legacy_dir, f'OVERVIEW_symbol={symbol}.pkl')
+            with open(path, 'wb') as f:
+                pickle.dump({'Symbol': symbol}, f)
+            os.utime(path, (1000.0, 1000.0))
+
+        counts = migrate_pickle_directory(legacy_dir, delete_files=True)
+
+        self.assertEqual(counts, {'imported': 2, 'failed': 0})
+        store = SQLiteCacheStore(legacy_dir)
+        self.assertEqual(store.read('OVERVIEW_symbol=MSFT')[1], 1000.0)
+        self.assertFalse(any(name.endswith('.pkl') for name in os.listdir(legacy_dir)))
+
+    def test_tiered_cache_with_store(self):
+        """The store works as the disk tier of a TieredCache"""
+        cache = TieredCache('test', disk=self.store, default_ttl=60)
+        cache.set('GLOBAL_QUOTE_symbol=AAPL', {'price': 1})
+        cache.memory.clear()
+
+        self.assertEqual(cache.get('GLOBAL_QUOTE_symbol=AAPL'), {'price': 1})
+        self.assertEqual(cache.stats.as_dict()['disk_hits'], 1)
+
+        self.store.write('GLOBAL_QUOTE_symbol=OLD', {'price': 2}, fetched_at=time.time() - 120)
+        self.assertIsNone(cache.get('GLOBAL_QUOTE_symbol=OLD'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from trading.broker_integration import PaperTradingBroker
+from trading.chat_commands import TradingCommandProcessor, QuoteCache
+
+
+class CountingQuotes:
+    """Fixed quotes that record how often each symbol is requested"""
+
+    def __init__(self, price=100.0, delay=0.0):
+        self.price = price
+        self.delay = delay
+        self.calls = {}
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, symbol):
+        with self._lock:
+            self.calls[symbol] = self.calls.get(symbol, 0) + 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return {"symbol": symbol, "ask_price": self.price, "bid_price": self.price}
+
+
+class TestTradingCommandProcessor(unittest.TestCase):
+    def setUp(self):
+        self.broker = PaperTradingBroker(data_path=None, initial_balance=1000000.0)
+        self.processor = TradingCommandProcessor(self.broker)
+
+    def test_dispatcher_prefers_specific_order_forms(self):
+        """Limit and stop orders are not swallowed by the market order pattern"""
+        cases = {
+            "buy 10 AAPL": ('buy_market', ('10', 'AAPL')),
+            "buy 10 shares of AAPL at 150.5": ('buy_limit', ('10', 'AAPL', '150.5')),
+            "sell 5 MSFT stop 90 limit 89": ('sell_stop_limit', ('5', 'MSFT', '90', '89')),
+            "sell 5 MSFT with stop 90": ('sell_stop', ('5', 'MSFT', '90')),
+            "show my positions": ('show_positions', ()),
+            "show position for TSLA": ('show_position', ('TSLA',)),
+            "cancel order abc123": ('cancel_order', ('abc123',)),
+            "get quote for NVDA": ('get_quote', ('NVDA',)),
+        }
+        for command, (cmd_type, groups) in cases.items():
+            found = self.processor.match_command(command)
+            self.assertIsNotNone(found, command)
+            self.assertEqual((found[0], found[1].groups()), (cmd_type, groups), command)
+        self.assertIsNone(self.processor.match_command("what's the weather"))
+
+    def test_quote_cache_shared_across_handlers(self):
+        quotes = CountingQuotes()
+        with patch.object(PaperTradingBroker, 'get_quote', side_effect=quotes):
+            self.processor.process_command("buy 10 AAPL", "u1")
+            self.processor.process_command("get quote for AAPL", "u1")
+            self.processor.process_command("show position for AAPL", "u1")
+            # The broker's own fill quote is the only other request
+            self.assertEqual(quotes.calls['AAPL'], 2)
+
+            self.processor.quote_cache.ttl = 0
+            self.processor.process_command("get quote for AAPL", "u1")
+            self.assertEqual(quotes.calls['AAPL'], 3)
+
+    def test_batch_prefetches_quotes_concurrently(self):
+        quotes = CountingQuotes(delay=0.05)
+        cache = QuoteCache(self.broker, ttl=60)
+        symbols = [f"S{chr(65 + i)}" for i in range(20)]
+        with patch.object(PaperTradingBroker, 'get_quote', side_effect=quotes):
+            prefetched = cache.prefetch(symbols, max_workers=10)
+        self.assertEqual(sorted(prefetched), sorted(symbols))
+        self.assertGreater(quotes.max_active, 1)
+        self.assertTrue(all(count == 1 for count in quotes.calls.values()))
+
+    def test_batch_orders(self):
+        quotes = CountingQuotes()
+        commands = "buy 10 AAPL\nbuy 5 MSFT at 95\n\n# trim\nsell 4 AAPL; sell 1 TSLA"
+        with patch.object(PaperTradingBroker, 'get_quote', side_effect=quotes):
+            result = self.processor.process_command(commands, "u1")
+
+        self.assertEqual(result['type'], 'batch')
+        self.assertEqual(result['status'], 'partial')
+        outcomes = [(r['command'], r['status']) for r in result['data']['results']]
+        self.assertEqual(outcomes, [("buy 10 AAPL", 'success'), ("buy 5 MSFT at 95", 'success'),
+                                    ("sell 4 AAPL", 'success'), ("sell 1 TSLA", 'error')])
+        self.assertEqual(self.broker.get_position('AAPL').quantity, 6)
+
+        rejected = self.processor.process_batch("buy 1 AAPL\nshow my positions", "u1")
+        self.assertEqual(rejected['type'], 'batch_error')
+        self.assertEqual(rejected['data']['invalid_lines'], ["show my positions"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import MagicMock
+
+from services.valuation_engine import ValuationEngine, FinancialSnapshot
+from services.margin_safety_calculator import MarginOfSafetyCalculator
+
+
+class TestFinancialSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.api_client = MagicMock()
+        self.api_client.get_stock_data.return_value = {'current_price': 40.0}
+        self.engine = ValuationEngine(self.api_client)
+
+    def test_snapshot_loads_market_data_once(self):
+        """Price and financial data come from a single quote fetch"""
+        snapshot = self.engine.load_snapshot('AAPL')
+
+        self.assertIsInstance(snapshot, FinancialSnapshot)
+        self.assertEqual(snapshot.current_price, 40.0)
+        self.assertIn('free_cash_flow', snapshot.financial_data)
+        self.assertEqual(len(snapshot.historical_eps), 10)
+        self.assertEqual(self.api_client.get_stock_data.call_count, 1)
+
+    def test_methods_reuse_snapshot(self):
+        """Valuing with a snapshot matches an unshared valuation without refetching"""
+        snapshot = self.engine.load_snapshot('AAPL')
+        self.api_client.get_stock_data.reset_mock()
+
+        graham = self.engine.calculate_graham_valuation('AAPL', snapshot=snapshot)
+        nav = self.engine.calculate_nav_valuation('AAPL', snapshot=snapshot)
+
+        self.api_client.get_stock_data.assert_not_called()
+        self.assertAlmostEqual(graham.intrinsic_value_per_share,
+                               self.engine.calculate_graham_valuation('AAPL').intrinsic_value_per_share)
+        self.assertAlmostEqual(nav.intrinsic_value_per_share,
+                               self.engine.calculate_nav_valuation('AAPL').intrinsic_value_per_share)
+
+    def test_margin_analysis_fetches_once(self):
+        """Margin of safety analyses share one snapshot across their steps"""
+        calculator = MarginOfSafetyCalculator(self.engine)
+
+        result = calculator.analyze_margin_of_safety('AAPL', valuation_method='graham')
+        self.assertEqual(result.current_price, 40.0)
+        self.assertGreater(result.intrinsic_value, 0)
+        self.assertEqual(self.api_client.get_stock_data.call_count, 1)
+
+        calculator.analyze_margin_of_safety('AAPL', valuation_method='all')
+        self.assertEqual(self.api_client.get_stock_data.call_count, 2)
+
+    def test_value_many(self):
+        """Batch valuation loads each distinct symbol once"""
+        results = self.engine.value_many(['AAPL', 'MSFT', 'AAPL'], methods=('graham', 'nav'))
+
+        self.assertEqual(list(results), ['AAPL', 'MSFT'])
+        self.assertEqual(set(results['MSFT']), {'graham', 'nav'})
+        self.assertEqual(self.api_client.get_stock_data.call_count, 2)
+        with self.assertRaises(ValueError):
+            self.engine.value_many(['AAPL'], methods=('pe',))
+
+
+if __name__ == '__main__':
+    unittest.main()
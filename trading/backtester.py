@@ -0,0 +1,621 @@
+"""
+Bar-replay backtester for the paper trading broker
+
+Replays aligned daily OHLCV bars through an in-memory ``PaperTradingBroker``:
+
+- strategies see bars up to and including the current close and submit orders
+  through the normal broker API; market orders fill at the next bar's open
+- limit, stop and stop-limit orders are matched intra-bar against the next
+  bars' open/high/low (gaps through the price fill at the open)
+- equity is marked to market at every close with one vector product, so the
+  cost per bar does not grow with the number of trades
+
+Bars come from the Alpha Vantage SQLite series cache (``BarPanel.from_cache``)
+or from yfinance-style DataFrames (``BarPanel.from_frames``). ``run_many``
+evaluates several strategies or parameter sets in parallel processes.
+"""
+
+import logging
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analysis.indicators import TRADING_DAYS_PER_YEAR, rolling_mean
+from .broker_integration import (PaperTradingBroker, Order, OrderSide, OrderType, TimeInForce,
+                                 OrderError)
+
+logger = logging.getLogger(__name__)
+
+
+class BarPanel:
+    """
+    OHLCV bars for many symbols aligned on one date index.
+
+    Every field is a float64 matrix of shape (n_symbols, n_bars), the layout used
+    by ``analysis.indicators``; bars a symbol did not trade are NaN.
+    """
+
+    FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, symbols: Sequence[str], dates: np.ndarray, **fields: np.ndarray):
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.dates = np.asarray(dates).astype('datetime64[D]')
+        self.index = {symbol: row for row, symbol in enumerate(self.symbols)}
+        for name in self.FIELDS:
+            matrix = np.asarray(fields[name], dtype=np.float64)
+            if matrix.shape != (len(self.symbols), len(self.dates)):
+                raise ValueError(f"{name} must have shape (n_symbols, n_bars)")
+            setattr(self, name, matrix)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @classmethod
+    def from_series(cls, series: Dict[str, Dict[str, Any]], start: Optional[str] = None,
+                    end: Optional[str] = None) -> 'BarPanel':
+        """
+        Align per-symbol column arrays (as returned by SQLiteCacheStore.get_series).
+
+        Args:
+            series: Dict mapping symbol to {'dates', 'open', 'high', 'low', 'close', 'volume'}
+            start: Optional first date (inclusive)
+            end: Optional last date (inclusive)
+        """
+        series = {symbol: data for symbol, data in series.items() if data is not None and len(data['dates'])}
+        if not series:
+            raise ValueError("No price series to align")
+
+        dates = np.unique(np.concatenate([np.asarray(data['dates']).astype('datetime64[D]')
+                                          for data in series.values()]))
+        if start is not None:
+            dates = dates[dates >= np.datetime64(start, 'D')]
+        if end is not None:
+            dates = dates[dates <= np.datetime64(end, 'D')]
+
+        fields = {name: np.full((len(series), len(dates)), np.nan) for name in cls.FIELDS}
+        for row, data in enumerate(series.values()):
+            symbol_dates = np.asarray(data['dates']).astype('datetime64[D]')
+            positions = np.searchsorted(dates, symbol_dates)
+            found = (positions < len(dates)) & (dates[np.minimum(positions, len(dates) - 1)] == symbol_dates)
+            for name in cls.FIELDS:
+                fields[name][row, positions[found]] = np.asarray(data[name], dtype=np.float64)[found]
+
+        return cls(list(series), dates, **fields)
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], start: Optional[str] = None,
+                    end: Optional[str] = None) -> 'BarPanel':
+        """Align yfinance-style DataFrames (DatetimeIndex, Open/High/Low/Close/Volume columns)."""
+        series = {}
+        for symbol, frame in frames.items():
+            if frame is None or frame.empty:
+                continue
+            columns = {column.lower(): column for column in frame.columns}
+            index = pd.DatetimeIndex(frame.index)
+            if index.tz is not None:
+                index = index.tz_localize(None)
+            series[symbol] = {'dates': index.values}
+            for name in cls.FIELDS:
+                series[symbol][name] = frame[columns[name]].to_numpy(dtype=np.float64)
+        return cls.from_series(series, start, end)
+
+    @classmethod
+    def from_cache(cls, symbols: Sequence[str], cache_dir: str = './cache/alpha_vantage/',
+                   weekly: bool = False, start: Optional[str] = None, end: Optional[str] = None) -> 'BarPanel':
+        """
+        Load bars stored by AlphaVantageClient without any API calls.
+
+        Symbols with no stored series are skipped (and logged).
+        """
+        from caching.sqlite_store import SQLiteCacheStore
+
+        store = SQLiteCacheStore(cache_dir)
+        endpoint = 'TIME_SERIES_WEEKLY' if weekly else 'TIME_SERIES_DAILY'
+        series = {}
+        for symbol in symbols:
+            data = store.get_series(symbol.upper(), endpoint)
+            if data is None:
+                logger.warning(f"No cached {endpoint} bars for {symbol}; skipping")
+                continue
+            series[symbol.upper()] = data
+        return cls.from_series(series, start, end)
+
+
+class ReplayBroker(PaperTradingBroker):
+    """
+    In-memory paper broker whose quotes come from the bar being replayed.
+    """
+
+    def __init__(self, symbol_index: Dict[str, int], initial_balance: float = 100000.0,
+                 slippage_bps: float = 0.0, commission: float = 0.0,
+                 on_fill: Optional[Callable[[Order, float], None]] = None):
+        """
+        Args:
+            symbol_index: Symbol to row of the price vector set with set_prices
+            initial_balance: Starting cash
+            slippage_bps: Market orders buy this many basis points above (sell below) the price
+            commission: Commission as a fraction of traded notional
+            on_fill: Called with (order, commission) after every fill
+        """
+        super().__init__(initial_balance=initial_balance, data_path=None)
+        self.symbol_index = symbol_index
+        self.slippage = slippage_bps / 10000.0
+        self.commission = commission
+        self.on_fill = on_fill
+        self.prices: Optional[np.ndarray] = None
+        self.sim_time: Optional[datetime] = None
+        self.pending: List[Order] = []
+
+    def authenticate(self) -> bool:
+        self.authenticated = True
+        return True
+
+    def set_prices(self, prices: np.ndarray):
+        """Set the execution prices (one per symbol row) for market orders"""
+        self.prices = prices
+
+    def get_quote(self, symbol: str) -> Dict:
+        row = self.symbol_index.get(symbol.upper())
+        price = float(self.prices[row]) if row is not None and self.prices is not None else None
+        if price is None or not price > 0:
+            raise OrderError(f"No bar for {symbol} at {self.sim_time}")
+        return {
+            "symbol": symbol,
+            "ask_price": price * (1 + self.slippage),
+            "bid_price": price * (1 - self.slippage),
+            "timestamp": self.sim_time.isoformat() if self.sim_time else None,
+            "broker": "backtest"
+        }
+
+    def place_order(self, order: Order) -> Order:
+        if order.side == OrderSide.SELL:
+            position = self.get_position(order.symbol)
+            if position is None or order.quantity > position.quantity + 1e-9:
+                raise OrderError(f"Cannot sell {order.quantity} {order.symbol}: short selling is not supported")
+        if self.sim_time is not None:
+            order.created_at = order.updated_at = self.sim_time
+
+        order = super().place_order(order)
+        if order.status == "open":
+            self.pending.append(order)
+        return order
+
+    def cancel_order(self, order_id: str) -> bool:
+        cancelled = super().cancel_order(order_id)
+        if cancelled:
+            self.pending = [order for order in self.pending if order.id != order_id]
+        return cancelled
+
+    def _process_filled_order(self, order: Order):
+        super()._process_filled_order(order)
+        fee = order.filled_quantity * order.filled_price * self.commission
+        if fee:
+            self.account["cash"] -= fee
+            self._update_account_values()
+        if self.on_fill is not None:
+            self.on_fill(order, fee)
+
+
+class BacktestContext:
+    """
+    What a strategy sees on each bar: history up to the current close, the
+    broker, current holdings, and order helpers.
+    """
+
+    def __init__(self, backtester: 'Backtester'):
+        self._backtester = backtester
+        self.panel = backtester.panel
+        self.broker = backtester.broker
+        self.symbols = self.panel.symbols
+        self.t = -1
+        self.params: Dict[str, Any] = {}
+
+    @property
+    def date(self) -> np.datetime64:
+        return self.panel.dates[self.t]
+
+    @property
+    def cash(self) -> float:
+        return self.broker.account["cash"]
+
+    @property
+    def equity(self) -> float:
+        """Equity marked at the current close"""
+        return float(self._backtester.equity[self.t])
+
+    @property
+    def quantities(self) -> np.ndarray:
+        """Shares held per symbol (read-only view, panel order)"""
+        view = self._backtester.quantities.view()
+        view.flags.writeable = False
+        return view
+
+    def history(self, field: str = 'close', lookback: Optional[int] = None) -> np.ndarray:
+        """Bars up to and including the current one, shape (n_symbols, bars)"""
+        matrix = getattr(self.panel, field)
+        start = 0 if lookback is None else max(0, self.t + 1 - lookback)
+        return matrix[:, start:self.t + 1]
+
+    def price(self, symbol: str) -> float:
+        """Latest close for a symbol (NaN if it has not traded yet)"""
+        return float(self._backtester.last_close[self.panel.index[symbol.upper()], self.t])
+
+    def order(self, symbol: str, quantity: float, order_type: OrderType = OrderType.MARKET,
+              limit_price: Optional[float] = None, stop_price: Optional[float] = None,
+              time_in_force: TimeInForce = TimeInForce.DAY) -> Optional[Order]:
+        """
+        Submit an order; positive quantity buys, negative sells.
+
+        Returns:
+            The placed order, or None if it was rejected (e.g. no bar to trade on)
+        """
+        if quantity == 0:
+            return None
+        side = OrderSide.BUY if quantity > 0 else OrderSide.SELL
+        try:
+            order = Order(symbol, abs(quantity), side, order_type, price=limit_price,
+                          stop_price=stop_price, time_in_force=time_in_force)
+            return self.broker.place_order(order)
+        except (OrderError, ValueError) as e:
+            self._backtester.rejected += 1
+            logger.debug(f"Backtest order rejected: {str(e)}")
+            return None
+
+    def order_target_weights(self, weights: Dict[str, float]) -> List[Order]:
+        """
+        Rebalance to target portfolio weights with market orders (whole shares
+        unless the backtester allows fractional shares). Holdings missing from
+        weights are sold; sells are submitted before buys.
+        """
+        backtester = self._backtester
+        equity = self.equity
+        prices = backtester.last_close[:, self.t]
+        target = np.zeros(len(self.symbols))
+        for symbol, weight in weights.items():
+            row = self.panel.index.get(symbol.upper())
+            if row is not None and prices[row] > 0:
+                target[row] = weight * equity / prices[row]
+        if not backtester.fractional:
+            target = np.floor(target)
+
+        delta = target - backtester.quantities
+        orders = []
+        for row in np.concatenate([np.flatnonzero(delta < -1e-9), np.flatnonzero(delta > 1e-9)]):
+            order = self.order(self.symbols[row], float(delta[row]))
+            if order is not None:
+                orders.append(order)
+        return orders
+
+
+@dataclass
+class BacktestResult:
+    """Equity curve, trades and summary statistics of one backtest"""
+    name: str
+    dates: np.ndarray
+    equity: np.ndarray
+    trades: List[Dict[str, Any]]
+    traded_value: np.ndarray
+    metrics: Dict[str, float] = field(default_factory=dict)
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'params': self.params,
+            'metrics': self.metrics,
+            'equity_curve': [{'date': str(date), 'equity': float(value)}
+                             for date, value in zip(self.dates, self.equity)],
+            'trades': self.trades
+        }
+
+
+class Backtester:
+    """
+    Replays a BarPanel through a ReplayBroker for one strategy.
+
+    A strategy is either a callable taking the BacktestContext or an object
+    with ``on_bar(context)`` and optionally ``on_start(context)``.
+    """
+
+    def __init__(self, panel: BarPanel, initial_cash: float = 100000.0, commission: float = 0.0,
+                 slippage_bps: float = 0.0, fractional: bool = False, warmup: int = 0):
+        """
+        Args:
+            panel: Aligned bars to replay
+            initial_cash: Starting cash
+            commission: Commission as a fraction of traded notional
+            slippage_bps: Market order slippage in basis points
+            fractional: Allow fractional share quantities in order_target_weights
+            warmup: Bars to skip before the strategy is first called
+        """
+        self.panel = panel
+        self.initial_cash = initial_cash
+        self.commission = commission
+        self.slippage_bps = slippage_bps
+        self.fractional = fractional
+        self.warmup = warmup
+
+        # Last known close per bar, used for marking to market and sizing
+        close = pd.DataFrame(panel.close.T).ffill().to_numpy().T
+        self.last_close = np.nan_to_num(close, nan=0.0)
+
+    def _reset(self):
+        n_symbols, n_bars = len(self.panel.symbols), len(self.panel)
+        self.broker = ReplayBroker(self.panel.index, self.initial_cash, self.slippage_bps,
+                                   self.commission, self._on_fill)
+        self.quantities = np.zeros(n_symbols)
+        self.equity = np.zeros(n_bars)
+        self.traded_value = np.zeros(n_bars)
+        self.trades: List[Dict[str, Any]] = []
+        self.rejected = 0
+        self._bar = 0
+        self._placed_at: Dict[str, int] = {}
+        self._triggered = set()
+
+    def _on_fill(self, order: Order, fee: float):
+        row = self.panel.index[order.symbol]
+        position = self.broker.get_position(order.symbol)
+        self.quantities[row] = position.quantity if position else 0.0
+        notional = order.filled_quantity * order.filled_price
+        self.traded_value[self._bar] += notional
+        self.trades.append({
+            'date': str(self.panel.dates[self._bar]),
+            'symbol': order.symbol,
+            'side': order.side.value,
+            'quantity': order.filled_quantity,
+            'price': order.filled_price,
+            'order_type': order.order_type.value,
+            'commission': fee
+        })
+
+    def _match_price(self, order: Order, bar_open: float, high: float, low: float) -> Optional[float]:
+        """Intra-bar fill price for a resting order, or None if it does not fill"""
+        buy = order.side == OrderSide.BUY
+
+        if order.order_type in (OrderType.STOP, OrderType.STOP_LIMIT) and order.id not in self._triggered:
+            stop = order.stop_price
+            if buy:
+                trigger = bar_open if bar_open >= stop else (stop if high >= stop else None)
+            else:
+                trigger = bar_open if bar_open <= stop else (stop if low <= stop else None)
+            if trigger is None:
+                return None
+            if order.order_type == OrderType.STOP:
+                return trigger
+            # Stop-limit: fill at the trigger if it satisfies the limit, else rest as a limit order
+            self._triggered.add(order.id)
+            within_limit = trigger <= order.price if buy else trigger >= order.price
+            return trigger if within_limit else None
+
+        limit = order.price
+        if buy:
+            return bar_open if bar_open <= limit else (limit if low <= limit else None)
+        return bar_open if bar_open >= limit else (limit if high >= limit else None)
+
+    def _process_pending(self, t: int):
+        """Match resting orders against bar t and expire day orders"""
+        still_open = []
+        for order in self.broker.pending:
+            if order.status != "open":
+                continue
+            row = self.panel.index[order.symbol]
+            bar_open, high, low = self.panel.open[row, t], self.panel.high[row, t], self.panel.low[row, t]
+            price = None
+            if not (math.isnan(bar_open) or math.isnan(high) or math.isnan(low)):
+                price = self._match_price(order, float(bar_open), float(high), float(low))
+
+            if price is not None and order.side == OrderSide.SELL:
+                # Never sell more than is held when the order fills
+                held = self.quantities[row]
+                if held <= 0:
+                    price = None
+                    order.status = "cancelled"
+                else:
+                    order.quantity = min(order.quantity, held)
+
+            if price is not None:
+                order.status = "filled"
+                order.filled_quantity = order.quantity
+                order.filled_price = price
+                order.updated_at = self.broker.sim_time
+                self.broker._process_filled_order(order)
+            elif order.status == "open" and order.time_in_force == TimeInForce.DAY \
+                    and self._placed_at.get(order.id, t) <= t:
+                order.status = "expired"
+            if order.status == "open":
+                still_open.append(order)
+        self.broker.pending = still_open
+
+    def run(self, strategy: Any, name: str = 'strategy', params: Optional[Dict[str, Any]] = None) -> BacktestResult:
+        """
+        Replay every bar through the strategy.
+
+        Returns:
+            BacktestResult with the equity curve (one value per close), trades,
+            per-bar traded value and summary metrics
+        """
+        self._reset()
+        panel = self.panel
+        context = BacktestContext(self)
+        context.params = params or {}
+        on_bar = strategy if callable(strategy) and not hasattr(strategy, 'on_bar') else strategy.on_bar
+        if hasattr(strategy, 'on_start'):
+            strategy.on_start(context)
+
+        n_bars = len(panel)
+        for t in range(n_bars):
+            self._bar = t
+            self.broker.sim_time = pd.Timestamp(panel.dates[t]).to_pydatetime()
+            if self.broker.pending:
+                self._process_pending(t)
+
+            self.equity[t] = self.broker.account["cash"] + float(self.quantities @ self.last_close[:, t])
+
+            if t + 1 < n_bars and t >= self.warmup:
+                # Orders placed after the close execute at the next bar's open
+                self._bar = t + 1
+                self.broker.sim_time = pd.Timestamp(panel.dates[t + 1]).to_pydatetime()
+                self.broker.set_prices(panel.open[:, t + 1])
+                context.t = t
+                on_bar(context)
+                # Day orders are good for the first bar they can fill on
+                for order in self.broker.pending:
+                    self._placed_at.setdefault(order.id, t + 1)
+
+        self._mark_broker_positions()
+        return BacktestResult(
+            name=name,
+            dates=panel.dates,
+            equity=self.equity.copy(),
+            trades=self.trades,
+            traded_value=self.traded_value.copy(),
+            metrics=self._metrics(),
+            params=params or {}
+        )
+
+    def _mark_broker_positions(self):
+        """Bring the broker's positions and account up to the final close"""
+        for position in self.broker.get_positions():
+            price = self.last_close[self.panel.index[position.symbol], -1]
+            position.current_price = price
+            position.market_value = position.quantity * price
+            position.unrealized_pl = position.market_value - position.cost_basis
+        self.broker._update_account_values()
+
+    def _metrics(self) -> Dict[str, float]:
+        equity = self.equity
+        years = max(len(equity) - 1, 1) / TRADING_DAYS_PER_YEAR
+        with np.errstate(divide='ignore', invalid='ignore'):
+            daily = np.diff(equity) / equity[:-1]
+        daily = daily[np.isfinite(daily)]
+        peaks = np.maximum.accumulate(equity)
+        drawdowns = np.where(peaks > 0, equity / np.where(peaks > 0, peaks, 1.0) - 1, 0.0)
+        volatility = float(daily.std() * np.sqrt(TRADING_DAYS_PER_YEAR)) if daily.size else 0.0
+        mean_equity = float(equity.mean()) if equity.size else 0.0
+        turnover = float(self.traded_value.sum() / mean_equity) if mean_equity > 0 else 0.0
+        final = float(equity[-1]) if equity.size else self.initial_cash
+
+        return {
+            'final_equity': final,
+            'total_return': final / self.initial_cash - 1,
+            'annualized_return': (final / self.initial_cash) ** (1 / years) - 1 if final > 0 else -1.0,
+            'annualized_volatility': volatility,
+            'sharpe_ratio': float(daily.mean() / daily.std() * np.sqrt(TRADING_DAYS_PER_YEAR))
+            if daily.size and daily.std() > 0 else 0.0,
+            'max_drawdown': float(drawdowns.min()) if drawdowns.size else 0.0,
+            'turnover': turnover,
+            'annualized_turnover': turnover / years,
+            'trades': len(self.trades),
+            'rejected_orders': self.rejected,
+            'commissions': float(sum(trade['commission'] for trade in self.trades))
+        }
+
+
+class TargetWeightsStrategy:
+    """
+    Hold fixed target weights, rebalancing every ``rebalance_every`` bars.
+    Used to evaluate Naif model portfolios over history.
+    """
+
+    def __init__(self, weights: Dict[str, float], rebalance_every: int = 21):
+        self.weights = {symbol.upper(): weight for symbol, weight in weights.items()}
+        self.rebalance_every = max(1, int(rebalance_every))
+        self._bars = 0
+
+    @classmethod
+    def from_portfolio(cls, portfolio: Any, rebalance_every: int = 21) -> 'TargetWeightsStrategy':
+        """Build from a Naif portfolio dict (or its holdings list); the cash holding stays in cash."""
+        holdings = portfolio.get('holdings', []) if isinstance(portfolio, dict) else portfolio
+        weights = {
+            holding['symbol']: float(holding.get('weight', 0))
+            for holding in holdings
+            if holding.get('symbol') and holding.get('asset_class') != 'Cash' and holding['symbol'] != 'CASH'
+        }
+        return cls(weights, rebalance_every)
+
+    def on_start(self, context: BacktestContext):
+        self._bars = 0
+
+    def on_bar(self, context: BacktestContext):
+        if self._bars % self.rebalance_every == 0:
+            context.order_target_weights(self.weights)
+        self._bars += 1
+
+
+class MovingAverageCrossStrategy:
+    """
+    Equal-weight every symbol whose fast moving average is above its slow one;
+    rebalance whenever that set changes.
+    """
+
+    def __init__(self, fast: int = 20, slow: int = 50, max_positions: Optional[int] = None):
+        if fast >= slow:
+            raise ValueError("fast window must be shorter than slow window")
+        self.fast = fast
+        self.slow = slow
+        self.max_positions = max_positions
+        self._held: Tuple[str, ...] = ()
+
+    def on_start(self, context: BacktestContext):
+        self._fast = rolling_mean(context.panel.close, self.fast)
+        self._slow = rolling_mean(context.panel.close, self.slow)
+        self._held = ()
+
+    def on_bar(self, context: BacktestContext):
+        t = context.t
+        with np.errstate(invalid='ignore'):
+            spread = (self._fast[:, t] - self._slow[:, t]) / self._slow[:, t]
+        rows = np.flatnonzero(spread > 0)
+        if self.max_positions is not None and len(rows) > self.max_positions:
+            rows = rows[np.argsort(-spread[rows], kind='stable')[:self.max_positions]]
+        selected = tuple(sorted(context.symbols[row] for row in rows))
+        if selected != self._held:
+            weight = 1.0 / len(selected) if selected else 0.0
+            context.order_target_weights({symbol: weight for symbol in selected})
+            self._held = selected
+
+
+# Panel and backtester settings shared by the worker processes of run_many
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(panel: BarPanel, backtester_kwargs: Dict[str, Any]):
+    _worker_state['backtester'] = Backtester(panel, **backtester_kwargs)
+
+
+def _run_spec(name: str, factory: Callable[..., Any], params: Dict[str, Any]) -> BacktestResult:
+    return _worker_state['backtester'].run(factory(**params), name=name, params=params)
+
+
+def run_many(panel: BarPanel, specs: Sequence[Tuple[str, Callable[..., Any], Dict[str, Any]]],
+             processes: Optional[int] = None, **backtester_kwargs: Any) -> Dict[str, BacktestResult]:
+    """
+    Run several strategies or parameter sets over the same bars in parallel.
+
+    The panel is sent to each worker process once; each spec only ships its
+    name, factory and parameters.
+
+    Args:
+        panel: Bars to replay
+        specs: (name, strategy factory, factory kwargs); factories must be picklable
+            (module-level classes or functions)
+        processes: Worker processes (defaults to the CPU count); 1 runs in-process
+        **backtester_kwargs: Passed to Backtester
+
+    Returns:
+        Dict mapping spec name to BacktestResult, in spec order
+    """
+    if processes == 1 or len(specs) <= 1:
+        backtester = Backtester(panel, **backtester_kwargs)
+        return {name: backtester.run(factory(**params), name=name, params=params)
+                for name, factory, params in specs}
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(panel, backtester_kwargs)) as executor:
+        futures = [(name, executor.submit(_run_spec, name, factory, params)) for name, factory, params in specs]
+        return {name: future.result() for name, future in futures}
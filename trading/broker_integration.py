@@ -18,6 +18,7 @@ Implementation details for actual API integration will need to be added.
 import os
 import time
 import json
+import random
 import logging
 import requests
 from typing import Dict, List, Any, Optional, Union, Tuple
@@ -25,6 +26,8 @@ from abc import ABC, abstractmethod
 from enum import Enum
 from datetime import datetime, timedelta
 
+from .journal import TradeJournal
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -218,6 +221,9 @@ class Position:
 class BaseBroker(ABC):
     """Abstract base class for broker implementations"""
     
+    # Whether orders may be placed from several threads at once
+    supports_concurrent_orders = False
+    
     def __init__(self, credentials: Dict[str, str], is_sandbox: bool = True):
         self.credentials = credentials
         self.is_sandbox = is_sandbox
@@ -318,6 +324,9 @@ class BaseBroker(ABC):
 class AlpacaBroker(BaseBroker):
     """Alpaca broker implementation"""
     
+    # Each call is an independent REST request
+    supports_concurrent_orders = True
+    
     def __init__(self, credentials: Dict[str, str], is_sandbox: bool = True):
         super().__init__(credentials, is_sandbox)
         
@@ -692,82 +701,136 @@ class AlpacaBroker(BaseBroker):
             raise BrokerException(error_msg)
 
 class PaperTradingBroker(BaseBroker):
-    """Paper trading broker implementation (simulation)"""
+    """
+    Paper trading broker implementation (simulation)
+    
+    State changes are appended to a TradeJournal (with periodic snapshots) and
+    replayed on start; positions are kept in memory indexed by symbol. Pass
+    data_path=None for a purely in-memory broker.
+    """
     
     def __init__(self, credentials: Dict[str, str] = None, is_sandbox: bool = True,
-                initial_balance: float = 100000.0, data_path: str = "./paper_trading_data"):
+                initial_balance: float = 100000.0, data_path: Optional[str] = "./paper_trading_data",
+                snapshot_interval: int = 1000):
         super().__init__(credentials or {}, is_sandbox=True)
         
         self.initial_balance = initial_balance
         self.data_path = data_path
         
-        # Create data directory if it doesn't exist
-        os.makedirs(data_path, exist_ok=True)
+        self.orders: List[Order] = []
+        self._orders_by_id: Dict[str, Order] = {}
+        self._positions: Dict[str, Position] = {}
+        
+        # Create the journal (and its directory) unless running in memory
+        self.journal = TradeJournal(data_path, snapshot_interval) if data_path else None
         
         # Load or initialize data
         self._load_data()
     
+    @property
+    def positions(self) -> List[Position]:
+        return list(self._positions.values())
+    
+    def _new_account(self) -> Dict[str, Any]:
+        return {
+            "account_id": f"paper_{int(time.time())}",
+            "cash": self.initial_balance,
+            "portfolio_value": self.initial_balance,
+            "equity": self.initial_balance,
+            "buying_power": self.initial_balance * 2,  # 2x leverage for margin account
+            "created_at": datetime.now().isoformat(),
+            "broker": "paper"
+        }
+    
     def _load_data(self):
-        """Load paper trading data from disk"""
+        """Restore the latest snapshot and replay the journal recorded after it"""
+        self.account = self._new_account()
+        if self.journal is None:
+            return
         
-        # Path for account data
-        account_path = os.path.join(self.data_path, "account.json")
+        state, events = self.journal.load()
+        migrated = False
+        if state is None and not events:
+            state = self._load_legacy_files()
+            migrated = state is not None
         
-        # Path for orders data
-        orders_path = os.path.join(self.data_path, "orders.json")
+        if state is not None:
+            self._restore_state(state)
+        for event in events:
+            self._apply_event(event)
         
-        # Path for positions data
-        positions_path = os.path.join(self.data_path, "positions.json")
-        
-        # Load or initialize account data
-        if os.path.exists(account_path):
-            with open(account_path, "r") as f:
-                self.account = json.load(f)
-        else:
-            # Initialize new account
-            self.account = {
-                "account_id": f"paper_{int(time.time())}",
-                "cash": self.initial_balance,
-                "portfolio_value": self.initial_balance,
-                "equity": self.initial_balance,
-                "buying_power": self.initial_balance * 2,  # 2x leverage for margin account
-                "created_at": datetime.now().isoformat(),
-                "broker": "paper"
-            }
-            self._save_account()
+        # Persist a new account, or the state migrated from the old JSON files
+        if migrated or (state is None and not events):
+            self.journal.write_snapshot(self._state())
+    
+    def _load_legacy_files(self) -> Optional[Dict[str, Any]]:
+        """Read state written by the previous account/orders/positions JSON format"""
+        paths = {name: os.path.join(self.data_path, f"{name}.json") for name in ("account", "orders", "positions")}
+        if not os.path.exists(paths["account"]):
+            return None
         
-        # Load or initialize orders data
-        if os.path.exists(orders_path):
-            with open(orders_path, "r") as f:
-                orders_data = json.load(f)
-                self.orders = [Order.from_dict(order) for order in orders_data]
-        else:
-            self.orders = []
-            self._save_orders()
-        
-        # Load or initialize positions data
-        if os.path.exists(positions_path):
-            with open(positions_path, "r") as f:
-                positions_data = json.load(f)
-                self.positions = [Position.from_dict(position) for position in positions_data]
+        state = {"orders": [], "positions": []}
+        for name, path in paths.items():
+            if os.path.exists(path):
+                with open(path, "r") as f:
+                    state[name] = json.load(f)
+        self.logger.info(f"Migrating paper trading data in {self.data_path} to the trade journal")
+        return state
+    
+    def _state(self) -> Dict[str, Any]:
+        return {
+            "account": self.account,
+            "orders": [order.to_dict() for order in self.orders],
+            "positions": [position.to_dict() for position in self._positions.values()]
+        }
+    
+    def _restore_state(self, state: Dict[str, Any]):
+        self.account = state["account"]
+        self.orders = [Order.from_dict(order) for order in state.get("orders", [])]
+        self._orders_by_id = {order.id: order for order in self.orders}
+        self._positions = {}
+        for data in state.get("positions", []):
+            position = Position.from_dict(data)
+            self._positions[position.symbol] = position
+    
+    def _upsert_order(self, data: Dict[str, Any]) -> Order:
+        order = Order.from_dict(data)
+        existing = self._orders_by_id.get(order.id)
+        if existing is None:
+            self.orders.append(order)
+            self._orders_by_id[order.id] = order
+            return order
+        existing.__dict__.update(order.__dict__)
+        return existing
+    
+    def _apply_event(self, event: Dict[str, Any]):
+        """Apply one journal event to the in-memory state"""
+        if event["type"] == "order":
+            self._upsert_order(event["order"])
+        elif event["type"] == "fill":
+            self._upsert_order(event["order"])
+            self.account = event["account"]
+            if event.get("position"):
+                self._positions[event["symbol"]] = Position.from_dict(event["position"])
+            else:
+                self._positions.pop(event["symbol"], None)
         else:
-            self.positions = []
-            self._save_positions()
+            self.logger.warning(f"Skipping unknown journal event type: {event['type']}")
     
-    def _save_account(self):
-        """Save account data to disk"""
-        with open(os.path.join(self.data_path, "account.json"), "w") as f:
-            json.dump(self.account, f, indent=2)
+    def _record(self, event_type: str, **payload: Any):
+        """Append an event to the journal, snapshotting when one is due"""
+        if self.journal is not None and self.journal.append(event_type, **payload):
+            self.journal.write_snapshot(self._state())
     
-    def _save_orders(self):
-        """Save orders data to disk"""
-        with open(os.path.join(self.data_path, "orders.json"), "w") as f:
-            json.dump([order.to_dict() for order in self.orders], f, indent=2)
+    def snapshot(self):
+        """Write a snapshot now and truncate the journal"""
+        if self.journal is not None:
+            self.journal.write_snapshot(self._state())
     
-    def _save_positions(self):
-        """Save positions data to disk"""
-        with open(os.path.join(self.data_path, "positions.json"), "w") as f:
-            json.dump([position.to_dict() for position in self.positions], f, indent=2)
+    def close(self):
+        """Release the journal file handle"""
+        if self.journal is not None:
+            self.journal.close()
     
     def authenticate(self) -> bool:
         """Authenticate with paper trading (always succeeds)"""
@@ -794,15 +857,16 @@ class PaperTradingBroker(BaseBroker):
             # Update order with execution details
             order.filled_quantity = order.quantity
             order.filled_price = execution_price
-            
-            # Update account and positions
-            self._process_filled_order(order)
         
         # Add to orders list
         self.orders.append(order)
+        self._orders_by_id[order.id] = order
         
-        # Save to disk
-        self._save_orders()
+        if order.status == "filled":
+            # Update account and positions (journals the fill)
+            self._process_filled_order(order)
+        else:
+            self._record("order", order=order.to_dict())
         
         return order
     
@@ -844,7 +908,7 @@ class PaperTradingBroker(BaseBroker):
                 existing_position.updated_at = datetime.now()
             else:
                 # Create new position
-                new_position = Position(
+                self._positions[order.symbol] = Position(
                     symbol=order.symbol,
                     quantity=order.filled_quantity,
                     entry_price=order.filled_price,
@@ -855,7 +919,6 @@ class PaperTradingBroker(BaseBroker):
                     unrealized_pl_percent=0,
                     broker="paper"
                 )
-                self.positions.append(new_position)
         
         else:  # SELL
             if existing_position:
@@ -877,20 +940,22 @@ class PaperTradingBroker(BaseBroker):
                     existing_position.updated_at = datetime.now()
                 else:
                     # Sold all shares, remove position
-                    self.positions = [p for p in self.positions if p.symbol != order.symbol]
+                    del self._positions[order.symbol]
         
         # Update account values
         self._update_account_values()
         
-        # Save changes
-        self._save_account()
-        self._save_positions()
+        # Journal the fill with the resulting account and position
+        if self.journal is not None:
+            position = self._positions.get(order.symbol)
+            self._record("fill", order=order.to_dict(), symbol=order.symbol,
+                         position=position.to_dict() if position else None, account=self.account)
     
     def _update_account_values(self):
         """Update account values based on current positions"""
         
         # Calculate portfolio value (cash + positions)
-        positions_value = sum(position.market_value for position in self.positions)
+        positions_value = sum(position.market_value for position in self._positions.values())
         self.account["portfolio_value"] = self.account["cash"] + positions_value
         
         # Update equity
@@ -902,22 +967,21 @@ class PaperTradingBroker(BaseBroker):
     def cancel_order(self, order_id: str) -> bool:
         """Cancel an order"""
         
-        # Find order
-        for order in self.orders:
-            if order.id == order_id and order.status == "open":
-                order.status = "cancelled"
-                self._save_orders()
-                return True
+        order = self._orders_by_id.get(order_id)
+        if order is not None and order.status == "open":
+            order.status = "cancelled"
+            order.updated_at = datetime.now()
+            self._record("order", order=order.to_dict())
+            return True
         
         return False
     
     def get_order(self, order_id: str) -> Order:
         """Get order details"""
         
-        # Find order
-        for order in self.orders:
-            if order.id == order_id:
-                return order
+        order = self._orders_by_id.get(order_id)
+        if order is not None:
+            return order
         
         raise OrderError(f"Order {order_id} not found")
     
@@ -931,15 +995,11 @@ class PaperTradingBroker(BaseBroker):
     
     def get_positions(self) -> List[Position]:
         """Get current positions"""
-        return self.positions.copy()
+        return list(self._positions.values())
     
     def get_position(self, symbol: str) -> Optional[Position]:
         """Get position for a specific symbol"""
-        for position in self.positions:
-            if position.symbol.upper() == symbol.upper():
-                return position
-        
-        return None
+        return self._positions.get(symbol.upper())
     
     def get_account_info(self) -> Dict:
         """Get account information"""
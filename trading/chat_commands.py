@@ -7,7 +7,10 @@ them into the appropriate broker API calls.
 """
 
 import re
+import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional, Union, Tuple, Callable
 from datetime import datetime
 
@@ -18,6 +21,92 @@ from .broker_integration import (
 
 logger = logging.getLogger(__name__)
 
+
+class QuoteCache:
+    """
+    Short-lived quote cache shared by the command handlers.
+
+    Quotes are reused for ``ttl`` seconds, so validating an order and then
+    showing the position or quote for the same symbol costs one broker call,
+    and a batch of orders can fetch all of its quotes concurrently up front.
+    Failed lookups are not cached.
+    """
+
+    def __init__(self, broker: BaseBroker, ttl: float = 5.0):
+        """
+        Args:
+            broker: Broker used to fetch quotes
+            ttl: Seconds a quote stays fresh
+        """
+        self.broker = broker
+        self.ttl = ttl
+        self._quotes: Dict[str, Tuple[float, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str) -> Dict:
+        """
+        Return a fresh quote for symbol, fetching it from the broker when needed.
+
+        Raises:
+            Whatever the broker raises when the quote cannot be fetched
+        """
+        symbol = symbol.upper()
+        now = time.monotonic()
+        with self._lock:
+            cached = self._quotes.get(symbol)
+        if cached is not None and now - cached[0] < self.ttl:
+            return cached[1]
+
+        quote = self.broker.get_quote(symbol)
+        with self._lock:
+            self._quotes[symbol] = (time.monotonic(), quote)
+        return quote
+
+    def prefetch(self, symbols: List[str], max_workers: int = 8) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch quotes for many symbols concurrently.
+
+        Returns:
+            Dict mapping each symbol to its quote, or None when the lookup failed
+        """
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+
+        def fetch(symbol):
+            try:
+                return self.get(symbol)
+            except Exception as e:
+                logger.warning(f"Quote prefetch failed for {symbol}: {str(e)}")
+                return None
+
+        if len(symbols) <= 1:
+            return {symbol: fetch(symbol) for symbol in symbols}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as executor:
+            return dict(zip(symbols, executor.map(fetch, symbols)))
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Drop one symbol's quote, or every quote"""
+        with self._lock:
+            if symbol is None:
+                self._quotes.clear()
+            else:
+                self._quotes.pop(symbol.upper(), None)
+
+
+class CommandMatch:
+    """Capture groups of one command inside a match of the combined dispatcher pattern"""
+
+    def __init__(self, match: re.Match, offset: int, group_count: int):
+        self._match = match
+        self._offset = offset
+        self._group_count = group_count
+
+    def group(self, index: int = 0) -> Optional[str]:
+        return self._match.group(self._offset + index)
+
+    def groups(self) -> Tuple[Optional[str], ...]:
+        return tuple(self.group(i) for i in range(1, self._group_count + 1))
+
+
 class TradingCommandProcessor:
     """
     Process trading-related commands from chat and execute them through the broker API.
@@ -56,16 +145,57 @@ class TradingCommandProcessor:
         'get_quote': re.compile(r'(?:get|show|display|view)\s+(?:the\s+)?(?:current\s+)?(?:quote|price)\s+(?:for|of)\s+([A-Za-z]+)', re.IGNORECASE),
     }
     
-    def __init__(self, broker: BaseBroker, max_order_value: float = 50000.0):
+    # Order in which the dispatcher tries the patterns. The patterns are not
+    # anchored at the end, so the more specific order forms come before the
+    # forms that match a prefix of them (e.g. "buy 10 AAPL at 150" is a limit
+    # order, not a market order followed by trailing text).
+    COMMAND_PRIORITY = [
+        'buy_stop_limit', 'buy_stop', 'buy_limit', 'buy_market',
+        'sell_stop_limit', 'sell_stop', 'sell_limit', 'sell_market',
+        'show_positions', 'show_position', 'show_orders', 'show_order', 'cancel_order',
+        'show_account', 'show_balance', 'show_buying_power', 'get_quote',
+    ]
+    
+    # Commands that place orders, and so may appear in a batch
+    ORDER_COMMANDS = {
+        'buy_market', 'buy_limit', 'buy_stop', 'buy_stop_limit',
+        'sell_market', 'sell_limit', 'sell_stop', 'sell_stop_limit',
+    }
+    
+    @classmethod
+    def _build_dispatcher(cls) -> Tuple[re.Pattern, Dict[int, Tuple[str, int, int]]]:
+        """
+        Combine all command patterns into one alternation so a command is
+        classified in a single regex pass.
+        
+        Returns:
+            Tuple of (compiled pattern, map of named group index to
+            (command type, group offset, capture group count))
+        """
+        parts = []
+        groups = {}
+        next_group = 1
+        for cmd_type in cls.COMMAND_PRIORITY:
+            pattern = cls.COMMAND_PATTERNS[cmd_type]
+            parts.append(f"(?P<{cmd_type}>{pattern.pattern})")
+            groups[next_group] = (cmd_type, next_group, pattern.groups)
+            next_group += pattern.groups + 1
+        return re.compile('|'.join(parts), re.IGNORECASE), groups
+    
+    def __init__(self, broker: BaseBroker, max_order_value: float = 50000.0,
+                 quote_cache: Optional[QuoteCache] = None, quote_ttl: float = 5.0):
         """
         Initialize the trading command processor
         
         Args:
             broker: The broker instance to use for executing commands
             max_order_value: Maximum value for any single order (safety limit)
+            quote_cache: Optional quote cache to share with other processors
+            quote_ttl: Seconds quotes are reused when no cache is given
         """
         self.broker = broker
         self.max_order_value = max_order_value
+        self.quote_cache = quote_cache or QuoteCache(broker, ttl=quote_ttl)
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         
         # Map command patterns to handler methods
@@ -89,10 +219,29 @@ class TradingCommandProcessor:
             'get_quote': self._handle_get_quote,
         }
     
+    def match_command(self, command: str) -> Optional[Tuple[str, CommandMatch]]:
+        """
+        Classify a command with the combined dispatcher pattern
+        
+        Args:
+            command: The command text
+            
+        Returns:
+            Tuple of (command type, match) or None when no command matches
+        """
+        match = _DISPATCHER.match(command.strip())
+        if match is None:
+            return None
+        cmd_type, offset, group_count = _DISPATCH_GROUPS[match.lastindex]
+        return cmd_type, CommandMatch(match, offset, group_count)
+    
     def process_command(self, command: str, user_id: str) -> Dict:
         """
         Process a trading command from the chat interface
         
+        Commands spanning several lines are processed as a batch (see
+        process_batch).
+        
         Args:
             command: The command text from the user
             user_id: User ID for authentication and tracking
@@ -100,59 +249,147 @@ class TradingCommandProcessor:
         Returns:
             Dict with response information and status
         """
+        if len(self._command_lines(command)) > 1:
+            return self.process_batch(command, user_id)
+        
         self.logger.info(f"Processing trading command from user {user_id}: {command}")
         
         try:
             # First, authenticate with the broker if needed
-            if not self.broker.authenticated:
-                self.broker.authenticate()
-            
-            # Try to match command against known patterns
-            for cmd_type, pattern in self.COMMAND_PATTERNS.items():
-                match = pattern.match(command)
-                if match:
-                    handler = self.command_handlers.get(cmd_type)
-                    if handler:
-                        return handler(match, user_id)
+            self._ensure_authenticated()
+            return self._dispatch(command, user_id)
+        except Exception as e:
+            return self._error_response(e)
+    
+    def process_batch(self, commands: str, user_id: str, max_workers: int = 8) -> Dict:
+        """
+        Process a multi-line list of orders, e.g. a pasted rebalancing list
+        
+        Quotes for every symbol are fetched concurrently before validation, and
+        the orders are submitted concurrently when the broker supports it
+        (otherwise in the order given). Each line succeeds or fails on its own.
+        
+        Args:
+            commands: Order commands, one per line (';' also separates orders);
+                blank lines and lines starting with '#' are ignored
+            user_id: User ID for authentication and tracking
+            max_workers: Maximum concurrent quote fetches and order submissions
             
-            # No matching command found
+        Returns:
+            Dict with per-line results in input order and a summary
+        """
+        lines = self._command_lines(commands)
+        self.logger.info(f"Processing batch of {len(lines)} trading commands from user {user_id}")
+        
+        try:
+            self._ensure_authenticated()
+        except Exception as e:
+            return self._error_response(e)
+        
+        matched = [self.match_command(line) for line in lines]
+        invalid = [line for line, found in zip(lines, matched) if found is None or found[0] not in self.ORDER_COMMANDS]
+        if invalid:
             return {
                 'status': 'error',
-                'message': "I couldn't understand that trading command. Try something like 'buy 10 AAPL at market' or 'show my positions'.",
-                'type': 'unknown_command'
+                'message': "Batches may only contain buy and sell orders. Couldn't use: " + "; ".join(invalid),
+                'type': 'batch_error',
+                'data': {'invalid_lines': invalid}
             }
-            
-        except AuthenticationError as e:
+        
+        # Warm the quote cache for every symbol in one concurrent round
+        self.quote_cache.prefetch([found[1].group(2) for found in matched], max_workers=max_workers)
+        
+        def run(line):
+            try:
+                return self._dispatch(line, user_id)
+            except Exception as e:
+                return self._error_response(e)
+        
+        workers = min(max_workers, len(lines)) if getattr(self.broker, 'supports_concurrent_orders', False) else 1
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(run, lines))
+        else:
+            results = [run(line) for line in lines]
+        
+        for line, result in zip(lines, results):
+            result['command'] = line
+        succeeded = sum(1 for result in results if result.get('status') == 'success')
+        failed = len(results) - succeeded
+        
+        message = f"Processed {len(results)} orders: {succeeded} succeeded, {failed} failed."
+        for result in results:
+            marker = "OK" if result.get('status') == 'success' else "FAILED"
+            message += f"\n[{marker}] {result['command']}: {result.get('message', '')}"
+        
+        return {
+            'status': 'success' if failed == 0 else ('partial' if succeeded else 'error'),
+            'message': message,
+            'type': 'batch',
+            'data': {
+                'results': results,
+                'succeeded': succeeded,
+                'failed': failed
+            }
+        }
+    
+    @staticmethod
+    def _command_lines(commands: str) -> List[str]:
+        lines = (line.strip() for line in re.split(r'[\r\n;]+', commands or ''))
+        return [line for line in lines if line and not line.startswith('#')]
+    
+    def _ensure_authenticated(self) -> None:
+        if not self.broker.authenticated:
+            self.broker.authenticate()
+    
+    def _dispatch(self, command: str, user_id: str) -> Dict:
+        """Match one command and run its handler"""
+        found = self.match_command(command)
+        if found is not None:
+            cmd_type, match = found
+            handler = self.command_handlers.get(cmd_type)
+            if handler:
+                return handler(match, user_id)
+        
+        # No matching command found
+        return {
+            'status': 'error',
+            'message': "I couldn't understand that trading command. Try something like 'buy 10 AAPL at market' or 'show my positions'.",
+            'type': 'unknown_command'
+        }
+    
+    def _error_response(self, e: Exception) -> Dict:
+        """Convert an exception raised while processing a command into a response"""
+        if isinstance(e, AuthenticationError):
             return {
                 'status': 'error',
                 'message': f"Authentication failed: {str(e)}",
                 'type': 'auth_error'
             }
-        except OrderError as e:
+        if isinstance(e, OrderError):
             return {
                 'status': 'error',
                 'message': f"Order error: {str(e)}",
                 'type': 'order_error'
             }
-        except PositionError as e:
+        if isinstance(e, PositionError):
             return {
                 'status': 'error',
                 'message': f"Position error: {str(e)}",
                 'type': 'position_error'
             }
-        except BrokerException as e:
+        if isinstance(e, BrokerException):
             return {
                 'status': 'error',
                 'message': f"Broker error: {str(e)}",
                 'type': 'broker_error'
             }
-        except Exception as e:
-            self.logger.error(f"Unexpected error processing command: {str(e)}")
-            return {
-                'status': 'error',
-                'message': f"An unexpected error occurred: {str(e)}",
-                'type': 'unexpected_error'
-            }
+        self.logger.error(f"Unexpected error processing command: {str(e)}")
+        return {
+            'status': 'error',
+            'message': f"An unexpected error occurred: {str(e)}",
+            'type': 'unexpected_error'
+        }
     
     def _validate_order_size(self, symbol: str, quantity: float, est_price: float) -> bool:
         """
@@ -185,7 +422,7 @@ class TradingCommandProcessor:
             Estimated price per share
         """
         try:
-            quote = self.broker.get_quote(symbol)
+            quote = self.quote_cache.get(symbol)
             return quote.get('ask_price', 0)
         except Exception:
             # If we can't get a quote, use a conservative estimate
@@ -629,7 +866,7 @@ class TradingCommandProcessor:
             }
         
         # Get latest quote for more detailed data
-        quote = self.broker.get_quote(symbol)
+        quote = self.quote_cache.get(symbol)
         
         # Calculate profit/loss
         pl_sign = "+" if position.unrealized_pl >= 0 else ""
@@ -870,7 +1107,7 @@ class TradingCommandProcessor:
         symbol = match.group(1).upper()
         
         try:
-            quote = self.broker.get_quote(symbol)
+            quote = self.quote_cache.get(symbol)
             
             # Format message
             message = f"Current Quote for {symbol}:\n"
@@ -896,4 +1133,7 @@ class TradingCommandProcessor:
                 'data': {
                     'symbol': symbol
                 }
-            }
\ No newline at end of file
+            }
+
+
+_DISPATCHER, _DISPATCH_GROUPS = TradingCommandProcessor._build_dispatcher()
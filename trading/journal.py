@@ -0,0 +1,115 @@
+"""
+Append-only trade journal for the paper trading broker
+
+Every state change is appended as one JSON line to ``journal.jsonl``. Every
+``snapshot_interval`` events the full broker state is written atomically to
+``snapshot.json`` and the journal is truncated, so startup cost is bounded by
+the snapshot size plus at most one interval of events to replay.
+"""
+
+import os
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class TradeJournal:
+    """
+    JSONL event journal with periodic snapshots.
+
+    Each event carries a monotonically increasing ``seq``; the snapshot records
+    the last sequence number it includes, so events left in the journal by a
+    crash between writing a snapshot and truncating the journal are skipped on
+    replay rather than applied twice.
+    """
+
+    JOURNAL_FILE = "journal.jsonl"
+    SNAPSHOT_FILE = "snapshot.json"
+
+    def __init__(self, data_path: str, snapshot_interval: int = 1000):
+        """
+        Args:
+            data_path: Directory holding the journal and snapshot
+            snapshot_interval: Events between snapshots
+        """
+        self.logger = logging.getLogger(__name__)
+        self.data_path = data_path
+        self.snapshot_interval = max(1, int(snapshot_interval))
+        self.journal_path = os.path.join(data_path, self.JOURNAL_FILE)
+        self.snapshot_path = os.path.join(data_path, self.SNAPSHOT_FILE)
+        self.seq = 0
+        self.events_since_snapshot = 0
+        self._handle = None
+
+        os.makedirs(data_path, exist_ok=True)
+
+    def load(self) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Read the latest snapshot and the journal events recorded after it.
+
+        A torn final line (from a crash mid-write) is discarded.
+
+        Returns:
+            (snapshot state or None, events to replay in order)
+        """
+        snapshot = None
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+        snapshot_seq = snapshot.get("seq", 0) if snapshot else 0
+        self.seq = snapshot_seq
+
+        events = []
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r") as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        self.logger.warning(f"Discarding unreadable journal line {line_number} in {self.journal_path}")
+                        break
+                    if event.get("seq", 0) > snapshot_seq:
+                        events.append(event)
+                        self.seq = event["seq"]
+
+        self.events_since_snapshot = len(events)
+        return (snapshot.get("state") if snapshot else None), events
+
+    def append(self, event_type: str, **payload: Any) -> bool:
+        """
+        Append one event.
+
+        Returns:
+            True when a snapshot is due
+        """
+        if self._handle is None:
+            self._handle = open(self.journal_path, "a")
+
+        self.seq += 1
+        event = {"seq": self.seq, "type": event_type, "ts": datetime.now().isoformat(), **payload}
+        self._handle.write(json.dumps(event) + "\n")
+        self._handle.flush()
+
+        self.events_since_snapshot += 1
+        return self.events_since_snapshot >= self.snapshot_interval
+
+    def write_snapshot(self, state: Dict[str, Any]) -> None:
+        """Atomically replace the snapshot with the given state and truncate the journal."""
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"seq": self.seq, "created_at": datetime.now().isoformat(), "state": state}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        self.close()
+        open(self.journal_path, "w").close()
+        self.events_since_snapshot = 0
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
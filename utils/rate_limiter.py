@@ -0,0 +1,421 @@
+"""
+Rate Limiter Utility Module
+Thread-safe token-bucket and sliding-window rate limiting shared by the market
+data clients, and priority-ordered admission so interactive requests are
+served before background work when the quota is contended.
+
+Sliding-window limiters obtained from ``get_window_limiter`` are shared by
+every client in the process. Setting the ``RATE_LIMIT_DB`` environment
+variable to a SQLite file path makes them shared across processes as well
+(e.g. all gunicorn workers), so the combined request rate stays within the
+provider's quota.
+"""
+
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lower values are admitted first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+_priority_context = threading.local()
+
+
+def current_priority() -> int:
+    """Request priority of the calling thread (interactive unless set otherwise)"""
+    return getattr(_priority_context, 'priority', PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """
+    Run upstream requests made by this thread at the given priority.
+
+    Example:
+        with request_priority(PRIORITY_BACKGROUND):
+            client.get_company_overview(symbol)
+    """
+    previous = getattr(_priority_context, 'priority', None)
+    _priority_context.priority = priority
+    try:
+        yield
+    finally:
+        if previous is None:
+            del _priority_context.priority
+        else:
+            _priority_context.priority = previous
+
+
+class RateLimiter:
+    """
+    Base class for limiters with a non-blocking ``try_acquire``.
+
+    ``acquire`` sleeps outside any lock, so a waiting thread never blocks
+    others from checking or consuming capacity.
+    """
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take capacity without blocking.
+
+        Returns:
+            0.0 if the tokens were taken, otherwise the estimated seconds to wait
+        """
+        raise NotImplementedError
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Block until tokens are available.
+
+        Args:
+            tokens: Number of tokens to take
+            timeout: Maximum seconds to wait; None waits indefinitely
+
+        Returns:
+            True if the tokens were taken, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class TokenBucket(RateLimiter):
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``. Callers
+    sleep outside the lock, so a waiting thread never blocks others from
+    checking or consuming tokens.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens without blocking.
+
+        Returns:
+            0.0 if the tokens were taken, otherwise the estimated seconds to wait
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+
+class SlidingWindowLimiter(RateLimiter):
+    """
+    At most ``limit`` calls in any ``period`` seconds, optionally with a minimum
+    interval between consecutive calls.
+
+    Call times are kept in a deque, so expiring old calls and checking the
+    window are amortised O(1) instead of rebuilding a list on every call.
+    """
+
+    def __init__(self, limit: int, period: float, min_interval: float = 0.0):
+        """
+        Args:
+            limit: Maximum calls per window
+            period: Window length in seconds
+            min_interval: Minimum seconds between consecutive calls
+        """
+        if limit <= 0 or period <= 0:
+            raise ValueError("limit and period must be positive")
+        self.limit = int(limit)
+        self.period = float(period)
+        self.min_interval = float(min_interval)
+        self._calls: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        calls = int(tokens)
+        if calls > self.limit:
+            raise ValueError(f"Cannot take {calls} calls from a window of {self.limit}")
+
+        with self._lock:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0] >= self.period:
+                self._calls.popleft()
+
+            wait = 0.0
+            if len(self._calls) + calls > self.limit:
+                # Wait until enough of the oldest calls leave the window
+                wait = self._calls[len(self._calls) + calls - self.limit - 1] + self.period - now
+            if self.min_interval and self._calls:
+                wait = max(wait, self._calls[-1] + self.min_interval - now)
+            if wait > 0:
+                return wait
+
+            self._calls.extend([now] * calls)
+            return 0.0
+
+    def in_window(self) -> int:
+        """Number of calls in the current window"""
+        with self._lock:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0] >= self.period:
+                self._calls.popleft()
+            return len(self._calls)
+
+
+class SharedSlidingWindowLimiter(RateLimiter):
+    """
+    Sliding-window limiter whose call log lives in a SQLite database, so every
+    process using the same file shares one window.
+
+    Each check runs in a ``BEGIN IMMEDIATE`` transaction, which takes SQLite's
+    write lock and makes the check-and-record atomic across processes.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rate_limit_calls (
+            name TEXT NOT NULL,
+            ts REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_rate_limit_calls ON rate_limit_calls (name, ts);
+    """
+
+    def __init__(self, name: str, limit: int, period: float, path: str,
+                 min_interval: float = 0.0):
+        """
+        Args:
+            name: Limiter name; processes share windows with the same name
+            limit: Maximum calls per window
+            period: Window length in seconds
+            path: SQLite database file
+            min_interval: Minimum seconds between consecutive calls
+        """
+        if limit <= 0 or period <= 0:
+            raise ValueError("limit and period must be positive")
+        self.name = name
+        self.limit = int(limit)
+        self.period = float(period)
+        self.min_interval = float(min_interval)
+        self.path = path
+        self._local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        calls = int(tokens)
+        if calls > self.limit:
+            raise ValueError(f"Cannot take {calls} calls from a window of {self.limit}")
+
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Wall-clock time, since timestamps are compared across processes
+            now = time.time()
+            conn.execute('DELETE FROM rate_limit_calls WHERE name = ? AND ts <= ?',
+                         (self.name, now - self.period))
+            stamps = [row[0] for row in conn.execute(
+                'SELECT ts FROM rate_limit_calls WHERE name = ? ORDER BY ts', (self.name,)
+            )]
+
+            wait = 0.0
+            if len(stamps) + calls > self.limit:
+                wait = stamps[len(stamps) + calls - self.limit - 1] + self.period - now
+            if self.min_interval and stamps:
+                wait = max(wait, stamps[-1] + self.min_interval - now)
+
+            if wait <= 0:
+                conn.executemany('INSERT INTO rate_limit_calls VALUES (?, ?)',
+                                 [(self.name, now)] * calls)
+            conn.execute('COMMIT')
+            return max(wait, 0.0)
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+
+class PriorityGate:
+    """
+    Admits callers to a rate limiter strictly in priority order.
+
+    Waiting callers form a heap ordered by (priority, arrival); only the head of
+    the heap may take a slot from the underlying limiter, so a background caller
+    that has been waiting longer never takes the slot an interactive caller is
+    waiting for. Callers at the same priority are served first come, first served.
+    """
+
+    def __init__(self, try_acquire: Callable[[], float]):
+        """
+        Args:
+            try_acquire: Non-blocking slot acquisition returning 0.0 on success or
+                         the estimated seconds until a slot frees up (e.g.
+                         ``TokenBucket.try_acquire``)
+        """
+        self._try_acquire = try_acquire
+        self._waiters: List[List] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    def acquire(self, priority: Optional[int] = None, key: Optional[str] = None,
+                timeout: Optional[float] = None) -> bool:
+        """
+        Block until this caller is first in line and a slot is available.
+
+        Args:
+            priority: Request priority; defaults to the thread's current_priority()
+            key: Optional request key so a queued request can be promoted later
+            timeout: Maximum seconds to wait; None waits indefinitely
+
+        Returns:
+            True once a slot was taken, False on timeout
+        """
+        priority = current_priority() if priority is None else priority
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waiter = [priority, next(self._counter), key]
+
+        with self._cond:
+            heapq.heappush(self._waiters, waiter)
+            try:
+                while True:
+                    wait = None
+                    if self._waiters[0] is waiter:
+                        wait = self._try_acquire()
+                        if wait == 0.0:
+                            return True
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def promote(self, key: str, priority: int) -> bool:
+        """
+        Raise the priority of a queued request, e.g. when an interactive caller
+        starts waiting on a background fetch of the same data.
+
+        Returns:
+            True if a queued request was promoted
+        """
+        with self._cond:
+            promoted = False
+            for waiter in self._waiters:
+                if waiter[2] == key and waiter[0] > priority:
+                    waiter[0] = priority
+                    promoted = True
+            if promoted:
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+            return promoted
+
+    def queued(self) -> Dict[int, int]:
+        """Number of waiting callers per priority"""
+        with self._cond:
+            counts: Dict[int, int] = {}
+            for priority, _, _ in self._waiters:
+                counts[priority] = counts.get(priority, 0) + 1
+            return counts
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_gates: Dict[str, PriorityGate] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_window_limiter(name: str, limit: int, period: float, min_interval: float = 0.0,
+                       shared_path: Optional[str] = None) -> RateLimiter:
+    """
+    Get the sliding-window limiter registered under ``name``, creating it on first use.
+
+    Args:
+        name: Upstream name, e.g. 'alpha_vantage'
+        limit: Maximum calls per window
+        period: Window length in seconds
+        min_interval: Minimum seconds between consecutive calls
+        shared_path: SQLite file used to share the window across processes;
+                     defaults to the RATE_LIMIT_DB environment variable, and the
+                     limiter is process-local if neither is set
+
+    Returns:
+        SharedSlidingWindowLimiter or SlidingWindowLimiter
+    """
+    shared_path = shared_path or os.environ.get('RATE_LIMIT_DB')
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            if shared_path:
+                limiter = SharedSlidingWindowLimiter(name, limit, period, shared_path, min_interval)
+            else:
+                limiter = SlidingWindowLimiter(limit, period, min_interval)
+            _limiters[name] = limiter
+            logger.debug(f"Created rate limiter '{name}': {limit} calls per {period:.1f}s"
+                         f"{' (shared)' if shared_path else ''}")
+        return limiter
+
+
+def get_priority_gate(name: str, limiter: RateLimiter) -> PriorityGate:
+    """
+    Get the priority gate in front of the limiter registered under ``name``.
+
+    All clients of one upstream queue in the same gate, so priorities are
+    honoured across client instances.
+    """
+    with _limiters_lock:
+        gate = _gates.get(name)
+        if gate is None:
+            gate = PriorityGate(limiter.try_acquire)
+            _gates[name] = gate
+        return gate
+
+
+def reset_rate_limiters() -> None:
+    """Forget every registered limiter and gate (used by tests)"""
+    with _limiters_lock:
+        _limiters.clear()
+        _gates.clear()